@@ -1,26 +1,142 @@
 import time
 import asyncio
+from collections import deque
+from typing import Deque, Dict, List, Mapping, Optional, Tuple
 from app.core.logger import get_logger
+from app.core import metrics
 
 logger = get_logger(__name__)
 
-class RateLimiter:
-    def __init__(self, calls: int = 10, period: float = 1.0):
-        self.calls = calls
+RATE_LIMIT_WAIT = metrics.histogram(
+    "rate_limiter_wait_seconds", "Time acquire() waited for tokens (0 on the fast path)",
+    buckets=(0.0, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+class TokenBucket:
+    """
+    Continuously refilling bucket: `capacity` tokens per `period` seconds, with bursts up to capacity.
+    All operations are O(1); tokens are only recomputed from elapsed time when touched.
+    """
+
+    def __init__(self, capacity: float, period: float, name: str = ""):
+        self.capacity = float(capacity)
         self.period = period
-        self.timestamps = []
-
-    async def acquire(self):
-        now = time.time()
-        # Remove timestamps older than the period
-        self.timestamps = [t for t in self.timestamps if now - t < self.period]
-        
-        if len(self.timestamps) >= self.calls:
-            sleep_time = self.period - (now - self.timestamps[0])
-            if sleep_time > 0:
-                logger.debug(f"Rate limit reached, sleeping for {sleep_time:.2f}s")
-                await asyncio.sleep(sleep_time)
-            # Re-check after sleeping
-            return await self.acquire()
-        
-        self.timestamps.append(time.time())
+        self.rate = self.capacity / period
+        self.name = name or f"{capacity:g}/{period:g}s"
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, weight: float, now: float) -> float:
+        """Seconds until `weight` tokens are available (0 if they are available now)."""
+        self._refill(now)
+        missing = weight - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def consume(self, weight: float, now: float) -> None:
+        self._refill(now)
+        self.tokens -= weight
+
+    def sync_used(self, used: float, now: float) -> None:
+        """Align with usage reported by the exchange. Only ever lowers the available tokens."""
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter:
+    """
+    Client-side limiter over one or more layered token buckets (e.g. per-second and per-minute).
+
+    Each call costs a weight (looked up by endpoint name, default 1) that must be available in
+    every bucket. Callers that have to wait are queued and released strictly in arrival order
+    by a single timer, so a refill wakes exactly the callers it can serve instead of all of them.
+    """
+
+    def __init__(
+        self,
+        calls: int = 10,
+        period: float = 1.0,
+        buckets: Optional[List[TokenBucket]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        header_buckets: Optional[Dict[str, TokenBucket]] = None,
+    ):
+        self.buckets = buckets or [TokenBucket(calls, period)]
+        self.weights = weights or {}
+        # Response header name (lower case) -> bucket whose usage the header reports
+        self.header_buckets = {k.lower(): v for k, v in (header_buckets or {}).items()}
+        self._waiters: Deque[Tuple[asyncio.Future, float]] = deque()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.total_wait = 0.0
+        self.waits = 0
+
+    def weight_for(self, endpoint: Optional[str]) -> float:
+        return self.weights.get(endpoint, 1) if endpoint else 1
+
+    def _delay(self, weight: float, now: float) -> float:
+        return max(bucket.delay(weight, now) for bucket in self.buckets)
+
+    def _consume(self, weight: float, now: float) -> None:
+        for bucket in self.buckets:
+            bucket.consume(weight, now)
+
+    async def acquire(self, endpoint: Optional[str] = None, weight: Optional[float] = None) -> None:
+        weight = self.weight_for(endpoint) if weight is None else weight
+        if any(weight > bucket.capacity for bucket in self.buckets):
+            raise ValueError(f"Weight {weight} exceeds rate limit bucket capacity")
+
+        now = time.monotonic()
+        # Fast path: nobody queued ahead and tokens available
+        if not self._waiters and self._delay(weight, now) == 0:
+            self._consume(weight, now)
+            RATE_LIMIT_WAIT.observe(0.0)
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiters.append((future, weight))
+        if self._timer is None:
+            self._dispatch()
+        await future
+        waited = time.monotonic() - now
+        self.total_wait += waited
+        self.waits += 1
+        RATE_LIMIT_WAIT.observe(waited)
+        logger.debug("Rate limit wait of %.3fs for %s (weight %s)", waited, endpoint or "call", weight)
+
+    def _dispatch(self) -> None:
+        """Release queued callers in FIFO order, then re-arm the timer for the next one."""
+        self._timer = None
+        now = time.monotonic()
+        while self._waiters:
+            future, weight = self._waiters[0]
+            if future.done():  # cancelled while waiting
+                self._waiters.popleft()
+                continue
+            delay = self._delay(weight, now)
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            self._consume(weight, now)
+            self._waiters.popleft()
+            future.set_result(None)
+
+    def observe_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Learn server-side usage from response headers such as Binance's x-mbx-used-weight-1m."""
+        if not headers or not self.header_buckets:
+            return
+        now = time.monotonic()
+        for name, value in headers.items():
+            bucket = self.header_buckets.get(name.lower())
+            if bucket is not None:
+                try:
+                    bucket.sync_used(float(value), now)
+                except ValueError:
+                    pass
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
@@ -0,0 +1,184 @@
+import asyncio
+import json
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Normalized stream events:
+#   ("kline", symbol, timeframe, [ts, open, high, low, close, volume], closed)  closed may be None if unknown
+#   ("trade", symbol, timestamp, price, amount)
+StreamEvent = Tuple
+
+_CLOSED = object()
+
+
+class StreamTransport(ABC):
+    """
+    Source of market data events. Subclasses push raw messages onto an internal queue from
+    their reader task(s); batches() drains everything already buffered and decodes it in one go.
+    """
+
+    def __init__(self, max_batch: int = 500, max_buffered: int = 10_000):
+        self.max_batch = max_batch
+        self.max_buffered = max_buffered
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # (error, messages queued before the close) once a reader has stopped
+        self._close: Optional[Tuple[Optional[BaseException], int]] = None
+        self._delivered = 0
+
+    @abstractmethod
+    async def connect(self, symbols: List[str], timeframe: str) -> None:
+        pass
+
+    @abstractmethod
+    def decode(self, raw: List[Any]) -> List[StreamEvent]:
+        pass
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def _start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_buffered)
+        self._close = None
+        self._delivered = 0
+
+    def _closed(self, error: Optional[BaseException] = None) -> None:
+        if self._close is not None:
+            return
+        # Recorded out of band: a sentinel would not fit in a full queue. What was queued before
+        # the close is still delivered, then batches() raises
+        self._close = (error, self._delivered + self._queue.qsize())
+        try:
+            # Wakes batches() if it is waiting on an empty queue
+            self._queue.put_nowait(_CLOSED)
+        except asyncio.QueueFull:
+            pass
+
+    async def batches(self) -> AsyncIterator[List[StreamEvent]]:
+        queue = self._queue
+        while True:
+            if self._close is not None and self._delivered >= self._close[1]:
+                raise ConnectionError(f"Stream closed: {self._close[0]}")
+            raw = [await queue.get()]
+            while len(raw) < self.max_batch and not queue.empty():
+                raw.append(queue.get_nowait())
+
+            raw = [item for item in raw if item is not _CLOSED]
+            if self._close is not None:
+                raw = raw[:self._close[1] - self._delivered]
+            self._delivered += len(raw)
+            if raw:
+                yield self.decode(raw)
+
+
+class BinanceWebSocketTransport(StreamTransport):
+    """Binance combined kline/trade streams over a plain WebSocket (aiohttp)."""
+
+    def __init__(self, url: str = "wss://stream.binance.com:9443/stream", streams=("kline",), **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.streams = streams
+        self._session = None
+        self._ws = None
+        self._symbols: Dict[str, str] = {}
+
+    async def connect(self, symbols: List[str], timeframe: str) -> None:
+        import aiohttp
+
+        self._symbols = {symbol.replace("/", "").upper(): symbol for symbol in symbols}
+        names = []
+        for market in self._symbols:
+            if "kline" in self.streams:
+                names.append(f"{market.lower()}@kline_{timeframe}")
+            if "trade" in self.streams:
+                names.append(f"{market.lower()}@trade")
+
+        self._start()
+        self._session = aiohttp.ClientSession()
+        self._ws = await self._session.ws_connect(f"{self.url}?streams={'/'.join(names)}", heartbeat=30)
+        self._tasks.append(asyncio.create_task(self._read()))
+
+    async def _read(self) -> None:
+        import aiohttp
+
+        error = None
+        try:
+            async for message in self._ws:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    await self._queue.put(message.data)
+                elif message.type == aiohttp.WSMsgType.ERROR:
+                    error = self._ws.exception()
+                    break
+        except Exception as e:
+            error = e
+        self._closed(error)
+
+    def decode(self, raw: List[str]) -> List[StreamEvent]:
+        # One parser call for the whole batch instead of one per message
+        messages = json.loads("[" + ",".join(raw) + "]")
+        events = []
+        for message in messages:
+            data = message.get("data", message)
+            symbol = self._symbols.get(data.get("s"))
+            if symbol is None:
+                continue
+            if data.get("e") == "kline":
+                k = data["k"]
+                candle = [int(k["t"]), float(k["o"]), float(k["h"]), float(k["l"]), float(k["c"]), float(k["v"])]
+                events.append(("kline", symbol, k["i"], candle, bool(k["x"])))
+            elif data.get("e") == "trade":
+                events.append(("trade", symbol, int(data["T"]), float(data["p"]), float(data["q"])))
+        return events
+
+    async def close(self) -> None:
+        await super().close()
+        if self._ws is not None:
+            await self._ws.close()
+        if self._session is not None:
+            await self._session.close()
+        self._ws = self._session = None
+
+
+class CCXTProTransport(StreamTransport):
+    """watch_ohlcv via ccxt.pro for any exchange it supports; one watcher task per symbol."""
+
+    def __init__(self, exchange_id: str, config: Optional[Dict] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.exchange_id = exchange_id
+        self.config = config or {}
+        self.exchange = None
+
+    async def connect(self, symbols: List[str], timeframe: str) -> None:
+        import ccxt.pro
+
+        self._start()
+        self.exchange = getattr(ccxt.pro, self.exchange_id)(self.config)
+        for symbol in symbols:
+            self._tasks.append(asyncio.create_task(self._watch(symbol, timeframe)))
+
+    async def _watch(self, symbol: str, timeframe: str) -> None:
+        try:
+            while True:
+                candles = await self.exchange.watch_ohlcv(symbol, timeframe)
+                await self._queue.put((symbol, timeframe, candles))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._closed(e)
+
+    def decode(self, raw: List[Tuple]) -> List[StreamEvent]:
+        # ccxt.pro has no closed flag; the builder closes a candle when a newer one shows up
+        return [("kline", symbol, timeframe, list(candle), None) for symbol, timeframe, candles in raw for candle in candles]
+
+    async def close(self) -> None:
+        await super().close()
+        if self.exchange is not None:
+            await self.exchange.close()
+            self.exchange = None
@@ -0,0 +1,64 @@
+import datetime
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from app.core.db import get_async_db
+from app.core import async_repository, balances
+from app.backend.cache import response_cache, rows_to_json
+from app.backend.schemas import BalanceHistory, BalanceRead
+
+router = APIRouter()
+
+BALANCE_FIELDS = ["timestamp", "asset", "free", "used", "total"]
+# Rollup rows (bucket, asset, open, high, low, close, free, used, changes) as points
+ROLLUP_FIELDS = ["timestamp", "asset", "open", "high", "low", "total", "free", "used", "changes"]
+DEFAULT_WINDOW = datetime.timedelta(days=1)
+
+@router.get("/", response_model=List[BalanceRead])
+async def read_balances(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Current balance of every asset held, as last recorded."""
+    async def build():
+        rows = await async_repository.get_latest_balances(db)
+        return rows_to_json(BALANCE_FIELDS, rows), {}
+
+    return await response_cache.respond(request, db, ["balance_snapshots"], build)
+
+@router.get("/history", response_model=BalanceHistory)
+async def read_balance_history(
+    request: Request,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    asset: Optional[str] = None,
+    resolution: Literal["auto", "raw", "1h", "1d"] = "auto",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Balances over [since, until) (default: the last day). "raw" returns each change, led by
+    the balances at `since`; "1h"/"1d" one point per asset and bucket. "auto" picks raw
+    changes for windows up to two days and otherwise the finest rollup with at most
+    1000 buckets in the window.
+    """
+    until = balances.as_utc(until) if until else datetime.datetime.now(datetime.timezone.utc)
+    window_since = balances.as_utc(since) if since else until - DEFAULT_WINDOW
+    if window_since >= until:
+        raise HTTPException(status_code=400, detail="since must be before until")
+    if resolution == "auto":
+        resolution = balances.choose_resolution(window_since, until)
+
+    async def build():
+        if resolution == "raw":
+            rows = await async_repository.get_balance_changes(db, window_since, until, asset)
+            fields = BALANCE_FIELDS
+        else:
+            rows = await async_repository.get_balance_rollups(db, resolution, window_since, until, asset)
+            fields = ROLLUP_FIELDS
+        points = [dict(zip(fields, row)) for row in rows]
+        return orjson.dumps({"resolution": resolution, "points": points}), {}
+
+    if since is None:
+        # A window relative to now changes without any write, so it is not cached
+        body, headers = await build()
+        return Response(body, media_type="application/json", headers=headers)
+    table = "balance_snapshots" if resolution == "raw" else "balance_rollups"
+    return await response_cache.respond(request, db, [table], build)
@@ -5,5 +5,5 @@ from app.core.utils import now_utc
 router = APIRouter()
 
 @router.get("/", response_model=HealthCheck)
-def health_check():
+async def health_check():
     return HealthCheck(status="ok", timestamp=now_utc())
@@ -0,0 +1,95 @@
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Optional, Set
+from app.core.db import get_async_session_factory
+from app.core.events import Subscription
+from app.backend.live import EVENT_TYPES, live_bus, live_feed
+
+router = APIRouter()
+
+# Comment line sent on an idle stream so proxies keep the connection open
+KEEPALIVE_SECONDS = 15.0
+
+def parse_types(types: Optional[str]) -> Optional[Set[str]]:
+    if types is None:
+        return None
+    wanted = {name for name in types.split(",") if name}
+    unknown = wanted - EVENT_TYPES
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown event types: {', '.join(sorted(unknown))}")
+    return wanted
+
+async def sse_frames(subscription: Subscription) -> AsyncIterator[bytes]:
+    try:
+        yield b"retry: 3000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if event is None:
+                if subscription.closed_reason == "slow consumer":
+                    yield b"event: evicted\ndata: {}\n\n"
+                return
+            yield event.sse
+    finally:
+        live_bus.unsubscribe(subscription)
+
+@router.get("/events")
+async def stream_events(
+    types: Optional[str] = None,
+    after: Optional[int] = None,
+    last_event_id: Optional[int] = Header(None),
+    session_factory=Depends(get_async_session_factory),
+):
+    """
+    Server-Sent Events: one `trade`, `position` or `pnl` event per changed row (comma-separated
+    `types` to filter). Reconnects resume after Last-Event-ID (or `after`); a `reset` event
+    means the gap could not be replayed and the client should reload through the REST endpoints.
+    """
+    wanted = parse_types(types)
+    await live_feed.ensure_started(session_factory)
+    subscription = live_bus.subscribe(wanted, after=after if after is not None else last_event_id)
+    return StreamingResponse(
+        sse_frames(subscription), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def websocket_events(
+    websocket: WebSocket,
+    types: Optional[str] = None,
+    after: Optional[int] = None,
+    session_factory=Depends(get_async_session_factory),
+):
+    """The events of /events as JSON text messages ({"seq", "type", "data"})."""
+    try:
+        wanted = parse_types(types)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    await websocket.accept()
+    await live_feed.ensure_started(session_factory)
+    subscription = live_bus.subscribe(wanted, after=after)
+
+    async def watch_disconnect():
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close("disconnected")
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        async for event in subscription:
+            await websocket.send_text(event.payload.decode())
+        if subscription.closed_reason == "slow consumer":
+            # 1013: try again later
+            await websocket.close(code=1013, reason="slow consumer")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        live_bus.unsubscribe(subscription)
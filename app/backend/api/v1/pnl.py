@@ -0,0 +1,71 @@
+import datetime
+import orjson
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.db import get_async_db
+from app.core import async_repository
+from app.backend.cache import response_cache
+from app.backend.schemas import DailyPnlRead, EquityPoint, PnlSummary, SymbolPnl
+
+router = APIRouter()
+
+@router.get("/", response_model=PnlSummary)
+async def read_pnl(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Realized PnL from the positions table; unrealized PnL marked at each symbol's last traded price."""
+    async def build():
+        summary = await _pnl_summary(db)
+        return summary.model_dump_json().encode(), {}
+
+    return await response_cache.respond(request, db, ["positions", "trades"], build)
+
+async def _pnl_summary(db: AsyncSession) -> PnlSummary:
+    positions = await async_repository.get_positions(db)
+    marks = await async_repository.get_last_prices(db, [p.symbol for p in positions if p.size])
+    symbols = []
+    for position in positions:
+        mark = marks.get(position.symbol)
+        cost_basis = position.cost_basis or 0.0
+        symbols.append(SymbolPnl(
+            symbol=position.symbol,
+            size=position.size or 0.0,
+            avg_price=position.avg_price or 0.0,
+            cost_basis=cost_basis,
+            mark_price=mark,
+            unrealized_pnl=(position.size or 0.0) * mark - cost_basis if mark is not None else None,
+            realized_pnl=position.realized_pnl or 0.0,
+            fees=position.fees or 0.0,
+        ))
+    return PnlSummary(
+        realized_pnl=sum(s.realized_pnl for s in symbols),
+        unrealized_pnl=sum(s.unrealized_pnl or 0.0 for s in symbols),
+        fees=sum(s.fees for s in symbols),
+        symbols=symbols,
+    )
+
+@router.get("/daily", response_model=List[DailyPnlRead])
+async def read_daily_pnl(
+    request: Request,
+    symbol: Optional[str] = None,
+    since: Optional[datetime.date] = None,
+    until: Optional[datetime.date] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    async def build():
+        rows = await async_repository.get_daily_pnl_range(db, symbol=symbol, since=since, until=until)
+        return orjson.dumps([DailyPnlRead.model_validate(row).model_dump() for row in rows]), {}
+
+    return await response_cache.respond(request, db, ["pnl_daily"], build)
+
+@router.get("/equity", response_model=List[EquityPoint])
+async def read_equity_curve(request: Request, symbol: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Cumulative realized PnL by day, from the materialized daily aggregates."""
+    async def build():
+        curve = []
+        cumulative = 0.0
+        for day, realized, fees in await async_repository.get_daily_pnl_totals(db, symbol=symbol):
+            cumulative += realized or 0.0
+            curve.append({"day": day, "realized_pnl": realized or 0.0, "cumulative_pnl": cumulative, "fees": fees or 0.0})
+        return orjson.dumps(curve), {}
+
+    return await response_cache.respond(request, db, ["pnl_daily"], build)
@@ -1,13 +1,19 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.core.db import get_db
-from app.core import repository
+from app.core.db import get_async_db
+from app.core import async_repository
+from app.backend.cache import response_cache, rows_to_json
 from app.backend.schemas import PositionRead
 
 router = APIRouter()
 
+POSITION_FIELDS = list(PositionRead.model_fields)
+
 @router.get("/", response_model=List[PositionRead])
-def read_positions(db: Session = Depends(get_db)):
-    positions = repository.get_positions(db)
-    return positions
+async def read_positions(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        rows = await async_repository.get_position_rows(db, POSITION_FIELDS)
+        return rows_to_json(POSITION_FIELDS, rows), {}
+
+    return await response_cache.respond(request, db, ["positions"], build)
@@ -1,13 +1,98 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.db import get_db
-from app.core import repository
+import csv
+import datetime
+import io
+import json
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Literal, Optional
+from app.core.db import get_async_db, get_async_session_factory
+from app.core import async_repository
+from app.backend.cache import response_cache, rows_to_json
+from app.backend.pagination import decode_cursor, encode_cursor
 from app.backend.schemas import TradeRead
 
 router = APIRouter()
 
+TRADE_FIELDS = list(TradeRead.model_fields)
+EXPORT_FIELDS = TRADE_FIELDS
+
+def trade_filters(
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime.datetime] = Query(None, description="Executed at or after (inclusive)"),
+    until: Optional[datetime.datetime] = Query(None, description="Executed before (exclusive)"),
+) -> dict:
+    return {"symbol": symbol, "side": side, "status": status, "since": since, "until": until}
+
 @router.get("/", response_model=List[TradeRead])
-def read_trades(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    trades = repository.get_trades(db, limit=limit, offset=skip)
-    return trades
+async def read_trades(
+    request: Request,
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    limit: int = Query(100, ge=1, le=1000),
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; prefer cursor"),
+    filters: dict = Depends(trade_filters),
+    db: AsyncSession = Depends(get_async_db),
+):
+    before = decode_cursor(cursor) if cursor else None
+
+    async def build():
+        rows = await async_repository.get_trade_rows(
+            db, TRADE_FIELDS, limit=limit, offset=skip, before=before, **filters
+        )
+        headers = {}
+        if len(rows) == limit:
+            last = dict(zip(TRADE_FIELDS, rows[-1]))
+            headers["X-Next-Cursor"] = encode_cursor(last["executed_at"], last["id"])
+        return rows_to_json(TRADE_FIELDS, rows), headers
+
+    return await response_cache.respond(request, db, ["trades"], build)
+
+def _row(trade) -> dict:
+    return TradeRead.model_validate(trade).model_dump(mode="json")
+
+async def _stream_rows(session_factory, filters: dict) -> AsyncIterator[dict]:
+    # The session lives as long as the response body, not the request handler
+    async with session_factory() as session:
+        async for trade in async_repository.stream_trades(session, **filters):
+            yield _row(trade)
+
+async def _ndjson(rows: AsyncIterator[dict], chunk_rows: int = 500) -> AsyncIterator[str]:
+    chunk = []
+    async for row in rows:
+        chunk.append(json.dumps(row))
+        if len(chunk) == chunk_rows:
+            yield "\n".join(chunk) + "\n"
+            chunk = []
+    if chunk:
+        yield "\n".join(chunk) + "\n"
+
+async def _csv(rows: AsyncIterator[dict], chunk_rows: int = 500) -> AsyncIterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    count = 0
+    async for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+@router.get("/export")
+async def export_trades(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    filters: dict = Depends(trade_filters),
+    session_factory=Depends(get_async_session_factory),
+):
+    """Stream every matching trade, newest first, without materializing the result."""
+    rows = _stream_rows(session_factory, filters)
+    if format == "csv":
+        return StreamingResponse(
+            _csv(rows), media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="trades.csv"'},
+        )
+    return StreamingResponse(_ndjson(rows), media_type="application/x-ndjson")
@@ -0,0 +1,126 @@
+"""
+Response cache for read endpoints that are polled by the dashboard.
+
+Entries are keyed by path and query string and validated against the per-table version
+counters (app.core.table_versions). The versions are read at most once per
+`version_ttl` seconds no matter how many requests arrive, and the ETag is derived from the
+versions alone, so a matching If-None-Match gets a 304 without running the query, and an
+unchanged cache entry is served as stored bytes.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import orjson
+from fastapi import Request, Response
+
+from app.core import async_repository
+from app.core.config import settings
+
+Builder = Callable[[], Awaitable[Tuple[bytes, Dict[str, str]]]]
+
+
+def rows_to_json(fields: Sequence[str], rows: Iterable[Tuple]) -> bytes:
+    """Serialize row tuples as a JSON list of objects without building models per row."""
+    return orjson.dumps([dict(zip(fields, row)) for row in rows])
+
+
+@dataclass
+class CacheEntry:
+    etag: str
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 512, version_ttl: float = 0.5):
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._building: Dict[str, asyncio.Future] = {}
+        self._versions: Dict[str, int] = {}
+        self._versions_at = float("-inf")
+        self._versions_lock: Optional[asyncio.Lock] = None
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._versions = {}
+        self._versions_at = float("-inf")
+        self.hits = self.misses = self.not_modified = 0
+
+    async def versions(self, session) -> Dict[str, int]:
+        if time.monotonic() - self._versions_at < self.version_ttl:
+            return self._versions
+        if self._versions_lock is None:
+            self._versions_lock = asyncio.Lock()
+        async with self._versions_lock:
+            # Another request may have refreshed them while this one waited
+            if time.monotonic() - self._versions_at >= self.version_ttl:
+                self._versions = await async_repository.get_table_versions(session)
+                self._versions_at = time.monotonic()
+        return self._versions
+
+    @staticmethod
+    def cache_key(request: Request) -> str:
+        return request.url.path + "?" + "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+
+    async def respond(self, request: Request, session, tables: List[str], build: Builder) -> Response:
+        versions = await self.versions(session)
+        key = self.cache_key(request)
+        state = ",".join(f"{table}:{versions.get(table, 0)}" for table in sorted(tables))
+        etag = '"' + hashlib.blake2b(f"{key}|{state}".encode(), digest_size=12).hexdigest() + '"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        if etag in request.headers.get("if-none-match", ""):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        entry = self._entries.get(key)
+        if entry is not None and entry.etag == etag:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        else:
+            entry = await self._build(key, etag, build)
+        return Response(entry.body, media_type="application/json", headers={**entry.headers, **headers})
+
+    async def _build(self, key: str, etag: str, build: Builder) -> CacheEntry:
+        # Concurrent misses for the same key share one query
+        pending = self._building.get(key)
+        if pending is not None:
+            entry = await asyncio.shield(pending)
+            if entry.etag == etag:
+                self.hits += 1
+                return entry
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._building[key] = future
+        try:
+            body, extra_headers = await build()
+            entry = CacheEntry(etag, body, extra_headers)
+            future.set_result(entry)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved; the caller re-raises
+            raise
+        finally:
+            if self._building.get(key) is future:
+                del self._building[key]
+
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "not_modified": self.not_modified}
+
+
+response_cache = ResponseCache(version_ttl=settings.API_CACHE_VERSION_TTL)
@@ -0,0 +1,174 @@
+"""
+Live updates for the dashboard: database changes turned into events on an in-process bus
+(app.core.events), pushed to SSE and WebSocket clients by app.backend.api.v1.live.
+
+The ChangeFeed reads the per-table version counters (app.core.table_versions) once per poll
+interval, or as soon as the bot sends a change notification (app.core.change_notifications),
+and only when trades, positions or pnl_daily moved on does it query that table, once, for
+what changed:
+
+- trades: rows above the highest id seen less RECENT_TRADE_IDS, plus the trades still open
+  (their status, amount and price change when they fill)
+- positions: all rows (one per symbol), diffed against the previous read
+- pnl_daily: the rows of the last `pnl_days` days, diffed against the previous read
+
+So the database work grows with the rate of changes, not with the number of clients.
+"""
+import asyncio
+import datetime
+from typing import Dict, Optional, Set, Tuple
+
+from app.backend.schemas import DailyPnlRead, PositionRead, TradeRead
+from app.core import async_repository
+from app.core.config import settings
+from app.core.events import EventBus
+from app.core.logger import get_rate_limited_logger
+
+poll_logger = get_rate_limited_logger(__name__, interval=60.0)
+
+TRADE_FIELDS = list(TradeRead.model_fields)
+POSITION_FIELDS = list(PositionRead.model_fields)
+PNL_FIELDS = list(DailyPnlRead.model_fields)
+# Table -> event type
+LIVE_TABLES = {"trades": "trade", "positions": "position", "pnl_daily": "pnl"}
+EVENT_TYPES = frozenset(LIVE_TABLES.values())
+# Open trades re-read on every trades change
+MAX_OPEN_TRADES = 10_000
+# Ids below the highest seen that are re-read too: with several writers (Postgres) an id is taken
+# at insert but the row only shows up at commit, so a lower id can appear after a higher one.
+# A trade committed more than this many ids late is missed until it changes again
+RECENT_TRADE_IDS = 256
+
+_ID = TRADE_FIELDS.index("id")
+_STATUS = TRADE_FIELDS.index("status")
+
+
+class ChangeFeed:
+    def __init__(self, bus: EventBus, poll_interval: float = 1.0, pnl_days: int = 2):
+        self.bus = bus
+        self.poll_interval = poll_interval
+        self.pnl_days = pnl_days
+        self.polls = 0
+        self.reads = 0  # queries of changed tables
+        self._session_factory = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._starting: Optional[asyncio.Lock] = None
+        self._versions: Dict[str, int] = {}
+        self._last_trade_id = 0
+        self._open_trades: Dict[int, Tuple] = {}
+        self._recent_trades: Dict[int, Tuple] = {}
+        self._positions: Dict[str, Tuple] = {}
+        self._pnl: Dict[Tuple, Tuple] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def ensure_started(self, session_factory) -> None:
+        """Start following the database behind `session_factory`, unless already running."""
+        if self.running:
+            return
+        if self._starting is None:
+            self._starting = asyncio.Lock()
+        async with self._starting:
+            if self.running:
+                return
+            self._session_factory = session_factory
+            self._wakeup = asyncio.Event()
+            async with session_factory() as session:
+                # Versions first: a change racing with the baseline shows up as a version bump
+                self._versions = await async_repository.get_table_versions(session)
+                await self._load_baseline(session)
+            self._task = asyncio.create_task(self._run())
+
+    def wake(self, tables: Optional[Set[str]] = None) -> None:
+        """Poll now instead of at the end of the interval (a change notification arrived)."""
+        if self._wakeup is not None and (tables is None or tables & LIVE_TABLES.keys()):
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"polls": self.polls, "reads": self.reads, **self.bus.stats()}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                async with self._session_factory() as session:
+                    await self.poll(session)
+            except Exception as e:
+                poll_logger.error("Live update poll failed: %s", e)
+
+    async def poll(self, session) -> None:
+        self.polls += 1
+        versions = await async_repository.get_table_versions(session)
+        changed = {table for table in LIVE_TABLES if versions.get(table, 0) != self._versions.get(table, 0)}
+        self._versions = versions
+        if "trades" in changed:
+            await self._trades(session)
+        if "positions" in changed:
+            await self._positions_changed(session)
+        if "pnl_daily" in changed:
+            await self._pnl_changed(session)
+
+    async def _load_baseline(self, session) -> None:
+        self._last_trade_id = await async_repository.get_last_trade_id(session)
+        rows = await async_repository.get_trade_rows(session, TRADE_FIELDS, limit=MAX_OPEN_TRADES, status="open")
+        self._open_trades = {row[_ID]: row for row in rows}
+        rows = await async_repository.get_trade_changes(session, TRADE_FIELDS, self._last_trade_id - RECENT_TRADE_IDS)
+        self._recent_trades = {row[_ID]: row for row in rows}
+        self._positions = {row[0]: row for row in await async_repository.get_position_rows(session, POSITION_FIELDS)}
+        self._pnl = {row[:2]: row for row in await self._pnl_rows(session)}
+
+    async def _trades(self, session) -> None:
+        self.reads += 1
+        rows = await async_repository.get_trade_changes(
+            session, TRADE_FIELDS, self._last_trade_id - RECENT_TRADE_IDS, list(self._open_trades)
+        )
+        open_trades = {}
+        for row in rows:
+            trade_id = row[_ID]
+            if self._recent_trades.get(trade_id, self._open_trades.get(trade_id)) != row:
+                self.bus.publish("trade", dict(zip(TRADE_FIELDS, row)))
+            if row[_STATUS] == "open":
+                open_trades[trade_id] = row
+        self._open_trades = open_trades
+        if rows:
+            self._last_trade_id = max(self._last_trade_id, rows[-1][_ID])
+        self._recent_trades = {row[_ID]: row for row in rows if row[_ID] > self._last_trade_id - RECENT_TRADE_IDS}
+
+    async def _positions_changed(self, session) -> None:
+        self.reads += 1
+        positions = {row[0]: row for row in await async_repository.get_position_rows(session, POSITION_FIELDS)}
+        for symbol, row in positions.items():
+            if self._positions.get(symbol) != row:
+                self.bus.publish("position", dict(zip(POSITION_FIELDS, row)))
+        for symbol in self._positions.keys() - positions.keys():
+            self.bus.publish("position", {"symbol": symbol, "deleted": True})
+        self._positions = positions
+
+    async def _pnl_rows(self, session):
+        since = datetime.datetime.now(datetime.timezone.utc).date() - datetime.timedelta(days=self.pnl_days - 1)
+        return await async_repository.get_daily_pnl_rows(session, PNL_FIELDS, since=since)
+
+    async def _pnl_changed(self, session) -> None:
+        self.reads += 1
+        pnl = {row[:2]: row for row in await self._pnl_rows(session)}
+        for key, row in pnl.items():
+            if self._pnl.get(key) != row:
+                self.bus.publish("pnl", dict(zip(PNL_FIELDS, row)))
+        self._pnl = pnl
+
+
+live_bus = EventBus(max_buffer=settings.LIVE_CLIENT_BUFFER, replay=settings.LIVE_REPLAY_EVENTS)
+live_feed = ChangeFeed(live_bus, poll_interval=settings.LIVE_POLL_SECONDS)
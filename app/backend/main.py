@@ -1,18 +1,46 @@
-from fastapi import FastAPI
-from app.backend.api.v1 import trades, positions, health
-from app.core.db import init_db
+from fastapi import FastAPI, Response
+from app.backend.api.v1 import trades, positions, pnl, balances, health, live
+from app.backend.live import live_feed
+from app.core import metrics
+from app.core.config import settings
+from app.core.db import init_db, dispose_async_engine
+from app.core.logger import setup_logging
 
 app = FastAPI(title="Trading Bot API")
 
 # Initialize DB on startup (for simplicity, usually done via migration)
 @app.on_event("startup")
 def on_startup():
+    setup_logging()
     init_db()
 
+@app.on_event("startup")
+async def start_change_notifications():
+    # The bot's commits wake the live feed at once instead of at its next poll
+    app.state.change_server = None
+    if settings.LIVE_EVENTS_SOCKET:
+        from app.core.change_notifications import serve_change_notifications
+
+        app.state.change_server = await serve_change_notifications(settings.LIVE_EVENTS_SOCKET, live_feed.wake)
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    if getattr(app.state, "change_server", None) is not None:
+        app.state.change_server.close()
+    await live_feed.stop()
+    await dispose_async_engine()
+
 app.include_router(trades.router, prefix="/api/v1/trades", tags=["trades"])
 app.include_router(positions.router, prefix="/api/v1/positions", tags=["positions"])
+app.include_router(pnl.router, prefix="/api/v1/pnl", tags=["pnl"])
+app.include_router(balances.router, prefix="/api/v1/balances", tags=["balances"])
+app.include_router(live.router, prefix="/api/v1/live", tags=["live"])
 app.include_router(health.router, prefix="/api/v1/health", tags=["health"])
 
+@app.get("/metrics", include_in_schema=False)
+def read_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     # Bind to localhost ONLY
@@ -0,0 +1,18 @@
+import base64
+import datetime
+import json
+from typing import Tuple
+from fastapi import HTTPException
+
+def encode_cursor(executed_at: datetime.datetime, trade_id: int) -> str:
+    """Opaque keyset cursor pointing just past the given row."""
+    raw = json.dumps([executed_at.isoformat(), trade_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        executed_at, trade_id = json.loads(raw)
+        return datetime.datetime.fromisoformat(executed_at), int(trade_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
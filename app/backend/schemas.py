@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
-from datetime import datetime
+from typing import Optional, Dict, Any, List
+from datetime import date, datetime
 
 class TradeRead(BaseModel):
     id: int
@@ -19,11 +19,73 @@ class PositionRead(BaseModel):
     symbol: str
     size: float
     avg_price: float
+    cost_basis: Optional[float] = None
+    fees: Optional[float] = None
+    realized_pnl: Optional[float] = None
     updated_at: datetime
 
     class Config:
         from_attributes = True
 
+class SymbolPnl(BaseModel):
+    symbol: str
+    size: float
+    avg_price: float
+    cost_basis: float
+    mark_price: Optional[float] = None  # Last traded price
+    unrealized_pnl: Optional[float] = None
+    realized_pnl: float
+    fees: float
+
+class PnlSummary(BaseModel):
+    realized_pnl: float
+    unrealized_pnl: float
+    fees: float
+    symbols: List[SymbolPnl]
+
+class DailyPnlRead(BaseModel):
+    day: date
+    symbol: str
+    trades: int
+    bought: float
+    sold: float
+    buy_notional: float
+    sell_notional: float
+    fees: float
+    realized_pnl: float
+
+    class Config:
+        from_attributes = True
+
+class EquityPoint(BaseModel):
+    day: date
+    realized_pnl: float
+    cumulative_pnl: float
+    fees: float
+
+class BalanceRead(BaseModel):
+    asset: str
+    timestamp: datetime
+    free: float
+    used: float
+    total: float
+
+class BalancePoint(BaseModel):
+    """A change of one asset's balance, or (rollup resolutions) one bucket with the total's range."""
+    timestamp: datetime
+    asset: str
+    free: float
+    used: float
+    total: float
+    open: Optional[float] = None
+    high: Optional[float] = None
+    low: Optional[float] = None
+    changes: Optional[int] = None
+
+class BalanceHistory(BaseModel):
+    resolution: str
+    points: List[BalancePoint]
+
 class HealthCheck(BaseModel):
     status: str
     timestamp: datetime
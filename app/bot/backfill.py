@@ -0,0 +1,69 @@
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.candle_store import CandleStore
+from app.core.logger import get_logger
+from app.core.utils import timeframe_to_ms
+from app.providers.base import BaseProvider
+
+logger = get_logger(__name__)
+
+
+def missing_ranges(store: CandleStore, provider_name: str, symbol: str, timeframe: str,
+                   start: int, end: int) -> List[Tuple[int, int]]:
+    """[start, end) ranges (ms) not yet covered by the store."""
+    tf = timeframe_to_ms(timeframe)
+    first = store.first_timestamp(provider_name, symbol, timeframe)
+    last = store.last_timestamp(provider_name, symbol, timeframe)
+    if first is None:
+        return [(start, end)]
+
+    ranges = []
+    if start < first:
+        ranges.append((start, first))
+    ranges.extend(gap for gap in store.find_gaps(provider_name, symbol, timeframe) if gap[1] > start and gap[0] < end)
+    if last + tf < end:
+        ranges.append((max(start, last + tf), end))
+    return ranges
+
+
+async def backfill(provider: BaseProvider, store: CandleStore, provider_name: str, symbol: str, timeframe: str,
+                   start: int, end: Optional[int] = None, page_limit: int = 1000, flush_rows: int = 100_000) -> int:
+    """
+    Page through provider.fetch_ohlcv with `since` to fill every missing range between start and end (ms).
+    Only closed candles are stored. Returns the number of candles written.
+
+    Pages are written in batches of up to `flush_rows` candles: a range before the end of the
+    stored series rewrites it, and once per page would make long history fills quadratic.
+    """
+    tf = timeframe_to_ms(timeframe)
+    open_start = int(time.time() * 1000) // tf * tf
+    end = min(end or open_start, open_start)
+
+    written = 0
+    for range_start, range_end in missing_ranges(store, provider_name, symbol, timeframe, start, end):
+        since = range_start
+        pending: List[np.ndarray] = []
+        buffered = 0
+        while since < range_end:
+            page = await provider.fetch_ohlcv(symbol, timeframe, since, page_limit)
+            if not page:
+                break
+            rows = np.asarray(page, dtype=np.float64)
+            in_range = rows[(rows[:, 0] >= since) & (rows[:, 0] < range_end)]
+            pending.append(in_range)
+            buffered += len(in_range)
+            if buffered >= flush_rows:
+                written += store.write(provider_name, symbol, timeframe, np.concatenate(pending))
+                pending, buffered = [], 0
+
+            next_since = int(rows[-1, 0]) + tf
+            if next_since <= since:
+                break
+            since = next_since
+        if buffered:
+            written += store.write(provider_name, symbol, timeframe, np.concatenate(pending))
+        logger.info(f"Backfilled {symbol} {timeframe} from {range_start} to {range_end}")
+    return written
@@ -0,0 +1,178 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Type
+
+import numpy as np
+
+from app.bot.strategy import AbstractStrategy
+from app.core.logger import get_logger
+from app.core.utils import timeframe_to_ms
+from app.providers.simulated_provider import SimulatedProvider
+
+logger = get_logger(__name__)
+# Handed to strategies in quiet backtests: a strategy out of simulated cash fails an order on
+# every candle. Only the backtested strategy is silenced, not the rest of the process
+quiet_logger = get_logger(__name__ + ".quiet")
+quiet_logger.setLevel(logging.CRITICAL + 1)
+quiet_logger.propagate = False
+
+TS, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+class SimulatedClock:
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@dataclass
+class BacktestResult:
+    timestamps: np.ndarray
+    equity: np.ndarray
+    drawdown: np.ndarray
+    position: np.ndarray
+    cash: np.ndarray
+    trade_index: np.ndarray
+    trade_price: np.ndarray
+    trade_amount: np.ndarray
+    trade_fee: np.ndarray
+    periods_per_year: float
+    params: Dict = field(default_factory=dict)
+
+    def summary(self) -> Dict[str, float]:
+        returns = np.diff(self.equity) / self.equity[:-1] if len(self.equity) > 1 else np.zeros(0)
+        std = returns.std() if len(returns) else 0.0
+        return {
+            **self.params,
+            "initial_equity": float(self.equity[0]) if len(self.equity) else 0.0,
+            "final_equity": float(self.equity[-1]) if len(self.equity) else 0.0,
+            "total_return": float(self.equity[-1] / self.equity[0] - 1) if len(self.equity) else 0.0,
+            "max_drawdown": float(self.drawdown.min()) if len(self.drawdown) else 0.0,
+            "sharpe": float(returns.mean() / std * np.sqrt(self.periods_per_year)) if std > 0 else 0.0,
+            "trades": int(len(self.trade_index)),
+            "fees": float(self.trade_fee.sum()),
+        }
+
+
+def compute_result(candles: np.ndarray, fill_index, fill_sign, fill_price, fill_amount, fill_fee,
+                   initial_cash: float, periods_per_year: float) -> BacktestResult:
+    """Compute cash/position, equity curve and drawdown over whole arrays from the fill log."""
+    close = candles[:, CLOSE]
+    n = len(close)
+    idx = np.asarray(fill_index, dtype=np.int64)
+    sign = np.asarray(fill_sign, dtype=np.float64)
+    price = np.asarray(fill_price, dtype=np.float64)
+    amount = np.asarray(fill_amount, dtype=np.float64)
+    fee = np.asarray(fill_fee, dtype=np.float64)
+
+    position_delta = np.zeros(n)
+    cash_delta = np.zeros(n)
+    np.add.at(position_delta, idx, sign * amount)
+    np.add.at(cash_delta, idx, -sign * price * amount - fee)
+
+    position = np.cumsum(position_delta)
+    cash = initial_cash + np.cumsum(cash_delta)
+    equity = cash + position * close
+    peak = np.maximum.accumulate(equity)
+    drawdown = np.divide(equity, peak, out=np.ones(n), where=peak > 0) - 1
+
+    return BacktestResult(
+        timestamps=candles[:, TS].astype(np.int64),
+        equity=equity,
+        drawdown=drawdown,
+        position=position,
+        cash=cash,
+        trade_index=idx,
+        trade_price=price,
+        trade_amount=amount,
+        trade_fee=fee,
+        periods_per_year=periods_per_year,
+    )
+
+
+class Backtester:
+    """
+    Replays an OHLCV array (columns: timestamp ms, open, high, low, close, volume) through a
+    strategy's on_candle/on_tick hooks with a simulated clock, using SimulatedProvider as the
+    exchange. Orders are matched as the candles are fed; accounting is done afterwards from
+    the provider's fill log.
+
+    Trades are not persisted unless a session_factory is given.
+    """
+
+    def __init__(
+        self,
+        strategy_class: Type[AbstractStrategy],
+        config: Dict,
+        candles: np.ndarray,
+        timeframe: str = "1m",
+        initial_cash: float = 10_000.0,
+        fee_rate: float = 0.001,
+        slippage_bps: float = 0.0,
+        participation: float = 1.0,
+        tick_every: int = 1,
+        session_factory=None,
+        quiet: bool = True,
+    ):
+        self.strategy_class = strategy_class
+        self.config = config
+        self.candles = np.ascontiguousarray(candles, dtype=np.float64)
+        self.timeframe = timeframe
+        self.initial_cash = initial_cash
+        self.fee_rate = fee_rate
+        self.slippage_bps = slippage_bps
+        self.participation = participation
+        self.tick_every = tick_every
+        self.session_factory = session_factory
+        self.quiet = quiet
+
+    async def run(self) -> BacktestResult:
+        symbol = self.config.get("symbol", "BTC/USDT")
+        clock = SimulatedClock()
+        quote = symbol.split("/")[1].split(":")[0]
+        provider = SimulatedProvider(
+            initial_balances={quote: self.initial_cash},
+            taker_fee=self.fee_rate,
+            maker_fee=self.fee_rate,
+            slippage_bps=self.slippage_bps,
+            participation=self.participation,
+            clock=clock,
+        )
+        provider.load_history(symbol, self.timeframe, self.candles)
+        strategy = self.strategy_class(
+            self.config, provider, self.session_factory, logger=quiet_logger if self.quiet else logger
+        )
+        strategy.clock = clock
+
+        tf_seconds = timeframe_to_ms(self.timeframe) / 1000
+        timestamps = (self.candles[:, TS] / 1000 + tf_seconds).tolist()  # candle close times
+        rows = self.candles.tolist()
+        tick_every = self.tick_every
+
+        await strategy.start()
+        for i, row in enumerate(rows):
+            clock.now = timestamps[i]
+            provider.feed_candle(symbol, row, index=i)
+            await strategy.on_candle({
+                "symbol": symbol,
+                "timeframe": self.timeframe,
+                "timestamp": int(row[0]),
+                "open": row[1],
+                "high": row[2],
+                "low": row[3],
+                "close": row[4],
+                "volume": row[5],
+            })
+            if i % tick_every == 0:
+                await strategy.on_tick()
+        await strategy.stop()
+
+        result = compute_result(
+            self.candles, provider.fill_index, provider.fill_sign, provider.fill_price,
+            provider.fill_amount, provider.fill_fee, self.initial_cash,
+            periods_per_year=365 * 24 * 60 * 60 / tf_seconds,
+        )
+        result.params = dict(self.config)
+        return result
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+from app.core import balances
+from app.core.logger import get_logger, get_rate_limited_logger
+from app.core.persistence import WriteBehindWriter
+from app.providers.base import BaseProvider
+
+logger = get_logger(__name__)
+poll_logger = get_rate_limited_logger(__name__, interval=300.0)
+
+
+class BalanceRecorder:
+    """
+    Records the account balance every `interval` seconds through the write-behind writer
+    (which keeps only the assets that changed, see app.core.balances) and rolls complete hours
+    and days up once per hour, `rollup_delay` seconds after the hour so its last snapshot is in.
+
+    Runs in the process that owns the exchange connection: the executor, or the gateway when
+    strategies are sharded over workers.
+    """
+
+    def __init__(self, provider: BaseProvider, writer: WriteBehindWriter, session_factory,
+                 interval: float = 300.0, rollup_delay: float = 60.0):
+        self.provider = provider
+        self.writer = writer
+        self.session_factory = session_factory
+        self.interval = interval
+        self.rollup_delay = rollup_delay
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.snapshots = 0
+        self.errors = 0
+        self.rollups: Dict[str, int] = {resolution: 0 for resolution in balances.RESOLUTIONS}
+
+    async def snapshot(self) -> None:
+        self.writer.save_account_snapshot(await self.provider.fetch_balance())
+        self.snapshots += 1
+
+    async def rollup(self) -> Dict[str, int]:
+        # Snapshots still queued in the writer belong to the buckets being closed
+        await self.writer.flush()
+        written = await asyncio.to_thread(balances.rollup_all, self.session_factory)
+        for resolution, count in written.items():
+            self.rollups[resolution] += count
+        return written
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        next_rollup = 0.0
+        while not self._stopping:
+            try:
+                await self.snapshot()
+            except Exception as e:
+                self.errors += 1
+                poll_logger.warning("Balance snapshot failed: %s", e)
+            now = time.time()
+            if now >= next_rollup:
+                try:
+                    await self.rollup()
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"Balance rollup failed: {e}")
+                next_rollup = now - now % 3600 + 3600 + self.rollup_delay
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def stats(self) -> Dict[str, float]:
+        return {"snapshots": self.snapshots, "errors": self.errors,
+                **{f"rollups_{resolution}": count for resolution, count in self.rollups.items()}}
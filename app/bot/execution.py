@@ -0,0 +1,369 @@
+"""
+Execution algorithms: a parent order worked as child orders placed through the TradeEngine,
+so every child is recorded as a trade like any other order.
+
+- TWAP: `slices` equal children at even intervals over `duration` seconds. Market children,
+  or limit children at the passive touch (`limit=True`) whose unfilled rest is canceled and
+  rolled into the next slice; the last slice is a market order.
+- Iceberg: at most `display` visible per price level, refilled as clips fill. With
+  `levels` > 1 the clips are laddered `level_step_bps` apart.
+- LimitChase: one limit child at the passive touch, moved when the touch moves, never
+  beyond `max_chase_bps` from the arrival price; the rest goes to market after `timeout`.
+
+Children placed or canceled together go out as one batch request when the provider supports
+createOrders/cancelOrders, and open children are polled with one open-orders request per
+refresh. Each parent records its arrival price (the mid when it started) and reports the
+slippage of its average fill price against it, in basis points, positive when worse.
+"""
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple
+
+from app.bot.order_tracker import FINAL_STATUSES, OrderTracker
+from app.core import metrics
+from app.core.logger import get_logger, get_rate_limited_logger
+from app.core.utils import fan_out
+
+logger = get_logger(__name__)
+poll_logger = get_rate_limited_logger(__name__, interval=60.0)
+
+SLIPPAGE_BPS = metrics.histogram(
+    "execution_slippage_bps", "Parent order average fill price versus arrival price, positive when worse",
+    ["algorithm"], buckets=(-50, -20, -10, -5, -2, 0, 2, 5, 10, 20, 50, 100),
+)
+PARENT_SECONDS = metrics.histogram(
+    "execution_parent_seconds", "Duration of algorithmic parent orders", ["algorithm"],
+    buckets=(1, 5, 15, 60, 300, 900, 3600, 4 * 3600),
+)
+
+# Fraction of the parent amount below which it counts as filled (float dust)
+DUST = 1e-9
+
+
+def _child_cost(order: Dict) -> float:
+    if order.get("cost"):
+        return order["cost"]
+    return (order.get("filled") or 0.0) * (order.get("average") or order.get("price") or 0.0)
+
+
+@dataclass
+class ParentOrder:
+    symbol: str
+    side: str
+    amount: float
+    algorithm: str
+    arrival_price: Optional[float] = None
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    status: str = "open"  # then closed (filled), canceled (finished with a remainder) or failed
+    children: Dict[str, Dict] = field(default_factory=dict)  # child id -> latest order snapshot
+    failures: int = 0
+
+    @property
+    def filled(self) -> float:
+        return sum(child.get("filled") or 0.0 for child in self.children.values())
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.amount - self.filled)
+
+    @property
+    def done(self) -> bool:
+        return self.remaining <= self.amount * DUST
+
+    @property
+    def open_ids(self) -> List[str]:
+        return [order_id for order_id, child in self.children.items() if child.get("status") not in FINAL_STATUSES]
+
+    @property
+    def working(self) -> float:
+        """Unfilled amount of the open children."""
+        return sum(
+            (child.get("amount") or 0.0) - (child.get("filled") or 0.0)
+            for child in self.children.values() if child.get("status") not in FINAL_STATUSES
+        )
+
+    @property
+    def average_price(self) -> Optional[float]:
+        filled = self.filled
+        return sum(_child_cost(child) for child in self.children.values()) / filled if filled else None
+
+    @property
+    def slippage_bps(self) -> Optional[float]:
+        average = self.average_price
+        if average is None or not self.arrival_price:
+            return None
+        sign = 1 if self.side == "buy" else -1
+        return sign * (average - self.arrival_price) / self.arrival_price * 10_000
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "symbol": self.symbol, "side": self.side, "algorithm": self.algorithm,
+            "status": self.status, "amount": self.amount, "filled": self.filled,
+            "average_price": self.average_price, "arrival_price": self.arrival_price,
+            "slippage_bps": self.slippage_bps, "children": len(self.children), "failures": self.failures,
+            "seconds": (self.finished_at or time.time()) - self.started_at,
+        }
+
+
+class Execution:
+    """A parent order being worked; the handle an algorithm uses to place, watch and cancel children."""
+
+    def __init__(self, engine, parent: ParentOrder, poll_interval: float = 1.0):
+        self.engine = engine
+        self.provider = engine.provider
+        self.parent = parent
+        self.poll_interval = poll_interval
+        # Records the final state of children left open on creation. Without a shared tracker
+        # a private one is used, driven only by refresh()
+        self.order_tracker = engine.order_tracker or OrderTracker(
+            engine.provider, engine.session_factory, writer=engine.writer
+        )
+
+    async def run(self, algorithm: "ExecutionAlgorithm") -> ParentOrder:
+        parent = self.parent
+        bid, ask = await self.touch()
+        parent.arrival_price = (bid + ask) / 2
+        logger.info("%s %s: %s %s %s, arrival %s", algorithm.name, parent.id, parent.side.upper(),
+                    parent.amount, parent.symbol, parent.arrival_price)
+        try:
+            await algorithm.work(self)
+        except BaseException:
+            parent.status = "failed"
+            raise
+        finally:
+            try:
+                await self.cancel()
+            except Exception as e:
+                logger.error("%s %s: canceling leftover children failed: %s", algorithm.name, parent.id, e)
+            parent.finished_at = time.time()
+            if parent.status != "failed":
+                parent.status = "closed" if parent.done else "canceled"
+            PARENT_SECONDS.labels(algorithm.name).observe(parent.finished_at - parent.started_at)
+            if parent.slippage_bps is not None:
+                SLIPPAGE_BPS.labels(algorithm.name).observe(parent.slippage_bps)
+            logger.info("%s %s finished: %s", algorithm.name, parent.id, parent.summary())
+        return parent
+
+    async def touch(self) -> Tuple[float, float]:
+        """Best bid and ask (the last price where the ticker has no book)."""
+        ticker = await self.provider.fetch_ticker(self.parent.symbol)
+        last = ticker.get("last") or ticker.get("close")
+        return ticker.get("bid") or last, ticker.get("ask") or last
+
+    async def passive_price(self) -> float:
+        """The price that joins the queue on the parent's side: the bid for a buy, the ask for a sell."""
+        bid, ask = await self.touch()
+        return bid if self.parent.side == "buy" else ask
+
+    async def place(self, children: Sequence[Tuple[float, Optional[float]]]) -> List[Optional[Dict]]:
+        """
+        Place children, each (amount, limit price or None for market), in one batch. Returns one
+        entry per child: the order, or None where it was not placed. Raises the first error when
+        no child could be placed.
+        """
+        parent = self.parent
+        wanted = [index for index, (amount, _) in enumerate(children) if amount > parent.amount * DUST]
+        if not wanted:
+            return [None] * len(children)
+        requests = [
+            {"symbol": parent.symbol, "side": parent.side, "amount": children[index][0], "price": children[index][1]}
+            for index in wanted
+        ]
+        results = await self.engine.execute_batch(requests, order_tracker=self.order_tracker)
+        placed: List[Optional[Dict]] = [None] * len(children)
+        for index, result in zip(wanted, results):
+            if isinstance(result, Exception):
+                parent.failures += 1
+                continue
+            parent.children[str(result["id"])] = result
+            placed[index] = result
+        if not any(placed):
+            raise next(result for result in results if isinstance(result, Exception))
+        return placed
+
+    async def refresh(self) -> None:
+        """
+        Fetch the state of open children: one open-orders request when the provider has it, then
+        one request per child that left the open list.
+        """
+        open_ids = self.parent.open_ids
+        if not open_ids:
+            return
+        symbol = self.parent.symbol
+        snapshots = []
+        missing = open_ids
+        if self.provider.supports("fetchOpenOrders"):
+            try:
+                listed = {str(order["id"]): order for order in await self.provider.fetch_open_orders(symbol)}
+            except Exception as e:
+                poll_logger.warning("Polling open orders for %s failed: %s", symbol, e)
+                return
+            snapshots = [listed[order_id] for order_id in open_ids if order_id in listed]
+            missing = [order_id for order_id in open_ids if order_id not in listed]
+        results = await fan_out(
+            {order_id: (lambda order_id=order_id: self.provider.fetch_order(order_id, symbol)) for order_id in missing},
+            self.provider.batch_concurrency,
+        )
+        for order_id, result in results.items():
+            if isinstance(result, Exception):
+                poll_logger.warning("Polling order %s failed: %s", order_id, result)
+            else:
+                snapshots.append(result)
+        for order in snapshots:
+            self.parent.children[str(order["id"])] = order
+            await self.order_tracker.update(order)
+
+    async def cancel(self, order_ids: Optional[Sequence[str]] = None) -> None:
+        """Cancel open children (all by default) in one batch, then fetch their final state."""
+        order_ids = list(order_ids if order_ids is not None else self.parent.open_ids)
+        if not order_ids:
+            return
+        results = await self.provider.cancel_orders(order_ids, self.parent.symbol)
+        for order_id, result in zip(order_ids, results):
+            # Typically an order that filled in the meantime; refresh() picks up its state
+            if isinstance(result, Exception):
+                logger.warning("Canceling child order %s failed: %s", order_id, result)
+        await self.refresh()
+
+    async def sleep(self, seconds: float) -> None:
+        """Wait `seconds`, refreshing open children every poll interval."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        while (remaining := deadline - loop.time()) > 0:
+            await asyncio.sleep(min(self.poll_interval, remaining))
+            await self.refresh()
+
+    async def wait_filled(self, timeout: float) -> bool:
+        """Wait until no child is open, up to `timeout` seconds; True when none is."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.parent.open_ids:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(self.poll_interval, remaining))
+            await self.refresh()
+        return True
+
+
+class ExecutionAlgorithm(ABC):
+    name: ClassVar[str] = "algorithm"
+
+    @abstractmethod
+    async def work(self, execution: Execution) -> None:
+        """Place and manage children until the parent is done or the algorithm gives up. Children still open afterwards are canceled."""
+
+
+@dataclass
+class TWAP(ExecutionAlgorithm):
+    duration: float
+    slices: int = 10
+    limit: bool = False
+    name: ClassVar[str] = "twap"
+
+    async def work(self, execution: Execution) -> None:
+        parent = execution.parent
+        interval = self.duration / self.slices
+        for index in range(self.slices):
+            if index:
+                await execution.sleep(interval)
+                # The unfilled rest of the previous slice rolls into this one
+                await execution.cancel()
+            if parent.done:
+                return
+            last = index == self.slices - 1
+            amount = parent.remaining if last else parent.remaining / (self.slices - index)
+            price = await execution.passive_price() if self.limit and not last else None
+            await execution.place([(amount, price)])
+        await execution.wait_filled(interval)
+
+
+@dataclass
+class Iceberg(ExecutionAlgorithm):
+    display: float
+    price: Optional[float] = None  # default: the passive touch at the start
+    levels: int = 1
+    level_step_bps: float = 0.0
+    timeout: Optional[float] = None
+    name: ClassVar[str] = "iceberg"
+
+    async def work(self, execution: Execution) -> None:
+        parent = execution.parent
+        base = self.price or await execution.passive_price()
+        # Deeper levels are further from the market: lower for a buy, higher for a sell
+        direction = -1 if parent.side == "buy" else 1
+        prices = [base * (1 + direction * self.level_step_bps * level / 10_000) for level in range(self.levels)]
+        level_of: Dict[str, int] = {}
+        loop = asyncio.get_running_loop()
+        deadline = None if self.timeout is None else loop.time() + self.timeout
+
+        while not parent.done and (deadline is None or loop.time() < deadline):
+            busy = {level_of[order_id] for order_id in parent.open_ids if order_id in level_of}
+            unallocated = parent.remaining - parent.working
+            clips = []
+            for level, price in enumerate(prices):
+                if level in busy or unallocated <= parent.amount * DUST:
+                    continue
+                clip = min(self.display, unallocated)
+                unallocated -= clip
+                clips.append((level, clip, price))
+            if clips:
+                placed = await execution.place([(clip, price) for _, clip, price in clips])
+                for (level, _, _), order in zip(clips, placed):
+                    if order is not None:
+                        level_of[str(order["id"])] = level
+            await execution.sleep(execution.poll_interval)
+
+
+@dataclass
+class LimitChase(ExecutionAlgorithm):
+    reprice_interval: float = 5.0
+    max_chase_bps: float = 50.0
+    timeout: Optional[float] = 300.0
+    market_on_timeout: bool = True
+    name: ClassVar[str] = "chase"
+
+    async def work(self, execution: Execution) -> None:
+        parent = execution.parent
+        direction = 1 if parent.side == "buy" else -1
+        limit = parent.arrival_price * (1 + direction * self.max_chase_bps / 10_000)
+        loop = asyncio.get_running_loop()
+        deadline = None if self.timeout is None else loop.time() + self.timeout
+        requested: Dict[str, float] = {}  # child id -> the limit price it was sent with
+
+        while not parent.done and (deadline is None or loop.time() < deadline):
+            price = await execution.passive_price()
+            price = min(price, limit) if parent.side == "buy" else max(price, limit)
+            working = parent.open_ids
+            # A child already at the price keeps its place in the queue
+            if not working or any(requested.get(order_id) != price for order_id in working):
+                await execution.cancel()
+                if parent.done:
+                    return
+                (order,) = await execution.place([(parent.remaining, price)])
+                requested[str(order["id"])] = price
+            wait = self.reprice_interval if deadline is None else min(self.reprice_interval, deadline - loop.time())
+            await execution.wait_filled(max(wait, 0.0))
+
+        if not parent.done and self.market_on_timeout:
+            await execution.cancel()
+            if not parent.done:
+                await execution.place([(parent.remaining, None)])
+                await execution.wait_filled(self.reprice_interval)
+
+
+ALGORITHMS = {"twap": TWAP, "iceberg": Iceberg, "chase": LimitChase}
+
+
+def build_algorithm(config: Dict) -> ExecutionAlgorithm:
+    """An algorithm from a strategy config entry, e.g. {"algorithm": "twap", "duration": 600, "slices": 10}."""
+    config = dict(config)
+    name = config.pop("algorithm")
+    if name not in ALGORITHMS:
+        raise ValueError(f"Unknown execution algorithm: {name} (known: {', '.join(ALGORITHMS)})")
+    return ALGORITHMS[name](**config)
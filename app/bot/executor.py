@@ -1,66 +1,204 @@
 import asyncio
+import copy
 import signal
-import sys
+from typing import Callable, Dict, Iterable, Optional
 from app.core.config import settings
-from app.core.logger import get_logger
-from app.core.db import get_db, SessionLocal, init_db
+from app.core import metrics
+from app.core.logger import get_logger, setup_logging
+from app.core.db import SessionLocal, init_db, sqlite_path
+from app.core.backup import BackupManager, BackupService, build_sink
+from app.core.checkpoint import build_checkpoint_store
+from app.core.change_notifications import ChangeNotifier
+from app.adapters.stream_transport import StreamTransport
+from app.providers.base import BaseProvider
 from app.providers.provider_factory import get_provider
-from app.bot.strategies.dca import DCAStrategy
+from app.providers.registry import providers
+from app.providers.market_data import MarketDataCache
+from app.core.candle_store import CandleStore
+from app.bot.scheduler import build_scheduler, load_schedule_config
+from app.bot.market_stream import build_market_streams
+from app.bot.order_tracker import OrderTracker
+from app.bot.balance_recorder import BalanceRecorder
+from app.core.persistence import WriteBehindWriter
 from app.core.secret_manager import bootstrap_secrets_to_env
 
 logger = get_logger("Executor")
 
-async def main():
-    logger.info("Starting Bot Executor...")
-    
-    # Bootstrap secrets
+# Used when no STRATEGIES_CONFIG file is set (single hourly DCA, as before)
+DEFAULT_SCHEDULE = {
+    "strategies": [
+        {
+            "name": "dca-btc",
+            "type": "dca",
+            "config": {
+                "symbol": "BTC/USDT",
+                "amount": 0.0001,
+                "interval_seconds": 60 * 60 # 1 hour
+            }
+        }
+    ]
+}
+
+def prepare() -> None:
+    """Once per deployment start: load exchange secrets into the environment, create/migrate tables."""
     bootstrap_secrets_to_env([
         settings.BINANCE_API_KEY_SECRET_NAME,
         settings.BINANCE_SECRET_KEY_SECRET_NAME
     ])
-    
-    # Init DB
     init_db()
 
-    # Setup Provider
+def start_backups() -> Optional[BackupService]:
+    """Scheduled online backups of a SQLite database, taken on a background thread."""
+    path = sqlite_path(settings.DATABASE_URL)
+    if path is None or not settings.BACKUP_INTERVAL_SECONDS:
+        return None
+    manager = BackupManager(path, build_sink(settings.BACKUP_DIR, settings.BACKUP_BUCKET), keep=settings.BACKUP_KEEP)
+    service = BackupService(manager, interval=settings.BACKUP_INTERVAL_SECONDS)
+    service.start()
+    return service
+
+def stop_backups(service: Optional[BackupService]) -> None:
+    if service is not None:
+        # Lets a backup in progress finish
+        service.stop(timeout=60.0)
+        logger.info(f"Backup stats: {service.stats()}")
+
+def build_provider() -> MarketDataCache:
+    # Strategies share one candle cache so identical OHLCV requests hit the exchange once
+    return MarketDataCache(
+        get_provider(settings.DEFAULT_PROVIDER),
+        max_bytes=settings.MARKET_DATA_CACHE_MB * 1024 * 1024,
+        store=CandleStore(),
+        store_provider=settings.DEFAULT_PROVIDER,
+    )
+
+def load_schedule() -> Dict:
+    if settings.STRATEGIES_CONFIG:
+        schedule_config = load_schedule_config(settings.STRATEGIES_CONFIG)
+    else:
+        schedule_config = copy.deepcopy(DEFAULT_SCHEDULE)
+    schedule_config.setdefault("max_concurrency", settings.BOT_MAX_CONCURRENT_TICKS)
+    return schedule_config
+
+async def start_metrics_exporter(port: Optional[int]):
+    if port is None:
+        return None
     try:
-        provider = get_provider(settings.DEFAULT_PROVIDER)
-    except Exception as e:
-        logger.error(f"Failed to initialize provider: {e}")
-        return
+        server = await metrics.start_exporter(port=port)
+        logger.info(f"Serving bot metrics on 127.0.0.1:{port}/metrics")
+        return server
+    except OSError as e:
+        logger.error(f"Failed to start metrics exporter: {e}")
+        return None
+
+async def run_strategies(schedule_config: Dict, provider: BaseProvider, metrics_port: Optional[int] = None,
+                         transport_factory: Optional[Callable[[], StreamTransport]] = None,
+                         symbols: Optional[Iterable[str]] = None, record_balances: bool = True) -> None:
+    """
+    Run the scheduled strategies on `provider` until SIGINT/SIGTERM. `symbols` limits the
+    open orders recovered from the database to the ones this process trades (a worker shard);
+    workers leave balance recording (record_balances) to the gateway.
+    """
+    # Trade/position writes are batched off the event loop
+    writer = WriteBehindWriter(SessionLocal, flush_interval=settings.PERSISTENCE_FLUSH_SECONDS)
+    writer.start()
+
+    # One tracker follows the open orders of all strategies
+    order_tracker = OrderTracker(
+        provider, SessionLocal,
+        min_interval=settings.ORDER_POLL_MIN_SECONDS, max_interval=settings.ORDER_POLL_MAX_SECONDS,
+        writer=writer,
+    )
+    await order_tracker.recover(symbols)
+
+    scheduler = build_scheduler(
+        schedule_config, provider, SessionLocal, default_tick_seconds=settings.BOT_TICK_SECONDS,
+        order_tracker=order_tracker, writer=writer,
+        checkpoints=build_checkpoint_store(settings.CHECKPOINT_STORE, settings.CHECKPOINT_DIR, SessionLocal),
+        checkpoint_seconds=settings.CHECKPOINT_SECONDS,
+    )
+    logger.info(f"Scheduled {len(scheduler.entries)} strategies")
+    # Before the candle streams start feeding on_candle
+    await scheduler.restore()
 
-    # Setup Strategy (Hardcoded DCA for now, could be dynamic)
-    strategy_config = {
-        "symbol": "BTC/USDT",
-        "amount": 0.0001,
-        "interval_seconds": 60 * 60 # 1 hour
-    }
-    strategy = DCAStrategy(strategy_config, provider, SessionLocal, logger=logger)
-    
-    await strategy.start()
-
-    running = True
-    
-    def handle_signal(sig, frame):
-        nonlocal running
+    # Candle streams for strategies that subscribe to on_candle
+    hub, streams = build_market_streams(
+        scheduler.entries, provider, settings.STREAM_TRANSPORT, transport_factory=transport_factory
+    )
+    stream_tasks = [asyncio.create_task(stream.run()) for stream in streams]
+    hub.start()
+    tracker_task = asyncio.create_task(order_tracker.run())
+    recorder = None
+    if record_balances and settings.BALANCE_SNAPSHOT_SECONDS:
+        recorder = BalanceRecorder(provider, writer, SessionLocal, interval=settings.BALANCE_SNAPSHOT_SECONDS)
+        recorder_task = asyncio.create_task(recorder.run())
+    metrics_server = await start_metrics_exporter(metrics_port)
+    # Pushes our commits to the API's live updates
+    notifier = None
+    if settings.LIVE_EVENTS_SOCKET:
+        notifier = ChangeNotifier(settings.LIVE_EVENTS_SOCKET)
+        notifier.start()
+
+    def handle_signal():
         logger.info("Shutdown signal received")
-        running = False
+        scheduler.stop()
 
-    signal.signal(signal.SIGINT, handle_signal)
-    signal.signal(signal.SIGTERM, handle_signal)
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGINT, handle_signal)
+    loop.add_signal_handler(signal.SIGTERM, handle_signal)
 
-    while running:
-        try:
-            await strategy.on_tick()
-            await asyncio.sleep(settings.BOT_TICK_SECONDS)
-        except Exception as e:
-            logger.error(f"Error in main loop: {e}")
-            await asyncio.sleep(5) # Backoff on error
+    try:
+        await scheduler.run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        for task in stream_tasks:
+            task.cancel()
+        await asyncio.gather(*stream_tasks, return_exceptions=True)
+        await hub.stop()
+        order_tracker.stop()
+        await asyncio.gather(tracker_task, return_exceptions=True)
+        logger.info(f"Order tracker stats: {order_tracker.stats()}")
+        if recorder is not None:
+            recorder.stop()
+            await asyncio.gather(recorder_task, return_exceptions=True)
+            logger.info(f"Balance recorder stats: {recorder.stats()}")
+        # Durability: everything queued is committed before exit
+        await writer.close()
+        logger.info(f"Persistence stats: {writer.stats()}")
+        if notifier is not None:
+            await notifier.stop()
+        for name, stats in scheduler.stats().items():
+            logger.info(f"Tick stats for {name}: {stats}")
 
-    await strategy.stop()
-    if hasattr(provider, 'close'):
+async def main():
+    logger.info("Starting Bot Executor...")
+    prepare()
+
+    # Setup Provider
+    try:
+        provider = build_provider()
+    except Exception as e:
+        logger.error(f"Failed to initialize provider: {e}")
+        return
+
+    backups = start_backups()
+    try:
+        await run_strategies(load_schedule(), provider, metrics_port=settings.BOT_METRICS_PORT)
+    finally:
+        logger.info(f"Market data cache stats: {provider.stats()}")
         await provider.close()
+        # Shared exchange connections
+        await providers.close()
+        await asyncio.to_thread(stop_backups, backups)
     logger.info("Bot Executor Stopped")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    setup_logging()
+    if settings.BOT_WORKERS > 1:
+        # Strategies sharded over worker processes behind one exchange gateway
+        from app.bot.supervisor import run_supervisor
+
+        run_supervisor()
+    else:
+        asyncio.run(main())
@@ -0,0 +1,47 @@
+import asyncio
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Type
+
+import numpy as np
+
+from app.bot.backtest import Backtester
+from app.bot.strategy import AbstractStrategy
+
+# Candles are sent to each worker once (via the pool initializer) instead of with every task
+_worker_candles: Optional[np.ndarray] = None
+
+
+def parameter_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """Expand {"a": [1, 2], "b": [3]} into [{"a": 1, "b": 3}, {"a": 2, "b": 3}]."""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def run_backtest(strategy_class: Type[AbstractStrategy], config: Dict, candles: np.ndarray, **backtest_kwargs) -> Dict:
+    result = asyncio.run(Backtester(strategy_class, config, candles, **backtest_kwargs).run())
+    return result.summary()
+
+
+def _init_worker(candles: np.ndarray) -> None:
+    global _worker_candles
+    _worker_candles = candles
+
+
+def _run_in_worker(strategy_class: Type[AbstractStrategy], config: Dict, backtest_kwargs: Dict) -> Dict:
+    return run_backtest(strategy_class, config, _worker_candles, **backtest_kwargs)
+
+
+def run_sweep(
+    strategy_class: Type[AbstractStrategy],
+    base_config: Dict,
+    grid: Dict[str, List[Any]],
+    candles: np.ndarray,
+    max_workers: Optional[int] = None,
+    **backtest_kwargs,
+) -> List[Dict]:
+    """Backtest every combination in grid across a process pool. Results keep grid order."""
+    configs = [{**base_config, **params} for params in parameter_grid(grid)]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(candles,)) as pool:
+        futures = [pool.submit(_run_in_worker, strategy_class, config, backtest_kwargs) for config in configs]
+        return [future.result() for future in futures]
@@ -0,0 +1,349 @@
+"""
+Exchange gateway for the multi-process executor (see app.bot.supervisor).
+
+One gateway process owns the exchange provider: its RateLimiter, connection pool and candle
+cache. Worker processes reach it over a Unix socket:
+
+- GatewayProvider is a BaseProvider whose calls are forwarded to the gateway, so every
+  request of every worker is paced by the same limiter and exchange limits stay global.
+- GatewayStreamTransport is a StreamTransport that receives the closed candles of the
+  gateway's market streams, so each symbol is streamed from the exchange once.
+
+Calls are pipelined: a connection carries any number of requests in flight, answered in
+completion order. A worker whose candle backlog grows past max_subscriber_buffer is
+disconnected; its MarketStream reconnects and gap-fills through fetch_ohlcv.
+"""
+import asyncio
+import itertools
+import pickle
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.adapters.stream_transport import StreamEvent, StreamTransport
+from app.core.ipc import encode_message, read_message, write_message
+from app.core.logger import get_logger
+from app.providers.base import BaseProvider, Tickers
+
+logger = get_logger(__name__)
+
+# BaseProvider methods a worker may call
+PROVIDER_METHODS = frozenset({
+    "fetch_balance", "fetch_ohlcv", "fetch_ohlcv_many", "fetch_ticker", "fetch_tickers",
+    "place_order", "place_orders", "fetch_order", "fetch_open_orders", "cancel_order", "cancel_orders",
+})
+
+# Capabilities reported to workers at connect time (supports() is synchronous)
+CAPABILITIES = (
+    "fetchOHLCV", "fetchTicker", "fetchTickers", "fetchOrder", "fetchOpenOrders", "cancelOrder",
+    "createMarketOrder", "createLimitOrder", "createOrders", "cancelOrders",
+)
+
+
+def _portable_error(error: Exception) -> Exception:
+    """The exception itself if it survives pickling, else a RuntimeError carrying its text."""
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+
+
+class Gateway:
+    def __init__(self, provider: BaseProvider, path: str, max_subscriber_buffer: int = 8 * 1024 * 1024):
+        self.provider = provider
+        self.path = path
+        self.max_subscriber_buffer = max_subscriber_buffer
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: Dict[Tuple[str, str], Set[asyncio.StreamWriter]] = {}
+        self._stream_tasks: List[asyncio.Task] = []
+        self.connections = 0
+        self.calls = 0
+        self.errors = 0
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_unix_server(self._serve, path=self.path)
+        logger.info("Gateway listening on %s", self.path)
+
+    def start_streams(self, subscriptions: Dict[str, List[str]], transport_factory: Callable[[], StreamTransport]) -> None:
+        """Run one MarketStream per timeframe ({timeframe: [symbol, ...]}) and fan its candles out to workers."""
+        from app.bot.market_stream import MarketStream
+
+        for timeframe, symbols in subscriptions.items():
+            stream = MarketStream(transport_factory(), self, sorted(symbols), timeframe, provider=self.provider)
+            self._stream_tasks.append(asyncio.create_task(stream.run()))
+
+    async def close(self) -> None:
+        for task in self._stream_tasks:
+            task.cancel()
+        await asyncio.gather(*self._stream_tasks, return_exceptions=True)
+        self._stream_tasks = []
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for writer in {w for writers in self._subscribers.values() for w in writers}:
+            writer.close()
+        self._subscribers.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": self.connections,
+            "calls": self.calls,
+            "errors": self.errors,
+            "published": self.published,
+            "subscribers": len({w for writers in self._subscribers.values() for w in writers}),
+            "dropped_subscribers": self.dropped_subscribers,
+        }
+
+    # -- candle fan-out (the CandleHub interface MarketStream publishes to) ----------------------
+
+    async def publish(self, candle: Dict) -> None:
+        writers = self._subscribers.get((candle["symbol"], candle["timeframe"]))
+        if not writers:
+            return
+        frame = encode_message(("candle", candle))
+        for writer in list(writers):
+            if writer.transport.get_write_buffer_size() > self.max_subscriber_buffer:
+                logger.warning("Disconnecting a worker that stopped reading candles")
+                self.dropped_subscribers += 1
+                self._unsubscribe(writer)
+                writer.close()
+                continue
+            writer.write(frame)
+        self.published += 1
+
+    def _unsubscribe(self, writer: asyncio.StreamWriter) -> None:
+        for writers in self._subscribers.values():
+            writers.discard(writer)
+
+    # -- connections ------------------------------------------------------------------------------
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        calls: Set[asyncio.Task] = set()
+        try:
+            while True:
+                message = await read_message(reader)
+                kind = message[0]
+                if kind == "call":
+                    task = asyncio.create_task(self._call(writer, *message[1:]))
+                    calls.add(task)
+                    task.add_done_callback(calls.discard)
+                elif kind == "subscribe":
+                    _, symbols, timeframe = message
+                    for symbol in symbols:
+                        self._subscribers.setdefault((symbol, timeframe), set()).add(writer)
+                elif kind == "hello":
+                    supported = [c for c in CAPABILITIES if self.provider.supports(c)]
+                    write_message(writer, ("hello", {"name": self.provider.name, "supports": supported}))
+                else:
+                    logger.warning("Ignoring unknown gateway message %r", kind)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error("Gateway connection failed: %s", e)
+        finally:
+            self.connections -= 1
+            self._unsubscribe(writer)
+            # Calls already sent to the exchange (orders in particular) are left to finish
+            if calls:
+                await asyncio.gather(*calls, return_exceptions=True)
+            writer.close()
+
+    async def _call(self, writer: asyncio.StreamWriter, call_id: int, method: str, args: Tuple, kwargs: Dict) -> None:
+        self.calls += 1
+        try:
+            if method not in PROVIDER_METHODS:
+                raise AttributeError(f"Gateway does not forward {method}")
+            result = await getattr(self.provider, method)(*args, **kwargs)
+            if method in ("place_orders", "cancel_orders"):
+                # Per-order failures travel inside the result list
+                result = [_portable_error(item) if isinstance(item, Exception) else item for item in result]
+            reply = ("result", call_id, result)
+        except Exception as e:
+            self.errors += 1
+            reply = ("error", call_id, _portable_error(e))
+        if writer.is_closing():
+            return
+        try:
+            write_message(writer, reply)
+        except Exception as e:  # result too large or not picklable
+            self.errors += 1
+            write_message(writer, ("error", call_id, RuntimeError(f"Gateway could not return {method}: {e}")))
+
+
+class GatewayProvider(BaseProvider):
+    """BaseProvider of a worker process. Connects (and reconnects) to the gateway on demand."""
+
+    def __init__(self, path: str, connect_timeout: float = 30.0):
+        self.path = path
+        self.connect_timeout = connect_timeout
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self._name = "gateway"
+        self._supports: Set[str] = set()
+
+    @property
+    def name(self) -> str:
+        """The gateway provider's name, so trades record the real exchange."""
+        return self._name
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.connected:
+                return
+            reader, writer = await open_gateway(self.path, self.connect_timeout)
+            write_message(writer, ("hello",))
+            _, info = await read_message(reader)
+            self._name = info["name"]
+            self._supports = set(info["supports"])
+            # Calls in flight belong to one connection and fail with it
+            self._writer, self._pending = writer, {}
+            self._reader_task = asyncio.create_task(self._read(reader, writer, self._pending))
+
+    async def _read(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                    pending: Dict[int, asyncio.Future]) -> None:
+        error: Exception = ConnectionError("Gateway connection closed")
+        try:
+            while True:
+                kind, call_id, value = await read_message(reader)
+                future = pending.pop(call_id, None)
+                if future is None or future.done():
+                    continue
+                if kind == "result":
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            error = ConnectionError(f"Gateway connection failed: {e}")
+        finally:
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+    async def call(self, method: str, *args, **kwargs) -> Any:
+        if not self.connected:
+            await self.connect()
+        call_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending
+        pending[call_id] = future
+        try:
+            write_message(self._writer, ("call", call_id, method, args, kwargs))
+            return await future
+        finally:
+            pending.pop(call_id, None)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+            self._reader_task = None
+
+    async def fetch_balance(self) -> Dict[str, Any]:
+        return await self.call("fetch_balance")
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str, since: int = None, limit: int = 100) -> List:
+        return await self.call("fetch_ohlcv", symbol, timeframe, since, limit)
+
+    async def fetch_ohlcv_many(self, symbols, timeframe: str, since: int = None, limit: int = 100):
+        return await self.call("fetch_ohlcv_many", list(symbols), timeframe, since, limit)
+
+    async def fetch_ticker(self, symbol: str) -> Dict:
+        return await self.call("fetch_ticker", symbol)
+
+    async def fetch_tickers(self, symbols) -> Tickers:
+        return await self.call("fetch_tickers", list(symbols))
+
+    async def place_order(self, symbol: str, side: str, amount: float, price: Optional[float] = None, type: str = "market") -> Dict:
+        return await self.call("place_order", symbol, side, amount, price, type)
+
+    async def fetch_order(self, order_id: str, symbol: str = None) -> Dict:
+        return await self.call("fetch_order", order_id, symbol)
+
+    async def fetch_open_orders(self, symbol: str = None) -> List[Dict]:
+        return await self.call("fetch_open_orders", symbol)
+
+    async def cancel_order(self, order_id: str, symbol: str = None) -> Dict:
+        return await self.call("cancel_order", order_id, symbol)
+
+    async def place_orders(self, orders: List[Dict]) -> List[Any]:
+        return await self.call("place_orders", list(orders))
+
+    async def cancel_orders(self, order_ids: List[str], symbol: str = None) -> List[Any]:
+        return await self.call("cancel_orders", list(order_ids), symbol)
+
+    def supports(self, capability: str) -> bool:
+        return capability in self._supports
+
+
+class GatewayStreamTransport(StreamTransport):
+    """Closed candles of the gateway's market streams for the requested symbols."""
+
+    def __init__(self, path: str, connect_timeout: float = 30.0, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.connect_timeout = connect_timeout
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self, symbols: List[str], timeframe: str) -> None:
+        self._start()
+        reader, self._writer = await open_gateway(self.path, self.connect_timeout)
+        write_message(self._writer, ("subscribe", list(symbols), timeframe))
+        self._tasks.append(asyncio.create_task(self._read(reader)))
+
+    async def _read(self, reader: asyncio.StreamReader) -> None:
+        error = None
+        try:
+            while True:
+                kind, candle = await read_message(reader)
+                if kind == "candle":
+                    await self._queue.put(candle)
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            error = e
+        self._closed(error)
+
+    def decode(self, raw: List[Dict]) -> List[StreamEvent]:
+        return [
+            ("kline", c["symbol"], c["timeframe"], [c["timestamp"], c["open"], c["high"], c["low"], c["close"], c["volume"]], True)
+            for c in raw
+        ]
+
+    async def close(self) -> None:
+        await super().close()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+async def open_gateway(path: str, timeout: float) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to the gateway socket, retrying while the gateway (re)starts."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    delay = 0.05
+    while True:
+        try:
+            return await asyncio.open_unix_connection(path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            if loop.time() + delay > deadline:
+                raise ConnectionError(f"Gateway not reachable at {path}: {e}") from e
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
@@ -0,0 +1,342 @@
+"""
+Technical indicators in two forms that produce the same numbers:
+
+- vectorized functions (`sma`, `ema`, `rsi`, `atr`, `bollinger`) over whole NumPy arrays, for
+  backtests and warm-up from history. Outputs have the input's length, NaN during warm-up.
+- incremental classes (`SMA`, `EMA`, `RSI`, `ATR`, `BollingerBands`) that take one candle at
+  a time in O(1) with fixed-size state, for live `on_candle` use.
+
+Conventions: EMA is seeded with the SMA of its first `period` values; RSI and ATR use Wilder
+smoothing (alpha = 1 / period) seeded the same way; the first true range is high - low;
+Bollinger bands use the population standard deviation.
+
+    live_rsi = RSI(14)
+    for candle in history:
+        live_rsi.update_candle(candle)
+    assert math.isclose(live_rsi.value, rsi(closes, 14)[-1])
+"""
+import math
+from typing import Dict, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Largest w^-i used by the blocked closed form of the recursive smoothers (bounds rounding error)
+_MAX_GROWTH = 1e3
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=np.float64)
+
+
+def _check_period(period: int) -> None:
+    if period < 1:
+        raise ValueError(f"Indicator period must be at least 1, got {period}")
+
+
+def _smooth(x: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """
+    y[i] = (1 - alpha) * y[i - 1] + alpha * x[i], with y[-1] = seed, in closed form: within a
+    block y[j] = w^(j+1) * y_prev + alpha * w^j * cumsum(x[i] * w^-i). All blocks are solved at
+    once as rows of a matrix; only the carry from one block to the next is a (short) loop.
+    Blocks are short enough that w^-i stays below _MAX_GROWTH.
+    """
+    n = len(x)
+    w = 1.0 - alpha
+    if n == 0 or w == 0.0:
+        return np.array(x, dtype=np.float64)
+    block = min(n, max(1, int(math.log(_MAX_GROWTH) / -math.log(w))))
+    rows = -(-n // block)
+    padded = np.zeros(rows * block)
+    padded[:n] = x
+    scale = w ** np.arange(block)
+    local = alpha * scale * np.cumsum(padded.reshape(rows, block) * (1.0 / scale), axis=1)
+
+    decay = w ** block
+    starts = []
+    previous = float(seed)
+    for end in local[:, -1].tolist():
+        starts.append(previous)
+        previous = decay * previous + end
+    y = local + np.outer(starts, w * scale)
+    return y.ravel()[:n]
+
+
+def sma(close, period: int) -> np.ndarray:
+    _check_period(period)
+    close = _as_array(close)
+    out = np.full(len(close), np.nan)
+    if len(close) >= period:
+        out[period - 1:] = sliding_window_view(close, period).mean(axis=1)
+    return out
+
+
+def ema(close, period: int) -> np.ndarray:
+    _check_period(period)
+    close = _as_array(close)
+    out = np.full(len(close), np.nan)
+    if len(close) >= period:
+        seed = close[:period].mean()
+        out[period - 1] = seed
+        out[period:] = _smooth(close[period:], 2.0 / (period + 1), seed)
+    return out
+
+
+def _rsi_values(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    flat = avg_loss == 0
+    values[flat] = np.where(avg_gain[flat] > 0, 100.0, 50.0)
+    return values
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    _check_period(period)
+    close = _as_array(close)
+    out = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return out
+    delta = np.diff(close)
+    gain = np.clip(delta, 0.0, None)
+    loss = np.clip(-delta, 0.0, None)
+    alpha = 1.0 / period
+    gain_seed, loss_seed = gain[:period].mean(), loss[:period].mean()
+    avg_gain = np.concatenate(([gain_seed], _smooth(gain[period:], alpha, gain_seed)))
+    avg_loss = np.concatenate(([loss_seed], _smooth(loss[period:], alpha, loss_seed)))
+    out[period:] = _rsi_values(avg_gain, avg_loss)
+    return out
+
+
+def true_range(high, low, close) -> np.ndarray:
+    high, low, close = _as_array(high), _as_array(low), _as_array(close)
+    tr = high - low
+    if len(close) > 1:
+        previous = close[:-1]
+        tr[1:] = np.maximum(tr[1:], np.maximum(np.abs(high[1:] - previous), np.abs(low[1:] - previous)))
+    return tr
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    _check_period(period)
+    tr = true_range(high, low, close)
+    out = np.full(len(tr), np.nan)
+    if len(tr) >= period:
+        seed = tr[:period].mean()
+        out[period - 1] = seed
+        out[period:] = _smooth(tr[period:], 1.0 / period, seed)
+    return out
+
+
+def bollinger(close, period: int = 20, k: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Middle, upper and lower band."""
+    _check_period(period)
+    close = _as_array(close)
+    middle = np.full(len(close), np.nan)
+    width = np.full(len(close), np.nan)
+    if len(close) >= period:
+        windows = sliding_window_view(close, period)
+        middle[period - 1:] = windows.mean(axis=1)
+        width[period - 1:] = k * windows.std(axis=1)
+    return middle, middle + width, middle - width
+
+
+# --- Incremental forms ---
+
+
+class Indicator:
+    """One-candle-at-a-time indicator. `value` is NaN until enough candles have been seen."""
+
+    value: float = math.nan
+
+    def update(self, close: float) -> float:
+        raise NotImplementedError
+
+    def update_candle(self, candle: Dict):
+        return self.update(candle["close"])
+
+    @property
+    def ready(self) -> bool:
+        return not math.isnan(self.value)
+
+    def get_state(self) -> Dict:
+        """Everything update() depends on, as plain values (for strategy checkpoints)."""
+        state = {name: _dump(value) for name, value in vars(self).items()}
+        state["value"] = self.value
+        return state
+
+    def set_state(self, state: Dict) -> None:
+        """Continue from get_state() of an indicator with the same parameters."""
+        if state.get("period") != getattr(self, "period", None):
+            raise ValueError(f"State of a period {state.get('period')} indicator, this one is {self.period}")
+        for name, value in state.items():
+            current = getattr(self, name, None)
+            if isinstance(current, (_Window, _Smoother)):
+                for slot, item in value.items():
+                    setattr(current, slot, list(item) if isinstance(item, (list, tuple)) else item)
+            else:
+                setattr(self, name, value)
+
+
+class _Window:
+    """Fixed-size ring buffer with a running sum, re-summed exactly once per wrap (no drift)."""
+    __slots__ = ("values", "index", "count", "total")
+
+    def __init__(self, period: int):
+        self.values = [0.0] * period
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+
+    @property
+    def full(self) -> bool:
+        return self.count == len(self.values)
+
+    def push(self, x: float) -> float:
+        """Store x and return the value it evicted (0.0 while filling)."""
+        evicted = self.values[self.index]
+        self.values[self.index] = x
+        self.index += 1
+        if self.count < len(self.values):
+            self.count += 1
+            self.total += x
+        else:
+            self.total += x - evicted
+        if self.index == len(self.values):
+            self.index = 0
+            self.total = math.fsum(self.values)
+        return evicted
+
+
+def _dump(value):
+    if isinstance(value, (_Window, _Smoother)):
+        return {slot: _dump(getattr(value, slot)) for slot in value.__slots__}
+    return list(value) if isinstance(value, list) else value
+
+
+class SMA(Indicator):
+    def __init__(self, period: int):
+        _check_period(period)
+        self.period = period
+        self._window = _Window(period)
+
+    def update(self, close: float) -> float:
+        self._window.push(float(close))
+        if self._window.full:
+            self.value = self._window.total / self.period
+        return self.value
+
+
+class _Smoother:
+    """Recursive smoother seeded with the mean of its first `period` inputs (same as _smooth)."""
+    __slots__ = ("period", "alpha", "count", "total", "value")
+
+    def __init__(self, period: int, alpha: float):
+        self.period = period
+        self.alpha = alpha
+        self.count = 0
+        self.total = 0.0
+        self.value = math.nan
+
+    def update(self, x: float) -> float:
+        if self.count < self.period:
+            self.count += 1
+            self.total += x
+            if self.count == self.period:
+                self.value = self.total / self.period
+        else:
+            self.value = (1.0 - self.alpha) * self.value + self.alpha * x
+        return self.value
+
+
+class EMA(Indicator):
+    def __init__(self, period: int):
+        _check_period(period)
+        self.period = period
+        self._smoother = _Smoother(period, 2.0 / (period + 1))
+
+    def update(self, close: float) -> float:
+        self.value = self._smoother.update(float(close))
+        return self.value
+
+
+class RSI(Indicator):
+    def __init__(self, period: int = 14):
+        _check_period(period)
+        self.period = period
+        self._gain = _Smoother(period, 1.0 / period)
+        self._loss = _Smoother(period, 1.0 / period)
+        self._previous = math.nan
+
+    def update(self, close: float) -> float:
+        close = float(close)
+        if not math.isnan(self._previous):
+            delta = close - self._previous
+            avg_gain = self._gain.update(delta if delta > 0 else 0.0)
+            avg_loss = self._loss.update(-delta if delta < 0 else 0.0)
+            if not math.isnan(avg_gain):
+                if avg_loss == 0:
+                    self.value = 100.0 if avg_gain > 0 else 50.0
+                else:
+                    self.value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        self._previous = close
+        return self.value
+
+
+class ATR(Indicator):
+    def __init__(self, period: int = 14):
+        _check_period(period)
+        self.period = period
+        self._smoother = _Smoother(period, 1.0 / period)
+        self._previous_close = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        high, low, close = float(high), float(low), float(close)
+        tr = high - low
+        if not math.isnan(self._previous_close):
+            tr = max(tr, abs(high - self._previous_close), abs(low - self._previous_close))
+        self._previous_close = close
+        self.value = self._smoother.update(tr)
+        return self.value
+
+    def update_candle(self, candle: Dict) -> float:
+        return self.update(candle["high"], candle["low"], candle["close"])
+
+
+class BollingerBands(Indicator):
+    """`value` is the middle band; `upper` and `lower` are updated alongside it."""
+
+    def __init__(self, period: int = 20, k: float = 2.0):
+        _check_period(period)
+        self.period = period
+        self.k = k
+        self._window = _Window(period)
+        self._mean = 0.0
+        self._m2 = 0.0  # sum of squared deviations from the mean over the window
+        self.upper = math.nan
+        self.lower = math.nan
+
+    def update(self, close: float) -> Tuple[float, float, float]:
+        x = float(close)
+        window = self._window
+        filling = not window.full
+        evicted = window.push(x)
+        if filling:
+            # Welford's update while the window fills
+            delta = x - self._mean
+            self._mean += delta / window.count
+            self._m2 += delta * (x - self._mean)
+        else:
+            # Replace the evicted value in place
+            previous_mean = self._mean
+            self._mean += (x - evicted) / self.period
+            self._m2 += (x - evicted) * (x - self._mean + evicted - previous_mean)
+        if window.index == 0:
+            # Exact recompute once per wrap keeps the running moments from drifting
+            self._mean = window.total / window.count
+            self._m2 = math.fsum((v - self._mean) ** 2 for v in window.values)
+        if window.full:
+            width = self.k * math.sqrt(max(self._m2 / self.period, 0.0))
+            self.value = self._mean
+            self.upper = self._mean + width
+            self.lower = self._mean - width
+        return self.value, self.upper, self.lower
@@ -0,0 +1,307 @@
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.adapters.stream_transport import StreamEvent, StreamTransport
+from app.bot.strategy import AbstractStrategy
+from app.core.logger import get_logger, get_rate_limited_logger
+from app.core.utils import timeframe_to_ms
+from app.providers.base import BaseProvider
+
+logger = get_logger(__name__)
+stream_logger = get_rate_limited_logger(__name__, interval=30.0)
+
+QUEUE_POLICIES = ("block", "drop_oldest", "coalesce")
+
+
+def candle_to_dict(symbol: str, timeframe: str, candle: List) -> Dict[str, Any]:
+    return {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "timestamp": int(candle[0]),
+        "open": candle[1],
+        "high": candle[2],
+        "low": candle[3],
+        "close": candle[4],
+        "volume": candle[5],
+    }
+
+
+class CandleBuilder:
+    """Incrementally builds one symbol's candles from trades or partial kline updates."""
+
+    def __init__(self, timeframe: str):
+        self.tf = timeframe_to_ms(timeframe)
+        self.current: Optional[List] = None
+
+    def add_trade(self, timestamp: int, price: float, amount: float) -> Optional[List]:
+        """Returns the previous candle when this trade opens a new one."""
+        start = timestamp // self.tf * self.tf
+        current = self.current
+        if current is None or start > current[0]:
+            self.current = [start, price, price, price, price, amount]
+            return current
+        if start < current[0]:
+            return None  # late trade for a candle that is already closed
+        if price > current[2]:
+            current[2] = price
+        if price < current[3]:
+            current[3] = price
+        current[4] = price
+        current[5] += amount
+        return None
+
+    def update_kline(self, candle: List, closed: Optional[bool]) -> Optional[List]:
+        """Returns a candle once it is known to be closed."""
+        if closed:
+            self.current = None
+            return candle
+        previous = self.current
+        self.current = candle
+        if closed is None and previous is not None and candle[0] > previous[0]:
+            return previous
+        return None
+
+
+class CandleQueue:
+    """
+    Bounded per-subscriber queue. When full, "block" makes the publisher wait (backpressure),
+    "drop_oldest" discards the oldest candle, and "coalesce" keeps only the newest candle per
+    (symbol, timeframe) so a slow consumer always sees the latest state.
+    """
+
+    def __init__(self, maxsize: int = 1000, policy: str = "block"):
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown queue policy: {policy}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self._items: "OrderedDict[Any, Dict]" = OrderedDict()
+        self._seq = itertools.count()
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self.dropped = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def put(self, candle: Dict) -> None:
+        key = (candle["symbol"], candle["timeframe"]) if self.policy == "coalesce" else next(self._seq)
+        if key in self._items:
+            self._items[key] = candle
+            self.coalesced += 1
+            return
+        while len(self._items) >= self.maxsize:
+            if self.policy == "block":
+                self._not_full.clear()
+                await self._not_full.wait()
+            else:
+                self._items.popitem(last=False)
+                self.dropped += 1
+        self._items[key] = candle
+        self._not_empty.set()
+
+    async def get(self) -> Dict:
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        _, candle = self._items.popitem(last=False)
+        self._not_full.set()
+        return candle
+
+
+@dataclass
+class Subscription:
+    strategy: AbstractStrategy
+    keys: Set[Tuple[str, str]]
+    queue: CandleQueue
+    task: Optional[asyncio.Task] = None
+    delivered: int = 0
+    errors: int = 0
+
+
+class CandleHub:
+    """Fans closed candles out to subscribed strategies, each through its own bounded queue."""
+
+    def __init__(self):
+        self.subscriptions: List[Subscription] = []
+        self._by_key: Dict[Tuple[str, str], List[Subscription]] = {}
+
+    def subscribe(self, strategy: AbstractStrategy, symbols: Iterable[str], timeframe: str,
+                  maxsize: int = 1000, policy: str = "block") -> Subscription:
+        subscription = Subscription(strategy, {(s, timeframe) for s in symbols}, CandleQueue(maxsize, policy))
+        self.subscriptions.append(subscription)
+        for key in subscription.keys:
+            self._by_key.setdefault(key, []).append(subscription)
+        return subscription
+
+    async def publish(self, candle: Dict) -> None:
+        for subscription in self._by_key.get((candle["symbol"], candle["timeframe"]), ()):
+            await subscription.queue.put(candle)
+
+    def start(self) -> None:
+        for subscription in self.subscriptions:
+            if subscription.task is None:
+                subscription.task = asyncio.create_task(self._consume(subscription))
+
+    async def stop(self) -> None:
+        tasks = [s.task for s in self.subscriptions if s.task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for subscription in self.subscriptions:
+            subscription.task = None
+
+    async def _consume(self, subscription: Subscription) -> None:
+        while True:
+            candle = await subscription.queue.get()
+            try:
+                await subscription.strategy.on_candle(candle)
+                subscription.delivered += 1
+                # Throttled by the strategy's checkpoint interval
+                await subscription.strategy.checkpoint()
+            except Exception as e:
+                subscription.errors += 1
+                stream_logger.error("on_candle failed for %s: %s", subscription.strategy.name, e)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            s.strategy.name: {
+                "delivered": s.delivered,
+                "errors": s.errors,
+                "queued": len(s.queue),
+                "dropped": s.queue.dropped,
+                "coalesced": s.queue.coalesced,
+            }
+            for s in self.subscriptions
+        }
+
+
+class MarketStream:
+    """
+    Runs a transport, turns its events into closed candles and publishes them to a hub.
+    Reconnects with exponential backoff and, after a reconnect, fills candles missed while
+    disconnected from the provider's REST fetch_ohlcv.
+    """
+
+    def __init__(self, transport: StreamTransport, hub: CandleHub, symbols: List[str], timeframe: str,
+                 provider: Optional[BaseProvider] = None, reconnect_delay: float = 1.0,
+                 max_reconnect_delay: float = 60.0):
+        self.transport = transport
+        self.hub = hub
+        self.symbols = symbols
+        self.timeframe = timeframe
+        self.tf = timeframe_to_ms(timeframe)
+        self.provider = provider
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.builders = {symbol: CandleBuilder(timeframe) for symbol in symbols}
+        self.last_closed: Dict[str, int] = {}
+        self.connects = 0
+        self.published = 0
+        self.gap_filled = 0
+
+    async def run(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            try:
+                await self.transport.connect(self.symbols, self.timeframe)
+                self.connects += 1
+                if self.connects > 1:
+                    await self._gap_fill()
+                delay = self.reconnect_delay
+                async for batch in self.transport.batches():
+                    await self.handle_events(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                stream_logger.warning("Market stream disconnected: %s; reconnecting in %.1fs", e, delay)
+            finally:
+                await self.transport.close()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def handle_events(self, events: List[StreamEvent]) -> None:
+        for event in events:
+            if event[0] == "kline":
+                _, symbol, timeframe, candle, closed = event
+                if timeframe != self.timeframe or symbol not in self.builders:
+                    continue
+                finished = self.builders[symbol].update_kline(candle, closed)
+            else:
+                _, symbol, timestamp, price, amount = event
+                if symbol not in self.builders:
+                    continue
+                finished = self.builders[symbol].add_trade(timestamp, price, amount)
+            if finished is not None:
+                await self._publish(symbol, finished)
+
+    async def _publish(self, symbol: str, candle: List) -> None:
+        if candle[0] <= self.last_closed.get(symbol, -1):
+            return  # already delivered (e.g. by gap fill)
+        self.last_closed[symbol] = int(candle[0])
+        self.published += 1
+        await self.hub.publish(candle_to_dict(symbol, self.timeframe, candle))
+
+    async def _gap_fill(self) -> None:
+        if self.provider is None:
+            return
+        open_start = int(time.time() * 1000) // self.tf * self.tf
+        for symbol, last in list(self.last_closed.items()):
+            if last + self.tf >= open_start:
+                continue
+            try:
+                candles = await self.provider.fetch_ohlcv(symbol, self.timeframe, since=last + self.tf, limit=1000)
+            except Exception as e:
+                logger.error(f"Gap fill failed for {symbol}: {e}")
+                continue
+            for candle in candles:
+                if candle[0] < open_start:
+                    await self._publish(symbol, candle)
+                    self.gap_filled += 1
+            # Candles may have been built from before the disconnect; start fresh
+            self.builders[symbol].current = None
+
+
+def get_transport(name: str) -> StreamTransport:
+    from app.adapters.stream_transport import BinanceWebSocketTransport, CCXTProTransport
+    from app.core.config import settings
+
+    if name == "binance":
+        return BinanceWebSocketTransport(settings.STREAM_URL)
+    elif name == "ccxtpro":
+        return CCXTProTransport("binance")
+    else:
+        raise ValueError(f"Unknown stream transport: {name}")
+
+
+def build_market_streams(entries, provider: BaseProvider, transport_name: str = "binance",
+                         transport_factory: Optional[Callable[[], StreamTransport]] = None) -> Tuple[CandleHub, List[MarketStream]]:
+    """
+    Subscribe every scheduled strategy with a `candles` section and build one stream per
+    timeframe, over `transport_factory()` if given, else the transport named `transport_name`.
+    """
+    hub = CandleHub()
+    symbols_by_timeframe: Dict[str, Set[str]] = {}
+    for entry in entries:
+        if not entry.candles:
+            continue
+        timeframe = entry.candles.get("timeframe", "1m")
+        symbols = entry.candles.get("symbols") or [entry.strategy.config.get("symbol")]
+        hub.subscribe(
+            entry.strategy, symbols, timeframe,
+            maxsize=entry.candles.get("queue_size", 1000),
+            policy=entry.candles.get("policy", "block"),
+        )
+        symbols_by_timeframe.setdefault(timeframe, set()).update(symbols)
+
+    streams = [
+        MarketStream(transport_factory() if transport_factory else get_transport(transport_name), hub,
+                     sorted(symbols), timeframe, provider=provider)
+        for timeframe, symbols in symbols_by_timeframe.items()
+    ]
+    return hub, streams
@@ -0,0 +1,247 @@
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.core import repository, async_repository
+from app.core.db import is_async_session_factory
+from app.core.portfolio import order_fee
+from app.core.logger import get_logger, get_rate_limited_logger
+from app.providers.base import BaseProvider
+
+logger = get_logger(__name__)
+poll_logger = get_rate_limited_logger(__name__, interval=60.0)
+
+FINAL_STATUSES = ("closed", "canceled", "cancelled", "expired", "rejected")
+
+OrderCallback = Callable[[Dict], Awaitable[None]]
+
+
+@dataclass
+class TrackedOrder:
+    order_id: str
+    symbol: str
+    side: str
+    trade_id: Optional[int] = None
+    on_filled: Optional[OrderCallback] = None
+    filled: float = 0.0
+    tracked_at: float = 0.0
+    interval: float = 0.0
+    next_poll: float = 0.0
+
+
+class OrderTracker:
+    """
+    Follows open orders until they are filled or canceled, then updates their Trade and
+    Position rows and fires the owner's on_order_filled callback.
+
+    Orders are polled on adaptive per-order intervals: an order whose fill changed is polled
+    again after min_interval, an idle one backs off towards max_interval. When the provider
+    supports fetchOpenOrders, all due orders of a symbol are checked with one request and only
+    orders that left the open list are fetched individually. Snapshots from other sources
+    (e.g. a user-data stream) can be applied with update().
+    """
+
+    def __init__(self, provider: BaseProvider, session_factory=None, min_interval: float = 1.0,
+                 max_interval: float = 30.0, backoff: float = 2.0, max_concurrency: int = 10, writer=None):
+        self.provider = provider
+        self.session_factory = session_factory
+        self.writer = writer
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_concurrency = max_concurrency
+        self.orders: Dict[str, TrackedOrder] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.requests = 0
+        self.filled = 0
+        self.canceled = 0
+
+    def _now(self) -> float:
+        return asyncio.get_running_loop().time()
+
+    def track(self, order: Dict, trade_id: Optional[int] = None, on_filled: Optional[OrderCallback] = None) -> TrackedOrder:
+        now = self._now()
+        tracked = TrackedOrder(
+            order_id=str(order["id"]), symbol=order["symbol"], side=order.get("side", "buy"),
+            trade_id=trade_id, on_filled=on_filled, filled=order.get("filled") or 0.0,
+            tracked_at=now, interval=self.min_interval, next_poll=now + self.min_interval,
+        )
+        self.orders[tracked.order_id] = tracked
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return tracked
+
+    async def recover(self, symbols: Optional[Iterable[str]] = None) -> int:
+        """
+        Start tracking trades still marked open in the database (e.g. after a restart), only
+        those of `symbols` when given (the symbols of a worker's shard).
+        """
+        if self.session_factory is None:
+            return 0
+        if is_async_session_factory(self.session_factory):
+            async with self.session_factory() as session:
+                trades = await async_repository.get_open_trades(session)
+        else:
+            with self.session_factory() as session:
+                trades = repository.get_open_trades(session)
+        if symbols is not None:
+            symbols = set(symbols)
+            trades = [trade for trade in trades if trade.symbol in symbols]
+        for trade in trades:
+            self.track({"id": trade.exchange_order_id, "symbol": trade.symbol, "side": trade.side}, trade_id=trade.id)
+        if trades:
+            logger.info(f"Recovered {len(trades)} open orders")
+        return len(trades)
+
+    async def update(self, order: Dict) -> None:
+        """Apply an order snapshot: finish the order or reschedule its next poll."""
+        tracked = self.orders.get(str(order["id"]))
+        if tracked is None:
+            return
+        if order.get("status") in FINAL_STATUSES:
+            del self.orders[tracked.order_id]
+            await self._finish(tracked, order)
+            return
+
+        filled = order.get("filled") or 0.0
+        if filled != tracked.filled:
+            tracked.filled = filled
+            tracked.interval = self.min_interval
+        else:
+            tracked.interval = min(self.max_interval, tracked.interval * self.backoff)
+        tracked.next_poll = self._now() + tracked.interval
+
+    async def _finish(self, tracked: TrackedOrder, order: Dict) -> None:
+        filled = order.get("filled") or 0.0
+        price = order.get("average") or order.get("price") or 0.0
+        fee = order_fee(order)
+        if order["status"] == "closed":
+            self.filled += 1
+        else:
+            self.canceled += 1
+
+        if self.writer is not None:
+            self.writer.update_trade(
+                self.provider.name, tracked.order_id, status=order["status"], amount=filled, price=price, meta_data=order
+            )
+            if filled > 0:
+                self.writer.apply_fill(tracked.symbol, tracked.side, filled, price, fee)
+        elif self.session_factory is not None and is_async_session_factory(self.session_factory):
+            try:
+                async with self.session_factory() as session:
+                    if tracked.trade_id is not None:
+                        await async_repository.update_trade(
+                            session, tracked.trade_id,
+                            status=order["status"], amount=filled, price=price, meta_data=order,
+                        )
+                    if filled > 0:
+                        await async_repository.apply_fill(session, tracked.symbol, tracked.side, filled, price, fee)
+            except Exception as e:
+                logger.error(f"Failed to record fill of order {tracked.order_id}: {e}")
+        elif self.session_factory is not None:
+            try:
+                with self.session_factory() as session:
+                    if tracked.trade_id is not None:
+                        repository.update_trade(
+                            session, tracked.trade_id,
+                            status=order["status"], amount=filled, price=price, meta_data=order,
+                        )
+                    if filled > 0:
+                        repository.apply_fill(session, tracked.symbol, tracked.side, filled, price, fee)
+            except Exception as e:
+                logger.error(f"Failed to record fill of order {tracked.order_id}: {e}")
+
+        if order["status"] == "closed" and tracked.on_filled is not None:
+            try:
+                await tracked.on_filled(order)
+            except Exception as e:
+                logger.error(f"on_order_filled failed for order {tracked.order_id}: {e}")
+
+    async def _fetch_order(self, tracked: TrackedOrder, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            self.requests += 1
+            try:
+                order = await self.provider.fetch_order(tracked.order_id, tracked.symbol)
+            except Exception as e:
+                poll_logger.warning("Polling order %s failed: %s", tracked.order_id, e)
+                tracked.interval = min(self.max_interval, tracked.interval * self.backoff)
+                tracked.next_poll = self._now() + tracked.interval
+                return
+        await self.update(order)
+
+    async def _poll_symbol(self, symbol: str, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            started = self._now()
+            self.requests += 1
+            try:
+                open_orders = await self.provider.fetch_open_orders(symbol)
+            except Exception as e:
+                poll_logger.warning("Polling open orders for %s failed: %s", symbol, e)
+                for tracked in self.orders.values():
+                    if tracked.symbol == symbol:
+                        tracked.next_poll = started + tracked.interval
+                return
+
+        by_id = {str(order["id"]): order for order in open_orders}
+        finished: List[TrackedOrder] = []
+        for tracked in list(self.orders.values()):
+            # Orders placed after the request went out may not be listed yet
+            if tracked.symbol != symbol or tracked.tracked_at > started:
+                continue
+            order = by_id.get(tracked.order_id)
+            if order is not None:
+                await self.update(order)
+            else:
+                finished.append(tracked)
+        # Only orders that left the open list need their final state fetched
+        await asyncio.gather(*(self._fetch_order(tracked, semaphore) for tracked in finished))
+
+    async def poll_once(self) -> None:
+        """Poll every order that is due."""
+        now = self._now()
+        due = [tracked for tracked in self.orders.values() if tracked.next_poll <= now]
+        if not due:
+            return
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self.provider.supports("fetchOpenOrders"):
+            symbols = {tracked.symbol for tracked in due}
+            await asyncio.gather(*(self._poll_symbol(symbol, semaphore) for symbol in symbols))
+        else:
+            await asyncio.gather(*(self._fetch_order(tracked, semaphore) for tracked in due))
+
+    async def run(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        while not self._stopping:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                poll_logger.error("Order polling failed: %s", e)
+
+            self._wakeup.clear()
+            delay = self.max_interval
+            if self.orders:
+                delay = max(0.0, min(tracked.next_poll for tracked in self.orders.values()) - self._now())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self) -> None:
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def stats(self) -> Dict[str, int]:
+        by_symbol = defaultdict(int)
+        for tracked in self.orders.values():
+            by_symbol[tracked.symbol] += 1
+        return {
+            "open": len(self.orders),
+            "symbols": len(by_symbol),
+            "filled": self.filled,
+            "canceled": self.canceled,
+            "requests": self.requests,
+        }
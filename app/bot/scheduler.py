@@ -0,0 +1,233 @@
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from app.bot.strategy import AbstractStrategy
+from app.core import metrics
+from app.core.logger import get_logger, get_rate_limited_logger
+
+logger = get_logger(__name__)
+# Failing strategies fail on every tick; report each kind of failure once a minute
+tick_logger = get_rate_limited_logger(__name__, interval=60.0)
+
+TICK_SECONDS = metrics.histogram("strategy_tick_seconds", "Duration of strategy on_tick calls", ["strategy"])
+TICK_OUTCOMES = metrics.counter(
+    "strategy_ticks_total", "Strategy ticks by outcome (ok, error, timeout, skipped)", ["strategy", "outcome"]
+)
+
+
+@dataclass
+class ScheduleSpec:
+    tick_seconds: float = 60.0
+    timeout_seconds: Optional[float] = None
+    jitter_seconds: float = 0.0
+    # Ticks that start later than this (e.g. waiting for a concurrency slot) are skipped
+    deadline_seconds: Optional[float] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ScheduleSpec":
+        return cls(
+            tick_seconds=float(data.get("tick_seconds", 60.0)),
+            timeout_seconds=data.get("timeout_seconds"),
+            jitter_seconds=float(data.get("jitter_seconds", 0.0)),
+            deadline_seconds=data.get("deadline_seconds"),
+        )
+
+
+@dataclass
+class TickStats:
+    ticks: int = 0
+    errors: int = 0
+    timeouts: int = 0
+    skipped: int = 0
+    last_latency: float = 0.0
+    max_latency: float = 0.0
+    total_latency: float = 0.0
+    samples: Deque[float] = field(default_factory=lambda: deque(maxlen=512))
+
+    def record(self, latency: float) -> None:
+        self.ticks += 1
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.samples.append(latency)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self) -> Dict:
+        return {
+            "ticks": self.ticks,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "skipped": self.skipped,
+            "last_latency": self.last_latency,
+            "avg_latency": self.total_latency / self.ticks if self.ticks else 0.0,
+            "p50_latency": self.percentile(0.50),
+            "p95_latency": self.percentile(0.95),
+            "max_latency": self.max_latency,
+        }
+
+
+@dataclass
+class ScheduledStrategy:
+    name: str
+    strategy: AbstractStrategy
+    spec: ScheduleSpec
+    stats: TickStats = field(default_factory=TickStats)
+    # Optional candle stream subscription: {"symbols": [...], "timeframe": "1m", "policy": ..., "queue_size": ...}
+    candles: Optional[Dict] = None
+
+
+class StrategyScheduler:
+    """Runs the on_tick hook of many strategies concurrently, each on its own schedule."""
+
+    def __init__(self, max_concurrency: int = 8):
+        self.max_concurrency = max_concurrency
+        self.entries: List[ScheduledStrategy] = []
+        self._restored = False
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    def add(self, strategy: AbstractStrategy, spec: ScheduleSpec, name: Optional[str] = None,
+            candles: Optional[Dict] = None) -> ScheduledStrategy:
+        entry = ScheduledStrategy(name=name or strategy.name, strategy=strategy, spec=spec, candles=candles)
+        self.entries.append(entry)
+        return entry
+
+    def stats(self) -> Dict[str, Dict]:
+        return {entry.name: entry.stats.to_dict() for entry in self.entries}
+
+    def stop(self) -> None:
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def restore(self) -> None:
+        """Load each strategy's checkpoint. run() does this too; call it earlier when candles flow before run()."""
+        if self._restored:
+            return
+        self._restored = True
+        for entry in self.entries:
+            await entry.strategy.restore()
+
+    async def _checkpoint(self, entry: ScheduledStrategy, force: bool = False) -> None:
+        try:
+            await entry.strategy.checkpoint(force=force)
+        except Exception as e:
+            tick_logger.error("Checkpoint of %s failed: %s", entry.name, e)
+
+    async def run(self) -> None:
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._stopping = asyncio.Event()
+
+        await self.restore()
+        for entry in self.entries:
+            await entry.strategy.start()
+
+        tasks = [asyncio.create_task(self._run_entry(entry), name=entry.name) for entry in self.entries]
+        try:
+            await self._stopping.wait()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for entry in self.entries:
+                try:
+                    await entry.strategy.stop()
+                except Exception as e:
+                    logger.error(f"Error stopping strategy {entry.name}: {e}")
+                await self._checkpoint(entry, force=True)
+
+    async def _sleep_until(self, deadline: float) -> bool:
+        """Sleep until the loop time reaches deadline. Returns False if the scheduler is stopping."""
+        loop = asyncio.get_running_loop()
+        delay = deadline - loop.time()
+        if delay > 0:
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        return not self._stopping.is_set()
+
+    async def _run_entry(self, entry: ScheduledStrategy) -> None:
+        loop = asyncio.get_running_loop()
+        spec = entry.spec
+        # Stagger the first tick so strategies sharing an interval do not fire together
+        next_run = loop.time() + random.uniform(0, spec.jitter_seconds)
+
+        while await self._sleep_until(next_run):
+            await self._tick(entry, scheduled_at=next_run)
+
+            # Advance on a fixed grid; missed periods are dropped instead of fired in a burst
+            base = next_run + spec.tick_seconds
+            now = loop.time()
+            if base < now:
+                base = now + spec.tick_seconds
+            next_run = base + random.uniform(0, spec.jitter_seconds)
+
+    async def _tick(self, entry: ScheduledStrategy, scheduled_at: float) -> None:
+        loop = asyncio.get_running_loop()
+        spec = entry.spec
+
+        async with self._semaphore:
+            lateness = loop.time() - scheduled_at
+            if spec.deadline_seconds is not None and lateness > spec.deadline_seconds:
+                entry.stats.skipped += 1
+                TICK_OUTCOMES.labels(entry.name, "skipped").inc()
+                tick_logger.warning("Skipping tick for %s: started %.2fs late", entry.name, lateness)
+                return
+
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                await asyncio.wait_for(entry.strategy.on_tick(), timeout=spec.timeout_seconds)
+            except asyncio.TimeoutError:
+                outcome = "timeout"
+                entry.stats.timeouts += 1
+                tick_logger.error("Tick for %s timed out after %ss", entry.name, spec.timeout_seconds)
+            except Exception as e:
+                outcome = "error"
+                entry.stats.errors += 1
+                tick_logger.error("Error in tick for %s: %s", entry.name, e)
+            finally:
+                latency = time.perf_counter() - start
+                entry.stats.record(latency)
+                TICK_SECONDS.labels(entry.name).observe(latency)
+                TICK_OUTCOMES.labels(entry.name, outcome).inc()
+            await self._checkpoint(entry)
+
+
+def load_schedule_config(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def build_scheduler(schedule_config: Dict, provider, session_factory, default_tick_seconds: float = 60.0,
+                    order_tracker=None, writer=None, checkpoints=None,
+                    checkpoint_seconds: float = 60.0) -> StrategyScheduler:
+    """
+    Build a scheduler from a config dict of the form loaded by load_schedule_config. Strategies
+    checkpoint their state to the `checkpoints` store (every `checkpoint_seconds`, or a
+    strategy's own "checkpoint_seconds" entry) when one is given.
+    """
+    from app.bot.strategy_factory import get_strategy
+
+    scheduler = StrategyScheduler(max_concurrency=schedule_config.get("max_concurrency", 8))
+    for item in schedule_config.get("strategies", []):
+        strategy_config = dict(item.get("config", {}))
+        strategy_config.setdefault("name", item.get("name", item["type"]))
+        strategy = get_strategy(
+            item["type"], strategy_config, provider, session_factory, order_tracker=order_tracker, writer=writer
+        )
+        strategy.checkpoints = checkpoints
+        strategy.checkpoint_interval = float(item.get("checkpoint_seconds", checkpoint_seconds))
+        spec = ScheduleSpec.from_dict({"tick_seconds": default_tick_seconds, **item.get("schedule", {})})
+        scheduler.add(strategy, spec, candles=item.get("candles"))
+    return scheduler
@@ -1,28 +1,75 @@
+from app.bot.execution import ParentOrder, build_algorithm
 from app.bot.strategy import AbstractStrategy
 from app.bot.trade_engine import TradeEngine
-from typing import Dict
+from typing import Dict, Optional
 import asyncio
 
 class DCAStrategy(AbstractStrategy):
-    def __init__(self, config: Dict, provider, session_factory, logger=None):
-        super().__init__(config, provider, session_factory, logger)
-        self.trade_engine = TradeEngine(provider, session_factory)
+    def __init__(self, config: Dict, provider, session_factory, logger=None, order_tracker=None, writer=None):
+        super().__init__(config, provider, session_factory, logger, order_tracker, writer)
+        self.trade_engine = TradeEngine(
+            provider, session_factory, order_tracker=order_tracker, on_order_filled=self.on_order_filled, writer=writer,
+            logger=logger,
+        )
         self.symbol = config.get("symbol", "BTC/USDT")
         self.amount = config.get("amount", 0.001)
         self.interval = config.get("interval_seconds", 60)
         self.last_buy_time = 0
+        # Optional execution algorithm for each buy, e.g. {"algorithm": "twap", "duration": 600, "slices": 10}
+        execution = config.get("execution")
+        self.algorithm = build_algorithm(execution) if execution else None
+        # A parent order outlives the tick that started it
+        self.working: Optional[asyncio.Task] = None
 
     async def on_tick(self) -> None:
         # Simple time-based DCA
-        import time
-        now = time.time()
+        now = self.clock()
         if now - self.last_buy_time > self.interval:
+            if self.working is not None and not self.working.done():
+                return
             self.logger.info(f"DCA Triggered for {self.symbol}")
+            previous, self.last_buy_time = self.last_buy_time, now
+            # Stored before the order goes out, so a restart never buys twice
+            try:
+                await self.checkpoint(force=True)
+            except Exception as e:
+                self.last_buy_time = previous
+                self.logger.error(f"DCA Buy skipped, checkpoint failed: {e}")
+                return
+            if self.algorithm is not None:
+                self.working = asyncio.create_task(self._work_buy(previous))
+                return
             try:
                 await self.trade_engine.execute_buy(self.symbol, self.amount)
-                self.last_buy_time = now
             except Exception as e:
                 self.logger.error(f"DCA Buy failed: {e}")
+                # Not placed: retry on the next tick
+                self.last_buy_time = previous
+                await self.checkpoint(force=True)
+
+    def get_state(self) -> Dict:
+        return {"last_buy_time": self.last_buy_time}
+
+    def set_state(self, state: Dict) -> None:
+        self.last_buy_time = state.get("last_buy_time", 0)
+
+    async def _work_buy(self, previous: float) -> None:
+        parent = ParentOrder(symbol=self.symbol, side="buy", amount=self.amount, algorithm=self.algorithm.name)
+        try:
+            await self.trade_engine.execute(self.symbol, "buy", self.amount, self.algorithm, parent=parent)
+        except Exception as e:
+            self.logger.error(f"DCA Buy failed: {e}")
+        if parent.filled == 0:
+            # Nothing bought: retry on the next tick, as on the direct path
+            self.last_buy_time = previous
+            await self.checkpoint(force=True)
+
+    async def stop(self) -> None:
+        if self.working is not None and not self.working.done():
+            # Cancels the parent's open children on the way out
+            self.working.cancel()
+            await asyncio.gather(self.working, return_exceptions=True)
+        await super().stop()
 
     async def on_candle(self, candle: Dict) -> None:
         pass
@@ -1,16 +1,36 @@
+import asyncio
+import math
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, Optional
 from app.providers.base import BaseProvider
+from app.core.checkpoint import CheckpointError, CheckpointStore, decode_checkpoint, encode_checkpoint
 from app.core.logger import get_logger
 from sqlalchemy.orm import Session
 
 
 class AbstractStrategy(ABC):
-    def __init__(self, config: Dict, provider: BaseProvider, session_factory, logger=None):
+    # Version of the get_state() layout; bump it when the layout changes and handle older
+    # checkpoints in migrate_state()
+    state_version: int = 1
+
+    def __init__(self, config: Dict, provider: BaseProvider, session_factory, logger=None, order_tracker=None, writer=None):
         self.config = config
+        self.name = config.get("name", self.__class__.__name__)
         self.provider = provider
         self.session_factory = session_factory
         self.logger = logger or get_logger(self.__class__.__name__)
+        # Shared OrderTracker that reports fills of orders left open on creation
+        self.order_tracker = order_tracker
+        # Shared WriteBehindWriter for trade/position writes (None writes inline via session_factory)
+        self.writer = writer
+        # Wall clock by default; the backtester swaps in a simulated one
+        self.clock: Callable[[], float] = time.time
+        # Where state checkpoints go (None disables them, e.g. in backtests); set by build_scheduler
+        self.checkpoints: Optional[CheckpointStore] = None
+        self.checkpoint_interval: float = 60.0
+        self._checkpoint_data: Optional[bytes] = None
+        self._checkpointed_at = -math.inf
 
     @abstractmethod
     async def on_candle(self, candle: Dict) -> None:
@@ -33,3 +53,59 @@ class AbstractStrategy(ABC):
     async def stop(self) -> None:
         """Optional shutdown hook"""
         self.logger.info("Strategy stopped")
+
+    def get_state(self) -> Dict[str, Any]:
+        """State to survive a restart (counters, timestamps, indicator state). Empty by default."""
+        return {}
+
+    def set_state(self, state: Dict[str, Any]) -> None:
+        """Restore what get_state() returned, before start()."""
+        pass
+
+    def migrate_state(self, state: Dict[str, Any], version: int) -> Optional[Dict[str, Any]]:
+        """Convert state checkpointed at an older state_version, or None to start fresh (the default)."""
+        return None
+
+    async def restore(self) -> bool:
+        """Load the last checkpoint, if any. Returns True when state was restored."""
+        if self.checkpoints is None:
+            return False
+        try:
+            data = await asyncio.to_thread(self.checkpoints.load, self.name)
+            if data is None:
+                return False
+            version, state = decode_checkpoint(data)
+        except (CheckpointError, OSError) as e:
+            self.logger.error(f"Ignoring checkpoint of {self.name}: {e}")
+            return False
+
+        if version != self.state_version:
+            state = self.migrate_state(state, version) if version < self.state_version else None
+            if state is None:
+                self.logger.warning(
+                    f"Discarding checkpoint of {self.name}: state version {version}, expected {self.state_version}"
+                )
+                return False
+        else:
+            self._checkpoint_data = data
+        self.set_state(state)
+        self.logger.info(f"Restored checkpoint of {self.name}")
+        return True
+
+    async def checkpoint(self, force: bool = False) -> bool:
+        """
+        Store the current state when it changed, at most once per checkpoint_interval unless
+        `force` (use it right after placing orders). Returns True when a checkpoint was written.
+        """
+        if self.checkpoints is None:
+            return False
+        now = time.monotonic()
+        if not force and now - self._checkpointed_at < self.checkpoint_interval:
+            return False
+        self._checkpointed_at = now
+        data = encode_checkpoint(self.get_state(), self.state_version)
+        if data == self._checkpoint_data:
+            return False
+        await asyncio.to_thread(self.checkpoints.save, self.name, data)
+        self._checkpoint_data = data
+        return True
@@ -0,0 +1,13 @@
+from app.bot.strategies.dca import DCAStrategy
+from app.bot.strategy import AbstractStrategy
+from typing import Dict
+
+STRATEGIES = {
+    "dca": DCAStrategy,
+}
+
+def get_strategy(name: str, config: Dict, provider, session_factory, logger=None, order_tracker=None, writer=None) -> AbstractStrategy:
+    strategy_class = STRATEGIES.get(name.lower())
+    if strategy_class is None:
+        raise ValueError(f"Unknown strategy: {name}")
+    return strategy_class(config, provider, session_factory, logger=logger, order_tracker=order_tracker, writer=writer)
@@ -0,0 +1,368 @@
+"""
+Multi-process executor: strategies sharded by symbol over worker processes.
+
+    BOT_WORKERS=4 python -m app.bot.executor
+
+The supervisor (the process started above) prepares secrets and the database once, then runs
+
+- one gateway process (app.bot.gateway) that owns the exchange provider, its rate limiter
+  and candle cache, streams candles from the exchange once per symbol and records the
+  account balance;
+- BOT_WORKERS worker processes, each running the strategies of one shard on its own event
+  loop, with a GatewayProvider for exchange calls and candles relayed by the gateway.
+
+The supervisor itself only watches its children and takes the scheduled database backups
+(app.core.backup).
+
+Shards have disjoint symbol sets, so a symbol's orders and open-order recovery belong to one
+worker. CPU-heavy on_candle/on_tick code only delays the strategies of its own shard.
+
+Every child writes a heartbeat into shared memory from its event loop. A child that exits,
+does not beat within `startup_timeout` of starting, or whose heartbeat is older than
+BOT_WORKER_HEARTBEAT_TIMEOUT (e.g. a loop stuck in CPU-bound work), is killed and restarted
+with a delay that doubles on each restart of a child that did not stay up for
+`stable_seconds`.
+"""
+import asyncio
+import multiprocessing
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.logger import get_logger, setup_logging
+
+logger = get_logger("Supervisor")
+
+
+# -- sharding ---------------------------------------------------------------------------------
+
+
+def strategy_symbols(item: Dict) -> List[str]:
+    """Symbols a schedule entry trades or streams: config.symbol plus candles.symbols."""
+    symbols = list((item.get("candles") or {}).get("symbols") or [])
+    symbol = item.get("config", {}).get("symbol")
+    if symbol and symbol not in symbols:
+        symbols.insert(0, symbol)
+    return symbols
+
+
+def shard_symbols(schedule_config: Dict) -> Set[str]:
+    return {symbol for item in schedule_config.get("strategies", []) for symbol in strategy_symbols(item)}
+
+
+def shard_schedule(schedule_config: Dict, workers: int) -> List[Dict]:
+    """
+    Split a schedule into at most `workers` schedules with disjoint symbol sets. Strategies
+    sharing a symbol (directly or through a multi-symbol strategy) stay in one shard; these
+    groups go, largest first, to the shard with the fewest strategies.
+    """
+    items = schedule_config.get("strategies", [])
+    parent: Dict[str, str] = {}
+
+    def find(key: str) -> str:
+        while parent.setdefault(key, key) != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    keys = []
+    for index, item in enumerate(items):
+        # A strategy without symbols is a group of its own
+        symbols = strategy_symbols(item) or [f"#{index}"]
+        for symbol in symbols[1:]:
+            parent[find(symbol)] = find(symbols[0])
+        keys.append(symbols[0])
+
+    groups: Dict[str, List[Dict]] = {}
+    for key, item in zip(keys, items):
+        groups.setdefault(find(key), []).append(item)
+
+    shards: List[List[Dict]] = [[] for _ in range(max(1, min(workers, len(groups))))]
+    for root in sorted(groups, key=lambda r: (-len(groups[r]), r)):
+        min(shards, key=len).extend(groups[root])
+    return [{**schedule_config, "strategies": shard} for shard in shards if shard]
+
+
+def candle_subscriptions(schedule_config: Dict) -> Dict[str, List[str]]:
+    """{timeframe: [symbol, ...]} over all strategies with a `candles` section (see build_market_streams)."""
+    subscriptions: Dict[str, Set[str]] = {}
+    for item in schedule_config.get("strategies", []):
+        candles = item.get("candles")
+        if not candles:
+            continue
+        symbols = candles.get("symbols") or [item.get("config", {}).get("symbol")]
+        subscriptions.setdefault(candles.get("timeframe", "1m"), set()).update(symbols)
+    return {timeframe: sorted(symbols) for timeframe, symbols in subscriptions.items()}
+
+
+# -- supervision ------------------------------------------------------------------------------
+
+
+class Heartbeat:
+    """A child's slot in the supervisor's shared heartbeat array (wall clock seconds)."""
+
+    def __init__(self, values, slot: int, interval: float = 1.0):
+        self.values = values
+        self.slot = slot
+        self.interval = interval
+
+    def beat(self) -> None:
+        self.values[self.slot] = time.time()
+
+    def reset(self) -> None:
+        self.values[self.slot] = 0.0
+
+    @property
+    def started(self) -> bool:
+        return self.values[self.slot] != 0.0
+
+    def age(self) -> float:
+        return time.time() - self.values[self.slot]
+
+    async def run(self) -> None:
+        """Beat from the event loop: a blocked loop stops the heartbeat."""
+        while True:
+            self.beat()
+            await asyncio.sleep(self.interval)
+
+
+@dataclass
+class Child:
+    name: str
+    target: Callable
+    args: Tuple
+    heartbeat: Heartbeat
+    stop_last: bool = False
+    process: Any = None
+    started_at: float = 0.0
+    restarts: int = 0
+    restart_delay: float = 0.0
+    restart_at: Optional[float] = None
+
+
+class Supervisor:
+    def __init__(self, heartbeat_timeout: float = 30.0, min_restart_delay: float = 1.0,
+                 max_restart_delay: float = 60.0, stable_seconds: float = 60.0, startup_timeout: float = 60.0,
+                 max_children: int = 256):
+        self.heartbeat_timeout = heartbeat_timeout
+        # Time a child has to send its first heartbeat (interpreter start, imports, connecting)
+        self.startup_timeout = startup_timeout
+        self.min_restart_delay = min_restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.stable_seconds = stable_seconds
+        # Fresh interpreters: no event loop, threads or sockets inherited from this process
+        self.context = multiprocessing.get_context("spawn")
+        self.heartbeats = self.context.RawArray("d", max_children)
+        self.children: List[Child] = []
+        self._stopping = threading.Event()
+
+    def add(self, name: str, target: Callable, *args, stop_last: bool = False) -> Child:
+        """Register target(*args, heartbeat) to run in its own process. stop_last children outlive the others at shutdown."""
+        slot = len(self.children)
+        if slot >= len(self.heartbeats):
+            raise ValueError(f"Supervisor supports at most {len(self.heartbeats)} children")
+        heartbeat = Heartbeat(self.heartbeats, slot, interval=max(0.05, self.heartbeat_timeout / 5))
+        child = Child(name, target, args, heartbeat, stop_last=stop_last, restart_delay=self.min_restart_delay)
+        self.children.append(child)
+        return child
+
+    def _start(self, child: Child) -> None:
+        child.heartbeat.reset()
+        child.process = self.context.Process(target=child.target, args=(*child.args, child.heartbeat), name=child.name)
+        child.process.start()
+        child.started_at = time.monotonic()
+        child.restart_at = None
+        logger.info("Started %s (pid %s)", child.name, child.process.pid)
+
+    def _kill(self, child: Child, timeout: float = 5.0) -> None:
+        process = child.process
+        process.terminate()
+        process.join(timeout)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+    def start(self) -> None:
+        for child in self.children:
+            self._start(child)
+
+    def check(self) -> None:
+        """Restart children that exited or stopped beating; call periodically."""
+        now = time.monotonic()
+        for child in self.children:
+            if child.restart_at is not None:
+                if now >= child.restart_at:
+                    child.restarts += 1
+                    self._start(child)
+                continue
+            process = child.process
+            if process.is_alive():
+                if not child.heartbeat.started:
+                    if now - child.started_at <= self.startup_timeout:
+                        continue
+                    logger.error("%s (pid %s) did not start in %.0fs; restarting", child.name, process.pid,
+                                 self.startup_timeout)
+                else:
+                    age = child.heartbeat.age()
+                    if age <= self.heartbeat_timeout:
+                        continue
+                    logger.error("%s (pid %s) missed heartbeats for %.1fs; restarting", child.name, process.pid, age)
+                self._kill(child)
+            else:
+                logger.error("%s (pid %s) exited with code %s", child.name, process.pid, process.exitcode)
+            if now - child.started_at >= self.stable_seconds:
+                child.restart_delay = self.min_restart_delay
+            child.restart_at = now + child.restart_delay
+            logger.info("Restarting %s in %.1fs", child.name, child.restart_delay)
+            child.restart_delay = min(child.restart_delay * 2, self.max_restart_delay)
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def run(self, check_interval: float = 1.0) -> None:
+        """Start every child and supervise until SIGINT/SIGTERM, then shut down."""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop())
+        self.start()
+        try:
+            while not self._stopping.wait(check_interval):
+                self.check()
+        finally:
+            self.shutdown()
+
+    def shutdown(self, timeout: float = 30.0) -> None:
+        """SIGTERM the children (stop_last ones after the rest have exited); kill what outlives timeout."""
+        for last in (False, True):
+            group = [c for c in self.children if c.stop_last == last and c.process is not None and c.process.is_alive()]
+            for child in group:
+                child.process.terminate()
+            deadline = time.monotonic() + timeout
+            for child in group:
+                child.process.join(max(0.0, deadline - time.monotonic()))
+                if child.process.is_alive():
+                    logger.error("%s did not stop in %.0fs; killing it", child.name, timeout)
+                    child.process.kill()
+                    child.process.join()
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            c.name: {
+                "pid": c.process.pid if c.process is not None else None,
+                "alive": bool(c.process is not None and c.process.is_alive()),
+                "restarts": c.restarts,
+                "heartbeat_age": c.heartbeat.age() if c.heartbeat.started else None,
+            }
+            for c in self.children
+        }
+
+
+# -- child processes --------------------------------------------------------------------------
+
+
+async def _until_signal() -> None:
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stopping.set)
+    await stopping.wait()
+
+
+async def _run_gateway(path: str, subscriptions: Dict[str, List[str]], metrics_port: Optional[int],
+                       heartbeat: Heartbeat) -> None:
+    from app.bot.balance_recorder import BalanceRecorder
+    from app.bot.executor import build_provider, start_metrics_exporter
+    from app.bot.gateway import Gateway
+    from app.bot.market_stream import get_transport
+    from app.core.db import SessionLocal
+    from app.core.persistence import WriteBehindWriter
+    from app.providers.registry import providers
+
+    beat = asyncio.create_task(heartbeat.run())
+    provider = build_provider()
+    gateway = Gateway(provider, path)
+    metrics_server = None
+    # The account is shared by all shards, so its balance is recorded here, once
+    writer = recorder = recorder_task = None
+    if settings.BALANCE_SNAPSHOT_SECONDS:
+        writer = WriteBehindWriter(SessionLocal, flush_interval=settings.PERSISTENCE_FLUSH_SECONDS)
+        recorder = BalanceRecorder(provider, writer, SessionLocal, interval=settings.BALANCE_SNAPSHOT_SECONDS)
+    try:
+        await gateway.start()
+        gateway.start_streams(subscriptions, lambda: get_transport(settings.STREAM_TRANSPORT))
+        if recorder is not None:
+            recorder_task = asyncio.create_task(recorder.run())
+        metrics_server = await start_metrics_exporter(metrics_port)
+        await _until_signal()
+    finally:
+        if metrics_server is not None:
+            metrics_server.close()
+        if recorder_task is not None:
+            recorder.stop()
+            await asyncio.gather(recorder_task, return_exceptions=True)
+            logger.info("Balance recorder stats: %s", recorder.stats())
+        if writer is not None:
+            await writer.close()
+        await gateway.close()
+        logger.info("Gateway stats: %s", gateway.stats())
+        logger.info("Market data cache stats: %s", provider.stats())
+        await provider.close()
+        await providers.close()
+        beat.cancel()
+
+
+def gateway_process(path: str, subscriptions: Dict[str, List[str]], metrics_port: Optional[int],
+                    heartbeat: Heartbeat) -> None:
+    setup_logging(filename="gateway.log")
+    asyncio.run(_run_gateway(path, subscriptions, metrics_port, heartbeat))
+
+
+async def _run_worker(schedule_config: Dict, path: str, metrics_port: Optional[int], heartbeat: Heartbeat) -> None:
+    from app.bot.executor import run_strategies
+    from app.bot.gateway import GatewayProvider, GatewayStreamTransport
+
+    beat = asyncio.create_task(heartbeat.run())
+    provider = GatewayProvider(path)
+    try:
+        await provider.connect()
+        await run_strategies(
+            schedule_config, provider, metrics_port=metrics_port,
+            transport_factory=lambda: GatewayStreamTransport(path), symbols=shard_symbols(schedule_config),
+            record_balances=False,
+        )
+    finally:
+        await provider.close()
+        beat.cancel()
+
+
+def worker_process(index: int, schedule_config: Dict, path: str, metrics_port: Optional[int],
+                   heartbeat: Heartbeat) -> None:
+    setup_logging(filename=f"worker-{index}.log")
+    asyncio.run(_run_worker(schedule_config, path, metrics_port, heartbeat))
+
+
+def run_supervisor(workers: Optional[int] = None) -> None:
+    from app.bot.executor import load_schedule, prepare, start_backups, stop_backups
+    from app.core.ipc import private_socket_path
+
+    workers = workers or settings.BOT_WORKERS
+    logger.info("Starting Bot Supervisor with %d workers...", workers)
+    prepare()
+    schedule_config = load_schedule()
+    path = settings.BOT_GATEWAY_SOCKET or private_socket_path("gateway.sock")
+    port = settings.BOT_METRICS_PORT
+
+    supervisor = Supervisor(heartbeat_timeout=settings.BOT_WORKER_HEARTBEAT_TIMEOUT)
+    supervisor.add("gateway", gateway_process, path, candle_subscriptions(schedule_config), port, stop_last=True)
+    for index, shard in enumerate(shard_schedule(schedule_config, workers)):
+        logger.info("worker-%d: %d strategies on %s", index, len(shard["strategies"]), sorted(shard_symbols(shard)))
+        worker_port = None if port is None else port + 1 + index
+        supervisor.add(f"worker-{index}", worker_process, index, shard, path, worker_port)
+    backups = start_backups()
+    try:
+        supervisor.run()
+    finally:
+        stop_backups(backups)
+    logger.info("Bot Supervisor Stopped")
@@ -1,43 +1,115 @@
 from app.providers.base import BaseProvider
-from app.core import repository
+from app.bot.execution import Execution, ExecutionAlgorithm, ParentOrder
+from app.core import repository, async_repository
+from app.core.db import is_async_session_factory
+from app.core.portfolio import order_fee
 from app.core.logger import get_logger
+from app.core import metrics
 from sqlalchemy.orm import Session
-from typing import Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
 
-logger = get_logger(__name__)
+ORDER_SECONDS = metrics.histogram(
+    "trade_execution_seconds", "Order placement plus trade recording, per side", ["side"]
+)
+ORDER_ERRORS = metrics.counter("trade_execution_errors_total", "Order executions that raised", ["side"])
 
 class TradeEngine:
-    def __init__(self, provider: BaseProvider, session_factory):
+    def __init__(self, provider: BaseProvider, session_factory, order_tracker=None,
+                 on_order_filled: Optional[Callable[[Dict], Awaitable[None]]] = None, writer=None, logger=None):
         self.provider = provider
+        # The backtester passes a silenced one
+        self.logger = logger or get_logger(__name__)
         self.session_factory = session_factory
+        # Optional WriteBehindWriter; when set, writes are queued instead of committed inline
+        self.writer = writer
+        # Orders that are not filled on creation are handed to the tracker until they are
+        self.order_tracker = order_tracker
+        self.on_order_filled = on_order_filled
 
+    @metrics.timed(ORDER_SECONDS, "buy", errors=ORDER_ERRORS)
     async def execute_buy(self, symbol: str, amount: float, price: Optional[float] = None) -> Dict:
-        logger.info(f"Executing BUY for {symbol}: {amount} @ {price or 'MARKET'}")
-        
-        # 1. Place order on exchange
+        return await self._execute(symbol, "buy", amount, price)
+
+    @metrics.timed(ORDER_SECONDS, "sell", errors=ORDER_ERRORS)
+    async def execute_sell(self, symbol: str, amount: float, price: Optional[float] = None) -> Dict:
+        return await self._execute(symbol, "sell", amount, price)
+
+    async def _execute(self, symbol: str, side: str, amount: float, price: Optional[float]) -> Dict:
+        self.logger.info("Executing %s for %s: %s @ %s", side.upper(), symbol, amount, price or "MARKET")
+
+        # Place order on exchange
         try:
-            order = await self.provider.place_order(symbol, "buy", amount, price)
+            order = await self.provider.place_order(symbol, side, amount, price, type="limit" if price else "market")
         except Exception as e:
-            logger.error(f"Failed to place buy order: {e}")
+            self.logger.error("Failed to place %s order: %s", side, e)
             raise
 
-        # 2. Record in DB
-        with self.session_factory() as session:
-            repository.save_trade(session, {
-                "provider": "binance", # TODO: dynamic
-                "symbol": symbol,
-                "side": "buy",
-                "amount": amount,
-                "price": price or 0.0, # Approximate if market
-                "status": order.get("status", "open"),
-                "exchange_order_id": str(order["id"]),
-                "meta_data": order
-            })
-            
-            # Update position (simplified, ideally should wait for fill)
-            # For now, we assume immediate fill or handle it in on_tick checks
-            # But let's just record it for the example
-            if order.get("status") == "closed":
-                 repository.save_position(session, symbol, amount, price or 0.0)
-
+        await self.record_order(order, symbol, side, amount, price)
         return order
+
+    @metrics.timed(ORDER_SECONDS, "batch", errors=ORDER_ERRORS)
+    async def execute_batch(self, orders: Sequence[Dict], order_tracker=None) -> List[Any]:
+        """
+        Place many orders ({"symbol", "side", "amount", "price"?}; a price makes a limit order)
+        through the provider's batch endpoint when it has one, and record each placed order.
+        Results follow the input order, with the exception in place of each order that failed.
+        """
+        specs = [{**order, "type": "limit" if order.get("price") else "market"} for order in orders]
+        results = await self.provider.place_orders(specs)
+        for spec, result in zip(specs, results):
+            if isinstance(result, Exception):
+                self.logger.error("Failed to place %s order for %s: %s", spec["side"], spec["symbol"], result)
+                continue
+            await self.record_order(result, spec["symbol"], spec["side"], spec["amount"], spec.get("price"),
+                                    order_tracker=order_tracker)
+        return results
+
+    async def execute(self, symbol: str, side: str, amount: float, algorithm: ExecutionAlgorithm,
+                      poll_interval: float = 1.0, parent: Optional[ParentOrder] = None) -> ParentOrder:
+        """
+        Work `amount` with an execution algorithm (see app.bot.execution); every child order is
+        recorded as a trade. Pass `parent` to see what filled even when the execution raises.
+        """
+        parent = parent or ParentOrder(symbol=symbol, side=side, amount=amount, algorithm=algorithm.name)
+        return await Execution(self, parent, poll_interval=poll_interval).run(algorithm)
+
+    async def record_order(self, order: Dict, symbol: str, side: str, amount: float, price: Optional[float] = None,
+                           order_tracker=None) -> None:
+        """Record a placed order as a trade, then report its fill or hand it to the order tracker."""
+        filled = order.get("status") == "closed"
+
+        # Record in DB (skipped when there is no session factory, e.g. in backtests)
+        trade_data = {
+            "provider": self.provider.name,
+            "symbol": symbol,
+            "side": side,
+            "amount": (order.get("filled") or amount) if filled else amount,
+            "price": order.get("average") or price or 0.0, # Requested price until filled
+            "status": order.get("status", "open"),
+            "exchange_order_id": str(order["id"]),
+            "meta_data": order
+        }
+        fee = order_fee(order)
+        trade_id = None
+        if self.writer is not None:
+            self.writer.save_trade(trade_data)
+            if filled:
+                self.writer.apply_fill(symbol, side, trade_data["amount"], trade_data["price"], fee)
+        elif self.session_factory is not None and is_async_session_factory(self.session_factory):
+            async with self.session_factory() as session:
+                trade_id = (await async_repository.save_trade(session, trade_data)).id
+                if filled:
+                    await async_repository.apply_fill(session, symbol, side, trade_data["amount"], trade_data["price"], fee)
+        elif self.session_factory is not None:
+            with self.session_factory() as session:
+                trade_id = repository.save_trade(session, trade_data).id
+                if filled:
+                    repository.apply_fill(session, symbol, side, trade_data["amount"], trade_data["price"], fee)
+
+        # Report the fill now, or once the tracker sees it
+        order_tracker = order_tracker or self.order_tracker
+        if filled:
+            if self.on_order_filled is not None:
+                await self.on_order_filled(order)
+        elif order_tracker is not None:
+            order_tracker.track(order, trade_id=trade_id, on_filled=self.on_order_filled)
@@ -0,0 +1,147 @@
+import asyncio
+import time
+from typing import Optional
+
+import typer
+
+from app.core.config import settings
+
+cli = typer.Typer(help="Trading bot maintenance commands")
+
+
+@cli.callback()
+def main():
+    from app.core.logger import setup_logging
+
+    setup_logging()
+
+
+@cli.command()
+def backfill(
+    symbol: str,
+    timeframe: str = "1m",
+    days: int = 30,
+    provider: str = settings.DEFAULT_PROVIDER,
+    store_dir: Optional[str] = None,
+):
+    """Fill the local candle store for SYMBOL from the exchange."""
+    from app.bot.backfill import backfill as run_backfill
+    from app.core.candle_store import CandleStore
+    from app.providers.provider_factory import get_provider
+    from app.providers.registry import providers
+
+    async def run():
+        exchange = get_provider(provider)
+        try:
+            start = int((time.time() - days * 24 * 60 * 60) * 1000)
+            return await run_backfill(exchange, CandleStore(store_dir), provider, symbol, timeframe, start)
+        finally:
+            await exchange.close()
+            await providers.close()
+
+    written = asyncio.run(run())
+    typer.echo(f"Stored {written} new {timeframe} candles for {symbol}")
+
+
+@cli.command()
+def backtest(
+    symbol: str,
+    strategy: str = "dca",
+    timeframe: str = "1m",
+    days: int = 365,
+    amount: float = 0.001,
+    interval_seconds: int = 60 * 60,
+    provider: str = settings.DEFAULT_PROVIDER,
+    store_dir: Optional[str] = None,
+):
+    """Backtest a strategy on candles from the local store (run `backfill` first)."""
+    from app.bot.backtest import Backtester
+    from app.bot.strategy_factory import STRATEGIES
+    from app.core.candle_store import CandleStore
+
+    if strategy not in STRATEGIES:
+        raise typer.BadParameter(f"Unknown strategy {strategy!r}; known: {', '.join(sorted(STRATEGIES))}",
+                                 param_hint="--strategy")
+    start = int((time.time() - days * 24 * 60 * 60) * 1000)
+    candles = CandleStore(store_dir).read_ohlcv(provider, symbol, timeframe, start=start)
+    if not len(candles):
+        raise typer.BadParameter(f"No stored {timeframe} candles for {symbol}; run backfill first")
+
+    config = {"symbol": symbol, "amount": amount, "interval_seconds": interval_seconds}
+    result = asyncio.run(Backtester(STRATEGIES[strategy], config, candles, timeframe=timeframe).run())
+    for key, value in result.summary().items():
+        typer.echo(f"{key}: {value}")
+
+
+@cli.command("rebuild-portfolio")
+def rebuild_portfolio(batch_size: int = 10_000):
+    """Recompute positions and daily PnL aggregates from the full trade history."""
+    from app.core import repository
+    from app.core.db import SessionLocal, init_db
+
+    init_db()
+    start = time.perf_counter()
+    with SessionLocal() as session:
+        applied = repository.rebuild_portfolio(session, batch_size=batch_size)
+    typer.echo(f"Replayed {applied} trades in {time.perf_counter() - start:.1f}s")
+
+
+@cli.command("compact-balances")
+def compact_balances(batch_size: int = 1000):
+    """Convert legacy account snapshots into balance change rows and roll them up."""
+    from app.core import balances
+    from app.core.db import SessionLocal, init_db
+
+    init_db()
+    with SessionLocal() as session:
+        converted = balances.import_account_snapshots(session, batch_size=batch_size)
+    written = balances.rollup_all(SessionLocal)
+    typer.echo(f"Converted {converted} account snapshots; rollup rows written: {written}")
+
+
+def _backup_manager(directory: Optional[str], bucket: Optional[str], keep: int = settings.BACKUP_KEEP):
+    from app.core.backup import BackupManager, build_sink
+    from app.core.db import sqlite_path
+
+    path = sqlite_path(settings.DATABASE_URL)
+    if path is None:
+        raise typer.BadParameter(f"Backups need a SQLite database file, not {settings.DATABASE_URL}")
+    return BackupManager(path, build_sink(directory or settings.BACKUP_DIR, bucket), keep=keep)
+
+
+@cli.command()
+def backup(
+    directory: Optional[str] = None,
+    bucket: Optional[str] = settings.BACKUP_BUCKET,
+    keep: int = settings.BACKUP_KEEP,
+):
+    """Take an online backup of the database now; safe while the bot is running."""
+    info = _backup_manager(directory, bucket, keep).backup()
+    if info is None:
+        typer.echo("Database unchanged since the last backup")
+    else:
+        typer.echo(f"Stored {info.name} ({info.compressed_size} bytes, sha256 {info.sha256})")
+
+
+@cli.command()
+def restore(
+    name: str,
+    target: str,
+    directory: Optional[str] = None,
+    bucket: Optional[str] = settings.BACKUP_BUCKET,
+    overwrite: bool = False,
+):
+    """Verify backup NAME (see `backups`) and write it to TARGET. Stop the bot before replacing its database."""
+    info = _backup_manager(directory, bucket).restore(name, target, overwrite=overwrite)
+    typer.echo(f"Restored {info.name} from {info.created_at} to {target}")
+
+
+@cli.command()
+def backups(directory: Optional[str] = None, bucket: Optional[str] = settings.BACKUP_BUCKET):
+    """List stored database backups, oldest first."""
+    for name in _backup_manager(directory, bucket).names():
+        typer.echo(name)
+
+
+if __name__ == "__main__":
+    cli()
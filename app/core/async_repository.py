@@ -0,0 +1,229 @@
+"""Async counterparts of app.core.repository for AsyncSession (aiosqlite / asyncpg)."""
+import datetime
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import balances
+from app.core.models import Trade, Position, BalanceSnapshot, DailyPnl, TableVersion
+from app.core.repository import timed_write, fill_position, new_daily_pnl, new_position
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+
+@timed_write("save_trade")
+async def save_trade(session: AsyncSession, trade_data: Dict[str, Any]) -> Trade:
+    trade = Trade(**trade_data)
+    session.add(trade)
+    await session.commit()
+    await session.refresh(trade)
+    return trade
+
+def _select_trades(
+    symbol: Optional[str] = None,
+    side: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[datetime.datetime] = None,
+    until: Optional[datetime.datetime] = None,
+    before: Optional[Tuple[datetime.datetime, int]] = None,
+    columns: Optional[List[str]] = None,
+):
+    """Newest-first trades matching the filters; `before` is a keyset cursor (executed_at, id)."""
+    stmt = select(*(getattr(Trade, name) for name in columns)) if columns else select(Trade)
+    if symbol is not None:
+        stmt = stmt.where(Trade.symbol == symbol)
+    if side is not None:
+        stmt = stmt.where(Trade.side == side)
+    if status is not None:
+        stmt = stmt.where(Trade.status == status)
+    if since is not None:
+        stmt = stmt.where(Trade.executed_at >= since)
+    if until is not None:
+        stmt = stmt.where(Trade.executed_at < until)
+    if before is not None:
+        stmt = stmt.where(tuple_(Trade.executed_at, Trade.id) < tuple_(*before))
+    return stmt.order_by(Trade.executed_at.desc(), Trade.id.desc())
+
+async def get_trades(session: AsyncSession, limit: int = 100, offset: int = 0, **filters) -> List[Trade]:
+    """
+    One page of trades. Pass the (executed_at, id) of the last row of the previous page as
+    `before` to page by keyset; `offset` still works but gets slower the deeper it goes.
+    """
+    stmt = _select_trades(**filters).limit(limit)
+    if offset:
+        stmt = stmt.offset(offset)
+    result = await session.execute(stmt)
+    return list(result.scalars())
+
+async def get_trade_rows(session: AsyncSession, columns: List[str], limit: int = 100, offset: int = 0,
+                         **filters) -> List[Tuple]:
+    """Like get_trades, but plain row tuples of the given columns (no ORM objects)."""
+    stmt = _select_trades(columns=columns, **filters).limit(limit)
+    if offset:
+        stmt = stmt.offset(offset)
+    result = await session.execute(stmt)
+    return [tuple(row) for row in result]
+
+async def get_last_trade_id(session: AsyncSession) -> int:
+    return (await session.execute(select(func.max(Trade.id)))).scalar() or 0
+
+async def get_trade_changes(session: AsyncSession, columns: List[str], after_id: int,
+                            ids: Optional[List[int]] = None) -> List[Tuple]:
+    """Rows of trades with id above `after_id`, plus the trades in `ids` (e.g. the ones still open), by id."""
+    condition = Trade.id > after_id
+    if ids:
+        condition = condition | Trade.id.in_(ids)
+    result = await session.execute(
+        select(*(getattr(Trade, name) for name in columns)).where(condition).order_by(Trade.id)
+    )
+    return [tuple(row) for row in result]
+
+async def stream_trades(session: AsyncSession, batch_size: int = 1000, **filters) -> AsyncIterator[Trade]:
+    """Yield matching trades from a server-side cursor, batch_size rows at a time."""
+    result = await session.stream(_select_trades(**filters).execution_options(yield_per=batch_size))
+    async for trade in result.scalars():
+        yield trade
+
+@timed_write("update_trade")
+async def update_trade(session: AsyncSession, trade_id: int, **kwargs) -> Optional[Trade]:
+    trade = await session.get(Trade, trade_id)
+    if trade:
+        for key, value in kwargs.items():
+            setattr(trade, key, value)
+        await session.commit()
+        await session.refresh(trade)
+    return trade
+
+async def get_open_trades(session: AsyncSession) -> List[Trade]:
+    result = await session.execute(select(Trade).where(Trade.status == "open"))
+    return list(result.scalars())
+
+async def get_position(session: AsyncSession, symbol: str) -> Optional[Position]:
+    result = await session.execute(select(Position).where(Position.symbol == symbol))
+    return result.scalars().first()
+
+async def get_positions(session: AsyncSession) -> List[Position]:
+    result = await session.execute(select(Position))
+    return list(result.scalars())
+
+async def get_position_rows(session: AsyncSession, columns: List[str]) -> List[Tuple]:
+    result = await session.execute(select(*(getattr(Position, name) for name in columns)).order_by(Position.symbol))
+    return [tuple(row) for row in result]
+
+@timed_write("save_position")
+async def save_position(session: AsyncSession, symbol: str, size: float, avg_price: float) -> Position:
+    position = await get_position(session, symbol)
+    if not position:
+        position = Position(symbol=symbol, size=size, avg_price=avg_price)
+        session.add(position)
+    else:
+        position.size = size
+        position.avg_price = avg_price
+    await session.commit()
+    await session.refresh(position)
+    return position
+
+async def get_daily_pnl(session: AsyncSession, day: datetime.date, symbol: str) -> Optional[DailyPnl]:
+    result = await session.execute(select(DailyPnl).where(DailyPnl.day == day, DailyPnl.symbol == symbol))
+    return result.scalars().first()
+
+@timed_write("apply_fill")
+async def apply_fill(session: AsyncSession, symbol: str, side: str, amount: float, price: float, fee: float = 0.0,
+                     day: Optional[datetime.date] = None) -> Position:
+    position = await get_position(session, symbol)
+    if not position:
+        position = new_position(symbol)
+        session.add(position)
+    day = day or datetime.datetime.now(datetime.timezone.utc).date()
+    daily = await get_daily_pnl(session, day, symbol)
+    if not daily:
+        daily = new_daily_pnl(day, symbol)
+        session.add(daily)
+    fill_position(position, side, amount, price, fee, daily)
+    await session.commit()
+    await session.refresh(position)
+    return position
+
+async def get_daily_pnl_range(
+    session: AsyncSession,
+    symbol: Optional[str] = None,
+    since: Optional[datetime.date] = None,
+    until: Optional[datetime.date] = None,
+) -> List[DailyPnl]:
+    stmt = select(DailyPnl)
+    if symbol is not None:
+        stmt = stmt.where(DailyPnl.symbol == symbol)
+    if since is not None:
+        stmt = stmt.where(DailyPnl.day >= since)
+    if until is not None:
+        stmt = stmt.where(DailyPnl.day < until)
+    result = await session.execute(stmt.order_by(DailyPnl.day, DailyPnl.symbol))
+    return list(result.scalars())
+
+async def get_daily_pnl_rows(session: AsyncSession, columns: List[str],
+                             since: Optional[datetime.date] = None) -> List[Tuple]:
+    stmt = select(*(getattr(DailyPnl, name) for name in columns))
+    if since is not None:
+        stmt = stmt.where(DailyPnl.day >= since)
+    result = await session.execute(stmt.order_by(DailyPnl.day, DailyPnl.symbol))
+    return [tuple(row) for row in result]
+
+async def get_daily_pnl_totals(session: AsyncSession, symbol: Optional[str] = None) -> List[Tuple]:
+    """(day, realized_pnl, fees) per day, summed over symbols unless one is given."""
+    stmt = select(DailyPnl.day, func.sum(DailyPnl.realized_pnl), func.sum(DailyPnl.fees))
+    if symbol is not None:
+        stmt = stmt.where(DailyPnl.symbol == symbol)
+    result = await session.execute(stmt.group_by(DailyPnl.day).order_by(DailyPnl.day))
+    return [tuple(row) for row in result]
+
+async def get_last_prices(session: AsyncSession, symbols: List[str]) -> Dict[str, float]:
+    """Price of the most recent trade per symbol (one index lookup each)."""
+    prices = {}
+    for symbol in symbols:
+        result = await session.execute(
+            select(Trade.price)
+            .where(Trade.symbol == symbol, Trade.price > 0)
+            .order_by(Trade.executed_at.desc(), Trade.id.desc())
+            .limit(1)
+        )
+        price = result.scalar()
+        if price is not None:
+            prices[symbol] = price
+    return prices
+
+@timed_write("save_account_snapshot")
+async def save_account_snapshot(session: AsyncSession, balance: Dict[str, Any],
+                                timestamp: Optional[datetime.datetime] = None) -> List[BalanceSnapshot]:
+    """Store the assets whose balance changed since their last row (see app.core.balances)."""
+    tracker = balances.BalanceTracker(balances.rows_to_state(await session.execute(balances.latest_balances_query())))
+    rows, _ = tracker.changes([(timestamp or datetime.datetime.now(datetime.timezone.utc), balance)])
+    snapshots = [BalanceSnapshot(**row) for row in rows]
+    session.add_all(snapshots)
+    await session.commit()
+    return snapshots
+
+async def get_latest_balances(session: AsyncSession) -> List[Tuple]:
+    """(timestamp, asset, free, used, total) of every asset currently holding a balance."""
+    result = await session.execute(balances.latest_balances_query())
+    return [tuple(row) for row in result if row.total or row.free or row.used]
+
+async def get_balance_changes(session: AsyncSession, since: datetime.datetime, until: datetime.datetime,
+                              asset: Optional[str] = None) -> List[Tuple]:
+    """
+    (timestamp, asset, free, used, total) change rows in [since, until), led by each asset's
+    balance at `since` (timestamped `since`) so the window starts from a known state.
+    """
+    opening = await session.execute(balances.latest_balances_query(before=since))
+    rows = [
+        (since, row.asset, row.free, row.used, row.total)
+        for row in opening if (asset is None or row.asset == asset) and (row.total or row.free or row.used)
+    ]
+    result = await session.execute(balances.changes_query(since, until, asset))
+    rows.extend(tuple(row) for row in result)
+    return rows
+
+async def get_balance_rollups(session: AsyncSession, resolution: str, since: datetime.datetime,
+                              until: datetime.datetime, asset: Optional[str] = None) -> List[Tuple]:
+    """(bucket, asset, open, high, low, close, free, used, changes) rows of buckets starting in [since, until)."""
+    result = await session.execute(balances.rollups_query(resolution, since, until, asset))
+    return [tuple(row) for row in result]
+
+async def get_table_versions(session: AsyncSession) -> Dict[str, int]:
+    result = await session.execute(select(TableVersion.name, TableVersion.version))
+    return {name: version for name, version in result}
@@ -0,0 +1,333 @@
+"""
+Online backups of the SQLite database while the bot keeps trading.
+
+The copy is taken with SQLite's online backup API from a separate connection on a background
+thread. The app runs the database in WAL mode (see app.core.db), where a reader never blocks
+writers, so the whole copy is one read transaction; with a rollback journal it is copied
+PAGES_PER_STEP pages at a time with a pause in between so writers get the lock. The backup
+step, zlib and hashlib all release the GIL, so the event loop keeps running meanwhile.
+
+Each backup is integrity-checked, gzip-compressed and stored in a BackupSink next to a JSON
+manifest with the SHA-256 of the database and of the compressed file. A database unchanged
+since the last backup is not stored again. Stored files are verified against the manifest
+after upload and again before restore().
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+from app.core import metrics
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+BACKUP_SECONDS = metrics.histogram("db_backup_seconds", "Duration of online database backups, upload included")
+BACKUP_BYTES = metrics.gauge("db_backup_bytes", "Compressed size of the last stored database backup")
+BACKUP_FAILURES = metrics.counter("db_backup_failures_total", "Database backups that raised")
+
+BACKUP_SUFFIX = ".db.gz"
+MANIFEST_SUFFIX = ".json"
+# Rollback-journal databases only: pages copied per step and the pause between steps
+PAGES_PER_STEP = 1024
+STEP_SLEEP = 0.01
+_CHUNK = 1024 * 1024
+
+
+class BackupError(RuntimeError):
+    pass
+
+
+@dataclass
+class BackupInfo:
+    name: str
+    created_at: str
+    sha256: str  # of the database file
+    size: int
+    compressed_sha256: str
+    compressed_size: int
+
+
+class BackupSink:
+    """Where backups are kept: named files, each written whole."""
+
+    def put(self, name: str, path: str) -> None:
+        raise NotImplementedError
+
+    def get(self, name: str, path: str) -> None:
+        raise NotImplementedError
+
+    def list(self) -> List[str]:
+        raise NotImplementedError
+
+    def delete(self, name: str) -> None:
+        raise NotImplementedError
+
+
+class LocalDirectorySink(BackupSink):
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def put(self, name: str, path: str) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        target = os.path.join(self.directory, name)
+        partial = target + ".partial"
+        with open(path, "rb") as src, open(partial, "wb") as dst:
+            shutil.copyfileobj(src, dst, _CHUNK)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(partial, target)
+
+    def get(self, name: str, path: str) -> None:
+        shutil.copyfile(os.path.join(self.directory, name), path)
+
+    def list(self) -> List[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name for name in os.listdir(self.directory) if not name.endswith(".partial"))
+
+    def delete(self, name: str) -> None:
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+
+
+class GCSSink(BackupSink):
+    """A Cloud Storage bucket (the deployment's backup bucket); the client is created on first use."""
+
+    def __init__(self, bucket: str, prefix: str = "db/"):
+        self.bucket_name = bucket
+        self.prefix = prefix
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            from google.cloud import storage
+
+            self._bucket = storage.Client().bucket(self.bucket_name)
+        return self._bucket
+
+    def put(self, name: str, path: str) -> None:
+        self.bucket.blob(self.prefix + name).upload_from_filename(path)
+
+    def get(self, name: str, path: str) -> None:
+        self.bucket.blob(self.prefix + name).download_to_filename(path)
+
+    def list(self) -> List[str]:
+        return sorted(blob.name[len(self.prefix):] for blob in self.bucket.list_blobs(prefix=self.prefix))
+
+    def delete(self, name: str) -> None:
+        self.bucket.blob(self.prefix + name).delete()
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_sqlite(db_path: str, target_path: str, pages_per_step: int = PAGES_PER_STEP,
+                    step_sleep: float = STEP_SLEEP) -> None:
+    """Consistent copy of a live SQLite database into a standalone file, integrity-checked."""
+    source = sqlite3.connect(db_path, timeout=30.0)
+    try:
+        wal = source.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target, pages=-1 if wal else pages_per_step, sleep=step_sleep)
+            # A single file without -wal/-shm companions
+            target.execute("PRAGMA journal_mode=DELETE")
+            result = target.execute("PRAGMA quick_check").fetchone()[0]
+        finally:
+            target.close()
+    finally:
+        source.close()
+    if result != "ok":
+        raise BackupError(f"Backup of {db_path} failed the integrity check: {result}")
+
+
+class BackupManager:
+    """Takes, stores, prunes, verifies and restores backups of one SQLite database."""
+
+    def __init__(self, db_path: str, sink: BackupSink, keep: int = 48, pages_per_step: int = PAGES_PER_STEP,
+                 step_sleep: float = STEP_SLEEP, staging_dir: Optional[str] = None):
+        self.db_path = db_path
+        self.sink = sink
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.staging_dir = staging_dir
+        self.prefix = os.path.splitext(os.path.basename(db_path))[0] + "-"
+        self._latest: Optional[BackupInfo] = None
+
+    def names(self) -> List[str]:
+        """Stored backups, oldest first (names sort by time)."""
+        return [
+            name[:-len(MANIFEST_SUFFIX)] for name in self.sink.list()
+            if name.startswith(self.prefix) and name.endswith(MANIFEST_SUFFIX)
+        ]
+
+    def info(self, name: str) -> BackupInfo:
+        with tempfile.TemporaryDirectory(dir=self.staging_dir) as tmp:
+            path = os.path.join(tmp, "manifest.json")
+            self.sink.get(name + MANIFEST_SUFFIX, path)
+            with open(path) as f:
+                return BackupInfo(**json.load(f))
+
+    def latest(self) -> Optional[BackupInfo]:
+        if self._latest is None:
+            names = self.names()
+            self._latest = self.info(names[-1]) if names else None
+        return self._latest
+
+    def backup(self) -> Optional[BackupInfo]:
+        """Store a backup; None when the database did not change since the last one."""
+        start = time.perf_counter()
+        try:
+            info = self._backup()
+        except Exception:
+            BACKUP_FAILURES.inc()
+            raise
+        BACKUP_SECONDS.observe(time.perf_counter() - start)
+        return info
+
+    def _backup(self) -> Optional[BackupInfo]:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with tempfile.TemporaryDirectory(dir=self.staging_dir, prefix="backup-") as tmp:
+            raw = os.path.join(tmp, "snapshot.db")
+            snapshot_sqlite(self.db_path, raw, self.pages_per_step, self.step_sleep)
+            digest = file_sha256(raw)
+            latest = self.latest()
+            if latest is not None and latest.sha256 == digest:
+                logger.info(f"Database unchanged since backup {latest.name}; skipped")
+                return None
+
+            name = self.prefix + now.strftime("%Y%m%dT%H%M%S%fZ")
+            compressed = os.path.join(tmp, name + BACKUP_SUFFIX)
+            with open(raw, "rb") as src, gzip.open(compressed, "wb", compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, _CHUNK)
+            info = BackupInfo(
+                name=name, created_at=now.isoformat(), sha256=digest, size=os.path.getsize(raw),
+                compressed_sha256=file_sha256(compressed), compressed_size=os.path.getsize(compressed),
+            )
+            manifest = os.path.join(tmp, name + MANIFEST_SUFFIX)
+            with open(manifest, "w") as f:
+                json.dump(asdict(info), f)
+
+            # The manifest goes last: a backup without one is incomplete and never listed
+            self.sink.put(name + BACKUP_SUFFIX, compressed)
+            self.sink.put(name + MANIFEST_SUFFIX, manifest)
+        self.verify(name, info)
+        self._latest = info
+        BACKUP_BYTES.set(info.compressed_size)
+        logger.info(f"Stored backup {name} ({info.size} bytes, {info.compressed_size} compressed)")
+        self.prune()
+        return info
+
+    def prune(self) -> List[str]:
+        names = self.names()
+        removed = names[:max(0, len(names) - self.keep)]
+        for name in removed:
+            # Manifest first, so an interrupted prune leaves no listed backup without data
+            self.sink.delete(name + MANIFEST_SUFFIX)
+            self.sink.delete(name + BACKUP_SUFFIX)
+        return removed
+
+    def verify(self, name: str, info: Optional[BackupInfo] = None) -> BackupInfo:
+        """Check a stored backup against its manifest; raises BackupError on any mismatch."""
+        info = info or self.info(name)
+        with tempfile.TemporaryDirectory(dir=self.staging_dir) as tmp:
+            self._fetch(name, info, os.path.join(tmp, "verify.db"))
+        return info
+
+    def restore(self, name: str, target_path: str, overwrite: bool = False) -> BackupInfo:
+        """Write a verified backup to `target_path`. Stop the bot first when restoring its live database."""
+        if os.path.exists(target_path) and not overwrite:
+            raise FileExistsError(f"{target_path} exists; pass overwrite=True to replace it")
+        info = self.info(name)
+        directory = os.path.dirname(os.path.abspath(target_path))
+        os.makedirs(directory, exist_ok=True)
+        partial = target_path + ".partial"
+        try:
+            self._fetch(name, info, partial)
+            for suffix in ("-wal", "-shm"):
+                if os.path.exists(target_path + suffix):
+                    os.remove(target_path + suffix)
+            os.replace(partial, target_path)
+        finally:
+            if os.path.exists(partial):
+                os.remove(partial)
+        return info
+
+    def _fetch(self, name: str, info: BackupInfo, path: str) -> None:
+        compressed = path + ".gz"
+        try:
+            self.sink.get(name + BACKUP_SUFFIX, compressed)
+            if file_sha256(compressed) != info.compressed_sha256:
+                raise BackupError(f"Backup {name}: compressed file does not match its checksum")
+            with gzip.open(compressed, "rb") as src, open(path, "wb") as dst:
+                shutil.copyfileobj(src, dst, _CHUNK)
+        finally:
+            if os.path.exists(compressed):
+                os.remove(compressed)
+        if file_sha256(path) != info.sha256:
+            raise BackupError(f"Backup {name}: database does not match its checksum")
+
+
+class BackupService:
+    """Runs BackupManager.backup every `interval` seconds on a daemon thread."""
+
+    def __init__(self, manager: BackupManager, interval: float = 3600.0, initial_delay: float = 60.0):
+        self.manager = manager
+        self.interval = interval
+        self.initial_delay = initial_delay
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.backups = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="db-backup", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop after the backup in progress, if any."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        delay = self.initial_delay
+        while not self._stop.wait(delay):
+            try:
+                if self.manager.backup() is None:
+                    self.skipped += 1
+                else:
+                    self.backups += 1
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Database backup failed: {e}")
+            delay = self.interval
+
+    def stats(self):
+        return {"backups": self.backups, "skipped": self.skipped, "errors": self.errors}
+
+
+def build_sink(directory: str, bucket: Optional[str] = None) -> BackupSink:
+    return GCSSink(bucket) if bucket else LocalDirectorySink(directory)
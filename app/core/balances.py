@@ -0,0 +1,257 @@
+"""
+Account balance history: per-asset change rows plus hourly and daily rollups.
+
+ccxt's fetch_balance lists every asset of the exchange, nearly all of them zero. A snapshot
+is stored as one balance_snapshots row per asset whose (free, used, total) changed since
+that asset's previous row: new and changed balances, and a single zero row when an asset is
+emptied. An asset's balance at time t is its last row at or before t.
+
+rollup() summarizes complete hours and days into balance_rollups, one row per bucket for
+every asset that held a balance or changed in it, so a chart over months reads one row per
+asset and day instead of replaying every change. choose_resolution() picks the table that
+serves a requested window.
+"""
+import datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.models import AccountSnapshot, BalanceRollup, BalanceSnapshot
+
+Balance = Tuple[float, float, float]  # free, used, total
+ZERO: Balance = (0.0, 0.0, 0.0)
+
+# Rollup resolution -> bucket length in seconds
+RESOLUTIONS = {"1h": 60 * 60, "1d": 24 * 60 * 60}
+# Windows up to this long are served from the change rows themselves...
+RAW_WINDOW = datetime.timedelta(days=2)
+# ...longer ones from the finest rollup that needs at most this many buckets
+MAX_POINTS = 1000
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+SNAPSHOT_COLUMNS = ("timestamp", "asset", "free", "used", "total")
+ROLLUP_COLUMNS = ("bucket", "asset", "open", "high", "low", "close", "free", "used", "changes")
+
+
+def as_utc(moment: datetime.datetime) -> datetime.datetime:
+    """SQLite hands back naive datetimes; every timestamp here is UTC."""
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=datetime.timezone.utc)
+    return moment.astimezone(datetime.timezone.utc)
+
+
+def floor_time(moment: datetime.datetime, seconds: int) -> datetime.datetime:
+    elapsed = int((as_utc(moment) - _EPOCH).total_seconds()) // seconds * seconds
+    return _EPOCH + datetime.timedelta(seconds=elapsed)
+
+
+def choose_resolution(since: datetime.datetime, until: datetime.datetime) -> str:
+    """"raw" for short windows, else the finest rollup with at most MAX_POINTS buckets in the window."""
+    span = as_utc(until) - as_utc(since)
+    if span <= RAW_WINDOW:
+        return "raw"
+    by_length = sorted(RESOLUTIONS, key=RESOLUTIONS.get)
+    for resolution in by_length:
+        if span.total_seconds() / RESOLUTIONS[resolution] <= MAX_POINTS:
+            return resolution
+    return by_length[-1]
+
+
+def normalize_balance(balance: Mapping) -> Dict[str, Balance]:
+    """Non-zero (free, used, total) per asset of a ccxt balance, or of a plain {asset: amount} map."""
+    if not any(key in balance for key in ("free", "used", "total")):
+        return {
+            asset: (float(amount), 0.0, float(amount))
+            for asset, amount in balance.items() if isinstance(amount, (int, float)) and amount
+        }
+    free, used, total = (balance.get(key) or {} for key in ("free", "used", "total"))
+    result = {}
+    for asset in set(free) | set(used) | set(total):
+        asset_free = float(free.get(asset) or 0.0)
+        asset_used = float(used.get(asset) or 0.0)
+        asset_total = total.get(asset)
+        asset_total = asset_free + asset_used if asset_total is None else float(asset_total)
+        if asset_free or asset_used or asset_total:
+            result[asset] = (asset_free, asset_used, asset_total)
+    return result
+
+
+def latest_balances_query(before: Optional[datetime.datetime] = None):
+    """Last row (timestamp, asset, free, used, total) per asset, optionally of rows before `before`."""
+    ranked = select(
+        *(getattr(BalanceSnapshot, column) for column in SNAPSHOT_COLUMNS),
+        func.row_number().over(
+            partition_by=BalanceSnapshot.asset,
+            order_by=(BalanceSnapshot.timestamp.desc(), BalanceSnapshot.id.desc()),
+        ).label("rank"),
+    )
+    if before is not None:
+        ranked = ranked.where(BalanceSnapshot.timestamp < before)
+    ranked = ranked.subquery()
+    return (
+        select(*(ranked.c[column] for column in SNAPSHOT_COLUMNS))
+        .where(ranked.c.rank == 1)
+        .order_by(ranked.c.asset)
+    )
+
+
+def changes_query(since: datetime.datetime, until: datetime.datetime, asset: Optional[str] = None):
+    stmt = select(*(getattr(BalanceSnapshot, column) for column in SNAPSHOT_COLUMNS)).where(
+        BalanceSnapshot.timestamp >= since, BalanceSnapshot.timestamp < until
+    )
+    if asset is not None:
+        stmt = stmt.where(BalanceSnapshot.asset == asset)
+    return stmt.order_by(BalanceSnapshot.timestamp, BalanceSnapshot.id)
+
+
+def rollups_query(resolution: str, since: datetime.datetime, until: datetime.datetime, asset: Optional[str] = None):
+    stmt = select(*(getattr(BalanceRollup, column) for column in ROLLUP_COLUMNS)).where(
+        BalanceRollup.resolution == resolution, BalanceRollup.bucket >= since, BalanceRollup.bucket < until
+    )
+    if asset is not None:
+        stmt = stmt.where(BalanceRollup.asset == asset)
+    return stmt.order_by(BalanceRollup.bucket, BalanceRollup.asset)
+
+
+def rows_to_state(rows: Iterable[Sequence]) -> Dict[str, Balance]:
+    """{asset: (free, used, total)} from (timestamp, asset, free, used, total) rows."""
+    return {asset: (free or 0.0, used or 0.0, total or 0.0) for _, asset, free, used, total in rows}
+
+
+def latest_balances(session: Session, before: Optional[datetime.datetime] = None) -> Dict[str, Balance]:
+    return rows_to_state(session.execute(latest_balances_query(before)))
+
+
+class BalanceTracker:
+    """The last stored balance per asset; turns snapshots into the rows worth storing."""
+
+    def __init__(self, last: Optional[Dict[str, Balance]] = None):
+        self.last: Dict[str, Balance] = dict(last or {})
+
+    @classmethod
+    def load(cls, session: Session) -> "BalanceTracker":
+        return cls(latest_balances(session))
+
+    def changes(self, snapshots: Iterable[Tuple[datetime.datetime, Mapping]]) -> Tuple[List[Dict], Dict[str, Balance]]:
+        """
+        Rows for (timestamp, balance) snapshots, oldest first, and the state after them. The
+        state is only adopted by commit(), after the rows are stored, so a failed write can
+        be recomputed.
+        """
+        state = dict(self.last)
+        rows = []
+        for timestamp, balance in snapshots:
+            current = normalize_balance(balance)
+            held = {asset for asset, value in state.items() if value != ZERO}
+            for asset in sorted(held | set(current)):
+                value = current.get(asset, ZERO)
+                if state.get(asset) != value:
+                    state[asset] = value
+                    rows.append({"timestamp": timestamp, "asset": asset,
+                                 "free": value[0], "used": value[1], "total": value[2]})
+        return rows, state
+
+    def commit(self, state: Dict[str, Balance]) -> None:
+        self.last = state
+
+
+def summarize(state: Dict[str, Balance], changes: Iterable[Sequence], start: datetime.datetime,
+              end: datetime.datetime, resolution: str) -> List[Dict]:
+    """
+    Rollup rows of the buckets in [start, end) from the balances at `start` and the change rows
+    (timestamp, asset, free, used, total) in the window, oldest first.
+    """
+    step = datetime.timedelta(seconds=RESOLUTIONS[resolution])
+    state = dict(state)
+    pending: Iterator[Sequence] = iter(changes)
+    change = next(pending, None)
+    rows = []
+    bucket = start
+    while bucket < end:
+        bucket_end = bucket + step
+        # asset -> [open, high, low, changes] of the total
+        stats = {asset: [value[2], value[2], value[2], 0] for asset, value in state.items()}
+        while change is not None and as_utc(change[0]) < bucket_end:
+            _, asset, free, used, total = change
+            opened = state.get(asset, ZERO)[2]
+            entry = stats.setdefault(asset, [opened, opened, opened, 0])
+            entry[1] = max(entry[1], total)
+            entry[2] = min(entry[2], total)
+            entry[3] += 1
+            state[asset] = (free, used, total)
+            change = next(pending, None)
+        for asset in sorted(stats):
+            open_, high, low, count = stats[asset]
+            free, used, total = state[asset]
+            if count == 0 and state[asset] == ZERO:
+                continue
+            rows.append({
+                "resolution": resolution, "bucket": bucket, "asset": asset, "open": open_, "high": high,
+                "low": low, "close": total, "free": free, "used": used, "changes": count,
+            })
+        bucket = bucket_end
+    return rows
+
+
+def rollup(session: Session, resolution: str, until: datetime.datetime) -> int:
+    """
+    Store the rollups of every complete `resolution` bucket after the last stored one that
+    ends by `until`. Returns the number of rows written; running it again is a no-op.
+    """
+    seconds = RESOLUTIONS[resolution]
+    end = floor_time(until, seconds)
+    last = session.scalar(select(func.max(BalanceRollup.bucket)).where(BalanceRollup.resolution == resolution))
+    if last is not None:
+        start = as_utc(last) + datetime.timedelta(seconds=seconds)
+    else:
+        first = session.scalar(select(func.min(BalanceSnapshot.timestamp)))
+        if first is None:
+            return 0
+        start = floor_time(first, seconds)
+    if start >= end:
+        return 0
+
+    state = latest_balances(session, before=start)
+    rows = summarize(state, session.execute(changes_query(start, end)), start, end, resolution)
+    if rows:
+        session.execute(insert(BalanceRollup), rows)
+    session.commit()
+    return len(rows)
+
+
+def rollup_all(session_factory, until: Optional[datetime.datetime] = None) -> Dict[str, int]:
+    until = until or datetime.datetime.now(datetime.timezone.utc)
+    written = {}
+    for resolution in RESOLUTIONS:
+        with session_factory() as session:
+            written[resolution] = rollup(session, resolution, until)
+    return written
+
+
+def import_account_snapshots(session: Session, batch_size: int = 1000) -> int:
+    """
+    Convert legacy account_snapshots blobs, oldest first, into change rows and delete them.
+    Returns the number of blobs converted.
+    """
+    first = session.scalar(select(func.min(AccountSnapshot.timestamp)))
+    if first is None:
+        return 0
+    tracker = BalanceTracker(latest_balances(session, before=first))
+    converted = 0
+    while True:
+        batch = session.execute(
+            select(AccountSnapshot.id, AccountSnapshot.timestamp, AccountSnapshot.balance)
+            .order_by(AccountSnapshot.timestamp, AccountSnapshot.id)
+            .limit(batch_size)
+        ).all()
+        if not batch:
+            return converted
+        rows, state = tracker.changes((timestamp, balance or {}) for _, timestamp, balance in batch)
+        if rows:
+            session.execute(insert(BalanceSnapshot), rows)
+        session.execute(delete(AccountSnapshot).where(AccountSnapshot.id.in_([row[0] for row in batch])))
+        session.commit()
+        tracker.commit(state)
+        converted += len(batch)
@@ -0,0 +1,198 @@
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.utils import timeframe_to_ms
+
+logger = get_logger(__name__)
+
+# One raw little-endian file per column; row i of every file is the same candle
+COLUMNS: List[Tuple[str, str]] = [
+    ("timestamp", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<f8"),
+]
+
+
+@dataclass
+class CandleColumns:
+    """Column views over a stored candle range. Arrays are read-only memory maps, not copies."""
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def to_ohlcv(self) -> np.ndarray:
+        """Stack into a (N, 6) float64 array, the layout used by the backtester and cache."""
+        return np.column_stack([self.timestamp, self.open, self.high, self.low, self.close, self.volume]).astype(np.float64)
+
+
+class CandleStore:
+    """
+    Append-only columnar OHLCV files on local disk, one directory per provider/symbol/timeframe.
+
+    Timestamps are strictly increasing within a series. New candles after the last stored one
+    are appended in place, as are batches whose only overlap with the store is candles already in
+    it; anything older (e.g. gap fills) rewrites the series into `<dir>.tmp` and swaps it in
+    (`<dir>` -> `<dir>.old`, `<dir>.tmp` -> `<dir>`), so callers filling history should write it
+    in large batches. A crash between the two renames leaves only `<dir>.old`: readers use it,
+    and the next write moves it back.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.CANDLE_STORE_DIR
+
+    def series_dir(self, provider: str, symbol: str, timeframe: str) -> str:
+        safe_symbol = symbol.replace("/", "-").replace(":", "_")
+        return os.path.join(self.root, provider, safe_symbol, timeframe)
+
+    def _column_path(self, directory: str, column: str) -> str:
+        return os.path.join(directory, f"{column}.bin")
+
+    def _row_count(self, directory: str) -> int:
+        # A crash mid-append can leave columns of different lengths; the shortest one wins
+        counts = []
+        for column, dtype in COLUMNS:
+            path = self._column_path(directory, column)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // np.dtype(dtype).itemsize)
+        return min(counts)
+
+    def _truncate(self, directory: str, rows: int) -> None:
+        for column, dtype in COLUMNS:
+            path = self._column_path(directory, column)
+            if os.path.exists(path) and os.path.getsize(path) != rows * np.dtype(dtype).itemsize:
+                with open(path, "r+b") as f:
+                    f.truncate(rows * np.dtype(dtype).itemsize)
+
+    def _readable_dir(self, directory: str) -> str:
+        """The series directory, or its previous version when a rewrite stopped mid-swap."""
+        old_dir = directory + ".old"
+        if not os.path.isdir(directory) and os.path.isdir(old_dir):
+            return old_dir
+        return directory
+
+    def _recover(self, directory: str) -> None:
+        """Undo what an interrupted rewrite left behind (writers only: readers may run meanwhile)."""
+        old_dir, tmp_dir = directory + ".old", directory + ".tmp"
+        if not os.path.isdir(directory) and os.path.isdir(old_dir):
+            # Crashed between the renames; the backfilled candles are fetched again
+            os.replace(old_dir, directory)
+            logger.warning(f"Restored {directory} from an interrupted rewrite")
+        for leftover in (old_dir, tmp_dir):
+            if os.path.isdir(leftover):
+                shutil.rmtree(leftover)
+
+    def count(self, provider: str, symbol: str, timeframe: str) -> int:
+        return self._row_count(self._readable_dir(self.series_dir(provider, symbol, timeframe)))
+
+    def read(self, provider: str, symbol: str, timeframe: str, start: int = None, end: int = None) -> CandleColumns:
+        """Memory-map the candles with start <= timestamp < end (both in ms, optional)."""
+        directory = self._readable_dir(self.series_dir(provider, symbol, timeframe))
+        rows = self._row_count(directory)
+        if rows == 0:
+            return CandleColumns(*[np.empty(0, dtype=dtype) for _, dtype in COLUMNS])
+
+        maps: Dict[str, np.ndarray] = {
+            column: np.memmap(self._column_path(directory, column), dtype=dtype, mode="r", shape=(rows,))
+            for column, dtype in COLUMNS
+        }
+        ts = maps["timestamp"]
+        lo = int(np.searchsorted(ts, start, side="left")) if start is not None else 0
+        hi = int(np.searchsorted(ts, end, side="left")) if end is not None else rows
+        return CandleColumns(**{column: array[lo:hi] for column, array in maps.items()})
+
+    def read_ohlcv(self, provider: str, symbol: str, timeframe: str, start: int = None, end: int = None) -> np.ndarray:
+        return self.read(provider, symbol, timeframe, start, end).to_ohlcv()
+
+    def tail(self, provider: str, symbol: str, timeframe: str, count: int) -> np.ndarray:
+        columns = self.read(provider, symbol, timeframe)
+        if len(columns) > count:
+            columns = CandleColumns(**{k: v[-count:] for k, v in columns.__dict__.items()})
+        return columns.to_ohlcv()
+
+    def first_timestamp(self, provider: str, symbol: str, timeframe: str) -> Optional[int]:
+        ts = self.read(provider, symbol, timeframe).timestamp
+        return int(ts[0]) if len(ts) else None
+
+    def last_timestamp(self, provider: str, symbol: str, timeframe: str) -> Optional[int]:
+        ts = self.read(provider, symbol, timeframe).timestamp
+        return int(ts[-1]) if len(ts) else None
+
+    def find_gaps(self, provider: str, symbol: str, timeframe: str) -> List[Tuple[int, int]]:
+        """Missing [start, end) ranges between stored candles."""
+        tf = timeframe_to_ms(timeframe)
+        ts = self.read(provider, symbol, timeframe).timestamp
+        if len(ts) < 2:
+            return []
+        missing = np.nonzero(np.diff(ts) > tf)[0]
+        return [(int(ts[i]) + tf, int(ts[i + 1])) for i in missing]
+
+    def write(self, provider: str, symbol: str, timeframe: str, candles) -> int:
+        """Store candles ([ts, o, h, l, c, v] rows). Returns the number of new candles."""
+        rows = np.asarray(candles, dtype=np.float64).reshape(-1, len(COLUMNS))
+        if not len(rows):
+            return 0
+        rows = rows[np.argsort(rows[:, 0], kind="stable")]
+
+        directory = self.series_dir(provider, symbol, timeframe)
+        self._recover(directory)
+        os.makedirs(directory, exist_ok=True)
+        count = self._row_count(directory)
+        self._truncate(directory, count)
+
+        ts = self.read(provider, symbol, timeframe).timestamp
+        if len(ts) and rows[0, 0] <= ts[-1]:
+            # Existing candles win over re-fetched duplicates
+            at = np.searchsorted(ts, rows[:, 0])
+            stored = (at < len(ts)) & (ts[np.minimum(at, len(ts) - 1)] == rows[:, 0])
+            rows = rows[~stored]
+            if not len(rows):
+                return 0
+            if rows[0, 0] <= ts[-1]:
+                return self._rewrite(provider, symbol, timeframe, directory, rows)
+        return self._append(directory, rows)
+
+    def _append(self, directory: str, rows: np.ndarray) -> int:
+        _, keep = np.unique(rows[:, 0], return_index=True)
+        rows = rows[keep]
+        # Timestamps go last so an interrupted append never exposes a row with missing values
+        for index, (column, dtype) in reversed(list(enumerate(COLUMNS))):
+            with open(self._column_path(directory, column), "ab") as f:
+                f.write(rows[:, index].astype(dtype).tobytes())
+        return len(rows)
+
+    def _rewrite(self, provider: str, symbol: str, timeframe: str, directory: str, rows: np.ndarray) -> int:
+        existing = self.read_ohlcv(provider, symbol, timeframe)
+        merged = np.concatenate((existing, rows))
+        # Existing candles win over re-fetched duplicates
+        _, keep = np.unique(merged[:, 0], return_index=True)
+        merged = merged[keep]
+        added = len(merged) - len(existing)
+        if added == 0:
+            return 0
+
+        tmp_dir = directory + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        self._append(tmp_dir, merged)
+        old_dir = directory + ".old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        os.replace(directory, old_dir)
+        os.replace(tmp_dir, directory)
+        shutil.rmtree(old_dir)
+        logger.info(f"Rewrote {directory} with {added} backfilled candles")
+        return added
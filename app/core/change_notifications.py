@@ -0,0 +1,124 @@
+"""
+Change notifications from the bot to the API process over a Unix domain socket.
+
+After each commit the bot sends the names of the tracked tables it changed (see
+app.core.table_versions), one comma-separated line per message, and the API's live feed
+re-reads those tables at once instead of waiting for its next poll. The notification is only
+a hint: the database stays the source of truth, so a lost message delays an update by at most
+one poll interval and nothing is lost when the API is down.
+
+The socket carries nothing but table names and is created with mode 0600.
+"""
+import asyncio
+import os
+from typing import Callable, FrozenSet, Optional, Set
+
+from app.core import table_versions
+from app.core.logger import get_logger, get_rate_limited_logger
+
+logger = get_logger(__name__)
+# The API may be down for a while; say so once a minute
+connect_logger = get_rate_limited_logger(__name__, interval=60.0)
+
+MAX_LINE_BYTES = 4096
+
+
+async def serve_change_notifications(path: str, on_change: Callable[[Set[str]], None]) -> asyncio.AbstractServer:
+    """Listen on `path` and call on_change(tables) for every notification received."""
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while line := await reader.readline():
+                tables = {name for name in line.decode(errors="replace").strip().split(",") if name}
+                if tables:
+                    on_change(tables & table_versions.TRACKED_TABLES)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning(f"Dropping change notification connection: {e}")
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        # Left behind by a previous run
+        os.unlink(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    server = await asyncio.start_unix_server(handle, path=path, limit=MAX_LINE_BYTES)
+    os.chmod(path, 0o600)
+    return server
+
+
+class ChangeNotifier:
+    """
+    Sends the tables changed by this process's commits to the API process. notify() may be
+    called from any thread (the write-behind writer commits on its own); notifications are
+    coalesced into one message per wakeup of the event loop.
+    """
+
+    def __init__(self, path: str, retry_seconds: float = 5.0):
+        self.path = path
+        self.retry_seconds = retry_seconds
+        self.sent = 0
+        self.failed = 0
+        self._pending: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        table_versions.add_commit_listener(self.notify)
+        self._task = asyncio.create_task(self._run())
+
+    def notify(self, tables: FrozenSet[str]) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self._changed, tables)
+        except RuntimeError:
+            # The loop is closing; the API picks the change up on its next poll
+            pass
+
+    def _changed(self, tables: FrozenSet[str]) -> None:
+        self._pending.update(tables)
+        self._wakeup.set()
+
+    async def _connect(self) -> bool:
+        if self._writer is not None and not self._writer.is_closing():
+            return True
+        try:
+            _, self._writer = await asyncio.open_unix_connection(self.path)
+            return True
+        except OSError as e:
+            connect_logger.warning("No change notification listener at %s: %s", self.path, e)
+            self._writer = None
+            return False
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            tables, self._pending = self._pending, set()
+            if not tables:
+                continue
+            if not await self._connect():
+                self.failed += 1
+                # Changes meanwhile are dropped too; the API polls for them
+                await asyncio.sleep(self.retry_seconds)
+                self._pending.clear()
+                continue
+            try:
+                self._writer.write((",".join(sorted(tables)) + "\n").encode())
+                await self._writer.drain()
+                self.sent += 1
+            except OSError as e:
+                self.failed += 1
+                connect_logger.warning("Sending change notification failed: %s", e)
+                self._writer.close()
+                self._writer = None
+
+    async def stop(self) -> None:
+        table_versions.remove_commit_listener(self.notify)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        if self._writer is not None:
+            self._writer.close()
+        logger.info(f"Change notifier stats: sent={self.sent} failed={self.failed}")
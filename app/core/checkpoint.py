@@ -0,0 +1,253 @@
+"""
+Strategy state checkpoints, so a restarted bot resumes where it stopped instead of re-buying
+or warming its indicators up again.
+
+A checkpoint is a small binary blob:
+
+    header  ">4sBHI": MAGIC, FORMAT_VERSION, state version, CRC-32 of the body
+    body    zlib-compressed tagged encoding of the state
+
+The state version belongs to the strategy (AbstractStrategy.state_version) and is bumped when
+the shape of its state changes; the format version covers the encoding itself. The encoding
+takes None, bool, int, float (NaN and infinities included), str, bytes, lists, tuples, dicts
+and NumPy arrays, and round-trips floats bit for bit, which JSON does not for NaN.
+
+Checkpoints are kept in a CheckpointStore: one file per strategy in a local directory, or one
+row per strategy in the strategy_checkpoints table.
+"""
+import datetime
+import os
+import re
+import struct
+import sys
+import zlib
+from typing import Any, Optional, Tuple
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+MAGIC = b"SCKP"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct(">4sBHI")
+_LENGTH = struct.Struct(">I")
+_INT = struct.Struct(">q")
+_FLOAT = struct.Struct(">d")
+
+# Type tags of the body encoding
+_NONE, _TRUE, _FALSE, _INTEGER, _BIGINT, _REAL = b"N", b"T", b"F", b"i", b"I", b"f"
+_TEXT, _BYTES, _LIST, _TUPLE, _DICT, _ARRAY = b"s", b"b", b"l", b"t", b"d", b"a"
+
+
+class CheckpointError(ValueError):
+    pass
+
+
+def _encode(value: Any, out: bytearray) -> None:
+    if value is None:
+        out += _NONE
+    elif value is True:
+        out += _TRUE
+    elif value is False:
+        out += _FALSE
+    elif isinstance(value, int):
+        if -2 ** 63 <= value < 2 ** 63:
+            out += _INTEGER + _INT.pack(value)
+        else:
+            data = str(value).encode()
+            out += _BIGINT + _LENGTH.pack(len(data)) + data
+    elif isinstance(value, float):
+        out += _REAL + _FLOAT.pack(value)
+    elif isinstance(value, str):
+        data = value.encode()
+        out += _TEXT + _LENGTH.pack(len(data)) + data
+    elif isinstance(value, (bytes, bytearray)):
+        out += _BYTES + _LENGTH.pack(len(value)) + value
+    elif isinstance(value, (list, tuple)):
+        out += (_LIST if isinstance(value, list) else _TUPLE) + _LENGTH.pack(len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out += _DICT + _LENGTH.pack(len(value))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    else:
+        # NumPy is only ever loaded by strategies that use it
+        np = sys.modules.get("numpy")
+        if np is not None and isinstance(value, np.ndarray):
+            array = np.ascontiguousarray(value)
+            out += _ARRAY
+            _encode(array.dtype.str, out)
+            _encode(list(array.shape), out)
+            _encode(array.tobytes(), out)
+        elif np is not None and isinstance(value, np.generic):
+            _encode(value.item(), out)
+        else:
+            raise CheckpointError(f"Cannot checkpoint a {type(value).__name__}")
+
+
+class _Decoder:
+    def __init__(self, data: bytes):
+        self.data = memoryview(data)
+        self.offset = 0
+
+    def take(self, size: int) -> memoryview:
+        end = self.offset + size
+        if end > len(self.data):
+            raise CheckpointError("Truncated checkpoint")
+        chunk = self.data[self.offset:end]
+        self.offset = end
+        return chunk
+
+    def length(self) -> int:
+        return _LENGTH.unpack(self.take(_LENGTH.size))[0]
+
+    def value(self) -> Any:
+        tag = bytes(self.take(1))
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _INTEGER:
+            return _INT.unpack(self.take(_INT.size))[0]
+        if tag == _BIGINT:
+            return int(bytes(self.take(self.length())).decode())
+        if tag == _REAL:
+            return _FLOAT.unpack(self.take(_FLOAT.size))[0]
+        if tag == _TEXT:
+            return bytes(self.take(self.length())).decode()
+        if tag == _BYTES:
+            return bytes(self.take(self.length()))
+        if tag in (_LIST, _TUPLE):
+            items = [self.value() for _ in range(self.length())]
+            return items if tag == _LIST else tuple(items)
+        if tag == _DICT:
+            result = {}
+            for _ in range(self.length()):
+                key = self.value()
+                result[key] = self.value()
+            return result
+        if tag == _ARRAY:
+            import numpy as np
+
+            dtype, shape, data = self.value(), self.value(), self.value()
+            return np.frombuffer(data, dtype=np.dtype(dtype)).reshape(shape).copy()
+        raise CheckpointError(f"Unknown tag {tag!r} at offset {self.offset - 1}")
+
+
+def encode_checkpoint(state: Any, version: int) -> bytes:
+    out = bytearray()
+    _encode(state, out)
+    body = zlib.compress(bytes(out))
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, version, zlib.crc32(body)) + body
+
+
+def decode_checkpoint(data: bytes) -> Tuple[int, Any]:
+    """(state version, state) of a checkpoint. Raises CheckpointError when it is not a valid checkpoint."""
+    if len(data) < _HEADER.size:
+        raise CheckpointError("Truncated checkpoint")
+    magic, format_version, version, crc = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CheckpointError("Not a checkpoint")
+    if format_version != FORMAT_VERSION:
+        raise CheckpointError(f"Unsupported checkpoint format {format_version}")
+    body = data[_HEADER.size:]
+    if zlib.crc32(body) != crc:
+        raise CheckpointError("Checkpoint checksum mismatch")
+    try:
+        decoder = _Decoder(zlib.decompress(body))
+    except zlib.error as e:
+        raise CheckpointError(f"Corrupt checkpoint: {e}") from e
+    state = decoder.value()
+    if decoder.offset != len(decoder.data):
+        raise CheckpointError("Trailing data after checkpoint state")
+    return version, state
+
+
+class CheckpointStore:
+    """Latest checkpoint per strategy name. Blocking; the scheduler calls it from a worker thread."""
+
+    def load(self, name: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def save(self, name: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def delete(self, name: str) -> None:
+        raise NotImplementedError
+
+
+class FileCheckpointStore(CheckpointStore):
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, re.sub(r"[^A-Za-z0-9._-]", "_", name) + ".ckpt")
+
+    def load(self, name: str) -> Optional[bytes]:
+        try:
+            with open(self._path(name), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save(self, name: str, data: bytes) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(name)
+        partial = path + ".partial"
+        with open(partial, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # A crash mid-write leaves the previous checkpoint in place
+        os.replace(partial, path)
+
+    def delete(self, name: str) -> None:
+        try:
+            os.remove(self._path(name))
+        except FileNotFoundError:
+            pass
+
+
+class DatabaseCheckpointStore(CheckpointStore):
+    def __init__(self, session_factory):
+        self.session_factory = session_factory
+
+    def load(self, name: str) -> Optional[bytes]:
+        from app.core.models import StrategyCheckpoint
+
+        with self.session_factory() as session:
+            row = session.get(StrategyCheckpoint, name)
+            return row.data if row is not None else None
+
+    def save(self, name: str, data: bytes) -> None:
+        from app.core.models import StrategyCheckpoint
+
+        with self.session_factory() as session:
+            session.merge(StrategyCheckpoint(
+                name=name, data=data, updated_at=datetime.datetime.now(datetime.timezone.utc)
+            ))
+            session.commit()
+
+    def delete(self, name: str) -> None:
+        from app.core.models import StrategyCheckpoint
+
+        with self.session_factory() as session:
+            session.query(StrategyCheckpoint).filter(StrategyCheckpoint.name == name).delete()
+            session.commit()
+
+
+def build_checkpoint_store(backend: Optional[str], directory: str, session_factory=None) -> Optional[CheckpointStore]:
+    """The store for a CHECKPOINT_STORE setting: "file", "db", or None (checkpointing disabled)."""
+    if not backend:
+        return None
+    if backend == "file":
+        return FileCheckpointStore(directory)
+    if backend == "db":
+        if session_factory is None:
+            raise ValueError("The db checkpoint store needs a session factory")
+        return DatabaseCheckpointStore(session_factory)
+    raise ValueError(f"Unknown checkpoint store: {backend} (use file or db)")
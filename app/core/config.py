@@ -7,14 +7,62 @@ class Settings(BaseSettings):
     # General
     ENV: str = "development"
     LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "text"  # or "json" (one object per line)
+    LOG_DIR: Optional[str] = "logs"  # Rotating app.log here; unset for stdout only
+    LOG_QUEUE: bool = True  # Hand records to a background thread instead of writing inline
     GCP_PROJECT: Optional[str] = None
     
     # Database
     DATABASE_URL: str = "sqlite:///./data/trades.db"
+    DB_SYNCHRONOUS: str = "NORMAL"  # SQLite only; WAL journal with this synchronous level
+    PERSISTENCE_FLUSH_SECONDS: float = 0.25  # Write-behind flush window of the bot
+    # Online SQLite backups taken by the executor; None disables. Stored in BACKUP_BUCKET
+    # (Cloud Storage) when set, else in BACKUP_DIR
+    BACKUP_INTERVAL_SECONDS: Optional[float] = 3600.0
+    BACKUP_DIR: str = "./data/backups"
+    BACKUP_BUCKET: Optional[str] = None
+    BACKUP_KEEP: int = 48
+    # Connection pool of the async engine (Postgres; SQLite uses the driver default)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    # API read cache: how often the table version counters are re-read (staleness bound)
+    API_CACHE_VERSION_TTL: float = 0.5
+    # Live updates (SSE/WebSocket): change poll interval, per-client buffer (full: client dropped),
+    # events kept for reconnecting clients, and the Unix socket where the API hears about the
+    # bot's commits right away (None: polling only)
+    LIVE_POLL_SECONDS: float = 1.0
+    LIVE_CLIENT_BUFFER: int = 256
+    LIVE_REPLAY_EVENTS: int = 1024
+    LIVE_EVENTS_SOCKET: Optional[str] = None
     
     # Bot
     BOT_TICK_SECONDS: int = 60
-    DEFAULT_PROVIDER: str = "binance"
+    DEFAULT_PROVIDER: str = "binance"  # any ccxt exchange id, or "paper" for simulated fills on live prices
+    PROVIDER_MAX_CONNECTIONS: int = 100  # Connection pool shared by all exchange providers
+    PROVIDER_FANOUT_CONCURRENCY: int = 16  # Calls in flight when querying many exchanges/symbols
+    PAPER_BALANCES: Dict[str, float] = {"USDT": 10000.0}
+    STRATEGIES_CONFIG: Optional[str] = None  # Path to a JSON strategy schedule file
+    BOT_MAX_CONCURRENT_TICKS: int = 8
+    MARKET_DATA_CACHE_MB: int = 64
+    CANDLE_STORE_DIR: str = "./data/candles"
+    STREAM_TRANSPORT: str = "binance"  # "binance" (raw WebSocket) or "ccxtpro"
+    STREAM_URL: str = "wss://stream.binance.com:9443/stream"
+    ORDER_POLL_MIN_SECONDS: float = 1.0
+    ORDER_POLL_MAX_SECONDS: float = 30.0
+    BALANCE_SNAPSHOT_SECONDS: Optional[float] = 300.0  # Account balance recording interval; None disables
+    # Strategy state checkpoints restored on restart: "file" (CHECKPOINT_DIR), "db", or None to disable.
+    # Written at most every CHECKPOINT_SECONDS while state changes, and right after orders
+    CHECKPOINT_STORE: Optional[str] = "file"
+    CHECKPOINT_DIR: str = "./data/checkpoints"
+    CHECKPOINT_SECONDS: float = 60.0
+    BOT_METRICS_PORT: Optional[int] = 9101  # Prometheus exporter of the bot (localhost); None disables
+    # Multi-process executor: >1 shards strategies by symbol over this many worker processes,
+    # with exchange access through one gateway process (worker i exports metrics on port + 1 + i)
+    BOT_WORKERS: int = 1
+    BOT_WORKER_HEARTBEAT_TIMEOUT: float = 30.0  # A worker whose event loop is silent this long is restarted
+    BOT_GATEWAY_SOCKET: Optional[str] = None  # Unix socket of the gateway; default is a private temp dir
     
     # Secrets (Names in Secret Manager)
     BINANCE_API_KEY_SECRET_NAME: str = "binance_api_key"
@@ -24,9 +72,6 @@ class Settings(BaseSettings):
     BINANCE_API_KEY: Optional[str] = None
     BINANCE_SECRET_KEY: Optional[str] = None
     
-    # Backup
-    BACKUP_BUCKET: Optional[str] = None
-    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,22 +1,85 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.core.config import settings
+from typing import AsyncIterator, Optional
 import os
 
-# Ensure data directory exists for sqlite
-if settings.DATABASE_URL.startswith("sqlite"):
-    os.makedirs(os.path.dirname(settings.DATABASE_URL.replace("sqlite:///", "")), exist_ok=True)
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+def enable_sqlite_wal(engine, synchronous: str = "NORMAL") -> None:
+    """
+    Put every connection of a SQLite engine in WAL mode. With synchronous=NORMAL a commit no
+    longer waits for an fsync (the WAL is synced at checkpoints), and readers such as the API
+    do not block the bot's writes.
+    """
+    synchronous = synchronous.upper()
+    if synchronous not in SYNCHRONOUS_MODES:
+        raise ValueError(f"Unknown SQLite synchronous mode: {synchronous}")
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.close()
 
 engine = create_engine(
     settings.DATABASE_URL, 
     connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
 )
+if settings.DATABASE_URL.startswith("sqlite"):
+    enable_sqlite_wal(engine, settings.DB_SYNCHRONOUS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations")
+
+def migrate_db(bind, stamp_only: bool = False) -> None:
+    """
+    Run the alembic migrations in app/migrations up to head. A database create_all has just
+    built from scratch is already at head and is only stamped.
+    """
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    with bind.begin() as conn:
+        config.attributes["connection"] = conn
+        if stamp_only:
+            command.stamp(config, "head")
+        else:
+            command.upgrade(config, "head")
+
+def sqlite_path(url: str) -> Optional[str]:
+    """File path of a SQLite database URL; None for other databases and in-memory SQLite."""
+    if not url.startswith("sqlite"):
+        return None
+    path = url.split(":///", 1)[-1]
+    return None if path in ("", ":memory:") or path == url else path
+
+def ensure_sqlite_dir(url: str) -> None:
+    """Create the directory of a SQLite database file (done by init_db, not at import)."""
+    path = sqlite_path(url)
+    if path:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
 def init_db():
+    import app.core.models  # noqa: F401  (registers the tables on Base)
+    ensure_sqlite_dir(settings.DATABASE_URL)
+    from app.core import table_versions
+    fresh = not inspect(engine).get_table_names()
     Base.metadata.create_all(bind=engine)
+    migrate_db(engine, stamp_only=fresh)
+    with engine.begin() as conn:
+        table_versions.seed(conn)
+    # create_all skips indexes of tables that already exist; add any new ones
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 def get_db():
     db = SessionLocal()
@@ -24,3 +87,69 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# --- Async access path (aiosqlite for SQLite, asyncpg for Postgres) ---
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    """Swap the driver of a sync database URL for its asyncio counterpart."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+")[0]
+    if dialect not in _ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for database URL scheme: {scheme}")
+    return _ASYNC_DRIVERS[dialect] + sep + rest
+
+def create_async_db_engine(url: str):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    async_url = async_database_url(url)
+    if async_url.startswith("sqlite"):
+        async_engine = create_async_engine(async_url)
+        enable_sqlite_wal(async_engine.sync_engine, settings.DB_SYNCHRONOUS)
+        return async_engine
+    return create_async_engine(
+        async_url,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+_async_engine = None
+_async_session_factory = None
+
+def get_async_session_factory():
+    """Async sessionmaker over DATABASE_URL, created on first use."""
+    global _async_engine, _async_session_factory
+    if _async_session_factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        _async_engine = create_async_db_engine(settings.DATABASE_URL)
+        _async_session_factory = async_sessionmaker(_async_engine, expire_on_commit=False, autoflush=False)
+    return _async_session_factory
+
+def is_async_session_factory(session_factory) -> bool:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    return isinstance(session_factory, async_sessionmaker)
+
+async def init_async_db():
+    get_async_session_factory()
+    async with _async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+async def get_async_db() -> AsyncIterator:
+    async with get_async_session_factory()() as session:
+        yield session
+
+async def dispose_async_engine() -> None:
+    global _async_engine, _async_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = _async_session_factory = None
@@ -0,0 +1,159 @@
+"""
+In-process publish/subscribe for live updates pushed to API clients (SSE and WebSocket).
+
+Each event is serialized once when it is published; subscribers only queue a reference. Every
+subscriber has a bounded buffer, and a subscriber whose buffer is full when an event arrives
+is evicted (its stream ends) rather than slowing down publishers or growing without bound.
+The bus keeps the last `replay` events so a client reconnecting with the last sequence number
+it saw resumes without a gap; one that fell further behind gets a "reset" event and should
+reload through the REST endpoints.
+
+Publishing and subscribing happen on the event loop thread.
+"""
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, Optional, Set
+
+import orjson
+
+from app.core import metrics
+from app.core.logger import get_rate_limited_logger
+
+evict_logger = get_rate_limited_logger(__name__, interval=30.0)
+
+LIVE_SUBSCRIBERS = metrics.gauge("live_subscribers", "Clients subscribed to live updates")
+LIVE_EVENTS = metrics.counter("live_events_total", "Live update events published", ["type"])
+LIVE_EVICTIONS = metrics.counter("live_evictions_total", "Live update subscribers dropped for falling behind")
+
+
+@dataclass
+class Event:
+    seq: int
+    type: str
+    data: Any
+    payload: bytes = b""  # {"seq", "type", "data"} as JSON
+    _sse: Optional[bytes] = field(default=None, repr=False)
+
+    @property
+    def sse(self) -> bytes:
+        """The event as one Server-Sent Events frame."""
+        if self._sse is None:
+            self._sse = b"id: %d\nevent: %s\ndata: %s\n\n" % (self.seq, self.type.encode(), self.payload)
+        return self._sse
+
+
+class Subscription:
+    def __init__(self, bus: "EventBus", types: Optional[Set[str]], max_buffer: int):
+        self.bus = bus
+        self.types = types
+        self.max_buffer = max_buffer
+        self.buffer: Deque[Event] = deque()
+        self.closed_reason: Optional[str] = None
+        self.delivered = 0
+        self._ready = asyncio.Event()
+
+    @property
+    def closed(self) -> bool:
+        return self.closed_reason is not None
+
+    def wants(self, event: Event) -> bool:
+        return self.types is None or event.type in self.types
+
+    def push(self, event: Event) -> bool:
+        """Queue an event; False when the buffer is full."""
+        if len(self.buffer) >= self.max_buffer:
+            return False
+        self.buffer.append(event)
+        self._ready.set()
+        return True
+
+    def close(self, reason: str = "closed") -> None:
+        if self.closed_reason is None:
+            self.closed_reason = reason
+        self._ready.set()
+
+    async def get(self) -> Optional[Event]:
+        """The next event, or None once the subscription is closed."""
+        while not self.buffer:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        if self.closed:
+            return None
+        self.delivered += 1
+        return self.buffer.popleft()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Event:
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class EventBus:
+    def __init__(self, max_buffer: int = 256, replay: int = 1024):
+        self.max_buffer = max_buffer
+        self.seq = 0
+        self.history: Deque[Event] = deque(maxlen=replay)
+        self.subscribers: Set[Subscription] = set()
+        self.published = 0
+        self.evicted = 0
+
+    def publish(self, type: str, data: Any) -> Event:
+        self.seq += 1
+        event = Event(self.seq, type, data)
+        event.payload = orjson.dumps({"seq": event.seq, "type": type, "data": data})
+        self.history.append(event)
+        self.published += 1
+        LIVE_EVENTS.labels(type).inc()
+        for subscription in list(self.subscribers):
+            if subscription.wants(event) and not subscription.push(event):
+                self._evict(subscription)
+        return event
+
+    def _evict(self, subscription: Subscription) -> None:
+        self.evicted += 1
+        LIVE_EVICTIONS.inc()
+        evict_logger.warning("Dropping live update subscriber: %d events behind", len(subscription.buffer))
+        subscription.close("slow consumer")
+        self.unsubscribe(subscription)
+
+    def subscribe(self, types: Optional[Iterable[str]] = None, after: Optional[int] = None,
+                  max_buffer: Optional[int] = None) -> Subscription:
+        """
+        Events of the given types (all by default) from now on, or from just after sequence
+        number `after` when it is still in the replay history.
+        """
+        subscription = Subscription(self, set(types) if types is not None else None, max_buffer or self.max_buffer)
+        if after is not None and after != self.seq:
+            oldest = self.history[0].seq if self.history else self.seq + 1
+            missed = [event for event in self.history if event.seq > after and subscription.wants(event)]
+            # A gap the history no longer covers, more than a buffer's worth to catch up on, or a
+            # sequence number from before this process started
+            if after + 1 < oldest or len(missed) > subscription.max_buffer or after > self.seq:
+                payload = orjson.dumps({"seq": self.seq, "type": "reset", "data": None})
+                subscription.push(Event(self.seq, "reset", None, payload))
+            else:
+                for event in missed:
+                    subscription.push(event)
+        self.subscribers.add(subscription)
+        LIVE_SUBSCRIBERS.set(len(self.subscribers))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        self.subscribers.discard(subscription)
+        LIVE_SUBSCRIBERS.set(len(self.subscribers))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "evicted": self.evicted,
+            "seq": self.seq,
+        }
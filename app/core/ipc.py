@@ -0,0 +1,47 @@
+"""
+Message framing for local IPC between the bot's processes over asyncio streams (Unix domain
+sockets): a 4-byte big-endian length followed by a pickled payload.
+
+Pickle keeps NumPy arrays, dataclasses and exceptions intact across the hop. Both ends are
+processes of this application and the socket lives in a directory only the bot's user can
+enter, so no untrusted peer can send a payload.
+"""
+import asyncio
+import os
+import pickle
+import struct
+import tempfile
+from typing import Any
+
+_HEADER = struct.Struct("!I")
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+
+
+class MessageTooLarge(ValueError):
+    pass
+
+
+def encode_message(message: Any) -> bytes:
+    payload = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(payload) > MAX_MESSAGE_BYTES:
+        raise MessageTooLarge(f"IPC message of {len(payload)} bytes exceeds {MAX_MESSAGE_BYTES}")
+    return _HEADER.pack(len(payload)) + payload
+
+
+def write_message(writer: asyncio.StreamWriter, message: Any) -> None:
+    """Queue one framed message. A single write call, so concurrent writers never interleave frames."""
+    writer.write(encode_message(message))
+
+
+async def read_message(reader: asyncio.StreamReader) -> Any:
+    """The next message; raises asyncio.IncompleteReadError when the peer closed the connection."""
+    header = await reader.readexactly(_HEADER.size)
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise MessageTooLarge(f"IPC message of {size} bytes exceeds {MAX_MESSAGE_BYTES}")
+    return pickle.loads(await reader.readexactly(size))
+
+
+def private_socket_path(name: str) -> str:
+    """A socket path inside a fresh directory readable by the current user only (mode 0700)."""
+    return os.path.join(tempfile.mkdtemp(prefix="bot-ipc-"), name)
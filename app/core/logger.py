@@ -1,26 +1,194 @@
+"""
+Logging setup for the bot, the API and the CLI.
+
+Nothing is configured on import; each entry point calls setup_logging() once. By default the
+application threads only put records on a queue (QueueHandler) and a QueueListener thread
+formats them and does the stdout/file I/O, so a log call never blocks the event loop on disk.
+LOG_FORMAT=json switches both handlers to one JSON object per line.
+
+Prefer lazy arguments on hot paths (`logger.debug("waited %.3fs", waited)`): the message is
+only built when the level is enabled, and the template doubles as the key for
+RateLimitedLogger.
+"""
+import atexit
+import copy
+import json
 import logging
+import os
 import sys
-from logging.handlers import RotatingFileHandler
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from queue import SimpleQueue
+from typing import Any, Dict, Optional, Tuple
+
 from app.core.config import settings
-import os
 
-def setup_logging():
-    log_level = getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO)
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs("logs", exist_ok=True)
-
-    logging.basicConfig(
-        level=log_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.StreamHandler(sys.stdout),
-            RotatingFileHandler("logs/app.log", maxBytes=10*1024*1024, backupCount=5)
-        ]
-    )
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+_configured = False
+_setup_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, exc_info and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z"
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that only resolves the message text in the calling thread. Tracebacks stay on
+    the record and are formatted by the listener thread, which also owns all I/O.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _handlers(log_format: str, log_dir: Optional[str], filename: str):
+    formatter = JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+        handlers.append(
+            RotatingFileHandler(os.path.join(log_dir, filename), maxBytes=10 * 1024 * 1024, backupCount=5)
+        )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    return handlers
+
+
+def setup_logging(level: Optional[str] = None, log_format: Optional[str] = None,
+                  log_dir: Optional[str] = "", use_queue: Optional[bool] = None, force: bool = False,
+                  filename: str = "app.log") -> None:
+    """
+    Configure the root logger. Arguments default to LOG_LEVEL, LOG_FORMAT, LOG_DIR and
+    LOG_QUEUE; pass log_dir=None to log to stdout only. Processes that run side by side
+    need their own `filename` (rotation is per process). Calling it again is a no-op unless
+    force=True.
+    """
+    global _listener, _configured
+    with _setup_lock:
+        if _configured and not force:
+            return
+        shutdown_logging()
+
+        level = level or settings.LOG_LEVEL
+        log_format = (log_format or settings.LOG_FORMAT).lower()
+        if log_format not in ("text", "json"):
+            raise ValueError(f"Unknown log format: {log_format}")
+        log_dir = settings.LOG_DIR if log_dir == "" else log_dir
+        use_queue = settings.LOG_QUEUE if use_queue is None else use_queue
+
+        handlers = _handlers(log_format, log_dir, filename)
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+        root.setLevel(getattr(logging, level.upper(), logging.INFO))
+
+        if use_queue:
+            queue = SimpleQueue()
+            _listener = QueueListener(queue, *handlers, respect_handler_level=True)
+            _listener.start()
+            root.addHandler(_DeferredQueueHandler(queue))
+        else:
+            for handler in handlers:
+                root.addHandler(handler)
+        _configured = True
+
+
+def shutdown_logging() -> None:
+    """Drain the queue and stop the listener thread (registered to run at exit)."""
+    global _listener, _configured
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+    _configured = False
+
+
+atexit.register(shutdown_logging)
+
 
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
-# Initialize logging on import
-setup_logging()
+
+class RateLimitedLogger(logging.LoggerAdapter):
+    """
+    Logger for repetitive messages, e.g. the same error on every tick. Each message template
+    (per level) is emitted at most `burst` times per `interval` seconds; the number of records
+    dropped in a window is attached as `suppressed` to the first record of the next window.
+
+    A template is limited separately for each subject, so one failing strategy does not hide
+    another's errors: the subject is the first argument when it is a string (a strategy name,
+    symbol or order id), or an explicit `key=`.
+    """
+
+    max_keys = 1024
+
+    def __init__(self, logger: logging.Logger, interval: float = 60.0, burst: int = 1):
+        super().__init__(logger, {})
+        self.interval = interval
+        self.burst = burst
+        # (level, template, subject) -> [window start, emitted in window, suppressed in window]
+        self._windows: Dict[Tuple[int, str, Any], list] = {}
+        self._lock = threading.Lock()
+
+    def log(self, level: int, msg, *args, key: Any = None, **kwargs) -> None:
+        if not self.isEnabledFor(level):
+            return
+        if key is None and args and isinstance(args[0], str):
+            key = args[0]
+        key = (level, str(msg), key)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            suppressed = 0
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                if window is None and len(self._windows) >= self.max_keys:
+                    self._windows.clear()
+                window = self._windows[key] = [now, 0, 0]
+            if window[1] >= self.burst:
+                window[2] += 1
+                return
+            window[1] += 1
+        if suppressed:
+            kwargs["extra"] = {**kwargs.get("extra", {}), "suppressed": suppressed}
+            msg = f"{msg} [{suppressed} similar suppressed]"
+        kwargs.setdefault("stacklevel", 2)
+        self.logger.log(level, msg, *args, **kwargs)
+
+
+def get_rate_limited_logger(name: str, interval: float = 60.0, burst: int = 1) -> RateLimitedLogger:
+    return RateLimitedLogger(logging.getLogger(name), interval=interval, burst=burst)
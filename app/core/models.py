@@ -1,24 +1,32 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, JSON, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, JSON, LargeBinary, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from app.core.db import Base
 import datetime
 
+def _utcnow() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
 class Trade(Base):
     __tablename__ = "trades"
 
     id = Column(Integer, primary_key=True, index=True)
     provider = Column(String, index=True)
-    symbol = Column(String, index=True)
+    symbol = Column(String)  # indexed by ix_trades_symbol_executed_at
     side = Column(String)  # buy, sell
     amount = Column(Float)
     price = Column(Float)
     status = Column(String) # open, closed, filled, canceled
     exchange_order_id = Column(String, index=True)
-    executed_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Set client side too, so every row is stored with the same precision and keyset
+    # cursors (executed_at, id) compare consistently
+    executed_at = Column(DateTime(timezone=True), default=_utcnow, server_default=func.now())
     meta_data = Column(JSON, nullable=True)
 
     __table_args__ = (
         UniqueConstraint('provider', 'exchange_order_id', name='uq_provider_order_id'),
+        # Keyset pagination, newest first, optionally filtered by symbol
+        Index('ix_trades_executed_at', 'executed_at', 'id'),
+        Index('ix_trades_symbol_executed_at', 'symbol', 'executed_at', 'id'),
     )
 
 class Position(Base):
@@ -28,11 +36,87 @@ class Position(Base):
     symbol = Column(String, unique=True, index=True)
     size = Column(Float)
     avg_price = Column(Float)
+    cost_basis = Column(Float, default=0.0)  # Quote spent on the open size, buy fees included
+    fees = Column(Float, default=0.0)
+    realized_pnl = Column(Float, default=0.0)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
 
+class DailyPnl(Base):
+    """Materialized per-day, per-symbol fill aggregates maintained alongside positions."""
+    __tablename__ = "pnl_daily"
+
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False)
+    symbol = Column(String, nullable=False)
+    trades = Column(Integer, default=0)
+    bought = Column(Float, default=0.0)
+    sold = Column(Float, default=0.0)
+    buy_notional = Column(Float, default=0.0)
+    sell_notional = Column(Float, default=0.0)
+    fees = Column(Float, default=0.0)
+    realized_pnl = Column(Float, default=0.0)
+
+    __table_args__ = (
+        UniqueConstraint('day', 'symbol', name='uq_pnl_daily_day_symbol'),
+        Index('ix_pnl_daily_symbol_day', 'symbol', 'day'),
+    )
+
 class AccountSnapshot(Base):
+    """Legacy full fetch_balance blobs; new snapshots go to balance_snapshots (see app.core.balances)."""
     __tablename__ = "account_snapshots"
 
     id = Column(Integer, primary_key=True, index=True)
     balance = Column(JSON)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+
+class BalanceSnapshot(Base):
+    """One asset's balance from the time it changed until its next row."""
+    __tablename__ = "balance_snapshots"
+
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime(timezone=True), nullable=False, default=_utcnow)
+    asset = Column(String, nullable=False)
+    free = Column(Float, default=0.0)
+    used = Column(Float, default=0.0)
+    total = Column(Float, default=0.0)
+
+    __table_args__ = (
+        Index('ix_balance_snapshots_asset_timestamp', 'asset', 'timestamp', 'id'),
+        Index('ix_balance_snapshots_timestamp', 'timestamp', 'id'),
+    )
+
+class BalanceRollup(Base):
+    """Per-asset balance over one hour or day: the total's open/high/low/close, free/used at close."""
+    __tablename__ = "balance_rollups"
+
+    id = Column(Integer, primary_key=True)
+    resolution = Column(String, nullable=False)  # "1h" or "1d"
+    bucket = Column(DateTime(timezone=True), nullable=False)  # bucket start
+    asset = Column(String, nullable=False)
+    open = Column(Float, default=0.0)
+    high = Column(Float, default=0.0)
+    low = Column(Float, default=0.0)
+    close = Column(Float, default=0.0)
+    free = Column(Float, default=0.0)
+    used = Column(Float, default=0.0)
+    changes = Column(Integer, default=0)
+
+    __table_args__ = (
+        UniqueConstraint('resolution', 'asset', 'bucket', name='uq_balance_rollups_resolution_asset_bucket'),
+        Index('ix_balance_rollups_resolution_bucket', 'resolution', 'bucket'),
+    )
+
+class StrategyCheckpoint(Base):
+    """Latest state checkpoint of each strategy (see app.core.checkpoint)."""
+    __tablename__ = "strategy_checkpoints"
+
+    name = Column(String, primary_key=True)
+    data = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow)
+
+class TableVersion(Base):
+    """Write counter per table, bumped in the same transaction as every change to that table."""
+    __tablename__ = "table_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
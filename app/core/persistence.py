@@ -0,0 +1,255 @@
+import asyncio
+import datetime
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+
+from app.core import balances, metrics, repository
+from app.core.logger import get_logger
+from app.core.models import BalanceSnapshot, DailyPnl, Position, Trade
+
+logger = get_logger(__name__)
+
+FLUSH_SECONDS = metrics.histogram("write_behind_flush_seconds", "Write-behind batch transaction latency, commit included")
+EVENTS_WRITTEN = metrics.counter("write_behind_events_written_total", "Events committed by the write-behind writer")
+EVENTS_DROPPED = metrics.counter("write_behind_events_dropped_total", "Events dropped after exhausting retries")
+QUEUE_DEPTH = metrics.gauge("write_behind_queue_depth", "Events waiting for the next write-behind flush")
+
+
+class WriteBehindWriter:
+    """
+    Collects trade, position and snapshot writes from the bot and applies them from a
+    background thread, one transaction per flush window: trades and the changed balances of
+    account snapshots as bulk inserts, updates of trades inserted in the same window merged
+    into the insert, and fills folded into one upsert per position and daily aggregate.
+    Callers on the event loop only enqueue.
+
+    flush() waits until everything submitted before it is committed; close() flushes and
+    stops the thread, so nothing queued is lost on a clean shutdown.
+    """
+
+    def __init__(self, session_factory, flush_interval: float = 0.25, max_batch: int = 5000,
+                 max_retries: int = 3, retry_delay: float = 0.5):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Last stored balance per asset, loaded with the first snapshot
+        self._balances: Optional[balances.BalanceTracker] = None
+        self.flushes = 0
+        self.written = 0
+        self.errors = 0
+        self.dropped = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+        self.flush_latencies: Deque[float] = deque(maxlen=512)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+                self._thread.start()
+                QUEUE_DEPTH.set_function(lambda: self.queue_depth)
+
+    def _submit(self, kind: str, payload: Any) -> None:
+        if self._thread is None:
+            self.start()
+        self._queue.put((kind, payload))
+
+    def save_trade(self, trade_data: Dict[str, Any]) -> None:
+        self._submit("trade", dict(trade_data))
+
+    def update_trade(self, provider: str, exchange_order_id: str, **fields) -> None:
+        self._submit("trade_update", ((provider, str(exchange_order_id)), fields))
+
+    def apply_fill(self, symbol: str, side: str, amount: float, price: float, fee: float = 0.0,
+                   day: Optional[datetime.date] = None) -> None:
+        day = day or datetime.datetime.now(datetime.timezone.utc).date()
+        self._submit("fill", (symbol, side, amount, price, fee, day))
+
+    def save_position(self, symbol: str, size: float, avg_price: float) -> None:
+        self._submit("position", (symbol, size, avg_price))
+
+    def save_account_snapshot(self, balance: Dict[str, Any], timestamp: Optional[datetime.datetime] = None) -> None:
+        self._submit("snapshot", (timestamp or datetime.datetime.now(datetime.timezone.utc), balance))
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    async def flush(self) -> None:
+        if self._thread is None:
+            return
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(("flush", (loop, future)))
+        await future
+
+    async def close(self) -> None:
+        if self._thread is None:
+            return
+        await self.flush()
+        self._queue.put(("stop", None))
+        await asyncio.to_thread(self._thread.join)
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch and batch[-1][0] not in ("flush", "stop"):
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            events = [item for item in batch if item[0] not in ("flush", "stop")]
+            if events:
+                self._write_with_retries(events)
+            for kind, payload in batch:
+                if kind == "flush":
+                    loop, future = payload
+                    loop.call_soon_threadsafe(_resolve, future)
+            if batch[-1][0] == "stop":
+                return
+
+    def _write_with_retries(self, events: List[Tuple[str, Any]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                self._write(events)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Write-behind flush of {len(events)} events failed (attempt {attempt + 1}): {e}")
+                time.sleep(self.retry_delay)
+                continue
+            self._written(events, time.perf_counter() - start)
+            return
+        self._write_one_by_one(events)
+
+    def _write_one_by_one(self, events: List[Tuple[str, Any]]) -> None:
+        """
+        Last resort for a batch that kept failing: one transaction per event, so an event that
+        can never be written (e.g. a duplicate trade) takes only itself down, not the unrelated
+        trades, fills and snapshots flushed with it.
+        """
+        failed = 0
+        for event in events:
+            start = time.perf_counter()
+            try:
+                self._write([event])
+            except Exception as e:
+                failed += 1
+                logger.error(f"Dropped write-behind {event[0]} event: {e}")
+                continue
+            self._written([event], time.perf_counter() - start)
+        self.dropped += failed
+        EVENTS_DROPPED.inc(failed)
+        logger.error(f"Dropped {failed} of {len(events)} write-behind events after {self.max_retries + 1} attempts")
+
+    def _written(self, events: List[Tuple[str, Any]], latency: float) -> None:
+        self.flushes += 1
+        self.written += len(events)
+        self.last_flush_latency = latency
+        self.total_flush_latency += latency
+        self.max_flush_latency = max(self.max_flush_latency, latency)
+        self.flush_latencies.append(latency)
+        FLUSH_SECONDS.observe(latency)
+        EVENTS_WRITTEN.inc(len(events))
+
+    def _write(self, events: List[Tuple[str, Any]]) -> None:
+        trades: List[Dict] = []
+        # Keyed like the trades' unique constraint: (provider, exchange_order_id)
+        inserted: Dict[Tuple[str, str], Dict] = {}
+        updates: Dict[Tuple[str, str], Dict] = {}
+        position_events: List[Tuple[str, Any]] = []
+        snapshots: List[Tuple[datetime.datetime, Dict]] = []
+
+        for kind, payload in events:
+            if kind == "trade":
+                trades.append(payload)
+                inserted[(payload.get("provider"), str(payload.get("exchange_order_id")))] = payload
+            elif kind == "trade_update":
+                key, fields = payload
+                target = inserted.get(key)
+                if target is not None:
+                    target.update(fields)
+                else:
+                    updates.setdefault(key, {}).update(fields)
+            elif kind in ("fill", "position"):
+                position_events.append((kind, payload))
+            elif kind == "snapshot":
+                snapshots.append(payload)
+
+        with self.session_factory() as session:
+            if trades:
+                session.execute(insert(Trade), trades)
+            for (provider, order_id), fields in updates.items():
+                session.query(Trade).filter(
+                    Trade.provider == provider, Trade.exchange_order_id == order_id
+                ).update(fields)
+            if position_events:
+                symbols = {payload[0] for _, payload in position_events}
+                positions = {
+                    p.symbol: p for p in session.query(Position).filter(Position.symbol.in_(symbols))
+                }
+                days = {payload[5] for kind, payload in position_events if kind == "fill"}
+                daily = {
+                    (d.day, d.symbol): d
+                    for d in session.query(DailyPnl).filter(DailyPnl.day.in_(days), DailyPnl.symbol.in_(symbols))
+                } if days else {}
+                for kind, payload in position_events:
+                    symbol = payload[0]
+                    position = positions.get(symbol)
+                    if position is None:
+                        position = positions[symbol] = repository.new_position(symbol)
+                        session.add(position)
+                    if kind == "fill":
+                        _, side, amount, price, fee, day = payload
+                        aggregate = daily.get((day, symbol))
+                        if aggregate is None:
+                            aggregate = daily[(day, symbol)] = repository.new_daily_pnl(day, symbol)
+                            session.add(aggregate)
+                        repository.fill_position(position, side, amount, price, fee, aggregate)
+                    else:
+                        position.size, position.avg_price = payload[1], payload[2]
+            if snapshots:
+                if self._balances is None:
+                    self._balances = balances.BalanceTracker.load(session)
+                balance_rows, balance_state = self._balances.changes(snapshots)
+                if balance_rows:
+                    session.execute(insert(BalanceSnapshot), balance_rows)
+            session.commit()
+        if snapshots:
+            self._balances.commit(balance_state)
+
+    def stats(self) -> Dict[str, float]:
+        ordered = sorted(self.flush_latencies)
+        return {
+            "queue_depth": self.queue_depth,
+            "flushes": self.flushes,
+            "written": self.written,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "last_flush_latency": self.last_flush_latency,
+            "avg_flush_latency": self.total_flush_latency / self.flushes if self.flushes else 0.0,
+            "p95_flush_latency": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] if ordered else 0.0,
+            "max_flush_latency": self.max_flush_latency,
+        }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,132 @@
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Trade statuses whose amount is an executed quantity (partial fills of canceled orders included)
+FILLED_STATUSES = ("closed", "filled", "canceled", "cancelled", "expired")
+
+
+def order_fee(order: Dict) -> float:
+    """Fee of a ccxt order in quote currency (fees charged in the base asset are converted)."""
+    fee = order.get("fee") or {}
+    cost = fee.get("cost") or 0.0
+    symbol = order.get("symbol") or ""
+    if cost and fee.get("currency") and "/" in symbol and fee["currency"] == symbol.split("/")[0]:
+        cost *= order.get("average") or order.get("price") or 0.0
+    return cost
+
+
+def apply_fill(position, side: str, amount: float, price: float, fee: float = 0.0) -> float:
+    """
+    Apply one fill to a position-like object (size, avg_price, cost_basis, fees, realized_pnl)
+    using average cost accounting, in O(1). Buy fees are added to the cost basis, sell fees
+    reduce the realized PnL. Returns the PnL realized by this fill.
+    """
+    size = position.size or 0.0
+    cost_basis = position.cost_basis or 0.0
+    position.fees = (position.fees or 0.0) + fee
+    realized = 0.0
+    if side == "buy":
+        size += amount
+        cost_basis += amount * price + fee
+    else:
+        closed = min(amount, size)
+        average = cost_basis / size if size else 0.0
+        realized = closed * (price - average) - fee
+        cost_basis -= closed * average
+        size -= closed
+        position.realized_pnl = (position.realized_pnl or 0.0) + realized
+    if size <= 1e-12:
+        size, cost_basis = 0.0, 0.0
+    position.size = size
+    position.cost_basis = cost_basis
+    position.avg_price = cost_basis / size if size else 0.0
+    return realized
+
+
+def apply_to_daily(aggregate, side: str, amount: float, price: float, fee: float, realized: float) -> None:
+    """Accumulate one fill into a daily aggregate (trades, volumes, notionals, fees, realized PnL)."""
+    aggregate.trades = (aggregate.trades or 0) + 1
+    if side == "buy":
+        aggregate.bought = (aggregate.bought or 0.0) + amount
+        aggregate.buy_notional = (aggregate.buy_notional or 0.0) + amount * price
+    else:
+        aggregate.sold = (aggregate.sold or 0.0) + amount
+        aggregate.sell_notional = (aggregate.sell_notional or 0.0) + amount * price
+    aggregate.fees = (aggregate.fees or 0.0) + fee
+    aggregate.realized_pnl = (aggregate.realized_pnl or 0.0) + realized
+
+
+@dataclass
+class PositionState:
+    symbol: str
+    size: float = 0.0
+    avg_price: float = 0.0
+    cost_basis: float = 0.0
+    fees: float = 0.0
+    realized_pnl: float = 0.0
+
+    def unrealized_pnl(self, mark_price: float) -> float:
+        return self.size * mark_price - self.cost_basis
+
+
+@dataclass
+class DailyState:
+    day: datetime.date
+    symbol: str
+    trades: int = 0
+    bought: float = 0.0
+    sold: float = 0.0
+    buy_notional: float = 0.0
+    sell_notional: float = 0.0
+    fees: float = 0.0
+    realized_pnl: float = 0.0
+
+
+@dataclass
+class PortfolioEngine:
+    """In-memory positions and daily per-symbol aggregates, updated incrementally per fill."""
+
+    positions: Dict[str, PositionState] = field(default_factory=dict)
+    daily: Dict[Tuple[datetime.date, str], DailyState] = field(default_factory=dict)
+
+    def apply(self, symbol: str, side: str, amount: float, price: float, fee: float = 0.0,
+              day: Optional[datetime.date] = None) -> float:
+        position = self.positions.get(symbol)
+        if position is None:
+            position = self.positions[symbol] = PositionState(symbol)
+        realized = apply_fill(position, side, amount, price, fee)
+
+        key = (day or datetime.datetime.now(datetime.timezone.utc).date(), symbol)
+        aggregate = self.daily.get(key)
+        if aggregate is None:
+            aggregate = self.daily[key] = DailyState(*key)
+        apply_to_daily(aggregate, side, amount, price, fee, realized)
+        return realized
+
+    def replay(self, trades: Iterable) -> int:
+        """Apply executed Trade rows in order; returns how many were applied."""
+        applied = 0
+        for trade in trades:
+            if trade.status not in FILLED_STATUSES or not trade.amount:
+                continue
+            fee = order_fee(trade.meta_data) if trade.meta_data else 0.0
+            self.apply(trade.symbol, trade.side, trade.amount, trade.price or 0.0, fee, trade.executed_at.date())
+            applied += 1
+        return applied
+
+    def unrealized_pnl(self, mark_prices: Dict[str, float]) -> float:
+        return sum(
+            position.unrealized_pnl(mark_prices[symbol])
+            for symbol, position in self.positions.items()
+            if symbol in mark_prices
+        )
+
+    def realized_pnl(self) -> float:
+        return sum(position.realized_pnl for position in self.positions.values())
+
+    def position_rows(self) -> List[Dict]:
+        return [vars(position).copy() for position in self.positions.values()]
+
+    def daily_rows(self) -> List[Dict]:
+        return [vars(aggregate).copy() for aggregate in self.daily.values()]
@@ -1,7 +1,18 @@
+import datetime
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from app.core.models import Trade, Position, AccountSnapshot
+from app.core.models import Trade, Position, BalanceSnapshot, DailyPnl
+from app.core import balances, metrics, portfolio
+from app.core import table_versions  # noqa: F401  (registers the version counter hooks)
 from typing import List, Optional, Dict, Any
 
+DB_WRITE_SECONDS = metrics.histogram("db_write_seconds", "Repository write latency, commit included", ["op"])
+DB_WRITE_ERRORS = metrics.counter("db_write_errors_total", "Repository writes that raised", ["op"])
+
+def timed_write(op: str):
+    return metrics.timed(DB_WRITE_SECONDS, op, errors=DB_WRITE_ERRORS)
+
+@timed_write("save_trade")
 def save_trade(session: Session, trade_data: Dict[str, Any]) -> Trade:
     trade = Trade(**trade_data)
     session.add(trade)
@@ -12,6 +23,7 @@ def save_trade(session: Session, trade_data: Dict[str, Any]) -> Trade:
 def get_trades(session: Session, limit: int = 100, offset: int = 0) -> List[Trade]:
     return session.query(Trade).order_by(Trade.executed_at.desc()).offset(offset).limit(limit).all()
 
+@timed_write("update_trade")
 def update_trade(session: Session, trade_id: int, **kwargs) -> Optional[Trade]:
     trade = session.query(Trade).filter(Trade.id == trade_id).first()
     if trade:
@@ -21,12 +33,21 @@ def update_trade(session: Session, trade_id: int, **kwargs) -> Optional[Trade]:
         session.refresh(trade)
     return trade
 
+def get_open_trades(session: Session) -> List[Trade]:
+    return session.query(Trade).filter(Trade.status == "open").all()
+
+def get_trade_by_order_id(session: Session, provider: str, exchange_order_id: str) -> Optional[Trade]:
+    return session.query(Trade).filter(
+        Trade.provider == provider, Trade.exchange_order_id == exchange_order_id
+    ).first()
+
 def get_position(session: Session, symbol: str) -> Optional[Position]:
     return session.query(Position).filter(Position.symbol == symbol).first()
 
 def get_positions(session: Session) -> List[Position]:
     return session.query(Position).all()
 
+@timed_write("save_position")
 def save_position(session: Session, symbol: str, size: float, avg_price: float) -> Position:
     position = get_position(session, symbol)
     if not position:
@@ -39,9 +60,73 @@ def save_position(session: Session, symbol: str, size: float, avg_price: float)
     session.refresh(position)
     return position
 
-def save_account_snapshot(session: Session, balance: Dict[str, Any]) -> AccountSnapshot:
-    snapshot = AccountSnapshot(balance=balance)
-    session.add(snapshot)
+def new_position(symbol: str) -> Position:
+    return Position(symbol=symbol, size=0.0, avg_price=0.0, cost_basis=0.0, fees=0.0, realized_pnl=0.0)
+
+def new_daily_pnl(day: datetime.date, symbol: str) -> DailyPnl:
+    return DailyPnl(day=day, symbol=symbol, trades=0, bought=0.0, sold=0.0, buy_notional=0.0,
+                    sell_notional=0.0, fees=0.0, realized_pnl=0.0)
+
+def fill_position(position: Position, side: str, amount: float, price: float, fee: float = 0.0,
+                  daily: Optional[DailyPnl] = None) -> Position:
+    """Apply a fill to a position (average cost, realized PnL) and optionally to its daily aggregate."""
+    realized = portfolio.apply_fill(position, side, amount, price, fee)
+    if daily is not None:
+        portfolio.apply_to_daily(daily, side, amount, price, fee, realized)
+    return position
+
+def get_daily_pnl(session: Session, day: datetime.date, symbol: str) -> Optional[DailyPnl]:
+    return session.query(DailyPnl).filter(DailyPnl.day == day, DailyPnl.symbol == symbol).first()
+
+@timed_write("apply_fill")
+def apply_fill(session: Session, symbol: str, side: str, amount: float, price: float, fee: float = 0.0,
+               day: Optional[datetime.date] = None) -> Position:
+    position = get_position(session, symbol)
+    if not position:
+        position = new_position(symbol)
+        session.add(position)
+    day = day or datetime.datetime.now(datetime.timezone.utc).date()
+    daily = get_daily_pnl(session, day, symbol)
+    if not daily:
+        daily = new_daily_pnl(day, symbol)
+        session.add(daily)
+    fill_position(position, side, amount, price, fee, daily)
+    session.commit()
+    session.refresh(position)
+    return position
+
+@timed_write("save_account_snapshot")
+def save_account_snapshot(session: Session, balance: Dict[str, Any],
+                          timestamp: Optional[datetime.datetime] = None) -> List[BalanceSnapshot]:
+    """Store the assets whose balance changed since their last row (see app.core.balances)."""
+    tracker = balances.BalanceTracker.load(session)
+    rows, _ = tracker.changes([(timestamp or datetime.datetime.now(datetime.timezone.utc), balance)])
+    snapshots = [BalanceSnapshot(**row) for row in rows]
+    session.add_all(snapshots)
+    session.commit()
+    return snapshots
+
+@timed_write("rebuild_portfolio")
+def rebuild_portfolio(session: Session, batch_size: int = 10_000) -> int:
+    """
+    Recompute positions and daily PnL aggregates by replaying every executed trade in order.
+    Trades are streamed in batches; the tables are replaced in a single transaction.
+    """
+    engine = portfolio.PortfolioEngine()
+    trades = (
+        session.query(Trade)
+        .filter(Trade.status.in_(portfolio.FILLED_STATUSES))
+        .order_by(Trade.executed_at, Trade.id)
+        .yield_per(batch_size)
+    )
+    applied = engine.replay(trades)
+
+    session.query(Position).delete()
+    session.query(DailyPnl).delete()
+    position_rows, daily_rows = engine.position_rows(), engine.daily_rows()
+    if position_rows:
+        session.execute(insert(Position), position_rows)
+    if daily_rows:
+        session.execute(insert(DailyPnl), daily_rows)
     session.commit()
-    session.refresh(snapshot)
-    return snapshot
+    return applied
@@ -1,45 +1,80 @@
-from google.cloud import secretmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable
 from app.core.config import settings
 from app.core.logger import get_logger
 import os
+import threading
 
 logger = get_logger(__name__)
 
+# Secrets fetched in parallel by get_secrets (each fetch is one blocking gRPC call)
+MAX_PARALLEL_FETCHES = 8
+
+_client = None
+# get_secrets' threads may all miss at once; only one of them builds the client
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    The Secret Manager client, built on first use and reused. The google-cloud import and the
+    client's channel setup cost a few hundred milliseconds, so processes that never read a
+    secret (API, tests, most CLI commands) don't pay for them.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google.cloud import secretmanager
+
+                _client = secretmanager.SecretManagerServiceClient()
+    return _client
+
 def get_secret(secret_name: str, project_id: str = None) -> str:
     """
     Retrieve a secret from GCP Secret Manager.
     """
     if not project_id:
         project_id = settings.GCP_PROJECT
-        
+
     if not project_id:
         logger.warning("GCP_PROJECT not set, cannot fetch secrets from Secret Manager.")
         return ""
 
-    client = secretmanager.SecretManagerServiceClient()
     name = f"projects/{project_id}/secrets/{secret_name}/versions/latest"
 
     try:
-        response = client.access_secret_version(request={"name": name})
+        response = get_client().access_secret_version(request={"name": name})
         return response.payload.data.decode("UTF-8")
     except Exception as e:
         logger.error(f"Failed to fetch secret {secret_name}: {e}")
         return ""
 
+def get_secrets(secret_names: Iterable[str], project_id: str = None) -> Dict[str, str]:
+    """
+    Retrieve several secrets concurrently over the shared client. Secrets that could not be
+    fetched map to "" (see get_secret).
+    """
+    names = list(dict.fromkeys(secret_names))
+    if not names:
+        return {}
+    if not (project_id or settings.GCP_PROJECT):
+        logger.warning("GCP_PROJECT not set, cannot fetch secrets from Secret Manager.")
+        return {name: "" for name in names}
+    if len(names) == 1:
+        return {names[0]: get_secret(names[0], project_id)}
+    with ThreadPoolExecutor(max_workers=min(len(names), MAX_PARALLEL_FETCHES)) as pool:
+        values = pool.map(lambda name: get_secret(name, project_id), names)
+        return dict(zip(names, values))
+
 def bootstrap_secrets_to_env(secret_names: list[str]):
     """
     Fetch secrets and write them to .env file or set in environment.
     """
     # For this implementation, we will set them in the environment variables of the current process
     # and also return them if needed.
-    for name in secret_names:
-        # Map secret name to env var name (simple uppercase mapping for now)
-        # In reality, you might want a mapping dict.
-        # Here we assume the secret name in GCP matches the config variable name (e.g. binance_api_key)
-        # But config expects BINANCE_API_KEY.
-        
-        # Let's assume the secret name passed here is the GCP secret name.
-        value = get_secret(name)
+    # Here we assume the secret name in GCP matches the config variable name (e.g. binance_api_key)
+    # But config expects BINANCE_API_KEY.
+    for name, value in get_secrets(secret_names).items():
         if value:
             # Heuristic: convert "binance_api_key" -> "BINANCE_API_KEY"
             env_var = name.upper()
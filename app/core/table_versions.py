@@ -0,0 +1,97 @@
+"""
+Per-table version counters for cache invalidation across processes.
+
+Importing this module registers Session event hooks: any ORM flush or ORM-enabled bulk
+insert/update/delete touching a tracked table increments that table's row in
+`table_versions` inside the same transaction, so a reader that sees the new data also sees
+the new version (and a rolled back write bumps nothing). Each table is bumped at most once
+per transaction.
+
+Commit listeners (add_commit_listener) are called with the tracked tables each committed
+transaction changed, on the committing thread; the bot uses this to tell the API process
+about new data (app.core.change_notifications).
+"""
+from itertools import chain
+from typing import Callable, FrozenSet, Iterable, List, Set
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from app.core.logger import get_logger
+from app.core.models import TableVersion
+
+logger = get_logger(__name__)
+
+TRACKED_TABLES = frozenset({
+    "trades", "positions", "pnl_daily", "account_snapshots", "balance_snapshots", "balance_rollups",
+})
+
+_versions = TableVersion.__table__
+_commit_listeners: List[Callable[[FrozenSet[str]], None]] = []
+
+
+def bump(connection, tables: Iterable[str]) -> None:
+    for name in sorted(set(tables) & TRACKED_TABLES):
+        result = connection.execute(
+            update(_versions).where(_versions.c.name == name).values(version=_versions.c.version + 1)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(_versions).values(name=name, version=1))
+
+
+def add_commit_listener(listener: Callable[[FrozenSet[str]], None]) -> None:
+    _commit_listeners.append(listener)
+
+
+def remove_commit_listener(listener: Callable[[FrozenSet[str]], None]) -> None:
+    if listener in _commit_listeners:
+        _commit_listeners.remove(listener)
+
+
+def seed(connection) -> None:
+    """Create the counter rows up front so bumps are plain UPDATEs."""
+    existing = {row[0] for row in connection.execute(_versions.select().with_only_columns(_versions.c.name))}
+    missing = [{"name": name, "version": 0} for name in sorted(TRACKED_TABLES - existing)]
+    if missing:
+        connection.execute(insert(_versions), missing)
+
+
+def _bump_once(session, tables: Set[str]) -> None:
+    bumped = session.info.setdefault("bumped_tables", set())
+    pending = (tables & TRACKED_TABLES) - bumped
+    if pending:
+        bump(session.connection(), pending)
+        bumped.update(pending)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context) -> None:
+    _bump_once(session, {
+        obj.__table__.name for obj in chain(session.new, session.dirty, session.deleted)
+        if hasattr(obj, "__table__")
+    })
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _on_orm_execute(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            _bump_once(state.session, {table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session) -> None:
+    bumped = session.info.pop("bumped_tables", None)
+    if bumped and _commit_listeners:
+        tables = frozenset(bumped)
+        for listener in list(_commit_listeners):
+            try:
+                listener(tables)
+            except Exception as e:
+                logger.error(f"Commit listener failed: {e}")
+
+
+@event.listens_for(Session, "after_rollback")
+def _end_transaction(session) -> None:
+    session.info.pop("bumped_tables", None)
@@ -1,7 +1,39 @@
+import asyncio
 import datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Mapping
 
 def format_money(amount: float, currency: str = "USD") -> str:
     return f"{amount:.2f} {currency}"
 
 def now_utc() -> datetime.datetime:
     return datetime.datetime.now(datetime.timezone.utc)
+
+_TIMEFRAME_UNITS = {
+    "s": 1,
+    "m": 60,
+    "h": 60 * 60,
+    "d": 24 * 60 * 60,
+    "w": 7 * 24 * 60 * 60,
+    "M": 30 * 24 * 60 * 60,
+    "y": 365 * 24 * 60 * 60,
+}
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """Convert a ccxt timeframe string (e.g. '1m', '4h', '1d') to milliseconds."""
+    amount, unit = timeframe[:-1], timeframe[-1]
+    if unit not in _TIMEFRAME_UNITS or not amount.isdigit():
+        raise ValueError(f"Unknown timeframe: {timeframe}")
+    return int(amount) * _TIMEFRAME_UNITS[unit] * 1000
+
+async def fan_out(calls: Mapping[Hashable, Callable[[], Awaitable[Any]]], max_concurrency: int = 16) -> Dict[Hashable, Any]:
+    """Run the calls concurrently, at most max_concurrency at a time; exceptions are returned as values."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(key, call):
+        async with semaphore:
+            try:
+                return key, await call()
+            except Exception as e:
+                return key, e
+
+    return dict(await asyncio.gather(*(run(key, call) for key, call in calls.items())))
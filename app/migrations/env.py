@@ -0,0 +1,47 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+import app.core.models  # noqa: F401  (registers the tables on Base)
+from app.core.db import Base
+
+config = context.config
+# Only when run from the alembic CLI; init_db() keeps the application's logging
+if config.config_file_name is not None and config.attributes.get("connection") is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations(connection) -> None:
+    # Batch mode: SQLite can only alter tables by copying them
+    context.configure(connection=connection, target_metadata=target_metadata, render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_offline() -> None:
+    from app.core.config import settings
+
+    context.configure(url=settings.DATABASE_URL, target_metadata=target_metadata, literal_binds=True,
+                      render_as_batch=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        run_migrations(connection)
+        return
+    from app.core.db import engine
+
+    with engine.connect() as connection:
+        run_migrations(connection)
+        connection.commit()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,34 @@
+"""positions: cost basis, fees and realized PnL
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("cost_basis", "fees", "realized_pnl")
+
+
+def upgrade() -> None:
+    # Databases started before migrations existed may have some of these already: they were
+    # added by an ALTER TABLE at startup
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("positions"):
+        return
+    existing = {column["name"] for column in inspector.get_columns("positions")}
+    with op.batch_alter_table("positions") as batch:
+        for name in COLUMNS:
+            if name not in existing:
+                batch.add_column(sa.Column(name, sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("positions") as batch:
+        for name in COLUMNS:
+            batch.drop_column(name)
@@ -1,7 +1,74 @@
+import math
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from dataclasses import dataclass
+from typing import Dict, Any, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.core.logger import get_rate_limited_logger
+from app.core.utils import fan_out
+
+logger = get_rate_limited_logger(__name__, interval=60.0)
+
+OHLCV_COLUMNS = 6  # timestamp, open, high, low, close, volume
+
+
+@dataclass
+class Tickers:
+    """Tickers of many symbols as columns: row i of every array belongs to symbols[i]. Missing values are NaN."""
+    symbols: List[str]
+    timestamp: np.ndarray  # milliseconds
+    last: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    base_volume: np.ndarray
+    quote_volume: np.ndarray
+
+    # Column -> ccxt ticker field
+    FIELDS = {
+        "timestamp": "timestamp",
+        "last": "last",
+        "bid": "bid",
+        "ask": "ask",
+        "base_volume": "baseVolume",
+        "quote_volume": "quoteVolume",
+    }
+
+    @classmethod
+    def from_dicts(cls, tickers: Mapping[str, Dict], symbols: Optional[Sequence[str]] = None) -> "Tickers":
+        """Build from ccxt ticker dicts keyed by symbol, in `symbols` order when given (absent ones skipped)."""
+        order = [s for s in symbols if s in tickers] if symbols is not None else list(tickers)
+        columns = {}
+        for column, field in cls.FIELDS.items():
+            values = (tickers[s].get(field) for s in order)
+            columns[column] = np.fromiter((math.nan if v is None else v for v in values), dtype=np.float64, count=len(order))
+        return cls(symbols=order, **columns)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.symbols
+
+    def row(self, symbol: str) -> Dict[str, float]:
+        i = self.symbols.index(symbol)
+        return {column: float(getattr(self, column)[i]) for column in self.FIELDS}
+
+
+def ohlcv_array(rows) -> np.ndarray:
+    """ccxt OHLCV rows as an (n, 6) float64 array."""
+    return np.asarray(rows, dtype=np.float64).reshape(-1, OHLCV_COLUMNS)
+
 
 class BaseProvider(ABC):
+    # Per-symbol requests in flight when a batch call falls back to one request per symbol
+    batch_concurrency: int = 8
+
+    @property
+    def name(self) -> str:
+        """Provider id recorded with trades (the exchange id for exchange-backed providers)."""
+        return self.__class__.__name__.lower()
+
     @abstractmethod
     async def fetch_balance(self) -> Dict[str, Any]:
         pass
@@ -17,7 +84,55 @@ class BaseProvider(ABC):
     @abstractmethod
     async def fetch_order(self, order_id: str, symbol: str = None) -> Dict:
         pass
-    
+
+    async def fetch_ticker(self, symbol: str) -> Dict:
+        raise NotImplementedError(f"{self.__class__.__name__} does not support fetch_ticker")
+
+    async def _per_symbol(self, symbols: Sequence[str], fetch) -> Dict[str, Any]:
+        """Concurrent per-symbol requests; failed symbols are logged and left out."""
+        results = await fan_out({symbol: (lambda s=symbol: fetch(s)) for symbol in symbols}, self.batch_concurrency)
+        for symbol, result in list(results.items()):
+            if isinstance(result, Exception):
+                logger.warning("%s: fetching %s failed: %s", self.name, symbol, result)
+                del results[symbol]
+        return results
+
+    async def fetch_tickers(self, symbols: Sequence[str]) -> Tickers:
+        """Tickers of many symbols. Symbols that fail are absent from the result."""
+        return Tickers.from_dicts(await self._per_symbol(symbols, self.fetch_ticker), symbols)
+
+    async def fetch_ohlcv_many(self, symbols: Sequence[str], timeframe: str, since: int = None,
+                               limit: int = 100) -> Dict[str, np.ndarray]:
+        """Candles of many symbols as (n, 6) arrays keyed by symbol. Symbols that fail are absent."""
+        rows = await self._per_symbol(symbols, lambda symbol: self.fetch_ohlcv(symbol, timeframe, since, limit))
+        return {symbol: ohlcv_array(rows[symbol]) for symbol in symbols if symbol in rows}
+
+    async def fetch_open_orders(self, symbol: str = None) -> List[Dict]:
+        raise NotImplementedError(f"{self.__class__.__name__} does not support fetch_open_orders")
+
+    async def cancel_order(self, order_id: str, symbol: str = None) -> Dict:
+        raise NotImplementedError(f"{self.__class__.__name__} does not support cancel_order")
+
+    async def place_orders(self, orders: Sequence[Dict]) -> List[Any]:
+        """
+        Place many orders, each {"symbol", "side", "amount", "price"?, "type"?}. Results follow the
+        input order, with the exception in place of each order that failed.
+        """
+        results = await fan_out({
+            index: (lambda o=order: self.place_order(o["symbol"], o["side"], o["amount"], o.get("price"),
+                                                     type=o.get("type", "market")))
+            for index, order in enumerate(orders)
+        }, self.batch_concurrency)
+        return [results[index] for index in range(len(orders))]
+
+    async def cancel_orders(self, order_ids: Sequence[str], symbol: str = None) -> List[Any]:
+        """Cancel many orders; results follow the input order, an exception for each that failed."""
+        results = await fan_out({
+            index: (lambda order_id=order_id: self.cancel_order(order_id, symbol))
+            for index, order_id in enumerate(order_ids)
+        }, self.batch_concurrency)
+        return [results[index] for index in range(len(order_ids))]
+
     @abstractmethod
     def supports(self, capability: str) -> bool:
         pass
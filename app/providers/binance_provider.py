@@ -1,9 +1,43 @@
 from app.providers.ccxt_provider import CCXTProvider
+from app.adapters.rate_limiter import RateLimiter, TokenBucket
 from app.core.config import settings
 from typing import Dict
 
+# Request weights of the spot REST endpoints behind each provider call
+BINANCE_ENDPOINT_WEIGHTS = {
+    "fetch_balance": 20,
+    "fetch_ohlcv": 2,
+    "fetch_ticker": 2,
+    "create_order": 1,
+    "fetch_order": 4,
+    "fetch_open_orders": 6,
+    "fetch_open_orders_all": 80,
+    "cancel_order": 1,
+}
+
+# ccxt implements these for Binance derivatives only; this provider trades spot
+SPOT_UNSUPPORTED = ("createOrders", "cancelOrders")
+
+def binance_tickers_weight(count: int) -> float:
+    """Weight of GET /api/v3/ticker/24hr with a symbols list, which grows in steps with its length."""
+    if count <= 20:
+        return 2
+    if count <= 100:
+        return 40
+    return 80
+
+def binance_rate_limiter() -> RateLimiter:
+    # Binance allows 6000 request weight per minute per IP; stay below it with some headroom
+    per_minute = TokenBucket(4800, 60.0, name="weight-1m")
+    per_second = TokenBucket(50, 1.0, name="weight-1s")
+    return RateLimiter(
+        buckets=[per_second, per_minute],
+        weights=BINANCE_ENDPOINT_WEIGHTS,
+        header_buckets={"x-mbx-used-weight-1m": per_minute},
+    )
+
 class BinanceProvider(CCXTProvider):
-    def __init__(self, api_key: str = None, secret: str = None):
+    def __init__(self, api_key: str = None, secret: str = None, rate_limiter: RateLimiter = None, session=None):
         config = {
             'options': {
                 'defaultType': 'spot', 
@@ -13,4 +47,10 @@ class BinanceProvider(CCXTProvider):
         key = api_key or settings.BINANCE_API_KEY
         sec = secret or settings.BINANCE_SECRET_KEY
         
-        super().__init__('binance', key, sec, config)
+        super().__init__('binance', key, sec, config, rate_limiter=rate_limiter or binance_rate_limiter(), session=session)
+
+    def tickers_weight(self, count: int) -> float:
+        return binance_tickers_weight(count)
+
+    def supports(self, capability: str) -> bool:
+        return capability not in SPOT_UNSUPPORTED and super().supports(capability)
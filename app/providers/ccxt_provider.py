@@ -1,58 +1,211 @@
-import ccxt.async_support as ccxt
-from app.providers.base import BaseProvider
-from app.core.logger import get_logger
+from app.providers.base import BaseProvider, Tickers
+from app.core.logger import get_logger, get_rate_limited_logger
+from app.core import metrics
 from app.adapters.rate_limiter import RateLimiter
 from typing import Dict, Any, List, Optional
 import asyncio
 
 logger = get_logger(__name__)
+# An exchange outage fails every call the same way. Not for order placement: every failed
+# order is logged
+error_logger = get_rate_limited_logger(__name__, interval=30.0)
+
+EXCHANGE_SECONDS = metrics.histogram(
+    "exchange_request_seconds", "Exchange REST call latency, including rate limiter wait", ["method"]
+)
+EXCHANGE_ERRORS = metrics.counter("exchange_request_errors_total", "Exchange REST calls that raised", ["method"])
 
 class CCXTProvider(BaseProvider):
-    def __init__(self, exchange_id: str, api_key: str = None, secret: str = None, config: Dict = None):
+    def __init__(self, exchange_id: str, api_key: str = None, secret: str = None, config: Dict = None,
+                 rate_limiter: Optional[RateLimiter] = None, session=None):
+        # Imported on first use: ccxt loads every exchange class, about a second of startup
+        import ccxt.async_support as ccxt
+
         self.exchange_id = exchange_id
         exchange_class = getattr(ccxt, exchange_id)
+        config = dict(config or {})
+        if session is not None:
+            # Shared aiohttp session (see ProviderRegistry); ccxt leaves closing it to the owner
+            config['session'] = session
         self.exchange = exchange_class({
             'apiKey': api_key,
             'secret': secret,
             'enableRateLimit': True,
-            **(config or {})
+            **config
         })
-        self.rate_limiter = RateLimiter(calls=10, period=1.0) # Conservative default
+        self.rate_limiter = rate_limiter or RateLimiter(calls=10, period=1.0) # Conservative default
+
+    @property
+    def name(self) -> str:
+        return self.exchange_id
+
+    @property
+    def closed(self) -> bool:
+        return bool(getattr(self.exchange, 'closed_by_user', False))
+
+    def _observe_response(self):
+        self.rate_limiter.observe_headers(getattr(self.exchange, 'last_response_headers', None))
 
     async def close(self):
         await self.exchange.close()
 
+    @metrics.timed(EXCHANGE_SECONDS, "fetch_balance", errors=EXCHANGE_ERRORS)
     async def fetch_balance(self) -> Dict[str, Any]:
-        await self.rate_limiter.acquire()
+        await self.rate_limiter.acquire("fetch_balance")
         try:
             return await self.exchange.fetch_balance()
         except Exception as e:
-            logger.error(f"Error fetching balance: {e}")
+            error_logger.error("Error fetching balance: %s", e)
             raise
+        finally:
+            self._observe_response()
 
+    @metrics.timed(EXCHANGE_SECONDS, "fetch_ohlcv", errors=EXCHANGE_ERRORS)
     async def fetch_ohlcv(self, symbol: str, timeframe: str, since: int = None, limit: int = 100) -> List:
-        await self.rate_limiter.acquire()
+        await self.rate_limiter.acquire("fetch_ohlcv")
         try:
             return await self.exchange.fetch_ohlcv(symbol, timeframe, since, limit)
         except Exception as e:
-            logger.error(f"Error fetching OHLCV: {e}")
+            error_logger.error("Error fetching OHLCV: %s", e)
+            raise
+        finally:
+            self._observe_response()
+
+    @metrics.timed(EXCHANGE_SECONDS, "fetch_ticker", errors=EXCHANGE_ERRORS)
+    async def fetch_ticker(self, symbol: str) -> Dict:
+        await self.rate_limiter.acquire("fetch_ticker")
+        try:
+            return await self.exchange.fetch_ticker(symbol)
+        except Exception as e:
+            error_logger.error("Error fetching ticker: %s", e)
             raise
+        finally:
+            self._observe_response()
+
+    # Symbols per bulk ticker request (None: all in one)
+    max_tickers_per_request: Optional[int] = None
+
+    def tickers_weight(self, count: int) -> float:
+        """Rate limiter weight of one bulk ticker request for `count` symbols."""
+        return self.rate_limiter.weight_for("fetch_tickers")
+
+    @metrics.timed(EXCHANGE_SECONDS, "fetch_tickers", errors=EXCHANGE_ERRORS)
+    async def fetch_tickers(self, symbols: List[str]) -> Tickers:
+        """One bulk request per chunk when the exchange has one, else concurrent per-symbol requests."""
+        if not self.supports("fetchTickers"):
+            return await super().fetch_tickers(symbols)
+        chunk_size = self.max_tickers_per_request or max(len(symbols), 1)
+        tickers: Dict[str, Dict] = {}
+        for start in range(0, len(symbols), chunk_size):
+            chunk = list(symbols[start:start + chunk_size])
+            await self.rate_limiter.acquire("fetch_tickers", weight=self.tickers_weight(len(chunk)))
+            try:
+                tickers.update(await self.exchange.fetch_tickers(chunk))
+            except Exception as e:
+                error_logger.error("Error fetching tickers: %s", e)
+                raise
+            finally:
+                self._observe_response()
+        return Tickers.from_dicts(tickers, symbols)
 
+    @metrics.timed(EXCHANGE_SECONDS, "place_order", errors=EXCHANGE_ERRORS)
     async def place_order(self, symbol: str, side: str, amount: float, price: Optional[float] = None, type: str = "market") -> Dict:
-        await self.rate_limiter.acquire()
+        await self.rate_limiter.acquire("create_order")
         try:
             return await self.exchange.create_order(symbol, type, side, amount, price)
         except Exception as e:
-            logger.error(f"Error placing order: {e}")
+            logger.error("Error placing order: %s", e)
             raise
+        finally:
+            self._observe_response()
 
+    @metrics.timed(EXCHANGE_SECONDS, "fetch_order", errors=EXCHANGE_ERRORS)
     async def fetch_order(self, order_id: str, symbol: str = None) -> Dict:
-        await self.rate_limiter.acquire()
+        await self.rate_limiter.acquire("fetch_order")
         try:
             return await self.exchange.fetch_order(order_id, symbol)
         except Exception as e:
-            logger.error(f"Error fetching order: {e}")
+            error_logger.error("Error fetching order: %s", e)
             raise
+        finally:
+            self._observe_response()
+
+    @metrics.timed(EXCHANGE_SECONDS, "fetch_open_orders", errors=EXCHANGE_ERRORS)
+    async def fetch_open_orders(self, symbol: str = None) -> List[Dict]:
+        await self.rate_limiter.acquire("fetch_open_orders" if symbol else "fetch_open_orders_all")
+        try:
+            return await self.exchange.fetch_open_orders(symbol)
+        except Exception as e:
+            error_logger.error("Error fetching open orders: %s", e)
+            raise
+        finally:
+            self._observe_response()
+
+    @metrics.timed(EXCHANGE_SECONDS, "cancel_order", errors=EXCHANGE_ERRORS)
+    async def cancel_order(self, order_id: str, symbol: str = None) -> Dict:
+        await self.rate_limiter.acquire("cancel_order")
+        try:
+            return await self.exchange.cancel_order(order_id, symbol)
+        except Exception as e:
+            error_logger.error("Error canceling order: %s", e)
+            raise
+        finally:
+            self._observe_response()
+
+    # Orders per batch create/cancel request
+    max_orders_per_batch: int = 5
+
+    @metrics.timed(EXCHANGE_SECONDS, "place_orders", errors=EXCHANGE_ERRORS)
+    async def place_orders(self, orders: List[Dict]) -> List[Any]:
+        """One batch request per chunk when the exchange has one, else concurrent single orders."""
+        if not self.supports("createOrders"):
+            return await super().place_orders(orders)
+        results: List[Any] = []
+        for start in range(0, len(orders), self.max_orders_per_batch):
+            chunk = orders[start:start + self.max_orders_per_batch]
+            requests = [
+                {"symbol": o["symbol"], "type": o.get("type", "market"), "side": o["side"],
+                 "amount": o["amount"], "price": o.get("price")}
+                for o in chunk
+            ]
+            await self.rate_limiter.acquire("create_orders")
+            try:
+                placed = await self.exchange.create_orders(requests)
+            except Exception as e:
+                logger.error("Error placing %d orders: %s", len(chunk), e)
+                results.extend(e for _ in chunk)
+                continue
+            finally:
+                self._observe_response()
+            # Rejected entries come back without an id
+            results.extend(
+                order if order.get("id") else RuntimeError(f"Order rejected: {order.get('info')}")
+                for order in placed
+            )
+        return results
+
+    @metrics.timed(EXCHANGE_SECONDS, "cancel_orders", errors=EXCHANGE_ERRORS)
+    async def cancel_orders(self, order_ids: List[str], symbol: str = None) -> List[Any]:
+        if not self.supports("cancelOrders"):
+            return await super().cancel_orders(order_ids, symbol)
+        results: List[Any] = []
+        for start in range(0, len(order_ids), self.max_orders_per_batch):
+            chunk = list(order_ids[start:start + self.max_orders_per_batch])
+            await self.rate_limiter.acquire("cancel_orders")
+            try:
+                canceled = await self.exchange.cancel_orders(chunk, symbol)
+            except Exception as e:
+                error_logger.error("Error canceling %d orders: %s", len(chunk), e)
+                results.extend(e for _ in chunk)
+                continue
+            finally:
+                self._observe_response()
+            by_id = {str(order.get("id")): order for order in canceled}
+            results.extend(
+                by_id.get(str(order_id), RuntimeError(f"Order {order_id} missing from the cancel response"))
+                for order_id in chunk
+            )
+        return results
 
     def supports(self, capability: str) -> bool:
         return self.exchange.has.get(capability, False)
@@ -0,0 +1,280 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.candle_store import CandleStore
+from app.core.logger import get_logger
+from app.core.utils import timeframe_to_ms
+from app.providers.base import OHLCV_COLUMNS, BaseProvider, Tickers
+
+logger = get_logger(__name__)
+
+
+class CandleRingBuffer:
+    """Fixed-capacity ring buffer of closed candles stored as one float64 array."""
+
+    def __init__(self, capacity: int = 10_000, initial_size: int = 256):
+        self.capacity = capacity
+        self.data = np.empty((min(initial_size, capacity), OHLCV_COLUMNS), dtype=np.float64)
+        self.start = 0
+        self.count = 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    @property
+    def first_ts(self) -> Optional[int]:
+        return int(self.data[self.start, 0]) if self.count else None
+
+    @property
+    def last_ts(self) -> Optional[int]:
+        if not self.count:
+            return None
+        return int(self.data[(self.start + self.count - 1) % len(self.data), 0])
+
+    def clear(self) -> None:
+        self.start = 0
+        self.count = 0
+
+    def to_array(self) -> np.ndarray:
+        """Return the candles in timestamp order (a copy when the buffer has wrapped)."""
+        end = self.start + self.count
+        if end <= len(self.data):
+            return self.data[self.start:end]
+        return np.concatenate((self.data[self.start:], self.data[:end - len(self.data)]))
+
+    def range(self, start_ts: int, end_ts: int) -> np.ndarray:
+        """Candles with start_ts <= timestamp < end_ts."""
+        ordered = self.to_array()
+        lo, hi = np.searchsorted(ordered[:, 0], [start_ts, end_ts], side="left")
+        return ordered[lo:hi]
+
+    def extend(self, rows: np.ndarray) -> None:
+        """Append candles newer than the last stored one, dropping the oldest when full."""
+        if self.count:
+            rows = rows[rows[:, 0] > self.last_ts]
+        if not len(rows):
+            return
+        if len(rows) > self.capacity:
+            rows = rows[-self.capacity:]
+
+        self._grow(self.count + len(rows))
+        size = len(self.data)
+        overflow = self.count + len(rows) - size
+        if overflow > 0:
+            self.start = (self.start + overflow) % size
+            self.count -= overflow
+
+        pos = (self.start + self.count) % size
+        first = min(len(rows), size - pos)
+        self.data[pos:pos + first] = rows[:first]
+        self.data[:len(rows) - first] = rows[first:]
+        self.count += len(rows)
+
+    def _grow(self, needed: int) -> None:
+        size = len(self.data)
+        if needed <= size or size >= self.capacity:
+            return
+        new_size = min(self.capacity, max(needed, size * 2))
+        data = np.empty((new_size, OHLCV_COLUMNS), dtype=np.float64)
+        data[:self.count] = self.to_array()
+        self.data = data
+        self.start = 0
+
+
+class _Series:
+    def __init__(self, capacity: int):
+        self.closed = CandleRingBuffer(capacity)
+        self.tail = np.empty((0, OHLCV_COLUMNS), dtype=np.float64)
+        self.tail_fetched_at = 0.0
+        self.persisted_until = -1
+
+
+def _to_rows(candles: np.ndarray) -> List[List]:
+    rows = candles.tolist()
+    for row in rows:
+        row[0] = int(row[0])
+    return rows
+
+
+class MarketDataCache(BaseProvider):
+    """
+    Wraps a provider and serves fetch_ohlcv from a shared per-series cache.
+
+    Closed candles never change, so they are kept in a ring buffer per (symbol, timeframe)
+    and only the candles after the last cached one (usually just the open candle) are
+    fetched on refresh. Concurrent identical requests are merged into one exchange call.
+    All other provider calls are passed through unchanged.
+
+    With a CandleStore, new series are warmed up from disk and newly closed candles are
+    appended to it, so restarts do not refetch history from the exchange.
+    """
+
+    def __init__(
+        self,
+        provider: BaseProvider,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_candles_per_series: int = 10_000,
+        tail_ttl_seconds: float = 1.0,
+        clock: Callable[[], float] = time.time,
+        store: Optional[CandleStore] = None,
+        store_provider: Optional[str] = None,
+    ):
+        self.provider = provider
+        self.store = store
+        self.store_provider = store_provider
+        self.max_bytes = max_bytes
+        self.max_candles_per_series = max_candles_per_series
+        self.tail_ttl_seconds = tail_ttl_seconds
+        self.clock = clock
+        self._series: "OrderedDict[Tuple[str, str], _Series]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str, int], Tuple[asyncio.Future, int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "series": len(self._series),
+            "bytes": self._total_bytes(),
+        }
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str, since: int = None, limit: int = 100) -> List:
+        tf = timeframe_to_ms(timeframe)
+        now = self.clock()
+        open_start = int(now * 1000) // tf * tf
+
+        if since is None:
+            start = open_start - (limit - 1) * tf
+        else:
+            start = -(-since // tf) * tf  # align up, exchanges return candles at or after since
+        end = start + limit * tf
+
+        fetch_end = min(end, open_start + tf)
+        series = self._get_series(symbol, timeframe)
+        closed = series.closed
+        # Refresh only what follows the cache, unless that is more than refetching the whole window
+        if closed.count and closed.first_ts <= start <= closed.last_ts + tf and fetch_end - closed.last_ts <= (limit + 1) * tf:
+            self.hits += 1
+            fetch_since = closed.last_ts + tf
+        else:
+            self.misses += 1
+            fetch_since = start
+
+        tail_is_fresh = now - series.tail_fetched_at < self.tail_ttl_seconds
+        if fetch_since < fetch_end and not (fetch_since >= open_start and tail_is_fresh and len(series.tail)):
+            fetched = await self._fetch(symbol, timeframe, fetch_since, (fetch_end - fetch_since) // tf)
+            if fetched:
+                rows = np.asarray(fetched, dtype=np.float64).reshape(-1, OHLCV_COLUMNS)
+                is_closed = rows[:, 0] < open_start
+                self._merge_closed(series, symbol, timeframe, rows[is_closed], tf)
+                series.tail = rows[~is_closed]
+                series.tail_fetched_at = now
+                self._evict()
+
+        result = closed.range(start, min(end, open_start))
+        if end > open_start and len(series.tail):
+            tail = series.tail[(series.tail[:, 0] >= start) & (series.tail[:, 0] < end)]
+            result = np.concatenate((result, tail))
+        return _to_rows(result[-limit:])
+
+    async def _fetch(self, symbol: str, timeframe: str, since: int, limit: int) -> List:
+        key = (symbol, timeframe, since)
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[1] >= limit:
+            self.coalesced += 1
+            return await asyncio.shield(inflight[0])
+
+        task = asyncio.ensure_future(self.provider.fetch_ohlcv(symbol, timeframe, since, limit))
+        self._inflight[key] = (task, limit)
+        try:
+            # Shield so one cancelled caller does not cancel the fetch others are waiting on
+            return await asyncio.shield(task)
+        finally:
+            if self._inflight.get(key, (None,))[0] is task:
+                del self._inflight[key]
+
+    def _merge_closed(self, series: _Series, symbol: str, timeframe: str, rows: np.ndarray, tf: int) -> None:
+        closed = series.closed
+        if not len(rows):
+            return
+        # Only contiguous data is kept; a non-adjacent range replaces the cached one
+        if closed.count and not (closed.first_ts <= rows[0, 0] <= closed.last_ts + tf):
+            closed.clear()
+        closed.extend(rows)
+
+        if self.store is not None:
+            new_rows = rows[rows[:, 0] > series.persisted_until]
+            if len(new_rows):
+                self.store.write(self.store_provider, symbol, timeframe, new_rows)
+                series.persisted_until = int(new_rows[-1, 0])
+
+    def _get_series(self, symbol: str, timeframe: str) -> _Series:
+        key = (symbol, timeframe)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(self.max_candles_per_series)
+            if self.store is not None:
+                warm = self.store.tail(self.store_provider, symbol, timeframe, self.max_candles_per_series)
+                series.closed.extend(warm)
+                series.persisted_until = series.closed.last_ts if series.closed.count else -1
+        else:
+            self._series.move_to_end(key)
+        return series
+
+    def _total_bytes(self) -> int:
+        return sum(series.closed.nbytes for series in self._series.values())
+
+    def _evict(self) -> None:
+        while len(self._series) > 1 and self._total_bytes() > self.max_bytes:
+            key, _ = self._series.popitem(last=False)
+            self.evictions += 1
+            logger.debug("Evicted cached candles for %s", key)
+
+    async def close(self):
+        if hasattr(self.provider, 'close'):
+            await self.provider.close()
+
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+    async def fetch_balance(self) -> Dict[str, Any]:
+        return await self.provider.fetch_balance()
+
+    async def fetch_ticker(self, symbol: str) -> Dict:
+        return await self.provider.fetch_ticker(symbol)
+
+    async def fetch_tickers(self, symbols: List[str]) -> Tickers:
+        # Keep the wrapped provider's bulk endpoint; fetch_ohlcv_many goes through the cache
+        return await self.provider.fetch_tickers(symbols)
+
+    async def place_order(self, symbol: str, side: str, amount: float, price: Optional[float] = None, type: str = "market") -> Dict:
+        return await self.provider.place_order(symbol, side, amount, price, type)
+
+    async def fetch_order(self, order_id: str, symbol: str = None) -> Dict:
+        return await self.provider.fetch_order(order_id, symbol)
+
+    async def fetch_open_orders(self, symbol: str = None) -> List[Dict]:
+        return await self.provider.fetch_open_orders(symbol)
+
+    async def cancel_order(self, order_id: str, symbol: str = None) -> Dict:
+        return await self.provider.cancel_order(order_id, symbol)
+
+    async def place_orders(self, orders: List[Dict]) -> List[Any]:
+        return await self.provider.place_orders(orders)
+
+    async def cancel_orders(self, order_ids: List[str], symbol: str = None) -> List[Any]:
+        return await self.provider.cancel_orders(order_ids, symbol)
+
+    def supports(self, capability: str) -> bool:
+        return self.provider.supports(capability)
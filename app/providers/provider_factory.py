@@ -1,8 +1,16 @@
-from app.providers.binance_provider import BinanceProvider
+from app.providers.simulated_provider import SimulatedProvider
 from app.providers.base import BaseProvider
+from app.providers.registry import DEFAULT_ACCOUNT, providers
+from app.core.config import settings
 
-def get_provider(name: str, **kwargs) -> BaseProvider:
-    if name.lower() == "binance":
-        return BinanceProvider(**kwargs)
-    else:
-        raise ValueError(f"Unknown provider: {name}")
+def get_provider(name: str, account: str = DEFAULT_ACCOUNT, **kwargs) -> BaseProvider:
+    """
+    The shared provider for a ccxt exchange id (see ProviderRegistry), or "paper". kwargs are
+    api_key/secret overriding the configured credentials when the provider is first built.
+    """
+    if name.lower() == "paper":
+        # Simulated fills against live Binance prices; no orders reach the exchange
+        return SimulatedProvider(
+            initial_balances=settings.PAPER_BALANCES, market_data=providers.get("binance", account, **kwargs)
+        )
+    return providers.get(name, account, **kwargs)
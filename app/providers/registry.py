@@ -0,0 +1,177 @@
+"""
+Long-lived exchange providers, one per (exchange, account), over one shared connection pool.
+
+Every provider built by a ProviderRegistry sends its REST calls through the registry's
+aiohttp session, so connections (and TLS handshakes) are reused across exchanges, accounts
+and strategies. Accounts of one exchange share a RateLimiter, since exchange limits such as
+Binance's request weight are counted per IP.
+
+The fan-out helpers query many exchanges concurrently (at most `max_concurrency` calls in
+flight) and return failures per exchange instead of failing the batch. Within an exchange,
+symbols go through the provider's batch APIs: one bulk request where the exchange has one,
+otherwise at most `max_per_exchange` per-symbol requests in flight, each waiting on the
+exchange's rate limiter.
+"""
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+from app.adapters.rate_limiter import RateLimiter, TokenBucket
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.utils import fan_out
+from app.providers.binance_provider import BinanceProvider
+from app.providers.ccxt_provider import CCXTProvider
+
+logger = get_logger(__name__)
+
+DEFAULT_ACCOUNT = "default"
+
+Credentials = Tuple[Optional[str], Optional[str]]
+Target = Union[str, Tuple[str, str]]
+
+
+def default_credentials(exchange_id: str, account: str = DEFAULT_ACCOUNT) -> Credentials:
+    """
+    API key and secret from settings or the environment: <EXCHANGE>_API_KEY/<EXCHANGE>_SECRET_KEY
+    for the default account, <EXCHANGE>_<ACCOUNT>_API_KEY/... for others.
+    """
+    prefix = exchange_id.upper() if account == DEFAULT_ACCOUNT else f"{exchange_id}_{account}".upper()
+    key = getattr(settings, f"{prefix}_API_KEY", None) or os.environ.get(f"{prefix}_API_KEY")
+    secret = getattr(settings, f"{prefix}_SECRET_KEY", None) or os.environ.get(f"{prefix}_SECRET_KEY")
+    return key, secret
+
+
+class ProviderRegistry:
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_concurrency: int = 16,
+        max_per_exchange: int = 8,
+        credentials: Callable[[str, str], Credentials] = default_credentials,
+    ):
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self.max_per_exchange = max_per_exchange
+        self.credentials = credentials
+        self._providers: Dict[Tuple[str, str], CCXTProvider] = {}
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._exchange_slots: Dict[str, asyncio.Semaphore] = {}
+        self._session = None
+
+    def _shared_session(self):
+        """The aiohttp session of the running event loop, created on first use."""
+        import aiohttp
+
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections, ttl_dns_cache=300, enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    def _rate_limiter(self, exchange_id: str, provider: CCXTProvider) -> RateLimiter:
+        limiter = self._limiters.get(exchange_id)
+        if limiter is None:
+            if exchange_id == "binance":
+                limiter = provider.rate_limiter  # weight-based, see binance_provider
+            else:
+                # ccxt's rateLimit is the minimum milliseconds between requests; allow a second's
+                # worth of requests as a burst, or one request per interval for slow exchanges
+                interval = (getattr(provider.exchange, "rateLimit", None) or 100) / 1000
+                limiter = RateLimiter(buckets=[TokenBucket(max(1, round(1 / interval)), max(1.0, interval))])
+            self._limiters[exchange_id] = limiter
+        return limiter
+
+    def _build(self, exchange_id: str, account: str, api_key: Optional[str], secret: Optional[str]) -> CCXTProvider:
+        import ccxt.async_support as ccxt
+
+        if not hasattr(ccxt, exchange_id):
+            raise ValueError(f"Unknown exchange: {exchange_id}")
+        if api_key is None and secret is None:
+            api_key, secret = self.credentials(exchange_id, account)
+        session = self._shared_session()
+        if exchange_id == "binance":
+            provider = BinanceProvider(api_key, secret, rate_limiter=self._limiters.get("binance"), session=session)
+        else:
+            provider = CCXTProvider(exchange_id, api_key, secret, session=session)
+        provider.rate_limiter = self._rate_limiter(exchange_id, provider)
+        provider.batch_concurrency = self.max_per_exchange
+        logger.info("Created %s provider for account %s", exchange_id, account)
+        return provider
+
+    def get(self, exchange_id: str, account: str = DEFAULT_ACCOUNT, api_key: Optional[str] = None,
+            secret: Optional[str] = None) -> CCXTProvider:
+        """
+        The cached provider for (exchange, account), built on first use (or after it was
+        closed). Call from a coroutine: the shared session belongs to the running event loop.
+        """
+        exchange_id = exchange_id.lower()
+        key = (exchange_id, account)
+        provider = self._providers.get(key)
+        if provider is None or provider.closed:
+            provider = self._providers[key] = self._build(exchange_id, account, api_key, secret)
+        return provider
+
+    def _slot(self, exchange_id: str) -> asyncio.Semaphore:
+        slot = self._exchange_slots.get(exchange_id)
+        if slot is None:
+            slot = self._exchange_slots[exchange_id] = asyncio.Semaphore(self.max_per_exchange)
+        return slot
+
+    def _call(self, exchange_id: str, account: str, method: str, *args) -> Callable[[], Awaitable[Any]]:
+        async def call():
+            provider = self.get(exchange_id, account)
+            async with self._slot(exchange_id):
+                return await getattr(provider, method)(*args)
+        return call
+
+    @staticmethod
+    def _target(target: Target) -> Tuple[str, str]:
+        return (target, DEFAULT_ACCOUNT) if isinstance(target, str) else target
+
+    async def fetch_balances(self, targets: Iterable[Target]) -> Dict[Tuple[str, str], Any]:
+        """Balances keyed by (exchange, account); a target is an exchange id or (exchange, account)."""
+        calls = {}
+        for target in targets:
+            exchange_id, account = self._target(target)
+            calls[(exchange_id, account)] = self._call(exchange_id, account, "fetch_balance")
+        return await fan_out(calls, self.max_concurrency)
+
+    async def fetch_tickers(self, symbols: Mapping[str, Iterable[str]]) -> Dict[str, Any]:
+        """
+        Tickers (a columnar Tickers) keyed by exchange, from {exchange: [symbol, ...]}. Each
+        exchange is queried through its bulk endpoint when it has one, see CCXTProvider.fetch_tickers.
+        """
+        calls = {
+            exchange_id: self._call(exchange_id, DEFAULT_ACCOUNT, "fetch_tickers", list(exchange_symbols))
+            for exchange_id, exchange_symbols in symbols.items()
+        }
+        return await fan_out(calls, self.max_concurrency)
+
+    async def fetch_ohlcv(self, symbols: Mapping[str, Iterable[str]], timeframe: str = "1m",
+                          since: Optional[int] = None, limit: int = 100) -> Dict[str, Any]:
+        """Candles keyed by exchange, then symbol, as (n, 6) arrays, from {exchange: [symbol, ...]}."""
+        calls = {
+            exchange_id: self._call(
+                exchange_id, DEFAULT_ACCOUNT, "fetch_ohlcv_many", list(exchange_symbols), timeframe, since, limit
+            )
+            for exchange_id, exchange_symbols in symbols.items()
+        }
+        return await fan_out(calls, self.max_concurrency)
+
+    async def close(self) -> None:
+        """Close every provider and the shared session."""
+        providers = [p for p in self._providers.values() if not p.closed]
+        self._providers.clear()
+        await asyncio.gather(*(p.close() for p in providers), return_exceptions=True)
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._exchange_slots.clear()
+
+
+providers = ProviderRegistry(
+    max_connections=settings.PROVIDER_MAX_CONNECTIONS,
+    max_concurrency=settings.PROVIDER_FANOUT_CONCURRENCY,
+)
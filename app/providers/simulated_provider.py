@@ -0,0 +1,421 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+import numpy as np
+
+from app.core.logger import get_logger
+from app.providers.base import BaseProvider
+
+logger = get_logger(__name__)
+
+EPSILON = 1e-12
+
+
+@dataclass
+class SimOrder:
+    id: str
+    symbol: str
+    side: str
+    type: str
+    amount: float
+    price: Optional[float]
+    timestamp: int
+    filled: float = 0.0
+    cost: float = 0.0
+    fee: float = 0.0
+    status: str = "open"
+    reserved: float = 0.0  # balance locked by a resting order
+
+    @property
+    def remaining(self) -> float:
+        return self.amount - self.filled
+
+    def to_dict(self, quote: str) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "symbol": self.symbol,
+            "side": self.side,
+            "type": self.type,
+            "amount": self.amount,
+            "price": self.price,
+            "filled": self.filled,
+            "remaining": self.remaining,
+            "cost": self.cost,
+            "average": self.cost / self.filled if self.filled else None,
+            "status": self.status,
+            "timestamp": self.timestamp,
+            "fee": {"cost": self.fee, "currency": quote},
+        }
+
+
+class OrderBook:
+    """
+    Resting limit orders of one symbol. Orders are grouped into FIFO price levels; the best
+    level per side comes from a heap, so matching never scans orders that cannot fill.
+    """
+
+    def __init__(self):
+        self.levels: Dict[str, Dict[float, Deque[SimOrder]]] = {"buy": {}, "sell": {}}
+        self._heaps: Dict[str, List[float]] = {"buy": [], "sell": []}
+        self.size = 0
+
+    def add(self, order: SimOrder) -> None:
+        levels = self.levels[order.side]
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = deque()
+            heapq.heappush(self._heaps[order.side], -order.price if order.side == "buy" else order.price)
+        level.append(order)
+        self.size += 1
+
+    def remove(self, order: SimOrder) -> None:
+        level = self.levels[order.side].get(order.price)
+        if level is not None and order in level:
+            level.remove(order)
+            self.size -= 1
+            if not level:
+                del self.levels[order.side][order.price]
+
+    def best(self, side: str) -> Optional[float]:
+        heap = self._heaps[side]
+        levels = self.levels[side]
+        while heap:
+            price = -heap[0] if side == "buy" else heap[0]
+            if price in levels:
+                return price
+            heapq.heappop(heap)  # level emptied earlier; drop it lazily
+        return None
+
+    def pop_front(self, side: str, price: float) -> None:
+        level = self.levels[side][price]
+        level.popleft()
+        self.size -= 1
+        if not level:
+            del self.levels[side][price]
+
+
+class SimulatedProvider(BaseProvider):
+    """
+    Paper-trading exchange that matches orders in memory against a price stream.
+
+    Prices come from feed_candle()/feed_price() (replayed history or a live feed), or are pulled
+    from an optional real `market_data` provider. Market orders take liquidity at the last price;
+    limit orders rest in the book and fill at their limit price once the market trades through
+    it. Fill size per price update is capped at `participation` of the traded volume, so large
+    orders fill partially over several updates.
+    """
+
+    def __init__(
+        self,
+        initial_balances: Optional[Dict[str, float]] = None,
+        taker_fee: float = 0.001,
+        maker_fee: float = 0.001,
+        slippage_bps: float = 0.0,
+        participation: float = 1.0,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        market_data: Optional[BaseProvider] = None,
+        price_ttl_seconds: float = 5.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.free: Dict[str, float] = dict(initial_balances or {"USDT": 10_000.0})
+        self.used: Dict[str, float] = {}
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.slippage = slippage_bps / 10_000
+        self.participation = participation
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.market_data = market_data
+        self.price_ttl_seconds = price_ttl_seconds
+        self.clock = clock
+
+        self.books: Dict[str, OrderBook] = {}
+        self.orders: Dict[str, SimOrder] = {}
+        self.pending_market: Dict[str, Deque[SimOrder]] = {}
+        self.last_price: Dict[str, float] = {}
+        self.last_price_at: Dict[str, float] = {}
+        self._liquidity: Dict[str, float] = {}
+        # Prefixed per instance: trades are unique by (provider, exchange_order_id) and a paper
+        # exchange restarted against the same database must not reuse the ids of the last run
+        self._id_prefix = uuid.uuid4().hex[:8]
+        self._ids = itertools.count(1)
+
+        # Replay state: full candle history per symbol and the index of the current candle
+        self.history: Dict[str, np.ndarray] = {}
+        self.history_timeframe: Dict[str, str] = {}
+        self.cursor: Dict[str, int] = {}
+
+        # Fill log (one entry per fill) used by the backtester's vectorized accounting
+        self.fill_index: List[int] = []
+        self.fill_sign: List[int] = []
+        self.fill_price: List[float] = []
+        self.fill_amount: List[float] = []
+        self.fill_fee: List[float] = []
+
+    @property
+    def name(self) -> str:
+        return "paper"
+
+    # -- price stream -------------------------------------------------------------------------
+
+    def load_history(self, symbol: str, timeframe: str, candles: np.ndarray) -> None:
+        """Register candles to replay; fetch_ohlcv only ever sees candles up to the cursor."""
+        self.history[symbol] = candles
+        self.history_timeframe[symbol] = timeframe
+        self.cursor[symbol] = -1
+
+    def feed_candle(self, symbol: str, candle, index: Optional[int] = None) -> None:
+        """Advance the market by one candle [ts, open, high, low, close, volume]."""
+        if index is not None:
+            self.cursor[symbol] = index
+        _, open_, high, low, close, volume = candle[:6]
+        book = self.books.get(symbol)
+        pending = self.pending_market.get(symbol)
+        self.last_price[symbol] = close
+        self.last_price_at[symbol] = self.clock()
+        # The participation cap is per candle: queued market orders, both sides of the book and
+        # orders placed before the next candle share one budget
+        budget = volume * self.participation
+        if pending:
+            budget = self._fill_pending_market(symbol, open_, budget)
+        if book and book.size:
+            budget = self._match(symbol, book, "buy", low, budget)
+            budget = self._match(symbol, book, "sell", high, budget)
+        self._liquidity[symbol] = budget
+
+    def feed_price(self, symbol: str, price: float, volume: float = float("inf")) -> None:
+        self.feed_candle(symbol, (0, price, price, price, price, volume))
+
+    async def _refresh_price(self, symbol: str) -> None:
+        if self.market_data is None:
+            return
+        if self.clock() - self.last_price_at.get(symbol, 0.0) < self.price_ttl_seconds:
+            return
+        candles = await self.market_data.fetch_ohlcv(symbol, "1m", limit=1)
+        if candles:
+            self.feed_candle(symbol, candles[-1])
+
+    async def _latency(self) -> None:
+        delay = self.latency_seconds + random.uniform(0, self.latency_jitter_seconds)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    # -- matching -----------------------------------------------------------------------------
+
+    def _assets(self, symbol: str):
+        base, quote = symbol.split("/")
+        return base, quote.split(":")[0]
+
+    def _record_fill(self, order: SimOrder, amount: float, price: float, fee_rate: float) -> None:
+        base, quote = self._assets(order.symbol)
+        cost = amount * price
+        fee = cost * fee_rate
+        order.filled += amount
+        order.cost += cost
+        order.fee += fee
+
+        if order.side == "buy":
+            self.free[base] = self.free.get(base, 0.0) + amount
+            self.free[quote] = self.free.get(quote, 0.0) - cost - fee
+        else:
+            self.free[base] = self.free.get(base, 0.0) - amount
+            self.free[quote] = self.free.get(quote, 0.0) + cost - fee
+        if order.remaining <= EPSILON:
+            order.status = "closed"
+
+        self.fill_index.append(self.cursor.get(order.symbol, -1))
+        self.fill_sign.append(1 if order.side == "buy" else -1)
+        self.fill_price.append(price)
+        self.fill_amount.append(amount)
+        self.fill_fee.append(fee)
+
+    def _release(self, order: SimOrder, amount: float) -> None:
+        """Move the part of a resting order's reservation covering `amount` back to free."""
+        base, quote = self._assets(order.symbol)
+        asset = quote if order.side == "buy" else base
+        release = order.reserved * amount / order.remaining if order.remaining > EPSILON else order.reserved
+        order.reserved -= release
+        self.used[asset] = self.used.get(asset, 0.0) - release
+        self.free[asset] = self.free.get(asset, 0.0) + release
+
+    def _match(self, symbol: str, book: OrderBook, side: str, through: float, budget: float) -> float:
+        """Fill resting `side` orders the market traded through; returns the unused budget."""
+        while budget > EPSILON:
+            price = book.best(side)
+            if price is None or (side == "buy" and price < through) or (side == "sell" and price > through):
+                return budget
+            order = book.levels[side][price][0]
+            amount = min(order.remaining, budget)
+            self._release(order, amount)
+            self._record_fill(order, amount, price, self.maker_fee)
+            budget -= amount
+            if order.status == "closed":
+                book.pop_front(side, price)
+        return budget
+
+    def _market_price(self, symbol: str, side: str, reference: float) -> float:
+        return reference * (1 + self.slippage) if side == "buy" else reference * (1 - self.slippage)
+
+    def _fill_pending_market(self, symbol: str, price: float, budget: float) -> float:
+        pending = self.pending_market[symbol]
+        base, quote = self._assets(symbol)
+        while pending and budget > EPSILON:
+            order = pending[0]
+            fill_price = self._market_price(symbol, order.side, price)
+            wanted = amount = min(order.remaining, budget)
+            self._release(order, wanted)
+            # The reservation was priced when the order came in; a buy the market has moved
+            # away from fills only as far as the free balance goes, and the rest is canceled
+            if order.side == "buy":
+                amount = min(amount, max(self.free.get(quote, 0.0), 0.0) / (fill_price * (1 + self.taker_fee)))
+            if amount > EPSILON:
+                self._record_fill(order, amount, fill_price, self.taker_fee)
+                budget -= amount
+            if amount < wanted - EPSILON:
+                self._release(order, order.remaining)
+                order.status = "canceled"
+            if order.status != "open":
+                pending.popleft()
+        return budget
+
+    # -- BaseProvider -------------------------------------------------------------------------
+
+    async def fetch_balance(self) -> Dict[str, Any]:
+        await self._latency()
+        assets = set(self.free) | set(self.used)
+        free = {a: self.free.get(a, 0.0) for a in assets}
+        used = {a: self.used.get(a, 0.0) for a in assets}
+        total = {a: free[a] + used[a] for a in assets}
+        return {"free": free, "used": used, "total": total}
+
+    async def fetch_ohlcv(self, symbol: str, timeframe: str, since: int = None, limit: int = 100) -> List:
+        await self._latency()
+        if symbol not in self.history:
+            if self.market_data is None:
+                raise ValueError(f"No price history for {symbol}")
+            return await self.market_data.fetch_ohlcv(symbol, timeframe, since, limit)
+        if timeframe != self.history_timeframe[symbol]:
+            raise ValueError(f"Only {self.history_timeframe[symbol]} candles are loaded for {symbol}")
+
+        visible = self.history[symbol][:self.cursor[symbol] + 1]
+        rows = visible[np.searchsorted(visible[:, 0], since):][:limit] if since is not None else visible[-limit:]
+        result = rows.tolist()
+        for row in result:
+            row[0] = int(row[0])
+        return result
+
+    async def fetch_ticker(self, symbol: str) -> Dict:
+        await self._latency()
+        await self._refresh_price(symbol)
+        if symbol not in self.last_price:
+            raise ValueError(f"No price for {symbol}")
+        price = self.last_price[symbol]
+        book = self.books.get(symbol)
+        bid = book.best("buy") if book else None
+        ask = book.best("sell") if book else None
+        return {"symbol": symbol, "timestamp": int(time.time() * 1000), "last": price,
+                "bid": bid if bid is not None else price, "ask": ask if ask is not None else price}
+
+    async def place_order(self, symbol: str, side: str, amount: float, price: Optional[float] = None, type: str = "market") -> Dict:
+        await self._latency()
+        await self._refresh_price(symbol)
+        last = self.last_price.get(symbol)
+        if last is None:
+            raise ValueError(f"No price for {symbol}; feed a price before trading")
+        if type == "limit" and price is None:
+            raise ValueError("Limit orders need a price")
+
+        base, quote = self._assets(symbol)
+        order = SimOrder(
+            id=f"{self._id_prefix}-{next(self._ids)}", symbol=symbol, side=side, type=type, amount=amount,
+            price=price if type == "limit" else None, timestamp=int(self.clock() * 1000),
+        )
+
+        crosses = type == "market" or (side == "buy" and price >= last) or (side == "sell" and price <= last)
+        if crosses:
+            reference = self._market_price(symbol, side, last) if type == "market" else last
+            needed = amount * reference * (1 + self.taker_fee) if side == "buy" else amount
+            self._check_funds(quote if side == "buy" else base, needed)
+            available = self._liquidity.get(symbol, float("inf"))
+            fill = min(amount, available)
+            if fill > EPSILON:
+                self._record_fill(order, fill, reference, self.taker_fee)
+                self._liquidity[symbol] = available - fill
+            if order.status != "closed":
+                if type == "market":
+                    # The unfilled rest waits for liquidity with its funds locked, like a resting order
+                    self._reserve(order, reference * (1 + self.taker_fee))
+                    self.pending_market.setdefault(symbol, deque()).append(order)
+                else:
+                    self._rest(order)
+        else:
+            self._rest(order)
+
+        self.orders[order.id] = order
+        return order.to_dict(quote)
+
+    def _check_funds(self, asset: str, needed: float) -> None:
+        if self.free.get(asset, 0.0) + EPSILON < needed:
+            raise ValueError(f"Insufficient {asset} balance: need {needed}, have {self.free.get(asset, 0.0)}")
+
+    def _reserve(self, order: SimOrder, unit_cost: float) -> None:
+        """Lock the balance the unfilled rest of `order` needs (`unit_cost` quote per unit for a buy)."""
+        base, quote = self._assets(order.symbol)
+        if order.side == "buy":
+            asset, reserve = quote, order.remaining * unit_cost
+        else:
+            asset, reserve = base, order.remaining
+        self._check_funds(asset, reserve)
+        self.free[asset] -= reserve
+        self.used[asset] = self.used.get(asset, 0.0) + reserve
+        order.reserved = reserve
+
+    def _rest(self, order: SimOrder) -> None:
+        self._reserve(order, order.price * (1 + self.maker_fee))
+        self.books.setdefault(order.symbol, OrderBook()).add(order)
+
+    async def fetch_order(self, order_id: str, symbol: str = None) -> Dict:
+        await self._latency()
+        order = self.orders.get(order_id)
+        if order is None:
+            raise ValueError(f"Unknown order {order_id}")
+        await self._refresh_price(order.symbol)
+        return order.to_dict(self._assets(order.symbol)[1])
+
+    async def fetch_open_orders(self, symbol: str = None) -> List[Dict]:
+        await self._latency()
+        return [
+            order.to_dict(self._assets(order.symbol)[1])
+            for order in self.orders.values()
+            if order.status == "open" and (symbol is None or order.symbol == symbol)
+        ]
+
+    async def cancel_order(self, order_id: str, symbol: str = None) -> Dict:
+        await self._latency()
+        order = self.orders.get(order_id)
+        if order is None:
+            raise ValueError(f"Unknown order {order_id}")
+        if order.status == "open":
+            self._release(order, order.remaining)
+            if order.type == "limit":
+                self.books[order.symbol].remove(order)
+            else:
+                self.pending_market[order.symbol].remove(order)
+            order.status = "canceled"
+        return order.to_dict(self._assets(order.symbol)[1])
+
+    def supports(self, capability: str) -> bool:
+        return capability in ("fetchOHLCV", "fetchTicker", "createMarketOrder", "createLimitOrder", "fetchOrder",
+                              "fetchOpenOrders", "cancelOrder")
+
+    async def close(self):
+        if self.market_data is not None and hasattr(self.market_data, 'close'):
+            await self.market_data.close()
@@ -1,7 +1,7 @@
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from app.core.db import Base
+from app.core.db import Base, enable_sqlite_wal
 from app.core.models import Trade
 
 @pytest.fixture(scope="function")
@@ -12,3 +12,21 @@ def db_session():
     session = Session()
     yield session
     session.close()
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """Sessions over a fresh SQLite file (tmp_path/trades.db) in WAL mode, usable from worker threads."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'trades.db'}", connect_args={"check_same_thread": False})
+    enable_sqlite_wal(engine, "NORMAL")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+@pytest.fixture(autouse=True)
+def fresh_response_cache():
+    # Every test builds its own database; cached API responses must not leak between them
+    from app.backend.cache import response_cache
+    response_cache.clear()
+    response_cache.version_ttl = 0.0
+    yield
+    response_cache.clear()
@@ -0,0 +1,56 @@
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.backend.main import app
+from app.bot.trade_engine import TradeEngine
+from app.core import async_repository
+from app.core.db import Base, async_database_url, create_async_db_engine, get_async_db
+from app.providers.simulated_provider import SimulatedProvider
+
+
+async def make_async_session_factory(tmp_path):
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'trades.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+
+def test_async_database_url():
+    assert async_database_url("sqlite:///./data/trades.db") == "sqlite+aiosqlite:///./data/trades.db"
+    assert async_database_url("postgresql://u:p@db/bot") == "postgresql+asyncpg://u:p@db/bot"
+    assert async_database_url("postgresql+psycopg2://u:p@db/bot") == "postgresql+asyncpg://u:p@db/bot"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://db/bot")
+
+
+@pytest.mark.asyncio
+async def test_trade_engine_and_routes_on_async_session(tmp_path):
+    engine, session_factory = await make_async_session_factory(tmp_path)
+    provider = SimulatedProvider({"USDT": 10_000.0})
+    provider.feed_price("BTC/USDT", 100.0)
+    trade_engine = TradeEngine(provider, session_factory)
+    for _ in range(3):
+        await trade_engine.execute_buy("BTC/USDT", 1.0)
+
+    async with session_factory() as session:
+        assert len(await async_repository.get_trades(session)) == 3
+        position = await async_repository.get_position(session, "BTC/USDT")
+        assert position.size == 3.0
+
+    async def override():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            trades = (await client.get("/api/v1/trades/", params={"limit": 2})).json()
+            positions = (await client.get("/api/v1/positions/")).json()
+    finally:
+        app.dependency_overrides.clear()
+        await engine.dispose()
+
+    assert len(trades) == 2
+    assert positions[0]["symbol"] == "BTC/USDT"
+    assert positions[0]["size"] == 3.0
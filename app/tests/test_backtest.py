@@ -0,0 +1,81 @@
+import logging
+import numpy as np
+import pytest
+import typer
+from app.bot.backtest import Backtester
+from app.bot.experiments import parameter_grid, run_sweep
+from app.bot.strategies.dca import DCAStrategy
+from app.cli import backtest
+
+MINUTE = 60_000
+
+
+def make_candles(count: int, start_price: float = 100.0, step: float = 0.01) -> np.ndarray:
+    candles = np.zeros((count, 6))
+    candles[:, 0] = 1_700_000_000_000 + np.arange(count) * MINUTE
+    close = start_price + np.arange(count) * step
+    candles[:, 1] = close
+    candles[:, 2] = close
+    candles[:, 3] = close
+    candles[:, 4] = close
+    candles[:, 5] = 1.0
+    return candles
+
+
+@pytest.mark.asyncio
+async def test_dca_backtest_equity_and_fees():
+    candles = make_candles(24 * 60)
+    config = {"symbol": "BTC/USDT", "amount": 1.0, "interval_seconds": 60 * 60}
+    result = await Backtester(DCAStrategy, config, candles, initial_cash=10_000.0, fee_rate=0.001).run()
+
+    summary = result.summary()
+    assert summary["trades"] == 24
+    bought_at = candles[result.trade_index, 4]
+    np.testing.assert_allclose(result.trade_fee, bought_at * 0.001)
+    expected_final = 10_000.0 - (bought_at * 1.001).sum() + 24 * candles[-1, 4]
+    assert summary["final_equity"] == pytest.approx(expected_final)
+    assert summary["max_drawdown"] <= 0
+
+
+@pytest.mark.asyncio
+async def test_quiet_backtest_logs_nothing_when_cash_runs_out(caplog):
+    candles = make_candles(6 * 60)
+    config = {"symbol": "BTC/USDT", "amount": 1.0, "interval_seconds": 60}
+    with caplog.at_level("DEBUG"):
+        result = await Backtester(DCAStrategy, config, candles, initial_cash=250.0).run()
+
+    # Two buys fit; every later attempt is rejected for insufficient USDT
+    assert result.summary()["trades"] == 2
+    assert caplog.records == []
+
+
+class NeighbourLoggingDCA(DCAStrategy):
+    """Stands in for other code running in the same process while a backtest runs."""
+
+    async def on_tick(self):
+        logging.getLogger("app.test.neighbour").error("still logging")
+        await super().on_tick()
+
+
+@pytest.mark.asyncio
+async def test_quiet_backtest_silences_only_the_strategy(caplog):
+    config = {"symbol": "BTC/USDT", "amount": 1.0, "interval_seconds": 60}
+    with caplog.at_level("DEBUG"):
+        await Backtester(NeighbourLoggingDCA, config, make_candles(3), initial_cash=0.0).run()
+
+    assert [(r.name, r.getMessage()) for r in caplog.records] == [("app.test.neighbour", "still logging")] * 3
+
+
+def test_parameter_sweep_runs_in_process_pool():
+    candles = make_candles(6 * 60)
+    grid = {"interval_seconds": [60 * 60, 2 * 60 * 60]}
+    results = run_sweep(DCAStrategy, {"symbol": "BTC/USDT", "amount": 1.0}, grid, candles, max_workers=2)
+
+    assert [r["interval_seconds"] for r in results] == [p["interval_seconds"] for p in parameter_grid(grid)]
+    assert results[0]["trades"] == 6
+    assert results[1]["trades"] == 3
+
+
+def test_backtest_command_rejects_unknown_strategy(tmp_path):
+    with pytest.raises(typer.BadParameter, match="Unknown strategy 'dac'; known: dca"):
+        backtest("BTC/USDT", strategy="dac", store_dir=str(tmp_path))
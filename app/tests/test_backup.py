@@ -0,0 +1,93 @@
+import gzip
+import sqlite3
+import threading
+import pytest
+from sqlalchemy import create_engine, text
+from app.core.backup import BackupError, BackupManager, BackupService, LocalDirectorySink
+from app.core.db import enable_sqlite_wal
+
+
+def make_database(tmp_path):
+    path = str(tmp_path / "trades.db")
+    engine = create_engine(f"sqlite:///{path}")
+    enable_sqlite_wal(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE fills (id INTEGER PRIMARY KEY, payload TEXT)"))
+        conn.execute(text("INSERT INTO fills (payload) VALUES " + ",".join(["('x')"] * 1000)))
+    return path, engine
+
+
+def count(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT count(*) FROM fills").fetchone()[0]
+
+
+def test_backup_while_writing_and_restore(tmp_path):
+    path, engine = make_database(tmp_path)
+    manager = BackupManager(path, LocalDirectorySink(str(tmp_path / "backups")), keep=2)
+
+    stop = threading.Event()
+    written = []
+
+    def writer():
+        # The bot keeps committing while the backup runs
+        with engine.connect() as conn:
+            while not stop.is_set():
+                conn.execute(text("INSERT INTO fills (payload) VALUES ('y')"))
+                conn.commit()
+                written.append(1)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        first = manager.backup()
+    finally:
+        stop.set()
+        thread.join()
+    assert written and first is not None
+
+    second = manager.backup()
+    assert second is not None and second.sha256 != first.sha256
+    # Nothing changed since
+    assert manager.backup() is None
+
+    restored = str(tmp_path / "restored.db")
+    manager.restore(second.name, restored)
+    assert count(restored) == count(path) == 1000 + len(written)
+    with pytest.raises(FileExistsError):
+        manager.restore(second.name, restored)
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM fills WHERE id < 10"))
+    manager.backup()
+    assert manager.names()[0] == second.name and len(manager.names()) == 2
+
+
+def test_corrupted_backup_is_rejected(tmp_path):
+    path, _ = make_database(tmp_path)
+    manager = BackupManager(path, LocalDirectorySink(str(tmp_path / "backups")))
+    info = manager.backup()
+
+    stored = tmp_path / "backups" / (info.name + ".db.gz")
+    with gzip.open(stored, "wb") as f:
+        f.write(b"not the database")
+    with pytest.raises(BackupError, match="checksum"):
+        manager.verify(info.name)
+    with pytest.raises(BackupError):
+        manager.restore(info.name, str(tmp_path / "restored.db"))
+    assert not (tmp_path / "restored.db").exists()
+
+
+def test_service_backs_up_on_a_background_thread(tmp_path):
+    path, _ = make_database(tmp_path)
+    manager = BackupManager(path, LocalDirectorySink(str(tmp_path / "backups")))
+    service = BackupService(manager, interval=0.05, initial_delay=0.0)
+    service.start()
+    try:
+        for _ in range(200):
+            if service.backups and service.skipped:
+                break
+            threading.Event().wait(0.01)
+    finally:
+        service.stop(timeout=5)
+    assert service.backups == 1 and service.skipped >= 1 and service.errors == 0
@@ -0,0 +1,141 @@
+import datetime
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.backend.main import app
+from app.core import balances, repository
+from app.core.db import Base, create_async_db_engine, get_async_db
+from app.core.models import AccountSnapshot, BalanceRollup, BalanceSnapshot
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def at(minutes):
+    return START + datetime.timedelta(minutes=minutes)
+
+
+def ccxt_balance(**totals):
+    # Exchanges list every asset, held or not
+    totals = {"BNB": 0.0, "ETH": 0.0, **totals}
+    return {"free": dict(totals), "used": {asset: 0.0 for asset in totals}, "total": dict(totals)}
+
+
+def test_only_changed_assets_are_stored(db_session):
+    repository.save_account_snapshot(db_session, ccxt_balance(USDT=100.0, BTC=1.0), timestamp=at(0))
+    repository.save_account_snapshot(db_session, ccxt_balance(USDT=100.0, BTC=1.0), timestamp=at(5))
+    repository.save_account_snapshot(db_session, ccxt_balance(USDT=50.0, BTC=1.0), timestamp=at(10))
+    repository.save_account_snapshot(db_session, ccxt_balance(USDT=50.0), timestamp=at(15))
+    repository.save_account_snapshot(db_session, {"USDT": 50.0}, timestamp=at(20))
+
+    rows = [(r.asset, r.total) for r in db_session.query(BalanceSnapshot).order_by(BalanceSnapshot.id)]
+    assert rows == [("BTC", 1.0), ("USDT", 100.0), ("USDT", 50.0), ("BTC", 0.0)]
+    assert balances.latest_balances(db_session) == {"BTC": (0.0, 0.0, 0.0), "USDT": (50.0, 0.0, 50.0)}
+    assert balances.latest_balances(db_session, before=at(12)) == {"BTC": (1.0, 0.0, 1.0), "USDT": (50.0, 0.0, 50.0)}
+
+
+def test_rollups_carry_balances_forward(db_session):
+    db_session.add_all(
+        BalanceSnapshot(timestamp=at(minutes), asset="USDT", free=total, used=0.0, total=total)
+        for minutes, total in [(10, 100.0), (20, 300.0), (30, 50.0), (70, 80.0)]
+    )
+    db_session.commit()
+
+    # Only complete hours are rolled up, and a second run adds nothing
+    assert balances.rollup(db_session, "1h", at(60 * 3 + 5)) == 3
+    assert balances.rollup(db_session, "1h", at(60 * 3 + 5)) == 0
+    assert balances.rollup(db_session, "1d", at(60 * 3 + 5)) == 0
+    rows = db_session.query(BalanceRollup).order_by(BalanceRollup.bucket).all()
+    assert [(r.open, r.high, r.low, r.close, r.changes) for r in rows] == [
+        (0.0, 300.0, 0.0, 50.0, 3),
+        (50.0, 80.0, 50.0, 80.0, 1),
+        (80.0, 80.0, 80.0, 80.0, 0),  # no change in the third hour
+    ]
+    assert balances.as_utc(rows[-1].bucket) == at(120)
+
+    # A later run continues after the last stored bucket
+    assert balances.rollup(db_session, "1h", at(60 * 5)) == 2
+    assert balances.rollup(db_session, "1d", START + datetime.timedelta(days=1)) == 1
+
+
+def test_resolution_follows_window_length():
+    assert balances.choose_resolution(START, START + datetime.timedelta(days=2)) == "raw"
+    assert balances.choose_resolution(START, START + datetime.timedelta(days=30)) == "1h"
+    assert balances.choose_resolution(START, START + datetime.timedelta(days=365)) == "1d"
+    assert balances.choose_resolution(START, START + datetime.timedelta(days=5000)) == "1d"
+
+
+def test_legacy_snapshots_are_converted(db_session):
+    db_session.add_all([
+        AccountSnapshot(timestamp=at(0), balance=ccxt_balance(USDT=10.0)),
+        AccountSnapshot(timestamp=at(1), balance=ccxt_balance(USDT=10.0)),
+        AccountSnapshot(timestamp=at(2), balance=ccxt_balance(USDT=20.0)),
+    ])
+    db_session.commit()
+
+    assert balances.import_account_snapshots(db_session, batch_size=2) == 3
+    assert db_session.query(AccountSnapshot).count() == 0
+    assert [r.total for r in db_session.query(BalanceSnapshot).order_by(BalanceSnapshot.id)] == [10.0, 20.0]
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path):
+    url = f"sqlite:///{tmp_path / 'balances.db'}"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(sync_engine)
+    session_factory = sessionmaker(bind=sync_engine)
+    with session_factory() as session:
+        # Five days of hourly changes
+        session.execute(insert(BalanceSnapshot), [
+            {"timestamp": at(60 * hour + 30), "asset": "USDT", "free": float(hour), "used": 0.0, "total": float(hour)}
+            for hour in range(1, 24 * 5)
+        ] + [{"timestamp": at(1), "asset": "BTC", "free": 1.0, "used": 0.0, "total": 1.0}])
+        session.commit()
+    balances.rollup_all(session_factory, until=at(60 * 24 * 5))
+    sync_engine.dispose()
+
+    engine = create_async_db_engine(url)
+    async_session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override():
+        async with async_session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_history_reads_the_resolution_of_the_window(client):
+    latest = (await client.get("/api/v1/balances/")).json()
+    assert [(b["asset"], b["total"]) for b in latest] == [("BTC", 1.0), ("USDT", 119.0)]
+
+    # A short window returns raw changes, led by the balances at its start
+    params = {"since": at(60 * 10).isoformat(), "until": at(60 * 12).isoformat()}
+    response = await client.get("/api/v1/balances/history", params=params)
+    body = response.json()
+    assert body["resolution"] == "raw"
+    assert [(p["asset"], p["total"]) for p in body["points"]] == [
+        ("BTC", 1.0), ("USDT", 9.0), ("USDT", 10.0), ("USDT", 11.0),
+    ]
+    assert (await client.get("/api/v1/balances/history", params=params,
+                             headers={"If-None-Match": response.headers["ETag"]})).status_code == 304
+
+    # Five days come from the hourly rollups
+    params = {"since": START.isoformat(), "until": at(60 * 24 * 5).isoformat(), "asset": "USDT"}
+    body = (await client.get("/api/v1/balances/history", params=params)).json()
+    assert body["resolution"] == "1h"
+    assert len(body["points"]) == 24 * 5 - 1
+    assert body["points"][0]["open"] == 0.0 and body["points"][0]["total"] == 1.0
+
+    body = (await client.get("/api/v1/balances/history", params={**params, "resolution": "1d"})).json()
+    assert [p["total"] for p in body["points"]] == [23.0, 47.0, 71.0, 95.0, 119.0]
+
+    params = {"since": at(60).isoformat(), "until": START.isoformat()}
+    assert (await client.get("/api/v1/balances/history", params=params)).status_code == 400
@@ -0,0 +1,85 @@
+import math
+import numpy as np
+import pytest
+from unittest.mock import AsyncMock
+from app.adapters.rate_limiter import RateLimiter
+from app.providers.base import Tickers
+from app.providers.binance_provider import BinanceProvider
+from app.providers.ccxt_provider import CCXTProvider
+from app.providers.simulated_provider import SimulatedProvider
+
+
+def ticker(symbol, last):
+    return {"symbol": symbol, "timestamp": 1_700_000_000_000, "last": last, "bid": last - 1,
+            "ask": last + 1, "baseVolume": 10.0, "quoteVolume": None}
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_is_one_weighted_request():
+    provider = BinanceProvider(api_key=None, secret=None)
+    symbols = [f"C{i}/USDT" for i in range(30)]
+    provider.exchange.fetch_tickers = AsyncMock(
+        return_value={s: ticker(s, 100.0 + i) for i, s in enumerate(reversed(symbols))}
+    )
+    provider.exchange.fetch_ticker = AsyncMock()
+    provider.rate_limiter.acquire = AsyncMock()
+    try:
+        tickers = await provider.fetch_tickers(symbols)
+    finally:
+        await provider.close()
+
+    provider.exchange.fetch_tickers.assert_awaited_once_with(symbols)
+    provider.exchange.fetch_ticker.assert_not_called()
+    provider.rate_limiter.acquire.assert_awaited_once_with("fetch_tickers", weight=40)
+    # Columns follow the requested order; missing values are NaN
+    assert tickers.symbols == symbols
+    assert tickers.last[0] == 129.0 and tickers.bid[-1] == 99.0
+    assert math.isnan(tickers.quote_volume[0])
+    assert tickers.row("C0/USDT")["ask"] == 130.0
+
+
+@pytest.mark.asyncio
+async def test_per_symbol_fallback_omits_failed_symbols():
+    provider = CCXTProvider("kraken", rate_limiter=RateLimiter(calls=1000, period=1.0))
+    provider.exchange.has = {**provider.exchange.has, "fetchTickers": False}
+
+    async def fetch_ticker(symbol):
+        if symbol == "BAD/USD":
+            raise ValueError("unknown symbol")
+        return ticker(symbol, 5.0)
+
+    provider.exchange.fetch_ticker = fetch_ticker
+    try:
+        tickers = await provider.fetch_tickers(["A/USD", "BAD/USD", "B/USD"])
+    finally:
+        await provider.close()
+
+    assert isinstance(tickers, Tickers)
+    assert tickers.symbols == ["A/USD", "B/USD"] and "BAD/USD" not in tickers
+    np.testing.assert_array_equal(tickers.last, [5.0, 5.0])
+
+
+@pytest.mark.asyncio
+async def test_fetch_ohlcv_many_returns_arrays_per_symbol():
+    provider = SimulatedProvider()
+    candles = np.array([[60_000 * i, 1.0, 2.0, 0.5, 1.5 + i, 10.0] for i in range(5)])
+    provider.load_history("BTC/USDT", "1m", candles)
+    provider.load_history("ETH/USDT", "1m", candles * 2)
+    for i in range(5):
+        provider.feed_candle("BTC/USDT", candles[i], index=i)
+    provider.feed_candle("ETH/USDT", candles[0] * 2, index=0)
+
+    result = await provider.fetch_ohlcv_many(["BTC/USDT", "ETH/USDT", "XRP/USDT"], "1m", limit=3)
+
+    assert list(result) == ["BTC/USDT", "ETH/USDT"]
+    assert result["BTC/USDT"].shape == (3, 6) and result["BTC/USDT"].dtype == np.float64
+    np.testing.assert_array_equal(result["BTC/USDT"][:, 4], [3.5, 4.5, 5.5])
+    assert result["ETH/USDT"].shape == (1, 6)
+
+    tickers = await provider.fetch_tickers(["BTC/USDT", "XRP/USDT"])
+    assert tickers.symbols == ["BTC/USDT"] and tickers.last[0] == 5.5
+
+
+def test_binance_ticker_weight_steps():
+    provider = BinanceProvider(api_key=None, secret=None)
+    assert [provider.tickers_weight(n) for n in (1, 20, 21, 100, 101)] == [2, 2, 40, 40, 80]
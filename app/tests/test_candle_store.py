@@ -0,0 +1,110 @@
+import os
+import numpy as np
+import pytest
+from app.bot.backfill import backfill
+from app.core.candle_store import CandleStore
+
+MINUTE = 60_000
+START = 1_700_000_000_000
+
+
+def make_candles(first: int, count: int):
+    return [[START + (first + i) * MINUTE, 1.0, 2.0, 0.5, 1.5 + first + i, 10.0] for i in range(count)]
+
+
+class PagingProvider:
+    def __init__(self, candles):
+        self.candles = candles
+        self.calls = []
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=100):
+        self.calls.append(since)
+        return [c for c in self.candles if c[0] >= since][:limit]
+
+
+def test_append_and_memory_mapped_range_read(tmp_path):
+    store = CandleStore(str(tmp_path))
+    assert store.write("binance", "BTC/USDT", "1m", make_candles(0, 10)) == 10
+    assert store.write("binance", "BTC/USDT", "1m", make_candles(8, 5)) == 3
+
+    columns = store.read("binance", "BTC/USDT", "1m", start=START + 2 * MINUTE, end=START + 5 * MINUTE)
+    assert list(columns.timestamp) == [START + i * MINUTE for i in (2, 3, 4)]
+    assert isinstance(columns.close.base, np.memmap)
+    assert store.count("binance", "BTC/USDT", "1m") == 13
+
+
+def test_gap_fill_rewrites_in_order(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write("binance", "BTC/USDT", "1m", make_candles(0, 3) + make_candles(6, 3))
+    assert store.find_gaps("binance", "BTC/USDT", "1m") == [(START + 3 * MINUTE, START + 6 * MINUTE)]
+
+    assert store.write("binance", "BTC/USDT", "1m", make_candles(2, 5)) == 3
+    ohlcv = store.read_ohlcv("binance", "BTC/USDT", "1m")
+    assert list(ohlcv[:, 0]) == [START + i * MINUTE for i in range(9)]
+    assert store.find_gaps("binance", "BTC/USDT", "1m") == []
+
+
+def test_partial_append_is_truncated(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write("binance", "BTC/USDT", "1m", make_candles(0, 4))
+    directory = store.series_dir("binance", "BTC/USDT", "1m")
+    with open(f"{directory}/close.bin", "ab") as f:
+        f.write(b"\x00" * 12)  # interrupted write
+
+    assert store.count("binance", "BTC/USDT", "1m") == 4
+    store.write("binance", "BTC/USDT", "1m", make_candles(4, 1))
+    assert list(store.read("binance", "BTC/USDT", "1m").close) == [1.5 + i for i in range(5)]
+
+
+def test_rewrite_interrupted_mid_swap_is_recovered(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write("binance", "BTC/USDT", "1m", make_candles(0, 3) + make_candles(6, 3))
+    directory = store.series_dir("binance", "BTC/USDT", "1m")
+    # Crash after the series was moved aside, before the rewritten copy was moved in
+    os.replace(directory, directory + ".old")
+    os.makedirs(directory + ".tmp")
+    with open(f"{directory}.tmp/timestamp.bin", "wb") as f:
+        f.write(b"\x00" * 8)
+
+    assert store.count("binance", "BTC/USDT", "1m") == 6
+    assert store.write("binance", "BTC/USDT", "1m", make_candles(3, 3)) == 3
+    assert list(store.read("binance", "BTC/USDT", "1m").close) == [1.5 + i for i in range(9)]
+    assert not os.path.exists(directory + ".old") and not os.path.exists(directory + ".tmp")
+
+
+@pytest.mark.asyncio
+async def test_backfill_pages_through_missing_ranges(tmp_path):
+    store = CandleStore(str(tmp_path))
+    store.write("binance", "BTC/USDT", "1m", make_candles(10, 5))
+    provider = PagingProvider(make_candles(0, 30))
+
+    written = await backfill(provider, store, "binance", "BTC/USDT", "1m",
+                             start=START, end=START + 30 * MINUTE, page_limit=4)
+
+    assert written == 25
+    assert store.count("binance", "BTC/USDT", "1m") == 30
+    assert provider.calls[0] == START
+
+
+class CountingStore(CandleStore):
+    rewrites = 0
+
+    def _rewrite(self, *args):
+        self.rewrites += 1
+        return super()._rewrite(*args)
+
+
+@pytest.mark.asyncio
+async def test_history_fill_rewrites_once_and_overlaps_append(tmp_path):
+    store = CountingStore(str(tmp_path))
+    store.write("binance", "BTC/USDT", "1m", make_candles(20, 5))
+    # Already stored candles plus new ones past the end
+    assert store.write("binance", "BTC/USDT", "1m", make_candles(22, 5)) == 2
+    assert store.rewrites == 0
+
+    provider = PagingProvider(make_candles(0, 20))
+    written = await backfill(provider, store, "binance", "BTC/USDT", "1m",
+                             start=START, end=START + 20 * MINUTE, page_limit=4)
+    assert written == 20 and len(provider.calls) == 5
+    assert store.rewrites == 1
+    assert list(store.read("binance", "BTC/USDT", "1m").close) == [1.5 + i for i in range(27)]
@@ -0,0 +1,164 @@
+import math
+import numpy as np
+import pytest
+from app.bot.indicators import RSI, SMA, BollingerBands
+from app.bot.strategies.dca import DCAStrategy
+from app.bot.strategy import AbstractStrategy
+from app.core.checkpoint import (
+    CheckpointError, DatabaseCheckpointStore, FileCheckpointStore, decode_checkpoint, encode_checkpoint,
+)
+from app.core.models import StrategyCheckpoint  # noqa: F401
+from app.providers.simulated_provider import SimulatedProvider
+
+
+def test_encoding_round_trips_floats_and_arrays():
+    state = {
+        "nan": math.nan, "inf": -math.inf, "tiny": 5e-324, "big": 2 ** 70, "flags": (True, False, None),
+        "text": "ü", "raw": b"\x00\x01", "nested": [{1: [1.5]}], "array": np.arange(6, dtype=np.float32).reshape(2, 3),
+    }
+    data = encode_checkpoint(state, version=3)
+    version, restored = decode_checkpoint(data)
+
+    assert version == 3
+    assert math.isnan(restored.pop("nan")) and math.isnan(state.pop("nan"))
+    array = restored.pop("array")
+    assert array.dtype == np.float32 and array.tolist() == state.pop("array").tolist()
+    assert restored == state
+
+    corrupted = bytearray(data)
+    corrupted[-1] ^= 0xFF
+    with pytest.raises(CheckpointError, match="checksum"):
+        decode_checkpoint(bytes(corrupted))
+    with pytest.raises(CheckpointError):
+        decode_checkpoint(b"SCKP")
+    with pytest.raises(CheckpointError):
+        encode_checkpoint({"set": {1, 2}}, version=1)
+
+
+def test_restored_indicators_continue_exactly():
+    closes = 100 + np.cumsum(np.random.default_rng(7).normal(size=200))
+    live = [SMA(20), RSI(14), BollingerBands(20)]
+    for close in closes[:150]:
+        for indicator in live:
+            indicator.update(close)
+
+    _, states = decode_checkpoint(encode_checkpoint([i.get_state() for i in live], version=1))
+    restored = [SMA(20), RSI(14), BollingerBands(20)]
+    for indicator, state in zip(restored, states):
+        indicator.set_state(state)
+    for close in closes[150:]:
+        for a, b in zip(live, restored):
+            assert a.update(close) == b.update(close)
+
+    with pytest.raises(ValueError):
+        SMA(10).set_state(live[0].get_state())
+
+
+class RecordingStore(FileCheckpointStore):
+    """Notes how many orders the exchange had when each checkpoint was written."""
+
+    def __init__(self, directory, provider):
+        super().__init__(directory)
+        self.provider = provider
+        self.orders_at_save = []
+
+    def save(self, name, data):
+        self.orders_at_save.append(len(self.provider.orders))
+        super().save(name, data)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("execution", [None, {"algorithm": "twap", "duration": 0.02, "slices": 2}])
+async def test_dca_restart_does_not_buy_again(tmp_path, execution):
+    provider = SimulatedProvider({"USDT": 10_000.0})
+    provider.feed_price("BTC/USDT", 100.0)
+    store = RecordingStore(str(tmp_path), provider)
+    config = {"name": "dca-btc", "symbol": "BTC/USDT", "amount": 0.1, "interval_seconds": 3600}
+    if execution:
+        config["execution"] = execution
+
+    first = DCAStrategy(config, provider, None)
+    first.checkpoints = store
+    await first.restore()
+    await first.on_tick()
+    if first.working is not None:
+        await first.working
+    assert len(provider.orders) == (2 if execution else 1)
+    # The buy time was stored before any order went out
+    assert store.orders_at_save[0] == 0
+
+    # A new process: state comes back from the checkpoint written before the buy
+    second = DCAStrategy(config, provider, None)
+    second.checkpoints = store
+    assert await second.restore()
+    await second.on_tick()
+    assert len(provider.orders) == (2 if execution else 1)
+    assert second.last_buy_time == first.last_buy_time
+    # Unchanged state is not written again
+    assert not await second.checkpoint(force=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("execution", [None, {"algorithm": "twap", "duration": 0.02, "slices": 2}])
+async def test_dca_failed_buy_is_retried_after_restart(tmp_path, execution):
+    provider = SimulatedProvider({"USDT": 0.0})
+    provider.feed_price("BTC/USDT", 100.0)
+    config = {"name": "dca-btc", "symbol": "BTC/USDT", "amount": 0.1, "interval_seconds": 3600}
+    if execution:
+        config["execution"] = execution
+
+    strategy = DCAStrategy(config, provider, None)
+    strategy.checkpoints = FileCheckpointStore(str(tmp_path))
+    await strategy.on_tick()
+    if strategy.working is not None:
+        await strategy.working
+
+    assert strategy.last_buy_time == 0
+    assert decode_checkpoint(strategy.checkpoints.load("dca-btc")) == (1, {"last_buy_time": 0})
+
+
+class VersionedStrategy(AbstractStrategy):
+    state_version = 2
+
+    def __init__(self, store):
+        super().__init__({"name": "versioned"}, None, None)
+        self.checkpoints = store
+        self.checkpoint_interval = 3600.0
+        self.state = {}
+
+    def get_state(self):
+        return self.state
+
+    def set_state(self, state):
+        self.state = state
+
+    def migrate_state(self, state, version):
+        return {"count": state["n"]} if version == 1 else None
+
+    async def on_candle(self, candle):
+        pass
+
+    async def on_tick(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_older_versions_migrate_and_newer_are_discarded(session_factory):
+    store = DatabaseCheckpointStore(session_factory)
+
+    store.save("versioned", encode_checkpoint({"n": 4}, version=1))
+    strategy = VersionedStrategy(store)
+    assert await strategy.restore()
+    assert strategy.state == {"count": 4}
+
+    # The interval throttles unforced checkpoints after the first
+    assert await strategy.checkpoint()
+    strategy.state = {"count": 5}
+    assert not await strategy.checkpoint()
+    assert await strategy.checkpoint(force=True)
+    assert decode_checkpoint(store.load("versioned")) == (2, {"count": 5})
+
+    store.save("versioned", encode_checkpoint({"anything": 1}, version=3))
+    fresh = VersionedStrategy(store)
+    assert not await fresh.restore()
+    assert fresh.state == {}
@@ -0,0 +1,135 @@
+import asyncio
+import pytest
+from app.bot.execution import TWAP, Iceberg, LimitChase, build_algorithm
+from app.bot.trade_engine import TradeEngine
+from app.core.models import Trade
+from app.providers.simulated_provider import SimulatedProvider
+
+
+class QuotedProvider(SimulatedProvider):
+    """Simulated exchange with a settable bid/ask and batch order endpoints."""
+
+    def __init__(self, *args, quote=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.quote = quote
+        self.calls = {"place_orders": [], "cancel_orders": []}
+
+    async def fetch_ticker(self, symbol):
+        ticker = await super().fetch_ticker(symbol)
+        if self.quote is not None:
+            ticker["bid"], ticker["ask"] = self.quote
+        return ticker
+
+    async def place_orders(self, orders):
+        self.calls["place_orders"].append(len(orders))
+        return await super().place_orders(orders)
+
+    async def cancel_orders(self, order_ids, symbol=None):
+        self.calls["cancel_orders"].append(len(order_ids))
+        return await super().cancel_orders(order_ids, symbol)
+
+    def supports(self, capability):
+        return capability in ("createOrders", "cancelOrders") or super().supports(capability)
+
+
+@pytest.mark.asyncio
+async def test_twap_slices_market_children_and_reports_slippage(session_factory):
+    provider = SimulatedProvider({"USDT": 10_000.0}, slippage_bps=10.0)
+    provider.feed_price("BTC/USDT", 100.0)
+    engine = TradeEngine(provider, session_factory)
+
+    parent = await engine.execute("BTC/USDT", "buy", 2.0, TWAP(duration=0.04, slices=4), poll_interval=0.01)
+
+    assert parent.status == "closed"
+    assert len(parent.children) == 4
+    assert parent.filled == pytest.approx(2.0)
+    assert parent.arrival_price == 100.0
+    assert parent.slippage_bps == pytest.approx(10.0)
+    with session_factory() as session:
+        trades = session.query(Trade).all()
+        assert [t.amount for t in trades] == pytest.approx([0.5] * 4)
+        assert all(t.status == "closed" for t in trades)
+
+
+@pytest.mark.asyncio
+async def test_iceberg_shows_one_clip_at_a_time(session_factory):
+    provider = SimulatedProvider({"USDT": 10_000.0}, maker_fee=0.0)
+    provider.feed_price("BTC/USDT", 100.0)
+    engine = TradeEngine(provider, session_factory)
+
+    task = asyncio.create_task(
+        engine.execute("BTC/USDT", "buy", 3.0, Iceberg(display=1.0, price=99.0), poll_interval=0.01)
+    )
+    visible = []
+    while not task.done():
+        await asyncio.sleep(0.02)
+        visible.append(sum(o["remaining"] for o in await provider.fetch_open_orders("BTC/USDT")))
+        provider.feed_price("BTC/USDT", 99.0, volume=0.6)
+    parent = await task
+
+    assert max(visible) <= 1.0
+    assert parent.status == "closed"
+    assert parent.filled == pytest.approx(3.0)
+    assert len(parent.children) == 3
+    assert parent.average_price == pytest.approx(99.0)
+    assert parent.slippage_bps == pytest.approx(-100.0)
+    with session_factory() as session:
+        assert [t.status for t in session.query(Trade).all()] == ["closed"] * 3
+
+
+@pytest.mark.asyncio
+async def test_limit_chase_follows_the_bid_up_to_the_cap_then_goes_to_market():
+    provider = QuotedProvider({"USDT": 10_000.0}, quote=(100.0, 100.1))
+    provider.feed_price("BTC/USDT", 101.0)
+    engine = TradeEngine(provider, None)
+    chase = LimitChase(reprice_interval=0.01, max_chase_bps=20.0, timeout=0.15)
+
+    task = asyncio.create_task(engine.execute("BTC/USDT", "buy", 1.0, chase, poll_interval=0.01))
+    await asyncio.sleep(0.04)
+    provider.quote = (100.1, 100.2)
+    await asyncio.sleep(0.04)
+    provider.quote = (101.0, 101.1)
+    parent = await task
+
+    prices = [child.get("price") for child in parent.children.values()]
+    cap = 100.05 * 1.002
+    assert prices[0] == 100.0 and 100.1 in prices
+    assert max(p for p in prices[:-1]) == pytest.approx(cap)
+    # Nothing rested at the cap filled, so the rest went to market at the last price
+    assert parent.status == "closed"
+    assert parent.average_price == pytest.approx(101.0)
+    assert not await provider.fetch_open_orders("BTC/USDT")
+
+
+@pytest.mark.asyncio
+async def test_children_go_out_and_are_canceled_in_batches():
+    provider = QuotedProvider({"USDT": 10_000.0})
+    provider.feed_price("BTC/USDT", 100.0)
+    engine = TradeEngine(provider, None)
+    algorithm = build_algorithm(
+        {"algorithm": "iceberg", "display": 1.0, "price": 95.0, "levels": 3, "level_step_bps": 10, "timeout": 0.05}
+    )
+
+    parent = await engine.execute("BTC/USDT", "buy", 5.0, algorithm, poll_interval=0.01)
+
+    assert provider.calls == {"place_orders": [3], "cancel_orders": [3]}
+    assert sorted(child["price"] for child in parent.children.values()) == pytest.approx(
+        [95.0 * (1 - 0.002), 95.0 * (1 - 0.001), 95.0]
+    )
+    assert parent.status == "canceled" and parent.filled == 0.0
+    assert (await provider.fetch_balance())["used"]["USDT"] == pytest.approx(0.0)
+    with pytest.raises(ValueError):
+        build_algorithm({"algorithm": "vwap"})
+
+
+@pytest.mark.asyncio
+async def test_execute_sell_records_a_sell(session_factory):
+    provider = SimulatedProvider({"BTC": 1.0, "USDT": 0.0})
+    provider.feed_price("BTC/USDT", 100.0)
+
+    order = await TradeEngine(provider, session_factory).execute_sell("BTC/USDT", 0.5)
+
+    assert order["status"] == "closed"
+    with session_factory() as session:
+        trade = session.query(Trade).one()
+        assert (trade.side, trade.amount, trade.price) == ("sell", 0.5, 100.0)
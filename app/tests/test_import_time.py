@@ -0,0 +1,31 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from benchmarks.bench_import import DEFERRED, IMPORT_BUDGETS, import_profile
+from app.core import secret_manager
+
+
+# The time budgets themselves are checked by benchmarks/bench_import.py, not on shared CI machines
+@pytest.mark.parametrize("module", sorted(IMPORT_BUDGETS))
+def test_entry_point_defers_heavy_imports(module):
+    _, loaded = import_profile(module)
+    assert not [name for name in DEFERRED if name in loaded], "heavy dependency imported eagerly"
+
+
+def test_secrets_share_one_client_and_are_fetched_together(monkeypatch):
+    client = MagicMock()
+    client.access_secret_version.side_effect = lambda request: MagicMock(
+        payload=MagicMock(data=request["name"].split("/")[3].upper().encode())
+    )
+
+    def slow_build():
+        time.sleep(0.05)  # every fetch thread misses the client while the first one builds it
+        return client
+
+    monkeypatch.setattr(secret_manager, "_client", None)
+    with patch("google.cloud.secretmanager.SecretManagerServiceClient", side_effect=slow_build) as build:
+        values = secret_manager.get_secrets(["key", "secret", "key", "token", "salt"], project_id="proj")
+        assert secret_manager.get_secret("other", project_id="proj") == "OTHER"
+
+    assert values == {"key": "KEY", "secret": "SECRET", "token": "TOKEN", "salt": "SALT"}
+    assert build.call_count == 1 and client.access_secret_version.call_count == 5
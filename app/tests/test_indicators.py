@@ -0,0 +1,74 @@
+import math
+import numpy as np
+import pytest
+from app.bot import indicators
+from app.bot.indicators import ATR, EMA, RSI, SMA, BollingerBands
+
+
+@pytest.fixture
+def candles():
+    rng = np.random.default_rng(7)
+    close = 30_000 * np.exp(np.cumsum(rng.normal(0, 0.002, 5000)))
+    spread = np.abs(rng.normal(0, 0.001, len(close))) * close
+    high = close + spread
+    low = close - spread * rng.uniform(0.5, 1.5, len(close))
+    # A flat stretch exercises zero-loss RSI and zero-width bands
+    close[1000:1100] = close[999]
+    high[1000:1100] = low[1000:1100] = close[999]
+    return high, low, close
+
+
+def stream(indicator, *columns):
+    return np.array([indicator.update(*values) for values in zip(*columns)], dtype=np.float64)
+
+
+def assert_same(incremental, vectorized):
+    assert np.array_equal(np.isnan(incremental), np.isnan(vectorized))
+    np.testing.assert_allclose(incremental, vectorized, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("period", [1, 2, 14, 50, 200])
+def test_incremental_matches_vectorized(candles, period):
+    high, low, close = candles
+    assert_same(stream(SMA(period), close), indicators.sma(close, period))
+    assert_same(stream(EMA(period), close), indicators.ema(close, period))
+    assert_same(stream(RSI(period), close), indicators.rsi(close, period))
+    assert_same(stream(ATR(period), high, low, close), indicators.atr(high, low, close, period))
+
+    bands = BollingerBands(period, k=2.0)
+    rows = np.array([bands.update(c) for c in close])
+    for column, expected in zip(rows.T, indicators.bollinger(close, period, k=2.0)):
+        assert_same(column, expected)
+
+
+def test_known_values():
+    close = [1.0, 2.0, 3.0, 4.0, 5.0]
+    np.testing.assert_array_equal(indicators.sma(close, 3), [np.nan, np.nan, 2.0, 3.0, 4.0])
+    # Seeded with the SMA, then alpha = 2 / (3 + 1)
+    np.testing.assert_allclose(indicators.ema(close, 3), [np.nan, np.nan, 2.0, 3.0, 4.0])
+    assert indicators.rsi(close, 3)[-1] == 100.0
+    assert indicators.rsi([5.0, 5.0, 5.0, 5.0], 3)[-1] == 50.0
+    middle, upper, lower = indicators.bollinger([1.0, 3.0], 2, k=1.0)
+    assert (middle[-1], upper[-1], lower[-1]) == (2.0, 3.0, 1.0)
+    assert np.isnan(indicators.sma([1.0, 2.0], 3)).all()
+
+
+def test_update_candle_and_ready():
+    atr = ATR(2)
+    assert not atr.ready
+    atr.update_candle({"high": 11.0, "low": 9.0, "close": 10.0})
+    value = atr.update_candle({"high": 12.0, "low": 10.0, "close": 11.0})
+    assert atr.ready and value == pytest.approx(2.0)
+    with pytest.raises(ValueError):
+        SMA(0)
+
+
+def test_state_is_fixed_size():
+    sma, bands = SMA(20), BollingerBands(20)
+    for i in range(100_000):
+        sma.update(50_000 + math.sin(i))
+        bands.update(50_000 + math.sin(i))
+    assert len(sma._window.values) == len(bands._window.values) == 20
+    # Running sums stay exact over long streams
+    expected = np.mean([50_000 + math.sin(i) for i in range(100_000 - 20, 100_000)])
+    assert sma.value == pytest.approx(expected, rel=1e-12)
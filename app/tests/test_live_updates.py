@@ -0,0 +1,228 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.backend.live import ChangeFeed, live_feed
+from app.backend.main import app
+from app.core import repository
+from app.core.change_notifications import ChangeNotifier, serve_change_notifications
+from app.core.db import Base, create_async_db_engine, get_async_session_factory
+from app.core.events import EventBus
+
+
+def drain(subscription):
+    events = list(subscription.buffer)
+    subscription.buffer.clear()
+    return [(event.type, event.data) for event in events]
+
+
+@pytest_asyncio.fixture
+async def database(tmp_path):
+    url = f"sqlite:///{tmp_path / 'trades.db'}"
+    engine = create_async_db_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # Writes go through the sync repository like the bot's, bumping the table versions
+    yield async_sessionmaker(engine, expire_on_commit=False), sessionmaker(bind=create_engine(url))
+    await engine.dispose()
+
+
+def test_bus_evicts_slow_consumers_and_replays_missed_events():
+    bus = EventBus(max_buffer=2, replay=3)
+    slow = bus.subscribe()
+    trades = bus.subscribe(types=["trade"])
+
+    for n in range(3):
+        bus.publish("position", {"n": n})
+    assert slow.closed_reason == "slow consumer" and slow not in bus.subscribers
+    assert not trades.buffer and bus.stats()["evicted"] == 1
+
+    resumed = bus.subscribe(after=1)
+    assert [event.seq for event in resumed.buffer] == [2, 3]
+    # Event 1 is still in the history but 0 asks for more than the buffer holds
+    assert [event.type for event in bus.subscribe(after=0).buffer] == ["reset"]
+    bus.publish("trade", {"n": 3})
+    # From a previous process: its sequence numbers mean nothing here
+    assert [event.type for event in bus.subscribe(after=99).buffer] == ["reset"]
+    assert [event.data for event in trades.buffer] == [{"n": 3}]
+
+
+@pytest.mark.asyncio
+async def test_feed_reads_each_change_once_for_all_subscribers(database):
+    async_factory, sync_factory = database
+    with sync_factory() as session:
+        repository.save_trade(session, {"provider": "paper", "symbol": "ETH/USDT", "side": "buy", "amount": 1.0,
+                                        "price": 10.0, "status": "closed", "exchange_order_id": "0"})
+
+    bus = EventBus()
+    feed = ChangeFeed(bus, poll_interval=3600)
+    await feed.ensure_started(async_factory)
+    subscribers = [bus.subscribe() for _ in range(50)]
+    try:
+        with sync_factory() as session:
+            trade = repository.save_trade(session, {
+                "provider": "paper", "symbol": "BTC/USDT", "side": "buy", "amount": 2.0, "price": 100.0,
+                "status": "open", "exchange_order_id": "1",
+            })
+        async with async_factory() as session:
+            await feed.poll(session)
+            await feed.poll(session)
+        assert feed.reads == 1
+        events = [drain(s) for s in subscribers]
+        assert events[0] == events[-1]
+        assert [(kind, data["id"], data["status"]) for kind, data in events[0]] == [("trade", trade.id, "open")]
+
+        # The open trade fills: its row changes, and the fill moves the position and daily PnL
+        with sync_factory() as session:
+            repository.update_trade(session, trade.id, status="closed", price=99.0)
+            repository.apply_fill(session, "BTC/USDT", "buy", 2.0, 99.0, fee=0.1)
+        async with async_factory() as session:
+            await feed.poll(session)
+        assert feed.reads == 4
+        kinds = {kind: data for kind, data in drain(subscribers[0])}
+        assert kinds["trade"]["status"] == "closed" and kinds["trade"]["price"] == 99.0
+        assert kinds["position"]["size"] == 2.0
+        assert kinds["pnl"]["symbol"] == "BTC/USDT" and kinds["pnl"]["fees"] == pytest.approx(0.1)
+    finally:
+        await feed.stop()
+
+
+@pytest.mark.asyncio
+async def test_feed_picks_up_trades_committed_out_of_order(database):
+    async_factory, sync_factory = database
+
+    def commit(trade_id):
+        with sync_factory() as session:
+            repository.save_trade(session, {"id": trade_id, "provider": "paper", "symbol": "BTC/USDT", "side": "buy",
+                                            "amount": 1.0, "price": 100.0, "status": "closed",
+                                            "exchange_order_id": str(trade_id)})
+
+    commit(1)
+    bus = EventBus()
+    feed = ChangeFeed(bus, poll_interval=3600)
+    await feed.ensure_started(async_factory)
+    subscription = bus.subscribe()
+    try:
+        # Another writer took id 2 first but commits after id 3
+        for trade_id in (3, 2):
+            commit(trade_id)
+            async with async_factory() as session:
+                await feed.poll(session)
+        commit(4)
+        async with async_factory() as session:
+            await feed.poll(session)
+    finally:
+        await feed.stop()
+    assert [data["id"] for _, data in drain(subscription)] == [3, 2, 4]
+
+
+async def asgi(scope, messages, stop_when):
+    """Run the app on one request, feeding it `messages` then a disconnect once stop_when(sent)."""
+    sent = []
+    done = asyncio.Event()
+    incoming = list(messages)
+
+    async def receive():
+        if incoming:
+            return incoming.pop(0)
+        await done.wait()
+        return {"type": scope["type"] + ".disconnect", "code": 1000}
+
+    async def send(message):
+        sent.append(message)
+        if stop_when(sent):
+            done.set()
+
+    scope = {"query_string": b"", "headers": [], "path_params": {}, "root_path": "", "scheme": "http",
+             "server": ("test", 80), "client": ("test", 1), **scope}
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+    return sent
+
+
+@pytest_asyncio.fixture
+async def live_app(database):
+    async_factory, sync_factory = database
+    app.dependency_overrides[get_async_session_factory] = lambda: async_factory
+    poll_interval, live_feed.poll_interval = live_feed.poll_interval, 0.02
+    yield sync_factory
+    await live_feed.stop()
+    live_feed.poll_interval = poll_interval
+    app.dependency_overrides.clear()
+
+
+def save_trade(sync_factory, price):
+    with sync_factory() as session:
+        repository.save_trade(session, {"provider": "paper", "symbol": "BTC/USDT", "side": "sell", "amount": 1.0,
+                                        "price": price, "status": "closed", "exchange_order_id": str(price)})
+
+
+@pytest.mark.asyncio
+async def test_sse_stream_pushes_trades(live_app):
+    def body(sent):
+        return b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+
+    request = asyncio.create_task(asgi(
+        {"type": "http", "method": "GET", "path": "/api/v1/live/events", "query_string": b"types=trade",
+         "http_version": "1.1"},
+        [{"type": "http.request", "body": b"", "more_body": False}],
+        lambda sent: body(sent).count(b"event: trade") == 2,
+    ))
+    while not live_feed.running:
+        await asyncio.sleep(0.01)
+    save_trade(live_app, 101.0)
+    save_trade(live_app, 102.0)
+    sent = await request
+
+    assert sent[0]["status"] == 200
+    frames = [frame for frame in body(sent).decode().split("\n\n") if frame.startswith("id:")]
+    prices = [json.loads(frame.split("data: ", 1)[1])["data"]["price"] for frame in frames]
+    assert prices == [101.0, 102.0]
+
+
+@pytest.mark.asyncio
+async def test_websocket_pushes_trades_and_rejects_unknown_types(live_app):
+    texts = lambda sent: [json.loads(m["text"]) for m in sent if m["type"] == "websocket.send"]
+    request = asyncio.create_task(asgi(
+        {"type": "websocket", "path": "/api/v1/live/ws", "query_string": b"types=trade,position", "subprotocols": []},
+        [{"type": "websocket.connect"}],
+        lambda sent: len(texts(sent)) == 1,
+    ))
+    while not live_feed.running:
+        await asyncio.sleep(0.01)
+    save_trade(live_app, 103.0)
+    sent = await request
+    assert sent[0]["type"] == "websocket.accept"
+    assert [(m["type"], m["data"]["price"]) for m in texts(sent)] == [("trade", 103.0)]
+
+    rejected = await asgi(
+        {"type": "websocket", "path": "/api/v1/live/ws", "query_string": b"types=orders", "subprotocols": []},
+        [{"type": "websocket.connect"}], lambda sent: True,
+    )
+    assert rejected[0]["type"] == "websocket.close" and rejected[0]["code"] == 1008
+
+
+@pytest.mark.asyncio
+async def test_bot_commits_wake_the_listener(tmp_path, database):
+    _, sync_factory = database
+    received = []
+    arrived = asyncio.Event()
+
+    def on_change(tables):
+        received.append(tables)
+        arrived.set()
+
+    path = str(tmp_path / "live.sock")
+    server = await serve_change_notifications(path, on_change)
+    notifier = ChangeNotifier(path)
+    notifier.start()
+    try:
+        # Committed on another thread, as the write-behind writer does
+        await asyncio.to_thread(save_trade, sync_factory, 104.0)
+        await asyncio.wait_for(arrived.wait(), timeout=5)
+    finally:
+        await notifier.stop()
+        server.close()
+    assert received == [{"trades"}]
@@ -0,0 +1,81 @@
+import json
+import logging
+import pathlib
+import subprocess
+import sys
+import pytest
+import app.core.logger as logger_module
+from app.core.logger import RateLimitedLogger, get_logger, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    shutdown_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_import_has_no_side_effects(tmp_path):
+    code = "import logging, app.core.logger; print(len(logging.getLogger().handlers))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=tmp_path, capture_output=True, text=True,
+        env={"PYTHONPATH": str(pathlib.Path(__file__).resolve().parents[2])},
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "0"
+    assert not (tmp_path / "logs").exists()
+
+
+def test_queued_json_lines(tmp_path, restore_root_logger):
+    setup_logging(level="INFO", log_format="json", log_dir=str(tmp_path), use_queue=True)
+    logger = get_logger("app.test")
+    logger.debug("not emitted %s", object())
+    logger.info("filled %s at %.2f", "BTC/USDT", 101.5, extra={"order_id": "42"})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("tick failed")
+    shutdown_logging()  # drains the queue
+
+    lines = [json.loads(line) for line in (tmp_path / "app.log").read_text().splitlines()]
+    assert [line["msg"] for line in lines] == ["filled BTC/USDT at 101.50", "tick failed"]
+    assert lines[0]["level"] == "INFO" and lines[0]["logger"] == "app.test" and lines[0]["order_id"] == "42"
+    assert "ValueError: boom" in lines[1]["exc_info"]
+
+
+def test_rate_limited_logger_reports_suppressed_count(caplog, monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(logger_module.time, "monotonic", lambda: clock[0])
+    limited = RateLimitedLogger(logging.getLogger("app.test.limited"), interval=60.0, burst=2)
+
+    with caplog.at_level(logging.ERROR, logger="app.test.limited"):
+        for i in range(10):
+            limited.error("Error in tick for %s: %s", "dca", i)
+        limited.error("a different failure")
+        # Another strategy failing the same way is not hidden behind the first
+        limited.error("Error in tick for %s: %s", "grid", 0)
+        limited.error("Error in tick for %s: %s", "grid", 1)
+        limited.error("Error in tick for %s: %s", "grid", 2)
+        limited.error("Error placing order: %s", ValueError("x"), key="BTC/USDT")
+        limited.error("Error placing order: %s", ValueError("y"), key="ETH/USDT")
+        clock[0] = 61.0
+        limited.error("Error in tick for %s: %s", "dca", 10)
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert messages == [
+        "Error in tick for dca: 0",
+        "Error in tick for dca: 1",
+        "a different failure",
+        "Error in tick for grid: 0",
+        "Error in tick for grid: 1",
+        "Error placing order: x",
+        "Error placing order: y",
+        "Error in tick for dca: 10 [8 similar suppressed]",
+    ]
+    assert caplog.records[-1].suppressed == 8
@@ -0,0 +1,97 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from app.providers.market_data import MarketDataCache, CandleRingBuffer
+import numpy as np
+
+MINUTE = 60_000
+
+
+def make_candles(start: int, count: int):
+    return [[start + i * MINUTE, 1.0, 2.0, 0.5, 1.5, 10.0] for i in range(count)]
+
+
+class FakeProvider:
+    def __init__(self, now_ms: int):
+        self.now_ms = now_ms
+        self.calls = []
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=100):
+        self.calls.append((since, limit))
+        await asyncio.sleep(0.01)
+        open_start = self.now_ms // MINUTE * MINUTE
+        if since is None:
+            since = open_start - (limit - 1) * MINUTE
+        count = min(limit, (open_start - since) // MINUTE + 1)
+        return make_candles(since, count)
+
+
+def test_ring_buffer_wraps_and_keeps_order():
+    buffer = CandleRingBuffer(capacity=5, initial_size=2)
+    buffer.extend(np.array(make_candles(0, 4), dtype=float))
+    buffer.extend(np.array(make_candles(2 * MINUTE, 5), dtype=float))
+    ordered = buffer.to_array()
+    assert buffer.count == 5
+    assert list(ordered[:, 0]) == [i * MINUTE for i in range(2, 7)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced():
+    now_ms = 1_700_000_000_000
+    provider = FakeProvider(now_ms)
+    cache = MarketDataCache(provider, clock=lambda: now_ms / 1000)
+
+    results = await asyncio.gather(*[cache.fetch_ohlcv("BTC/USDT", "1m", limit=50) for _ in range(10)])
+
+    assert len(provider.calls) == 1
+    assert cache.coalesced == 9
+    assert all(r == results[0] for r in results)
+    assert len(results[0]) == 50
+
+
+@pytest.mark.asyncio
+async def test_refresh_only_fetches_tail():
+    now_ms = 1_700_000_000_000
+    provider = FakeProvider(now_ms)
+    clock = MagicMock(return_value=now_ms / 1000)
+    cache = MarketDataCache(provider, clock=clock)
+
+    await cache.fetch_ohlcv("BTC/USDT", "1m", limit=100)
+    provider.now_ms = now_ms + 3 * MINUTE
+    clock.return_value = provider.now_ms / 1000
+    candles = await cache.fetch_ohlcv("BTC/USDT", "1m", limit=100)
+
+    assert provider.calls[1][1] == 4  # three newly closed candles plus the open one
+    assert cache.hits == 1
+    assert candles[-1][0] == provider.now_ms // MINUTE * MINUTE
+    assert len(candles) == 100
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_respects_byte_budget():
+    now_ms = 1_700_000_000_000
+    provider = FakeProvider(now_ms)
+    cache = MarketDataCache(provider, max_bytes=256 * 48 * 2, clock=lambda: now_ms / 1000)
+
+    for symbol in ["A/USDT", "B/USDT", "C/USDT"]:
+        await cache.fetch_ohlcv(symbol, "1m", limit=100)
+
+    assert cache.evictions == 1
+    assert cache.stats()["series"] == 2
+
+
+@pytest.mark.asyncio
+async def test_series_is_warmed_from_candle_store(tmp_path):
+    from app.core.candle_store import CandleStore
+
+    now_ms = 1_700_000_000_000
+    open_start = now_ms // MINUTE * MINUTE
+    store = CandleStore(str(tmp_path))
+    store.write("binance", "BTC/USDT", "1m", make_candles(open_start - 200 * MINUTE, 200))
+    provider = FakeProvider(now_ms)
+    cache = MarketDataCache(provider, clock=lambda: now_ms / 1000, store=store, store_provider="binance")
+
+    candles = await cache.fetch_ohlcv("BTC/USDT", "1m", limit=100)
+
+    assert provider.calls == [(open_start, 1)]  # only the open candle came from the exchange
+    assert len(candles) == 100
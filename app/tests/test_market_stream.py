@@ -0,0 +1,163 @@
+import asyncio
+import json
+import pytest
+import pytest_asyncio
+from aiohttp import web
+from app.adapters.stream_transport import BinanceWebSocketTransport, StreamTransport
+from app.bot.market_stream import CandleBuilder, CandleHub, CandleQueue, MarketStream
+from app.bot.strategy import AbstractStrategy
+
+MINUTE = 60_000
+
+
+def kline(start: int, close: float, closed: bool) -> str:
+    return json.dumps({
+        "stream": "btcusdt@kline_1m",
+        "data": {"e": "kline", "s": "BTCUSDT", "k": {
+            "t": start, "i": "1m", "o": "1", "h": "2", "l": "0.5", "c": str(close), "v": "10", "x": closed,
+        }},
+    })
+
+
+class RecordingStrategy(AbstractStrategy):
+    def __init__(self):
+        super().__init__({"name": "recorder"}, provider=None, session_factory=None)
+        self.candles = []
+
+    async def on_candle(self, candle) -> None:
+        self.candles.append(candle)
+
+    async def on_tick(self) -> None:
+        pass
+
+
+class GapProvider:
+    def __init__(self):
+        self.calls = []
+
+    async def fetch_ohlcv(self, symbol, timeframe, since=None, limit=100):
+        self.calls.append(since)
+        return [[since, 1.0, 2.0, 0.5, 99.0, 10.0]]
+
+
+@pytest_asyncio.fixture
+async def fake_exchange():
+    """Local WebSocket server that sends two candles per connection and then drops it."""
+    connections = []
+
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        connections.append(request.query["streams"])
+        base = 0 if len(connections) == 1 else 3 * MINUTE
+        await ws.send_str(kline(base, 1.0, False))
+        await ws.send_str(kline(base, 1.5, True))
+        await ws.send_str(kline(base + MINUTE, 2.0, True))
+        await ws.close()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/stream", handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}/stream", connections
+    await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_stream_reconnects_and_gap_fills(fake_exchange):
+    url, connections = fake_exchange
+    hub = CandleHub()
+    strategy = RecordingStrategy()
+    hub.subscribe(strategy, ["BTC/USDT"], "1m")
+    provider = GapProvider()
+    stream = MarketStream(BinanceWebSocketTransport(url), hub, ["BTC/USDT"], "1m",
+                          provider=provider, reconnect_delay=0.01)
+
+    hub.start()
+    task = asyncio.create_task(stream.run())
+    for _ in range(100):
+        await asyncio.sleep(0.02)
+        if len(strategy.candles) >= 5:
+            break
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    await hub.stop()
+
+    assert connections[0] == "btcusdt@kline_1m"
+    assert provider.calls[0] == 2 * MINUTE
+    assert [c["timestamp"] for c in strategy.candles[:5]] == [0, MINUTE, 2 * MINUTE, 3 * MINUTE, 4 * MINUTE]
+    assert strategy.candles[0]["close"] == 1.5
+    assert strategy.candles[2]["close"] == 99.0  # from REST gap fill
+
+
+class ListTransport(StreamTransport):
+    async def connect(self, symbols, timeframe):
+        self._start()
+
+    def decode(self, raw):
+        return raw
+
+
+@pytest.mark.asyncio
+async def test_close_is_seen_with_a_full_queue():
+    transport = ListTransport(max_batch=2, max_buffered=3)
+    await transport.connect(["BTC/USDT"], "1m")
+    for n in range(3):
+        transport._queue.put_nowait(n)
+    transport._closed(RuntimeError("reset by peer"))
+
+    batches = []
+
+    async def consume():
+        async for batch in transport.batches():
+            batches.append(batch)
+
+    with pytest.raises(ConnectionError, match="reset by peer"):
+        await asyncio.wait_for(consume(), timeout=1)
+    assert batches == [[0, 1], [2]]
+
+    # Closing while batches() waits on an empty queue
+    await transport.connect(["BTC/USDT"], "1m")
+    waiting = asyncio.create_task(anext(transport.batches()))
+    await asyncio.sleep(0)
+    transport._closed()
+    with pytest.raises(ConnectionError):
+        await asyncio.wait_for(waiting, timeout=1)
+
+
+def test_candle_builder_from_trades():
+    builder = CandleBuilder("1m")
+    assert builder.add_trade(1_000, 10.0, 1.0) is None
+    assert builder.add_trade(2_000, 12.0, 1.0) is None
+    assert builder.add_trade(3_000, 9.0, 2.0) is None
+    closed = builder.add_trade(MINUTE + 1, 11.0, 1.0)
+    assert closed == [0, 10.0, 12.0, 9.0, 9.0, 4.0]
+
+
+@pytest.mark.asyncio
+async def test_queue_policies():
+    candle = lambda ts: {"symbol": "BTC/USDT", "timeframe": "1m", "timestamp": ts}
+
+    dropping = CandleQueue(maxsize=2, policy="drop_oldest")
+    for ts in range(5):
+        await dropping.put(candle(ts))
+    assert dropping.dropped == 3
+    assert (await dropping.get())["timestamp"] == 3
+
+    coalescing = CandleQueue(maxsize=2, policy="coalesce")
+    for ts in range(5):
+        await coalescing.put(candle(ts))
+    assert len(coalescing) == 1
+    assert (await coalescing.get())["timestamp"] == 4
+
+    blocking = CandleQueue(maxsize=1, policy="block")
+    await blocking.put(candle(0))
+    producer = asyncio.create_task(blocking.put(candle(1)))
+    await asyncio.sleep(0.01)
+    assert not producer.done()
+    await blocking.get()
+    await asyncio.wait_for(producer, timeout=1)
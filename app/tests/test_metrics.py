@@ -0,0 +1,112 @@
+import asyncio
+import httpx
+import pytest
+from app.adapters.rate_limiter import RateLimiter
+from app.backend.main import app
+from app.bot.trade_engine import ORDER_ERRORS, ORDER_SECONDS, TradeEngine
+from app.core import metrics
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.Registry()
+    latency = registry.histogram("op_seconds", "Op latency", ["op"], buckets=(0.1, 1.0))
+    child = latency.labels("read")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    text = registry.render()
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{op="read",le="0.1"} 2' in text
+    assert 'op_seconds_bucket{op="read",le="1.0"} 3' in text
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 4' in text
+    assert 'op_seconds_count{op="read"} 4' in text
+    assert 'op_seconds_sum{op="read"} 3.65' in text
+
+
+def test_counter_gauge_and_label_escaping():
+    registry = metrics.Registry()
+    calls = registry.counter("calls_total", "Calls", ["path"])
+    calls.labels('a"b\\c').inc(2)
+    depth = registry.gauge("queue_depth", "Depth")
+    depth.set_function(lambda: 7)
+
+    text = registry.render()
+    assert 'calls_total{path="a\\"b\\\\c"} 2.0' in text
+    assert "queue_depth 7.0" in text
+    with pytest.raises(ValueError):
+        calls.labels("x").inc(-1)
+    with pytest.raises(ValueError):
+        calls.inc()  # labelled metric used without labels
+    # Re-registering returns the same metric; a conflicting type is rejected
+    assert registry.counter("calls_total", "Calls", ["path"]) is calls
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls", ["path"])
+
+
+@pytest.mark.asyncio
+async def test_timed_counts_calls_and_errors():
+    registry = metrics.Registry()
+    latency = registry.histogram("call_seconds", "Latency", ["name"])
+    errors = registry.counter("call_errors_total", "Errors", ["name"])
+
+    @metrics.timed(latency, "async", errors=errors)
+    async def work(fail: bool):
+        await asyncio.sleep(0)
+        if fail:
+            raise RuntimeError("boom")
+        return 1
+
+    @metrics.timed(latency, "sync")
+    def sync_work():
+        return 2
+
+    assert await work(False) == 1
+    with pytest.raises(RuntimeError):
+        await work(True)
+    assert sync_work() == 2
+
+    assert latency.labels("async").count == 2
+    assert errors.labels("async").value == 1
+    assert latency.labels("sync").count == 1
+
+
+class FailingProvider:
+    async def place_order(self, *args, **kwargs):
+        raise RuntimeError("exchange down")
+
+
+@pytest.mark.asyncio
+async def test_hot_paths_are_instrumented():
+    limiter_waits = metrics.registry.get("rate_limiter_wait_seconds").labels()
+    before = limiter_waits.count
+    await RateLimiter(calls=100, period=1.0).acquire()
+    assert limiter_waits.count == before + 1
+
+    buys, failures = ORDER_SECONDS.labels("buy").count, ORDER_ERRORS.labels("buy").value
+    with pytest.raises(RuntimeError):
+        await TradeEngine(FailingProvider(), None).execute_buy("BTC/USDT", 1.0)
+    assert ORDER_SECONDS.labels("buy").count == buys + 1
+    assert ORDER_ERRORS.labels("buy").value == failures + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_and_bot_exporter():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE db_write_seconds histogram" in response.text
+
+    server = await metrics.start_exporter(port=0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}") as client:
+            response = await client.get("/metrics")
+            missing = await client.get("/other")
+    finally:
+        server.close()
+        await server.wait_closed()
+    assert response.status_code == 200
+    assert "# TYPE trade_execution_seconds histogram" in response.text
+    assert missing.status_code == 404
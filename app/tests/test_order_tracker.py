@@ -0,0 +1,94 @@
+import pytest
+from app.bot.order_tracker import OrderTracker
+from app.bot.trade_engine import TradeEngine
+from app.core.models import Position, Trade
+from app.providers.simulated_provider import SimulatedProvider
+
+
+class CountingProvider(SimulatedProvider):
+    def __init__(self, *args, open_orders: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.open_orders = open_orders
+        self.calls = {"fetch_order": 0, "fetch_open_orders": 0}
+
+    async def fetch_order(self, order_id, symbol=None):
+        self.calls["fetch_order"] += 1
+        return await super().fetch_order(order_id, symbol)
+
+    async def fetch_open_orders(self, symbol=None):
+        self.calls["fetch_open_orders"] += 1
+        return await super().fetch_open_orders(symbol)
+
+    def supports(self, capability):
+        if capability == "fetchOpenOrders":
+            return self.open_orders
+        return super().supports(capability)
+
+
+@pytest.mark.asyncio
+async def test_limit_fill_updates_trade_position_and_callback(session_factory):
+    provider = CountingProvider({"USDT": 10_000.0}, maker_fee=0.0)
+    provider.feed_price("BTC/USDT", 100.0)
+    tracker = OrderTracker(provider, session_factory, min_interval=0.0)
+    fills = []
+
+    async def on_filled(order):
+        fills.append(order)
+
+    engine = TradeEngine(provider, session_factory, order_tracker=tracker, on_order_filled=on_filled)
+    order = await engine.execute_buy("BTC/USDT", 2.0, price=95.0)
+    assert order["status"] == "open"
+
+    await tracker.poll_once()
+    assert tracker.orders and not fills
+
+    provider.feed_candle("BTC/USDT", (0, 100, 101, 90, 96, 100.0))
+    await tracker.poll_once()
+
+    assert not tracker.orders
+    assert [f["id"] for f in fills] == [order["id"]]
+    with session_factory() as session:
+        trade = session.query(Trade).one()
+        position = session.query(Position).one()
+        assert trade.status == "closed"
+        assert trade.amount == 2.0
+        assert trade.price == 95.0
+        assert position.size == 2.0
+        assert position.avg_price == 95.0
+
+
+@pytest.mark.asyncio
+async def test_one_request_per_symbol_for_many_orders():
+    provider = CountingProvider({"USDT": 1_000_000.0}, maker_fee=0.0)
+    provider.feed_price("BTC/USDT", 100.0)
+    tracker = OrderTracker(provider, min_interval=0.0)
+    for i in range(1000):
+        tracker.track(await provider.place_order("BTC/USDT", "buy", 0.01, price=90.0 - i * 0.01, type="limit"))
+
+    await tracker.poll_once()
+    assert provider.calls == {"fetch_order": 0, "fetch_open_orders": 1}
+
+    # Ten orders fill; only those are fetched individually
+    provider.feed_candle("BTC/USDT", (0, 100, 100, 89.905, 95, 1_000.0))
+    await tracker.poll_once()
+    assert provider.calls == {"fetch_order": 10, "fetch_open_orders": 2}
+    assert tracker.stats()["open"] == 990
+    assert tracker.filled == 10
+
+
+@pytest.mark.asyncio
+async def test_idle_orders_back_off_without_open_orders_support():
+    provider = CountingProvider({"USDT": 10_000.0}, open_orders=False)
+    provider.feed_price("BTC/USDT", 100.0)
+    tracker = OrderTracker(provider, min_interval=1.0, max_interval=8.0, backoff=2.0)
+    tracked = tracker.track(await provider.place_order("BTC/USDT", "buy", 1.0, price=50.0, type="limit"))
+
+    for expected in (2.0, 4.0, 8.0, 8.0):
+        tracked.next_poll = 0.0
+        await tracker.poll_once()
+        assert tracked.interval == expected
+    assert provider.calls == {"fetch_order": 4, "fetch_open_orders": 0}
+
+    # Not due yet: no request
+    await tracker.poll_once()
+    assert provider.calls["fetch_order"] == 4
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import text
+from app.bot.trade_engine import TradeEngine
+from app.core.models import BalanceSnapshot, Position, Trade
+from app.core.persistence import WriteBehindWriter
+from app.providers.simulated_provider import SimulatedProvider
+
+
+def test_wal_mode_enabled(session_factory):
+    with session_factory.kw["bind"].connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+
+@pytest.mark.asyncio
+async def test_writes_are_batched_and_merged(tmp_path, session_factory):
+    writer = WriteBehindWriter(session_factory, flush_interval=0.05)
+
+    for i in range(500):
+        writer.save_trade({
+            "provider": "binance", "symbol": "BTC/USDT", "side": "buy", "amount": 1.0,
+            "price": 0.0, "status": "open", "exchange_order_id": str(i),
+        })
+        writer.update_trade("binance", str(i), status="closed", price=100.0 + i)
+        writer.apply_fill("BTC/USDT", "buy", 1.0, 100.0 + i)
+    writer.save_account_snapshot({"USDT": 1.0})
+    await writer.flush()
+
+    with session_factory() as session:
+        assert session.query(Trade).filter(Trade.status == "closed").count() == 500
+        assert session.query(Trade).filter(Trade.exchange_order_id == "499").one().price == 599.0
+        position = session.query(Position).one()
+        assert position.size == 500.0
+        assert position.avg_price == pytest.approx(349.5)
+        assert session.query(BalanceSnapshot).count() == 1
+
+    # An update for a trade written in an earlier flush is applied as an UPDATE
+    writer.update_trade("binance", "0", status="canceled")
+    writer.apply_fill("BTC/USDT", "sell", 100.0, 400.0)
+    await writer.close()
+
+    with session_factory() as session:
+        assert session.query(Trade).filter(Trade.exchange_order_id == "0").one().status == "canceled"
+        assert session.query(Position).one().size == 400.0
+
+    stats = writer.stats()
+    assert stats["written"] == 1503
+    assert stats["flushes"] < 20
+    assert stats["queue_depth"] == 0
+    assert stats["max_flush_latency"] > 0
+
+
+@pytest.mark.asyncio
+async def test_failing_event_does_not_drop_its_batch(tmp_path, session_factory):
+    trade = {"provider": "paper", "symbol": "BTC/USDT", "side": "buy", "amount": 1.0, "price": 100.0,
+             "status": "open", "exchange_order_id": "1"}
+    with session_factory() as session:
+        session.add(Trade(**trade))
+        session.commit()
+
+    writer = WriteBehindWriter(session_factory, flush_interval=0.05, max_retries=1, retry_delay=0.0)
+    writer.save_trade(trade)  # can never be written: same provider and order id
+    writer.save_trade({**trade, "exchange_order_id": "2"})
+    # Same order id at another exchange: left alone
+    writer.update_trade("binance", "1", status="closed")
+    writer.apply_fill("BTC/USDT", "buy", 1.0, 100.0)
+    writer.save_account_snapshot({"USDT": 1.0})
+    await writer.close()
+
+    with session_factory() as session:
+        assert sorted(t.exchange_order_id for t in session.query(Trade)) == ["1", "2"]
+        assert session.query(Trade).filter(Trade.status == "closed").count() == 0
+        assert session.query(Position).one().size == 1.0
+        assert session.query(BalanceSnapshot).count() == 1
+    assert writer.stats()["dropped"] == 1 and writer.stats()["written"] == 4
+
+
+@pytest.mark.asyncio
+async def test_trade_engine_with_writer(tmp_path, session_factory):
+    writer = WriteBehindWriter(session_factory, flush_interval=0.05)
+    provider = SimulatedProvider({"USDT": 1_000_000.0})
+    trade_engine = TradeEngine(provider, session_factory, writer=writer)
+
+    for i in range(200):
+        provider.feed_price("BTC/USDT", 100.0)
+        await trade_engine.execute_buy("BTC/USDT", 0.01)
+    await writer.close()
+
+    with session_factory() as session:
+        assert session.query(Trade).count() == 200
+        position = session.query(Position).one()
+        assert position.size == pytest.approx(2.0)
+        assert position.avg_price == pytest.approx(100.0 * 1.001)  # taker fee is part of the cost basis
+        assert position.fees == pytest.approx(0.2)
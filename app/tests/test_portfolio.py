@@ -0,0 +1,114 @@
+import datetime
+import httpx
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from app.backend.main import app
+from app.core import repository
+from app.core.db import Base, create_async_db_engine, get_async_db, migrate_db
+from app.core.models import DailyPnl, Position, Trade
+from app.core.portfolio import PortfolioEngine, order_fee
+
+DAY1 = datetime.date(2024, 1, 1)
+DAY2 = datetime.date(2024, 1, 2)
+FILLS = [
+    ("buy", 2.0, 100.0, 1.0, DAY1),
+    ("buy", 1.0, 130.0, 0.0, DAY1),
+    ("sell", 1.5, 150.0, 0.5, DAY2),
+]
+
+
+def test_average_cost_and_realized_pnl():
+    engine = PortfolioEngine()
+    for side, amount, price, fee, day in FILLS:
+        engine.apply("BTC/USDT", side, amount, price, fee, day)
+
+    position = engine.positions["BTC/USDT"]
+    assert position.size == 1.5
+    assert position.cost_basis == pytest.approx(165.5)
+    assert position.avg_price == pytest.approx(331.0 / 3)
+    assert position.realized_pnl == pytest.approx(59.0)
+    assert position.fees == 1.5
+    assert engine.unrealized_pnl({"BTC/USDT": 120.0}) == pytest.approx(14.5)
+    assert engine.daily[(DAY1, "BTC/USDT")].buy_notional == 330.0
+    assert engine.daily[(DAY2, "BTC/USDT")].realized_pnl == pytest.approx(59.0)
+
+
+def test_order_fee_in_base_currency_is_converted():
+    order = {"symbol": "BTC/USDT", "average": 200.0, "fee": {"cost": 0.01, "currency": "BTC"}}
+    assert order_fee(order) == pytest.approx(2.0)
+    assert order_fee({"symbol": "BTC/USDT", "fee": {"cost": 0.5, "currency": "USDT"}}) == 0.5
+
+
+@pytest.mark.asyncio
+async def test_incremental_matches_rebuild_and_api(tmp_path):
+    path = tmp_path / "trades.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    session_factory = sessionmaker(bind=sync_engine)
+
+    with session_factory() as session:
+        for i, (side, amount, price, fee, day) in enumerate(FILLS):
+            repository.save_trade(session, {
+                "provider": "binance", "symbol": "BTC/USDT", "side": side, "amount": amount, "price": price,
+                "status": "closed", "exchange_order_id": str(i),
+                "executed_at": datetime.datetime.combine(day, datetime.time(12, i)),
+                "meta_data": {"fee": {"cost": fee, "currency": "USDT"}},
+            })
+            repository.apply_fill(session, "BTC/USDT", side, amount, price, fee, day)
+        incremental = [(p.size, p.cost_basis, p.realized_pnl, p.fees) for p in session.query(Position)]
+        incremental_daily = sorted((d.day, d.trades, d.realized_pnl) for d in session.query(DailyPnl))
+
+        assert repository.rebuild_portfolio(session, batch_size=2) == 3
+        rebuilt = [(p.size, p.cost_basis, p.realized_pnl, p.fees) for p in session.query(Position)]
+        rebuilt_daily = sorted((d.day, d.trades, d.realized_pnl) for d in session.query(DailyPnl))
+    assert rebuilt == pytest.approx(incremental)
+    assert rebuilt_daily == incremental_daily
+
+    async_engine = create_async_db_engine(f"sqlite:///{path}")
+    async_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override():
+        async with async_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            summary = (await client.get("/api/v1/pnl/")).json()
+            daily = (await client.get("/api/v1/pnl/daily", params={"since": "2024-01-02"})).json()
+            equity = (await client.get("/api/v1/pnl/equity")).json()
+    finally:
+        app.dependency_overrides.clear()
+        await async_engine.dispose()
+
+    assert summary["realized_pnl"] == pytest.approx(59.0)
+    assert summary["symbols"][0]["mark_price"] == 150.0
+    assert summary["unrealized_pnl"] == pytest.approx(1.5 * 150.0 - 165.5)
+    assert [d["day"] for d in daily] == ["2024-01-02"]
+    assert [point["cumulative_pnl"] for point in equity] == pytest.approx([0.0, 59.0])
+
+
+def test_migration_adds_pnl_columns_to_existing_positions(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE positions (id INTEGER PRIMARY KEY, symbol VARCHAR UNIQUE, size FLOAT, "
+                          "avg_price FLOAT, updated_at DATETIME)"))
+        conn.execute(text("INSERT INTO positions (symbol, size, avg_price) VALUES ('BTC/USDT', 1.0, 100.0)"))
+
+    migrate_db(engine)
+    migrate_db(engine)  # already at head
+    columns = {column["name"] for column in inspect(engine).get_columns("positions")}
+    assert {"cost_basis", "fees", "realized_pnl"} <= columns
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT symbol, size FROM positions")).all() == [("BTC/USDT", 1.0)]
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == "0001"
+
+    # Built by create_all: only stamped
+    fresh = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    Base.metadata.create_all(fresh)
+    migrate_db(fresh, stamp_only=True)
+    with fresh.connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == "0001"
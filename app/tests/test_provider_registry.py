@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from app.bot.trade_engine import TradeEngine
+from app.core.models import Trade
+from app.adapters.rate_limiter import RateLimiter
+from app.providers.registry import ProviderRegistry, fan_out
+
+
+@pytest.mark.asyncio
+async def test_one_provider_per_exchange_and_account_over_one_session():
+    seen = []
+
+    def credentials(exchange_id, account):
+        seen.append((exchange_id, account))
+        return f"{account}-key", f"{account}-secret"
+
+    registry = ProviderRegistry(credentials=credentials)
+    try:
+        main = registry.get("binance")
+        assert registry.get("Binance") is main
+        sub = registry.get("binance", "sub1")
+        kraken = registry.get("kraken")
+
+        assert sub is not main and sub.exchange.apiKey == "sub1-key"
+        assert seen == [("binance", "default"), ("binance", "sub1"), ("kraken", "default")]
+        # Accounts share the exchange's (per-IP) rate limiter; exchanges share the connection pool
+        assert sub.rate_limiter is main.rate_limiter
+        assert kraken.rate_limiter is not main.rate_limiter
+        # Paced at ccxt's minimum interval between requests (rateLimit, in ms)
+        assert kraken.rate_limiter.buckets[0].rate == pytest.approx(1000 / kraken.exchange.rateLimit)
+        assert main.exchange.session is sub.exchange.session is kraken.exchange.session
+        assert (main.name, kraken.name) == ("binance", "kraken")
+        with pytest.raises(ValueError):
+            registry.get("not-an-exchange")
+    finally:
+        await registry.close()
+    assert main.closed and registry._session is None
+
+
+@pytest.mark.asyncio
+async def test_fan_out_bounds_concurrency_and_reports_errors_per_key():
+    registry = ProviderRegistry(max_concurrency=10, max_per_exchange=2, credentials=lambda *_: (None, None))
+    in_flight = {"binance": 0, "kraken": 0}
+    peak = {"binance": 0, "kraken": 0}
+
+    def fake_ticker(exchange_id):
+        async def fetch_ticker(symbol):
+            in_flight[exchange_id] += 1
+            peak[exchange_id] = max(peak[exchange_id], in_flight[exchange_id])
+            await asyncio.sleep(0.01)
+            in_flight[exchange_id] -= 1
+            if symbol == "BAD/USDT":
+                raise ValueError("unknown symbol")
+            return {"symbol": symbol, "last": 1.0}
+        return fetch_ticker
+
+    async def broken_tickers(symbols):
+        raise ConnectionError("exchange down")
+
+    try:
+        for exchange_id in in_flight:
+            provider = registry.get(exchange_id)
+            provider.exchange.fetch_ticker = fake_ticker(exchange_id)
+            # Force the per-symbol fallback
+            provider.exchange.has = {**provider.exchange.has, "fetchTickers": False}
+            provider.rate_limiter = RateLimiter(calls=1000, period=1.0)
+        registry.get("bitstamp").exchange.fetch_tickers = broken_tickers
+        symbols = [f"C{i}/USDT" for i in range(8)]
+        result = await registry.fetch_tickers(
+            {"binance": symbols + ["BAD/USDT"], "kraken": symbols, "bitstamp": symbols}
+        )
+    finally:
+        await registry.close()
+
+    assert result["kraken"].symbols == symbols and result["kraken"].last.tolist() == [1.0] * 8
+    # Failed symbols are left out, failed exchanges are reported
+    assert result["binance"].symbols == symbols
+    assert isinstance(result["bitstamp"], ConnectionError)
+    assert peak == {"binance": 2, "kraken": 2}
+
+
+@pytest.mark.asyncio
+async def test_fan_out_limits_total_concurrency():
+    running, peak = 0, 0
+
+    async def call():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.005)
+        running -= 1
+        return True
+
+    result = await fan_out({i: call for i in range(20)}, max_concurrency=3)
+    assert all(result.values()) and peak == 3
+
+
+@pytest.mark.asyncio
+async def test_trades_record_the_real_provider(session_factory):
+
+    registry = ProviderRegistry(credentials=lambda *_: (None, None))
+    try:
+        provider = registry.get("kraken")
+        provider.exchange.create_order = AsyncMock(
+            return_value={"id": "7", "status": "closed", "filled": 1.0, "average": 10.0}
+        )
+        await TradeEngine(provider, session_factory).execute_buy("BTC/USD", 1.0)
+    finally:
+        await registry.close()
+
+    with session_factory() as session:
+        assert session.query(Trade).one().provider == "kraken"
@@ -0,0 +1,60 @@
+import asyncio
+import time
+import pytest
+from app.adapters.rate_limiter import RateLimiter, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_released_in_fifo_order():
+    limiter = RateLimiter(calls=5, period=0.1)
+    order = []
+
+    async def worker(i):
+        await limiter.acquire()
+        order.append(i)
+
+    await asyncio.gather(*[worker(i) for i in range(30)])
+    assert order == list(range(30))
+    assert limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_endpoint_weights_and_layered_buckets():
+    per_second = TokenBucket(10, 0.1)
+    per_minute = TokenBucket(12, 60.0)
+    limiter = RateLimiter(buckets=[per_second, per_minute], weights={"fetch_balance": 5})
+
+    await limiter.acquire("fetch_balance")
+    await limiter.acquire("fetch_balance")
+    await limiter.acquire("fetch_ohlcv")  # weight 1
+    await limiter.acquire("fetch_ohlcv")
+    assert per_minute.tokens == pytest.approx(0, abs=0.05)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(limiter.acquire("fetch_ohlcv"), timeout=0.2)
+
+
+@pytest.mark.asyncio
+async def test_used_weight_header_lowers_available_tokens():
+    per_minute = TokenBucket(100, 60.0)
+    limiter = RateLimiter(buckets=[per_minute], header_buckets={"X-MBX-USED-WEIGHT-1M": per_minute})
+
+    limiter.observe_headers({"x-mbx-used-weight-1m": "95"})
+    assert per_minute.tokens == pytest.approx(5, abs=0.01)
+
+    start = time.monotonic()
+    await limiter.acquire(weight=5)
+    assert time.monotonic() - start < 0.05
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_block_queue():
+    limiter = RateLimiter(calls=1, period=0.05)
+    await limiter.acquire()
+    cancelled = asyncio.create_task(limiter.acquire())
+    waiting = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await asyncio.wait_for(waiting, timeout=0.5)
+    assert cancelled.cancelled()
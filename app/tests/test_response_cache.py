@@ -0,0 +1,101 @@
+import asyncio
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.backend.cache import response_cache
+from app.backend.main import app
+from app.core import repository
+from app.core.db import create_async_db_engine, get_async_db
+from app.core.models import TableVersion, Trade
+from app.core.persistence import WriteBehindWriter
+
+
+def versions(session_factory):
+    with session_factory() as session:
+        return {row.name: row.version for row in session.query(TableVersion)}
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path, session_factory):
+    async_engine = create_async_db_engine(f"sqlite:///{tmp_path / 'trades.db'}")
+    async_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+    async def override():
+        async with async_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+    await async_engine.dispose()
+
+
+def test_writes_bump_table_versions(session_factory):
+    with session_factory() as session:
+        repository.apply_fill(session, "BTC/USDT", "buy", 1.0, 100.0)
+    assert versions(session_factory) == {"positions": 1, "pnl_daily": 1}
+
+    with session_factory() as session:
+        session.add(Trade(provider="binance", symbol="BTC/USDT", side="buy", exchange_order_id="1"))
+        session.flush()
+        session.rollback()
+    assert "trades" not in versions(session_factory)
+
+
+@pytest.mark.asyncio
+async def test_bulk_writes_bump_table_versions(session_factory):
+    writer = WriteBehindWriter(session_factory, flush_interval=0.01)
+    writer.save_trade({"provider": "binance", "symbol": "BTC/USDT", "side": "buy", "exchange_order_id": "1"})
+    await writer.flush()
+    writer.update_trade("binance", "1", status="closed")
+    await writer.close()
+    assert versions(session_factory)["trades"] == 2
+
+
+@pytest.mark.asyncio
+async def test_etag_and_invalidation(client, session_factory):
+    with session_factory() as session:
+        repository.apply_fill(session, "BTC/USDT", "buy", 1.0, 100.0)
+
+    first = await client.get("/api/v1/positions/")
+    etag = first.headers["etag"]
+    assert first.json()[0]["size"] == 1.0
+
+    cached = await client.get("/api/v1/positions/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    with session_factory() as session:
+        repository.apply_fill(session, "BTC/USDT", "buy", 1.0, 100.0)
+    fresh = await client.get("/api/v1/positions/", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()[0]["size"] == 2.0
+
+    # Trades are unaffected by position writes
+    trades_etag = (await client.get("/api/v1/trades/")).headers["etag"]
+    with session_factory() as session:
+        repository.apply_fill(session, "BTC/USDT", "buy", 1.0, 100.0)
+    assert (await client.get("/api/v1/trades/", headers={"If-None-Match": trades_etag})).status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_concurrent_polls_share_one_query(client, session_factory):
+    with session_factory() as session:
+        for i in range(50):
+            repository.save_trade(session, {
+                "provider": "binance", "symbol": "BTC/USDT", "side": "buy", "amount": 1.0,
+                "price": 100.0, "status": "closed", "exchange_order_id": str(i),
+            })
+    response_cache.version_ttl = 60.0
+
+    responses = await asyncio.gather(*(client.get("/api/v1/trades/", params={"limit": 20}) for _ in range(100)))
+
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.content for r in responses}) == 1
+    assert len(responses[0].json()) == 20
+    assert "x-next-cursor" in responses[0].headers
+    assert response_cache.misses == 1
+    assert response_cache.hits == 99
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from app.bot.strategy import AbstractStrategy
+from app.bot.scheduler import StrategyScheduler, ScheduleSpec
+
+
+class CountingStrategy(AbstractStrategy):
+    def __init__(self, name: str, delay: float = 0.0):
+        super().__init__({"name": name}, provider=None, session_factory=None)
+        self.delay = delay
+        self.ticks = 0
+
+    async def on_tick(self) -> None:
+        self.ticks += 1
+        await asyncio.sleep(self.delay)
+
+    async def on_candle(self, candle) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_slow_strategy_does_not_stall_others():
+    scheduler = StrategyScheduler(max_concurrency=4)
+    fast = CountingStrategy("fast")
+    slow = CountingStrategy("slow", delay=10)
+    scheduler.add(fast, ScheduleSpec(tick_seconds=0.01))
+    scheduler.add(slow, ScheduleSpec(tick_seconds=0.01, timeout_seconds=0.05))
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.3)
+    scheduler.stop()
+    await task
+
+    stats = scheduler.stats()
+    assert fast.ticks > 10
+    assert stats["slow"]["timeouts"] >= 1
+    assert stats["fast"]["errors"] == 0
+    assert stats["fast"]["p95_latency"] < 0.05
+
+
+@pytest.mark.asyncio
+async def test_deadline_skips_ticks_waiting_for_a_slot():
+    scheduler = StrategyScheduler(max_concurrency=1)
+    blocker = CountingStrategy("blocker", delay=0.2)
+    late = CountingStrategy("late")
+    scheduler.add(blocker, ScheduleSpec(tick_seconds=1.0))
+    scheduler.add(late, ScheduleSpec(tick_seconds=1.0, deadline_seconds=0.05))
+
+    task = asyncio.create_task(scheduler.run())
+    await asyncio.sleep(0.3)
+    scheduler.stop()
+    await task
+
+    assert scheduler.stats()["late"]["skipped"] == 1
+    assert late.ticks == 0
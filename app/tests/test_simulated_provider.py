@@ -0,0 +1,129 @@
+import pytest
+from app.bot.trade_engine import TradeEngine
+from app.core.models import Trade
+from app.providers.simulated_provider import SimulatedProvider
+
+
+@pytest.mark.asyncio
+async def test_market_order_fills_at_last_price_with_fee():
+    provider = SimulatedProvider({"USDT": 1000.0}, taker_fee=0.01)
+    provider.feed_price("BTC/USDT", 100.0)
+
+    order = await provider.place_order("BTC/USDT", "buy", 2.0)
+    balance = await provider.fetch_balance()
+
+    assert order["status"] == "closed"
+    assert order["average"] == 100.0
+    assert balance["total"]["BTC"] == 2.0
+    assert balance["total"]["USDT"] == pytest.approx(1000.0 - 200.0 - 2.0)
+
+
+@pytest.mark.asyncio
+async def test_limit_order_partial_fills_then_closes():
+    provider = SimulatedProvider({"USDT": 1000.0}, maker_fee=0.0, participation=0.5)
+    provider.feed_price("BTC/USDT", 100.0)
+    order = await provider.place_order("BTC/USDT", "buy", 3.0, price=95.0, type="limit")
+    assert order["status"] == "open"
+    assert (await provider.fetch_balance())["used"]["USDT"] == pytest.approx(285.0)
+
+    provider.feed_candle("BTC/USDT", (0, 100, 101, 94, 96, 4.0))  # 2.0 available at 50% participation
+    partial = await provider.fetch_order(order["id"])
+    assert partial["status"] == "open"
+    assert partial["filled"] == 2.0
+
+    provider.feed_candle("BTC/USDT", (0, 96, 97, 94.5, 95, 4.0))
+    done = await provider.fetch_order(order["id"])
+    assert done["status"] == "closed"
+    assert done["average"] == 95.0
+    balance = await provider.fetch_balance()
+    assert balance["used"]["USDT"] == pytest.approx(0.0)
+    assert balance["total"]["USDT"] == pytest.approx(1000.0 - 285.0)
+
+
+@pytest.mark.asyncio
+async def test_best_price_first_and_cancel_releases_funds():
+    provider = SimulatedProvider({"BTC": 2.0, "USDT": 0.0}, maker_fee=0.0)
+    provider.feed_price("BTC/USDT", 100.0)
+    far = await provider.place_order("BTC/USDT", "sell", 1.0, price=110.0, type="limit")
+    near = await provider.place_order("BTC/USDT", "sell", 1.0, price=105.0, type="limit")
+
+    provider.feed_candle("BTC/USDT", (0, 100, 106, 99, 104, 10.0))
+    assert (await provider.fetch_order(near["id"]))["status"] == "closed"
+    assert (await provider.fetch_order(far["id"]))["status"] == "open"
+
+    canceled = await provider.cancel_order(far["id"])
+    balance = await provider.fetch_balance()
+    assert canceled["status"] == "canceled"
+    assert balance["free"]["BTC"] == pytest.approx(1.0)
+    assert await provider.fetch_open_orders("BTC/USDT") == []
+
+
+@pytest.mark.asyncio
+async def test_queued_market_orders_cannot_overspend():
+    provider = SimulatedProvider({"USDT": 1000.0}, taker_fee=0.0, participation=0.5)
+    provider.feed_candle("BTC/USDT", (0, 100, 100, 100, 100, 2.0))
+    first = await provider.place_order("BTC/USDT", "buy", 5.0)  # 1.0 fills, 4.0 waits for liquidity
+    balance = await provider.fetch_balance()
+    assert first["filled"] == 1.0
+    assert balance["free"]["USDT"] == pytest.approx(500.0) and balance["used"]["USDT"] == pytest.approx(400.0)
+    second = await provider.place_order("BTC/USDT", "buy", 5.0)
+    with pytest.raises(ValueError):
+        await provider.place_order("BTC/USDT", "buy", 0.1)
+
+    # The price runs away: each order fills as far as its funds go and the rest is canceled
+    provider.feed_candle("BTC/USDT", (0, 125, 125, 125, 125, 100.0))
+    first, second = await provider.fetch_order(first["id"]), await provider.fetch_order(second["id"])
+    balance = await provider.fetch_balance()
+    assert (first["status"], second["status"]) == ("canceled", "canceled")
+    assert first["filled"] == pytest.approx(1.0 + 400.0 / 125) and second["filled"] == pytest.approx(4.0)
+    assert balance["free"]["USDT"] == pytest.approx(0.0) and balance["used"]["USDT"] == pytest.approx(0.0)
+
+
+@pytest.mark.asyncio
+async def test_participation_cap_is_per_candle():
+    provider = SimulatedProvider({"BTC": 1.0, "USDT": 1000.0}, maker_fee=0.0, participation=0.5)
+    provider.feed_price("BTC/USDT", 100.0)
+    buy = await provider.place_order("BTC/USDT", "buy", 1.0, price=95.0, type="limit")
+    sell = await provider.place_order("BTC/USDT", "sell", 1.0, price=105.0, type="limit")
+
+    provider.feed_candle("BTC/USDT", (0, 100, 106, 94, 100, 2.0))  # 1.0 tradable in total
+    assert (await provider.fetch_order(buy["id"]))["filled"] == 1.0
+    assert (await provider.fetch_order(sell["id"]))["filled"] == 0.0
+
+    # What the resting buy took is gone for orders placed before the next candle too
+    late = await provider.place_order("BTC/USDT", "buy", 1.0)
+    assert late["filled"] == 0.0 and late["status"] == "open"
+
+
+@pytest.mark.asyncio
+async def test_insufficient_funds_rejected():
+    provider = SimulatedProvider({"USDT": 50.0})
+    provider.feed_price("BTC/USDT", 100.0)
+    with pytest.raises(ValueError):
+        await provider.place_order("BTC/USDT", "buy", 1.0)
+
+
+@pytest.mark.asyncio
+async def test_trade_engine_against_simulated_exchange(session_factory):
+    provider = SimulatedProvider({"USDT": 1_000_000.0})
+    trade_engine = TradeEngine(provider, session_factory)
+
+    for i in range(200):
+        provider.feed_price("BTC/USDT", 100.0 + i)
+        await trade_engine.execute_buy("BTC/USDT", 0.01)
+
+    with session_factory() as session:
+        assert session.query(Trade).count() == 200
+    assert (await provider.fetch_balance())["total"]["BTC"] == pytest.approx(2.0)
+
+
+@pytest.mark.asyncio
+async def test_restarted_paper_exchange_does_not_reuse_order_ids(session_factory):
+
+    for _ in range(2):  # one provider per process run, same database
+        provider = SimulatedProvider({"USDT": 1000.0})
+        provider.feed_price("BTC/USDT", 100.0)
+        await TradeEngine(provider, session_factory).execute_buy("BTC/USDT", 0.01)
+
+    with session_factory() as session:
+        assert len({trade.exchange_order_id for trade in session.query(Trade)}) == 2
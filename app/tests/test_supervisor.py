@@ -0,0 +1,117 @@
+import asyncio
+import os
+import sys
+import time
+import pytest
+from app.bot.gateway import Gateway, GatewayProvider, GatewayStreamTransport
+from app.bot.supervisor import Supervisor, candle_subscriptions, shard_schedule, shard_symbols
+from app.core.ipc import private_socket_path
+from app.providers.simulated_provider import SimulatedProvider
+
+
+def entry(name, symbol, candles=None):
+    item = {"name": name, "type": "dca", "config": {"symbol": symbol}}
+    if candles:
+        item["candles"] = candles
+    return item
+
+
+def test_shards_keep_each_symbol_in_one_worker():
+    schedule = {"max_concurrency": 4, "strategies": [
+        entry("btc-1", "BTC/USDT"), entry("btc-2", "BTC/USDT"), entry("eth", "ETH/USDT"),
+        entry("sol", "SOL/USDT"), entry("xrp", "XRP/USDT"),
+        # Links ADA and DOT into one group
+        entry("pair", "ADA/USDT", candles={"symbols": ["ADA/USDT", "DOT/USDT"], "timeframe": "5m"}),
+        entry("dot", "DOT/USDT"),
+    ]}
+
+    shards = shard_schedule(schedule, workers=3)
+
+    assert len(shards) == 3 and all(s["max_concurrency"] == 4 for s in shards)
+    assert sorted(len(s["strategies"]) for s in shards) == [2, 2, 3]
+    symbol_sets = [shard_symbols(s) for s in shards]
+    assert sum(len(s) for s in symbol_sets) == len(set().union(*symbol_sets))
+    assert any({"ADA/USDT", "DOT/USDT"} <= s for s in symbol_sets)
+    assert any(s == {"BTC/USDT"} for s in symbol_sets)
+    assert len(shard_schedule(schedule, workers=32)) == 5
+    assert candle_subscriptions(schedule) == {"5m": ["ADA/USDT", "DOT/USDT"]}
+
+
+@pytest.mark.asyncio
+async def test_gateway_forwards_calls_and_candles():
+    provider = SimulatedProvider(initial_balances={"USDT": 1000.0})
+    provider.feed_price("BTC/USDT", 100.0)
+    path = private_socket_path("gateway.sock")
+    gateway = Gateway(provider, path)
+    await gateway.start()
+    worker = GatewayProvider(path, connect_timeout=2.0)
+    transport = GatewayStreamTransport(path, connect_timeout=2.0)
+    try:
+        await worker.connect()
+        assert worker.name == "paper" and worker.supports("createLimitOrder")
+
+        # Pipelined calls on one connection
+        orders = await asyncio.gather(*(worker.place_order("BTC/USDT", "buy", 1.0) for _ in range(3)))
+        assert len({o["id"] for o in orders}) == 3 and all(o["status"] == "closed" for o in orders)
+        balance = await worker.fetch_balance()
+        assert balance["total"]["BTC"] == pytest.approx(3.0)
+        with pytest.raises(ValueError, match="No price"):
+            await worker.fetch_ticker("ETH/USDT")
+        with pytest.raises(AttributeError):
+            await worker.call("close")
+
+        await transport.connect(["BTC/USDT"], "1m")
+        while not gateway.stats()["subscribers"]:
+            await asyncio.sleep(0.01)
+        candle = {"symbol": "BTC/USDT", "timeframe": "1m", "timestamp": 60_000,
+                  "open": 1.0, "high": 2.0, "low": 0.5, "close": 1.5, "volume": 3.0}
+        await gateway.publish(candle)
+        await gateway.publish({**candle, "symbol": "ETH/USDT"})
+        batch = await asyncio.wait_for(transport.batches().__anext__(), timeout=2.0)
+        assert batch == [("kline", "BTC/USDT", "1m", [60_000, 1.0, 2.0, 0.5, 1.5, 3.0], True)]
+    finally:
+        await transport.close()
+        await worker.close()
+        await gateway.close()
+
+    # In-flight calls fail instead of hanging when the gateway goes away
+    assert not worker.connected
+    with pytest.raises(ConnectionError):
+        await GatewayProvider(path, connect_timeout=0.1).fetch_balance()
+    os.unlink(path)
+
+
+def crash(heartbeat):
+    sys.exit(3)
+
+
+def hang(heartbeat):
+    heartbeat.beat()
+    time.sleep(60)
+
+
+def healthy(heartbeat):
+    while True:
+        heartbeat.beat()
+        time.sleep(0.05)
+
+
+def test_supervisor_restarts_crashed_and_hung_children():
+    supervisor = Supervisor(heartbeat_timeout=1.0, min_restart_delay=0.1, max_restart_delay=0.4)
+    crashing = supervisor.add("crash", crash)
+    hanging = supervisor.add("hang", hang)
+    steady = supervisor.add("healthy", healthy, stop_last=True)
+    supervisor.start()
+    pid = steady.process.pid
+    try:
+        deadline = time.monotonic() + 20
+        while time.monotonic() < deadline and (crashing.restarts < 2 or hanging.restarts < 1):
+            supervisor.check()
+            time.sleep(0.05)
+    finally:
+        supervisor.shutdown(timeout=5)
+
+    assert crashing.restarts >= 2 and crashing.restart_delay > supervisor.min_restart_delay
+    assert hanging.restarts >= 1
+    assert steady.restarts == 0 and steady.process.pid == pid
+    assert not any(stats["alive"] for stats in supervisor.stats().values())
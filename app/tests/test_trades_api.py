@@ -0,0 +1,83 @@
+import csv
+import datetime
+import io
+import json
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.backend.main import app
+from app.core.db import Base, create_async_db_engine, get_async_db, get_async_session_factory
+from app.core.models import Trade
+
+START = datetime.datetime(2024, 1, 1, 12, 0, 0)
+
+
+@pytest_asyncio.fixture
+async def client(tmp_path):
+    engine = create_async_db_engine(f"sqlite:///{tmp_path / 'trades.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        # Pairs of trades share a timestamp, so pages must break ties on id
+        await conn.execute(insert(Trade), [
+            {
+                "provider": "binance", "symbol": "BTC/USDT" if i % 3 else "ETH/USDT",
+                "side": "buy" if i % 2 else "sell", "amount": 1.0, "price": float(i), "status": "closed",
+                "exchange_order_id": str(i), "executed_at": START + datetime.timedelta(seconds=i // 2),
+            }
+            for i in range(25)
+        ])
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def override():
+        async with session_factory() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override
+    app.dependency_overrides[get_async_session_factory] = lambda: session_factory
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_all_rows_once(client):
+    seen = []
+    params = {"limit": 4}
+    while True:
+        response = await client.get("/api/v1/trades/", params=params)
+        assert response.status_code == 200
+        seen.extend(trade["id"] for trade in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        params["cursor"] = cursor
+    assert seen == list(range(25, 0, -1))
+
+
+@pytest.mark.asyncio
+async def test_filters(client):
+    response = await client.get("/api/v1/trades/", params={
+        "symbol": "ETH/USDT", "side": "sell", "since": (START + datetime.timedelta(seconds=3)).isoformat(),
+    })
+    prices = [trade["price"] for trade in response.json()]
+    assert prices == [24.0, 18.0, 12.0, 6.0]
+
+    assert (await client.get("/api/v1/trades/", params={"cursor": "not-a-cursor"})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_streaming_export(client):
+    response = await client.get("/api/v1/trades/export", params={"symbol": "BTC/USDT"})
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert len(lines) == 16
+    assert lines[0]["price"] == 23.0
+
+    response = await client.get("/api/v1/trades/export", params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 25
+    assert rows[-1]["id"] == "1"
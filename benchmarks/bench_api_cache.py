@@ -0,0 +1,85 @@
+"""
+Polling benchmark for the cached read endpoints.
+
+    python -m benchmarks.bench_api_cache
+
+Serves the API in-process against a temporary SQLite database with 10k trades and polls
+/api/v1/trades and /api/v1/positions at increasing concurrency, with and without
+If-None-Match, reporting p50/p99 latency and CPU time per request.
+"""
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine, insert
+
+from app.backend.main import app
+from app.core.config import settings
+from app.core.db import Base, dispose_async_engine
+from app.core.models import Position, Trade
+
+
+def populate(path: str, rows: int = 10_000) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Trade), [
+            {"provider": "binance", "symbol": "BTC/USDT", "side": "buy", "amount": 0.01, "price": 100.0 + i,
+             "status": "closed", "exchange_order_id": str(i)}
+            for i in range(rows)
+        ])
+        conn.execute(insert(Position), [
+            {"symbol": f"SYM{i}/USDT", "size": 1.0, "avg_price": 1.0, "cost_basis": 1.0, "fees": 0.0, "realized_pnl": 0.0}
+            for i in range(50)
+        ])
+    engine.dispose()
+
+
+async def poll(client: httpx.AsyncClient, path: str, concurrency: int, requests: int, conditional: bool) -> dict:
+    etag = (await client.get(path)).headers["etag"]
+    headers = {"If-None-Match": etag} if conditional else {}
+    latencies = []
+
+    async def worker():
+        for _ in range(requests // concurrency):
+            start = time.perf_counter()
+            await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - start)
+
+    cpu = time.process_time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    cpu = time.process_time() - cpu
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+        "cpu_us_per_req": cpu / len(latencies) * 1e6,
+    }
+
+
+async def main(requests: int = 2000) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trades.db")
+        populate(path)
+        # Point the lazily created async engine at the scratch database. A dependency
+        # override would make FastAPI re-analyze the dependency on every request.
+        await dispose_async_engine()
+        settings.DATABASE_URL = f"sqlite:///{path}"
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for path in ("/api/v1/trades/?limit=100", "/api/v1/positions/"):
+                for conditional in (False, True):
+                    for concurrency in (1, 10, 50):
+                        r = await poll(client, path, concurrency, requests, conditional)
+                        print(
+                            f"{path:<28} {'304' if conditional else '200'} x{concurrency:<3} "
+                            f"p50 {r['p50_ms']:6.2f} ms  p99 {r['p99_ms']:6.2f} ms  cpu {r['cpu_us_per_req']:6.0f} us/req"
+                        )
+        await dispose_async_engine()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+"""
+Sync vs async database access benchmark.
+
+    python -m benchmarks.bench_db
+
+Runs the same workload of concurrent trade inserts and trade list reads from coroutines,
+once through the sync session (as the bot and API did) and once through the async engine
+(aiosqlite), against a temporary SQLite file. Reports throughput and event loop lag, i.e. how
+long a heartbeat coroutine that should wake every millisecond was held up.
+"""
+import asyncio
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.core import async_repository, repository
+from app.core.db import Base, create_async_db_engine, enable_sqlite_wal
+
+
+def trade(i: int) -> dict:
+    return {
+        "provider": "binance", "symbol": "BTC/USDT", "side": "buy", "amount": 0.01,
+        "price": 100.0 + i, "status": "closed", "exchange_order_id": str(i),
+    }
+
+
+async def measure(workload, concurrency: int) -> dict:
+    lags = []
+    stopping = False
+
+    async def heartbeat():
+        while not stopping:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lags.append(time.perf_counter() - start - 0.001)
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    await asyncio.gather(*(workload(worker) for worker in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stopping = True
+    await beat
+    lags.sort()
+    return {
+        "elapsed_s": elapsed,
+        "loop_lag_p99_ms": lags[int(0.99 * (len(lags) - 1))] * 1000 if lags else 0.0,
+        "loop_lag_max_ms": lags[-1] * 1000 if lags else 0.0,
+    }
+
+
+async def bench_sync(path: str, concurrency: int, per_worker: int) -> dict:
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    enable_sqlite_wal(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    async def workload(worker: int):
+        for i in range(per_worker):
+            with session_factory() as session:
+                repository.save_trade(session, trade(worker * per_worker + i))
+                repository.get_trades(session, limit=50)
+            await asyncio.sleep(0)
+
+    result = await measure(workload, concurrency)
+    engine.dispose()
+    return result
+
+
+async def bench_async(path: str, concurrency: int, per_worker: int) -> dict:
+    engine = create_async_db_engine(f"sqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def workload(worker: int):
+        for i in range(per_worker):
+            async with session_factory() as session:
+                await async_repository.save_trade(session, trade(worker * per_worker + i))
+                await async_repository.get_trades(session, limit=50)
+
+    result = await measure(workload, concurrency)
+    await engine.dispose()
+    return result
+
+
+async def main(concurrency: int = 20, per_worker: int = 50):
+    operations = concurrency * per_worker * 2
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, bench in (("sync", bench_sync), ("async", bench_async)):
+            result = await bench(os.path.join(tmp, f"{name}.db"), concurrency, per_worker)
+            print(
+                f"{name:>5}: {operations / result['elapsed_s']:8.0f} ops/s, "
+                f"loop lag p99 {result['loop_lag_p99_ms']:.2f} ms, max {result['loop_lag_max_ms']:.2f} ms"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
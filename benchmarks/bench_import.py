@@ -0,0 +1,64 @@
+"""
+Cold-start import time of the entry points, from `python -X importtime`.
+
+    python -m benchmarks.bench_import
+
+Imports each entry point in a fresh interpreter (best of a few runs) and prints its total
+import time, the slowest modules it pulled in, and whether it stays within IMPORT_BUDGETS.
+app/tests/test_import_time.py checks that the heavy dependencies in DEFERRED are not loaded
+at import; the timings are only checked here, since they depend on the machine.
+"""
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+# Entry point -> seconds allowed for `import <module>` in a fresh interpreter
+IMPORT_BUDGETS = {
+    "app.bot.executor": 1.5,
+    "app.backend.main": 2.0,
+    "app.cli": 0.6,
+}
+
+# Imported on first use only (ccxt, Secret Manager client)
+DEFERRED = ("ccxt", "google.cloud.secretmanager")
+
+
+def import_profile(module: str) -> Tuple[float, Dict[str, float]]:
+    """Total import seconds of `module` and the cumulative seconds of every module it loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line.split("|")
+        total = total.strip()
+        if total.isdigit():
+            cumulative[name.strip()] = int(total) / 1e6
+    return cumulative.get(module, 0.0), cumulative
+
+
+def best_profile(module: str, runs: int = 3) -> Tuple[float, Dict[str, float]]:
+    return min((import_profile(module) for _ in range(runs)), key=lambda profile: profile[0])
+
+
+def main(runs: int = 3, top: int = 8) -> None:
+    for module, budget in IMPORT_BUDGETS.items():
+        seconds, cumulative = best_profile(module, runs)
+        status = "ok" if seconds <= budget else "OVER BUDGET"
+        print(f"{module:20s} {seconds * 1000:7.0f} ms   (budget {budget * 1000:.0f} ms, {status})")
+        loaded = [name for name in DEFERRED if name in cumulative]
+        if loaded:
+            print(f"  eagerly imported: {', '.join(loaded)}")
+        slowest = sorted(
+            ((name, t) for name, t in cumulative.items() if name != module and not name.startswith(module + ".")),
+            key=lambda item: -item[1],
+        )[:top]
+        for name, t in slowest:
+            print(f"  {t * 1000:7.0f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
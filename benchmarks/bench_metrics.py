@@ -0,0 +1,55 @@
+"""
+Instrumentation overhead microbenchmark.
+
+    python -m benchmarks.bench_metrics
+
+Measures the cost of recording a counter increment and a histogram observation, and the
+added latency of the `timed` decorator over a bare sync call and a bare coroutine call.
+"""
+import asyncio
+import time
+
+from app.core import metrics
+
+
+def per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+async def per_await(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations
+
+
+async def main(iterations: int = 500_000) -> None:
+    registry = metrics.Registry()
+    calls = registry.counter("bench_calls_total", "Calls", ["op"]).labels("noop")
+    latency = registry.histogram("bench_seconds", "Latency", ["op"])
+    child = latency.labels("noop")
+
+    def noop():
+        return None
+
+    async def async_noop():
+        return None
+
+    timed_noop = metrics.timed(latency, "sync")(noop)
+    timed_async_noop = metrics.timed(latency, "async")(async_noop)
+
+    results = {
+        "counter inc": per_call(calls.inc, iterations),
+        "histogram observe": per_call(lambda: child.observe(0.003), iterations),
+        "timed sync overhead": per_call(timed_noop, iterations) - per_call(noop, iterations),
+        "timed async overhead": await per_await(timed_async_noop, iterations) - await per_await(async_noop, iterations),
+    }
+    for name, seconds in results.items():
+        print(f"{name:<22} {seconds * 1e6:6.3f} us/call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""
+Trades query benchmark at scale.
+
+    python -m benchmarks.bench_trades_api [rows]
+
+Fills a temporary SQLite database with `rows` trades (default 1M) spread over a year and
+a handful of symbols, then times the trades listing: offset pages vs keyset pages at
+increasing depth, a symbol-filtered page, and the rows/s of the streaming export query.
+"""
+import asyncio
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core import async_repository
+from app.core.db import Base, create_async_db_engine
+from app.core.models import Trade
+
+SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "BNB/USDT", "XRP/USDT"]
+
+
+def populate(path: str, rows: int, batch: int = 50_000) -> None:
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    start = datetime.datetime(2024, 1, 1)
+    step = 365 * 24 * 3600 / rows
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch):
+            conn.execute(insert(Trade), [
+                {
+                    "provider": "binance", "symbol": rng.choice(SYMBOLS), "side": rng.choice(("buy", "sell")),
+                    "amount": 0.01, "price": 100.0, "status": "closed", "exchange_order_id": str(i),
+                    "executed_at": start + datetime.timedelta(seconds=i * step),
+                }
+                for i in range(offset, min(rows, offset + batch))
+            ])
+    engine.dispose()
+
+
+async def timed(coro_factory, repeat: int = 5) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def run(path: str, rows: int, limit: int = 100) -> None:
+    engine = create_async_db_engine(f"sqlite:///{path}")
+    session_factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_factory() as session:
+        for depth in (0, rows // 10, rows // 2, rows - limit):
+            offset_ms = await timed(lambda: async_repository.get_trades(session, limit=limit, offset=depth))
+            # The keyset cursor for the same depth is the row just above the page
+            anchor = (await async_repository.get_trades(session, limit=1, offset=max(depth - 1, 0)))[0]
+            keyset_ms = await timed(
+                lambda: async_repository.get_trades(session, limit=limit, before=(anchor.executed_at, anchor.id))
+            )
+            print(f"page at depth {depth:>9,}: offset {offset_ms:8.2f} ms, keyset {keyset_ms:6.2f} ms")
+
+        filtered_ms = await timed(lambda: async_repository.get_trades(session, limit=limit, symbol="ETH/USDT"))
+        print(f"symbol-filtered first page: {filtered_ms:.2f} ms")
+
+        start = time.perf_counter()
+        count = 0
+        async for _ in async_repository.stream_trades(session, symbol="BTC/USDT"):
+            count += 1
+        elapsed = time.perf_counter() - start
+        print(f"export stream: {count:,} rows in {elapsed:.2f}s ({count / elapsed:,.0f} rows/s)")
+    await engine.dispose()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "trades.db")
+        start = time.perf_counter()
+        populate(path, rows)
+        print(f"inserted {rows:,} trades in {time.perf_counter() - start:.1f}s")
+        asyncio.run(run(path, rows))
+
+
+if __name__ == "__main__":
+    main()